@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Market Scan API Endpoints
+Scan top USDT perpetuals lintas timeframe dan kembalikan sinyal terurut
+"""
+
+import logging
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_cors import cross_origin
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+scan_bp = Blueprint('scan_api', __name__)
+
+MAX_SCAN_SYMBOLS = 200
+
+
+def _split_param(value: str):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+@scan_bp.route('/api/scan', methods=['GET'])
+@cross_origin()
+def market_scan():
+    """
+    🔎 Market Scan - ranked signals untuk banyak symbol x timeframe
+
+    Query Parameters:
+    - symbols: comma separated (default: top `universe` USDT perpetuals)
+    - timeframes: comma separated OKX bars (default: 15m,1H,4H,1D)
+    - universe: jumlah symbol teratas by 24h volume (default: 100)
+    - top: jumlah sinyal yang dikembalikan (default: 20)
+    - refresh: sync candle store dari OKX sebelum scan (true/false)
+
+    Examples:
+    GET /api/scan
+    GET /api/scan?top=10&timeframes=1H,4H
+    GET /api/scan?symbols=BTC-USDT,ETH-USDT&refresh=true
+    """
+    try:
+        from core.market_scanner import SCAN_TIMEFRAMES, get_market_scanner
+
+        symbols = _split_param(request.args.get('symbols', ''))[:MAX_SCAN_SYMBOLS]
+        timeframes = _split_param(request.args.get('timeframes', '')) or list(SCAN_TIMEFRAMES)
+        universe = min(int(request.args.get('universe', 100)), MAX_SCAN_SYMBOLS)
+        top_n = int(request.args.get('top', 20))
+        refresh = request.args.get('refresh', 'false').lower() == 'true'
+
+        result = get_market_scanner().scan(
+            symbols=symbols or None,
+            timeframes=timeframes,
+            top_n=top_n,
+            universe_size=universe,
+            refresh=refresh
+        )
+
+        logger.info(f"✅ Market scan: {result['scanned_units']} units in {result['timing']['total_seconds']}s")
+        return jsonify({
+            'status': 'success',
+            **result,
+            'api_info': {
+                'version': '1.0.0',
+                'service': 'Market Scan API',
+                'server_time': datetime.now().isoformat()
+            }
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'error': 'INVALID_PARAMETER',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Market scan endpoint error: {e}")
+        return jsonify({
+            'status': 'error',
+            'error': 'SCAN_FAILED',
+            'message': str(e),
+            'server_time': datetime.now().isoformat()
+        }), 500
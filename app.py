@@ -105,5 +105,15 @@ with app.app_context():
     
     db.create_all()
     
+    # Indexes added after the table existed + one-time analytics rollup backfill
+    from services.state_manager import StateManager
+    startup_state = StateManager()
+    startup_state.ensure_signal_indexes()
+    startup_state.ensure_query_rollups()
+    
 # Import routes after app is created
-import routes  # noqa: F401
\ No newline at end of file
+import routes  # noqa: F401
+
+# Live OKX feed: candle store, streaming indicators and paper sessions advance on bar close
+from config.app_setup import setup_realtime_streaming
+setup_realtime_streaming(app)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite untuk backtester & indikator
+Mengukur AdvancedIndicatorCalculator.calculate_all_indicators,
+ProfessionalSMCAnalyzer.analyze_market_structure, EventDrivenBacktester dan
+BacktestBuilder.run_backtest pada dataset synthetic (GBM + jump + regime volume)
+dan recorded (fixture OKX yang di-replay) di 1k/10k/100k/1M bar.
+
+Setiap run ditambahkan ke logs/benchmarks/history.jsonl dengan commit git-nya,
+lalu dibandingkan dengan run terakhir dari commit lain; target yang melambat
+lebih dari --threshold ditandai sebagai regresi (exit code 1).
+
+Usage:
+    python benchmark_backtests.py [--sizes 1000 10000] [--targets smc indicators]
+    python benchmark_backtests.py --datasets recorded --record-fixture 5000
+    python benchmark_backtests.py --compare-only --baseline <commit>
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.benchmark_data import make_dataset, record_fixture
+
+HISTORY_PATH = Path('logs/benchmarks/history.jsonl')
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_THRESHOLD = 0.25
+
+# Per-target size caps; the per-bar event loop re-slices the frame each bar
+DEFAULT_MAX_BARS = {
+    'event_driven': 100_000,
+}
+
+
+def crossover_signals(close: np.ndarray):
+    fast = pd.Series(close).rolling(5).mean().to_numpy()
+    slow = pd.Series(close).rolling(20).mean().to_numpy()
+    with np.errstate(invalid='ignore'):
+        return fast > slow, fast < slow
+
+
+# =================== TARGETS ===================
+# setup(df) -> zero-argument callable; only the callable is timed
+
+def setup_indicators(df: pd.DataFrame) -> Callable[[], Any]:
+    from core.feature_frame import feature_cache
+    from core.indicator_calculator import AdvancedIndicatorCalculator
+
+    def run():
+        # Cold run: no shared feature frame, no indicator LRU
+        feature_cache.clear()
+        return AdvancedIndicatorCalculator().calculate_all_indicators(df)
+    return run
+
+
+def setup_smc(df: pd.DataFrame) -> Callable[[], Any]:
+    from core.professional_smc_analyzer import ProfessionalSMCAnalyzer
+
+    analyzer = ProfessionalSMCAnalyzer()
+    market_data = {'candles': df.to_dict('records')}
+    return lambda: analyzer.analyze_market_structure(market_data)
+
+
+def setup_event_driven(df: pd.DataFrame) -> Callable[[], Any]:
+    from core.event_driven_backtester import EventDrivenBacktester
+
+    entries, exits = crossover_signals(df['close'].to_numpy())
+
+    def strategy(data, positions, capital):
+        i = len(data) - 1
+        if entries[i] and 'BTC-USDT' not in positions:
+            return {'action': 'BUY', 'quantity': capital * 0.1 / data['close'].iloc[-1], 'symbol': 'BTC-USDT'}
+        if exits[i] and 'BTC-USDT' in positions:
+            return {'action': 'CLOSE', 'symbol': 'BTC-USDT'}
+        return None
+
+    return lambda: EventDrivenBacktester(initial_capital=100000).run_backtest(df, strategy)
+
+
+def setup_event_driven_vectorized(df: pd.DataFrame) -> Callable[[], Any]:
+    from core.event_driven_backtester import EventDrivenBacktester
+
+    entries, exits = crossover_signals(df['close'].to_numpy())
+    return lambda: EventDrivenBacktester(initial_capital=100000).run_vectorized_backtest(
+        df, entries, exits, size=0.1
+    )
+
+
+class FrameFetcher:
+    """Candle source untuk BacktestBuilder yang melayani dataset benchmark"""
+
+    def __init__(self, df: pd.DataFrame):
+        from core.candle_store import CANDLE_DTYPE
+
+        self.records = np.empty(len(df), dtype=CANDLE_DTYPE)
+        self.records['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            self.records[column] = df[column].to_numpy()
+
+    def get_candle_range(self, symbol, timeframe, start_time, end_time=None):
+        ts = self.records['timestamp']
+        lo = np.searchsorted(ts, int(start_time.timestamp() * 1000), side='left')
+        hi = len(ts) if end_time is None else np.searchsorted(ts, int(end_time.timestamp() * 1000), side='right')
+        return self.records[lo:hi]
+
+
+def setup_backtest_builder(df: pd.DataFrame) -> Callable[[], Any]:
+    from core.backtest_builder import BacktestBuilder, BacktestConfiguration
+    from core.backtest_store import BacktestStore
+
+    store_dir = tempfile.mkdtemp(prefix='bench_backtests_')
+    builder = BacktestBuilder(okx_fetcher=FrameFetcher(df), result_store=BacktestStore(base_dir=store_dir))
+    config = BacktestConfiguration(
+        symbol='BTC-USDT', timeframe='1H',
+        start_date=df['timestamp'].iloc[0].isoformat(), end_date=df['timestamp'].iloc[-1].isoformat(),
+        initial_capital=10000, position_size_percent=10, confidence_threshold=60,
+        max_concurrent_positions=3, commission_percent=0.1, slippage_percent=0.05,
+        model_type='benchmark', custom_parameters={}
+    )
+
+    def run():
+        return asyncio.run(builder.run_backtest(config, use_cache=False))
+    run.cleanup = lambda: (builder.result_store.close(), shutil.rmtree(store_dir, ignore_errors=True))
+    return run
+
+
+TARGETS: Dict[str, Callable[[pd.DataFrame], Callable[[], Any]]] = {
+    'indicators': setup_indicators,
+    'smc': setup_smc,
+    'event_driven': setup_event_driven,
+    'event_driven_vectorized': setup_event_driven_vectorized,
+    'backtest_builder': setup_backtest_builder,
+}
+
+
+# =================== RUN & HISTORY ===================
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def result_key(target: str, dataset: str, size: int) -> str:
+    return f"{target}/{dataset}/{size}"
+
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = 'unknown', True
+    return {'commit': commit, 'dirty': dirty}
+
+
+def load_history(path: Path = HISTORY_PATH) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(run: Dict[str, Any], path: Path = HISTORY_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(run, sort_keys=True) + '\n')
+
+
+def find_baseline(history: List[Dict[str, Any]], commit: str,
+                  baseline: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Run terbaru untuk `baseline` (prefix commit), atau run terbaru dari commit lain"""
+    for run in reversed(history):
+        if baseline is not None:
+            if run['commit'].startswith(baseline):
+                return run
+        elif run['commit'] != commit:
+            return run
+    return None
+
+
+def compare_runs(current: Dict[str, float], baseline: Dict[str, float],
+                 threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Rasio waktu per key yang ada di kedua run; regression bila ratio > 1 + threshold"""
+    rows = []
+    for key in sorted(set(current) & set(baseline)):
+        ratio = current[key] / baseline[key] if baseline[key] > 0 else float('inf')
+        rows.append({'key': key, 'baseline': baseline[key], 'current': current[key],
+                     'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return rows
+
+
+def run_suite(targets: List[str], datasets: List[str], sizes: List[int], repeat: int,
+              max_bars: Dict[str, int], seed: int) -> Dict[str, float]:
+    results = {}
+    print(f"{'target':>24} {'dataset':>10} {'bars':>10} {'best (s)':>10} {'bars/s':>12}")
+    for dataset in datasets:
+        for size in sizes:
+            df = make_dataset(dataset, size, seed=seed)
+            if df is None:
+                print(f"{'-':>24} {dataset:>10} {size:>10}  no fixture recorded, skipped")
+                break
+            for target in targets:
+                if size > max_bars.get(target, size):
+                    continue
+                func = TARGETS[target](df)
+                try:
+                    elapsed = best_of(func, repeat)
+                finally:
+                    getattr(func, 'cleanup', lambda: None)()
+                results[result_key(target, dataset, size)] = elapsed
+                print(f"{target:>24} {dataset:>10} {size:>10} {elapsed:10.4f} {size / elapsed:12.0f}")
+    return results
+
+
+def print_comparison(rows: List[Dict[str, Any]], baseline_commit: str):
+    print(f"\nvs {baseline_commit[:10]}")
+    print(f"{'benchmark':>48} {'before (s)':>11} {'after (s)':>10} {'ratio':>7}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['key']:>48} {row['baseline']:11.4f} {row['current']:10.4f} {row['ratio']:7.2f}{flag}")
+
+
+def parse_max_bars(values: List[str]) -> Dict[str, int]:
+    max_bars = dict(DEFAULT_MAX_BARS)
+    for value in values:
+        target, _, bars = value.partition('=')
+        if target not in TARGETS or not bars.isdigit():
+            raise SystemExit(f"--max-bars expects target=N, got {value!r}")
+        max_bars[target] = int(bars)
+    return max_bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest & indicator benchmark suite')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--datasets', nargs='+', choices=['synthetic', 'recorded'],
+                        default=['synthetic', 'recorded'])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-bars', nargs='*', default=[], metavar='TARGET=N',
+                        help='Skip a target above N bars (default: event_driven=100000)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Slowdown ratio above 1+threshold counts as a regression')
+    parser.add_argument('--baseline', help='Commit (prefix) to compare against; default: previous commit run')
+    parser.add_argument('--history', type=Path, default=HISTORY_PATH)
+    parser.add_argument('--no-save', action='store_true', help='Do not append this run to the history')
+    parser.add_argument('--compare-only', action='store_true',
+                        help='Compare the latest stored run with the baseline without running')
+    parser.add_argument('--record-fixture', type=int, metavar='BARS',
+                        help='Record BARS recent BTC-USDT 1H candles from OKX as the replay fixture')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.record_fixture:
+        from core.okx_fetcher import OKXFetcher
+        print(f"Fixture written to {record_fixture(OKXFetcher(), 'BTC-USDT', '1H', args.record_fixture)}")
+
+    history = load_history(args.history)
+    if args.compare_only:
+        if not history:
+            raise SystemExit(f"No benchmark history in {args.history}")
+        run = history[-1]
+    else:
+        revision = git_revision()
+        run = {
+            **revision,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'results': run_suite(args.targets, args.datasets, args.sizes, args.repeat,
+                                 parse_max_bars(args.max_bars), args.seed),
+        }
+        if not args.no_save:
+            append_history(run, args.history)
+
+    baseline = find_baseline(history, run['commit'], args.baseline)
+    if baseline is None or baseline is run:
+        print("\nNo baseline run to compare against")
+        return
+
+    rows = compare_runs(run['results'], baseline['results'], args.threshold)
+    print_comparison(rows, baseline['commit'])
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
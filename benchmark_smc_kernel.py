@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark SMC Kernel vs loop lama ProfessionalSMCAnalyzer
+Membandingkan deteksi order block + FVG berbasis df.iloc (loop per candle)
+dengan kernel NumPy pada 1k/10k/100k candle.
+
+Usage:
+    python benchmark_smc_kernel.py [--sizes 1000 10000 100000] [--legacy-max 10000]
+"""
+
+import argparse
+import sys
+import time
+
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.smc_kernel import analyze_smc
+
+
+def make_candles(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 0.8, n),
+    })
+
+
+def legacy_order_blocks_and_fvgs(df: pd.DataFrame):
+    """Loop lama dari ProfessionalSMCAnalyzer (sebelum kernel)"""
+    order_blocks = []
+    for i in range(10, len(df) - 5):
+        candle = df.iloc[i]
+        body_size = abs(candle['close'] - candle['open'])
+        avg_volume = df['volume'].rolling(20).mean().iloc[i]
+        if candle['volume'] > avg_volume * 1.5 and body_size > 0:
+            order_blocks.append(i)
+
+    fvgs = []
+    for i in range(2, len(df)):
+        candle1 = df.iloc[i - 2]
+        candle3 = df.iloc[i]
+        if candle1['high'] < candle3['low'] or candle1['low'] > candle3['high']:
+            fvgs.append(i - 1)
+    return order_blocks, fvgs
+
+
+def kernel_full(df: pd.DataFrame):
+    return analyze_smc(df['open'].values, df['high'].values, df['low'].values,
+                       df['close'].values, df['volume'].values)
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMC kernel benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='Skip the O(n^2) legacy loop above this many candles')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'candles':>10} {'legacy (s)':>12} {'kernel (s)':>12} {'speedup':>10}  swings/bos+choch/ob/fvg/pools")
+    for size in args.sizes:
+        df = make_candles(size)
+        kernel_time, smc = best_of(kernel_full, df, args.repeat)
+
+        legacy_time = None
+        if size <= args.legacy_max:
+            legacy_time, (order_blocks, fvgs) = best_of(legacy_order_blocks_and_fvgs, df, 1)
+            assert order_blocks == smc.order_blocks['index'].tolist(), 'order block mismatch'
+            assert fvgs == smc.fvgs['index'].tolist(), 'FVG mismatch'
+
+        counts = '/'.join(str(len(part)) for part in (
+            smc.swings, smc.structure, smc.order_blocks, smc.fvgs, smc.liquidity
+        ))
+        legacy_text = f"{legacy_time:12.4f}" if legacy_time is not None else f"{'skipped':>12}"
+        speedup = f"{legacy_time / kernel_time:9.0f}x" if legacy_time is not None else f"{'-':>10}"
+        print(f"{size:>10} {legacy_text} {kernel_time:12.4f} {speedup}  {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -40,6 +40,12 @@ def setup_database(app: Flask):
                 import models  # Import models module
                 db.create_all()
                 logger.info("✅ Database tables created successfully")
+                
+                # Indexes added after the table existed + one-time analytics rollup backfill
+                from services.state_manager import StateManager
+                startup_state = StateManager()
+                startup_state.ensure_signal_indexes()
+                startup_state.ensure_query_rollups()
             except Exception as e:
                 logger.warning(f"Database table creation warning: {e}")
         
@@ -224,6 +230,12 @@ def setup_blueprints(app: Flask):
             'blueprint_name': 'performance_api',
             'critical': False
         },
+        {
+            'name': 'Market Scan Endpoints',
+            'import_path': 'api.scan_endpoints',
+            'blueprint_name': 'scan_bp',
+            'critical': False
+        },
         {
             'name': 'Chart Endpoints',
             'import_path': 'api.chart_endpoints',
@@ -396,6 +408,29 @@ def setup_telegram_integration(app: Flask):
         logger.warning(f"⚠️ Telegram Bot integration failed: {e}")
         return {"status": "error", "error": str(e)}
 
+def setup_realtime_streaming(app: Flask, enable: bool = True):
+    """
+    Start the OKX WebSocket ingestor for this worker
+    Paper trading sessions dan streaming indicators ikut maju di setiap candle
+    close (engine sudah di-attach oleh streamer); setiap worker punya feed
+    sendiri, candle yang sama hanya diproses sekali lewat state feed di SQLite.
+    """
+    if not enable or os.environ.get('DISABLE_REALTIME_STREAMING', 'false').lower() == 'true':
+        logger.info("⏸️ Realtime streaming disabled")
+        return {"status": "disabled"}
+    
+    try:
+        from core.realtime_streamer import streamer
+        if not streamer.is_streaming:
+            streamer.start_streaming()
+        app.extensions['realtime_streamer'] = streamer
+        
+        logger.info(f"✅ Realtime streaming started for {len(streamer.symbols)} symbols")
+        return {"status": "active", "streamer": streamer}
+    except Exception as e:
+        logger.warning(f"⚠️ Realtime streaming failed: {e}")
+        return {"status": "error", "error": str(e)}
+
 def check_dependencies():
     """Check critical dependencies"""
     dependencies = {
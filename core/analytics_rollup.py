@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Analytics Rollup - Agregat minute/hour/day untuk query & signal analytics
+Dashboard membaca tabel rollup (ukurannya tergantung jumlah bucket, bukan jumlah
+row mentah). Query rollup diperbarui saat insert (increment per batch); signal
+rollup dihitung ulang per hari yang berubah karena outcome/eksekusi di-update
+belakangan oleh banyak modul.
+
+Window "N hari terakhir" dipecah menjadi potongan minute -> hour -> day sehingga
+hasilnya sama dengan filter created_at >= now - N hari pada data mentah (presisi menit).
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ('minute', 'hour', 'day')
+RESOLUTION_DELTAS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+# Fine-grained buckets are pruned by compaction; day buckets are kept
+RETENTION = {
+    'minute': timedelta(days=2),
+    'hour': timedelta(days=90),
+}
+
+# Latency histogram upper bounds (ms); -1 = no latency recorded
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LATENCY_OVERFLOW_MS = 2 ** 31 - 1
+NO_LATENCY = -1
+
+WIN_OUTCOMES = ('WIN', 'HIT_TP')
+LOSS_OUTCOMES = ('LOSS', 'HIT_SL')
+
+QUERY_VALUE_FIELDS = ('query_count', 'latency_sum_ms')
+SIGNAL_VALUE_FIELDS = ('signal_count', 'executed_count', 'win_count', 'loss_count', 'confidence_sum')
+
+
+def floor_time(ts: datetime, resolution: str) -> datetime:
+    if resolution == 'minute':
+        return ts.replace(second=0, microsecond=0)
+    if resolution == 'hour':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_time(ts: datetime, resolution: str) -> datetime:
+    floored = floor_time(ts, resolution)
+    return floored if floored == ts else floored + RESOLUTION_DELTAS[resolution]
+
+
+def _cover(lo: datetime, hi: datetime, level: int) -> List[Tuple[str, datetime, datetime]]:
+    if lo >= hi:
+        return []
+    resolution = RESOLUTIONS[level]
+    if level == 0:
+        return [(resolution, lo, hi)]
+    first, last = _ceil_time(lo, resolution), floor_time(hi, resolution)
+    if first >= last:
+        return _cover(lo, hi, level - 1)
+    return _cover(lo, first, level - 1) + [(resolution, first, last)] + _cover(last, hi, level - 1)
+
+
+def split_window(start: datetime, end: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """
+    [(resolution, lo, hi)] yang menutup [start, end] dengan bucket sesedikit mungkin
+
+    Bucket ikut bila lo <= bucket_start < hi. start dibulatkan ke bawah ke menit;
+    bila start lebih tua dari retensi minute/hour bucket, start dibulatkan ke
+    jam/hari karena bucket halus di sana sudah dipangkas.
+    """
+    start = floor_time(start, 'minute')
+    if end - start > RETENTION['minute']:
+        start = floor_time(start, 'hour')
+    if end - start > RETENTION['hour']:
+        start = floor_time(start, 'day')
+    return _cover(start, floor_time(end, 'minute') + RESOLUTION_DELTAS['minute'], len(RESOLUTIONS) - 1)
+
+
+def latency_bucket(latency_ms: Optional[float]) -> int:
+    if latency_ms is None:
+        return NO_LATENCY
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return bound
+    return LATENCY_OVERFLOW_MS
+
+
+# =================== AGGREGATION ===================
+
+def query_rollup_increments(rows: Iterable[Dict[str, Any]]) -> Dict[tuple, Dict[str, float]]:
+    """
+    Increment per (resolution, bucket_start, endpoint, is_successful, latency_bucket_ms)
+
+    rows: mapping dengan created_at, endpoint, response_status, processing_time_ms
+    """
+    increments = defaultdict(lambda: dict.fromkeys(QUERY_VALUE_FIELDS, 0))
+    for row in rows:
+        latency = row.get('processing_time_ms')
+        status = row.get('response_status') or 200
+        key_tail = (row.get('endpoint') or 'unknown', status < 400, latency_bucket(latency))
+        for resolution in RESOLUTIONS:
+            values = increments[(resolution, floor_time(row['created_at'], resolution)) + key_tail]
+            values['query_count'] += 1
+            values['latency_sum_ms'] += float(latency or 0)
+    return dict(increments)
+
+
+def expired(resolution: str, bucket_start: datetime, now: datetime) -> bool:
+    retention = RETENTION.get(resolution)
+    return retention is not None and bucket_start < now - retention
+
+
+def signal_rollup_values(rows: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[tuple, Dict[str, float]]:
+    """
+    Nilai rollup per (resolution, bucket_start, symbol, timeframe)
+
+    rows: mapping dengan created_at, symbol, timeframe, confidence, is_executed, outcome
+    now: Bila diisi, minute/hour bucket di luar retensi tidak dibuat
+    """
+    values = defaultdict(lambda: dict.fromkeys(SIGNAL_VALUE_FIELDS, 0))
+    for row in rows:
+        outcome = (row.get('outcome') or '').upper()
+        for resolution in RESOLUTIONS:
+            if now is not None and expired(resolution, floor_time(row['created_at'], resolution), now):
+                continue
+            bucket = values[(resolution, floor_time(row['created_at'], resolution), row['symbol'], row['timeframe'])]
+            bucket['signal_count'] += 1
+            bucket['executed_count'] += 1 if row.get('is_executed') else 0
+            bucket['win_count'] += 1 if outcome in WIN_OUTCOMES else 0
+            bucket['loss_count'] += 1 if outcome in LOSS_OUTCOMES else 0
+            bucket['confidence_sum'] += float(row.get('confidence') or 0)
+    return dict(values)
+
+
+# =================== PERSISTENCE (SQLAlchemy session) ===================
+
+QUERY_KEY_FIELDS = ('resolution', 'bucket_start', 'endpoint', 'is_successful', 'latency_bucket_ms')
+SIGNAL_KEY_FIELDS = ('resolution', 'bucket_start', 'symbol', 'timeframe')
+
+
+def apply_increments(session, model, key_fields: Tuple[str, ...], increments: Dict[tuple, Dict[str, float]]):
+    """
+    UPDATE ... SET col = col + n, INSERT bila row belum ada
+
+    Increment di SQL sehingga beberapa worker bisa menulis bucket yang sama; insert
+    yang kalah race (unique constraint) diulang sebagai update. Commit oleh caller.
+    """
+    from sqlalchemy.exc import IntegrityError
+
+    for key, values in increments.items():
+        filters = dict(zip(key_fields, key))
+        changes = {getattr(model, field): getattr(model, field) + amount for field, amount in values.items()}
+        if session.query(model).filter_by(**filters).update(changes, synchronize_session=False):
+            continue
+        try:
+            with session.begin_nested():
+                session.add(model(**filters, **values))
+        except IntegrityError:
+            session.query(model).filter_by(**filters).update(changes, synchronize_session=False)
+
+
+def replace_rollups(session, model, key_fields: Tuple[str, ...], values: Dict[tuple, Dict[str, float]],
+                    start: datetime, end: datetime, **scope):
+    """Ganti semua rollup row di [start, end) (opsional per scope, mis. symbol) dengan `values`"""
+    query = session.query(model).filter(model.bucket_start >= start, model.bucket_start < end)
+    if scope:
+        query = query.filter_by(**scope)
+    query.delete(synchronize_session=False)
+    session.bulk_insert_mappings(model, [{**dict(zip(key_fields, key)), **row} for key, row in values.items()])
+
+
+def load_window(session, model, start: datetime, end: datetime) -> List[Any]:
+    """Rollup rows yang menutup [start, end) tepat satu kali"""
+    rows = []
+    for resolution, lo, hi in split_window(start, end):
+        rows.extend(session.query(model).filter(
+            model.resolution == resolution, model.bucket_start >= lo, model.bucket_start < hi
+        ).all())
+    return rows
+
+
+def prune_rollups(session, model, now: datetime) -> Dict[str, int]:
+    """Compaction: buang minute/hour bucket yang melewati retensi"""
+    deleted = {}
+    for resolution, retention in RETENTION.items():
+        deleted[resolution] = session.query(model).filter(
+            model.resolution == resolution, model.bucket_start < now - retention
+        ).delete(synchronize_session=False)
+    return deleted
+
+
+# =================== SUMMARIES ===================
+
+def summarize_query_rollups(rows: Iterable[Any], days: int) -> Dict[str, Any]:
+    """Analytics dict (format QueryLogger.get_query_analytics) dari rollup rows"""
+    total = successful = timed = 0
+    latency_sum = 0.0
+    endpoints = defaultdict(int)
+    daily = defaultdict(int)
+    histogram = defaultdict(int)
+
+    for row in rows:
+        count = row.query_count
+        total += count
+        successful += count if row.is_successful else 0
+        endpoints[row.endpoint] += count
+        daily[row.bucket_start.date()] += count
+        if row.latency_bucket_ms != NO_LATENCY:
+            timed += count
+            latency_sum += row.latency_sum_ms
+            histogram[row.latency_bucket_ms] += count
+
+    top_endpoints = sorted(endpoints.items(), key=lambda item: (-item[1], item[0]))[:10]
+    return {
+        'period_days': days,
+        'total_queries': total,
+        'successful_queries': successful,
+        'success_rate': round(successful / total * 100, 2) if total else 0,
+        'avg_processing_time_ms': round(latency_sum / timed, 2) if timed else 0,
+        'top_sources': [{'source': endpoint or 'unknown', 'count': count} for endpoint, count in top_endpoints],
+        'top_categories': [{'category': endpoint, 'count': count} for endpoint, count in top_endpoints],
+        'top_endpoints': [{'endpoint': endpoint, 'count': count} for endpoint, count in top_endpoints],
+        'daily_stats': [{'date': str(day), 'count': count} for day, count in sorted(daily.items())],
+        'latency_histogram': [
+            {'le_ms': 'inf' if bound == LATENCY_OVERFLOW_MS else bound, 'count': histogram[bound]}
+            for bound in LATENCY_BUCKETS_MS + (LATENCY_OVERFLOW_MS,)
+        ]
+    }
+
+
+def summarize_signal_rollups(rows: Iterable[Any], days: int) -> Dict[str, Any]:
+    """Performance stats dict (format StateManager.get_signal_performance_stats) dari rollup rows"""
+    totals = dict.fromkeys(SIGNAL_VALUE_FIELDS, 0)
+    by_symbol = defaultdict(lambda: [0, 0.0])
+    by_pair = defaultdict(lambda: dict.fromkeys(SIGNAL_VALUE_FIELDS, 0))
+
+    for row in rows:
+        for field in SIGNAL_VALUE_FIELDS:
+            totals[field] += getattr(row, field)
+            by_pair[(row.symbol, row.timeframe)][field] += getattr(row, field)
+        by_symbol[row.symbol][0] += row.signal_count
+        by_symbol[row.symbol][1] += row.confidence_sum
+
+    total = totals['signal_count']
+    closed = totals['win_count'] + totals['loss_count']
+    top_symbols = sorted(by_symbol.items(), key=lambda item: (-item[1][0], item[0]))[:10]
+    return {
+        'period_days': days,
+        'total_signals': total,
+        'executed_signals': totals['executed_count'],
+        'execution_rate': round(totals['executed_count'] / total * 100, 2) if total else 0,
+        'winning_signals': totals['win_count'],
+        'closed_signals': closed,
+        'win_rate': round(totals['win_count'] / closed * 100, 2) if closed else 0,
+        'top_symbols': [
+            {'symbol': symbol, 'count': count, 'avg_confidence': round(confidence_sum / count, 2) if count else 0}
+            for symbol, (count, confidence_sum) in top_symbols
+        ],
+        'by_symbol_timeframe': [
+            {
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'signals': pair['signal_count'],
+                'wins': pair['win_count'],
+                'losses': pair['loss_count'],
+                'win_rate': round(pair['win_count'] / (pair['win_count'] + pair['loss_count']) * 100, 2)
+                if pair['win_count'] + pair['loss_count'] else 0
+            }
+            for (symbol, timeframe), pair in sorted(by_pair.items())
+        ]
+    }
+
+
+# Export
+__all__ = [
+    'RESOLUTIONS', 'LATENCY_BUCKETS_MS', 'floor_time', 'split_window', 'latency_bucket', 'expired',
+    'query_rollup_increments', 'signal_rollup_values', 'apply_increments', 'replace_rollups',
+    'load_window', 'prune_rollups', 'summarize_query_rollups', 'summarize_signal_rollups',
+    'QUERY_KEY_FIELDS', 'SIGNAL_KEY_FIELDS'
+]
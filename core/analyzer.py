@@ -7,7 +7,8 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, Any, Optional, List
-import ta
+from datetime import datetime
+from .feature_frame import get_feature_frame
 from .professional_smc_analyzer import ProfessionalSMCAnalyzer
 from .enhanced_ai_engine import EnhancedAIEngine
 
@@ -69,8 +70,11 @@ class TechnicalAnalyzer:
         indicators = {}
         
         try:
+            # Shared feature frame; parameters follow the `ta` library conventions
+            features = get_feature_frame(df)
+            
             # RSI
-            rsi = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
+            rsi = features.get('rsi', period=14, method='wilder')
             indicators['rsi'] = {
                 'value': float(rsi.iloc[-1]) if not rsi.empty else 50.0,
                 'overbought': bool(rsi.iloc[-1] > 70) if not rsi.empty else False,
@@ -78,8 +82,8 @@ class TechnicalAnalyzer:
             }
             
             # Moving Averages
-            ema_20 = ta.trend.EMAIndicator(df['close'], window=20).ema_indicator()
-            ema_50 = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator()
+            ema_20 = features.get('ema', period=20, adjust=False, min_periods=20)
+            ema_50 = features.get('ema', period=50, adjust=False, min_periods=50)
             
             indicators['ema'] = {
                 'ema_20': float(ema_20.iloc[-1]) if not ema_20.empty else float(df['close'].iloc[-1]),
@@ -88,10 +92,10 @@ class TechnicalAnalyzer:
             }
             
             # MACD
-            macd_indicator = ta.trend.MACD(df['close'])
-            macd_line = macd_indicator.macd()
-            macd_signal = macd_indicator.macd_signal()
-            macd_histogram = macd_indicator.macd_diff()
+            macd = features.get('macd', fast=12, slow=26, signal=9, adjust=False)
+            macd_line = macd['macd']
+            macd_signal = macd['signal']
+            macd_histogram = macd['histogram']
             
             if not macd_line.empty and not macd_signal.empty:
                 indicators['macd'] = {
@@ -102,10 +106,10 @@ class TechnicalAnalyzer:
                 }
             
             # Bollinger Bands
-            bb_indicator = ta.volatility.BollingerBands(df['close'])
-            bb_upper = bb_indicator.bollinger_hband()
-            bb_middle = bb_indicator.bollinger_mavg()
-            bb_lower = bb_indicator.bollinger_lband()
+            bands = features.get('bollinger', period=20, std_dev=2, ddof=0)
+            bb_upper = bands['upper']
+            bb_middle = bands['middle']
+            bb_lower = bands['lower']
             
             if not bb_upper.empty and not bb_middle.empty and not bb_lower.empty:
                 indicators['bollinger'] = {
@@ -116,7 +120,7 @@ class TechnicalAnalyzer:
                 }
             
             # Volume indicators
-            volume_sma = ta.trend.SMAIndicator(df['volume'], window=20).sma_indicator()
+            volume_sma = features.get('sma', period=20, column='volume')
             indicators['volume'] = {
                 'current': float(df['volume'].iloc[-1]),
                 'average': float(volume_sma.iloc[-1]) if not volume_sma.empty else float(df['volume'].iloc[-1]),
@@ -11,11 +11,145 @@ import numpy as np
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
+from pathlib import Path
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from core.backtest_store import BacktestStore, backtest_cache_key, source_fingerprint
+from core.intrabar_fills import IntrabarResolver, fetcher_loader
+
 logger = logging.getLogger(__name__)
 
+# Maximum holding period sebelum posisi ditutup paksa
+MAX_HOLDING_HOURS = 48
+
+# Part of every cache key: edits to the simulation code invalidate stored results
+CODE_VERSION = source_fingerprint(__file__, Path(__file__).with_name('intrabar_fills.py'))
+
+class PriceIndex:
+    """
+    Time-indexed OHLC arrays untuk exit simulation
+    
+    Timestamps disimpan sebagai int64 nanoseconds (UTC) sehingga entry lookup
+    cukup satu searchsorted; first-hit TP/SL dicari dengan cumulative max/min
+    atas holding window. Bar yang menyentuh TP dan SL sekaligus diselesaikan
+    oleh `intrabar` (IntrabarResolver) bila tersedia.
+    """
+    
+    # Optional core.intrabar_fills.IntrabarResolver for bars touching both levels
+    intrabar = None
+    
+    def __init__(self, historical_data: pd.DataFrame):
+        data = historical_data[['timestamp', 'open', 'high', 'low', 'close']].copy()
+        data['timestamp'] = pd.to_datetime(data['timestamp'])
+        if not data['timestamp'].is_monotonic_increasing or data['timestamp'].duplicated().any():
+            data = data.drop_duplicates('timestamp', keep='last').sort_values('timestamp', kind='stable')
+        
+        self.times = pd.DatetimeIndex(data['timestamp'])
+        self.ns = self.times.asi8
+        self.open = data['open'].to_numpy(dtype=float)
+        self.high = data['high'].to_numpy(dtype=float)
+        self.low = data['low'].to_numpy(dtype=float)
+        self.close = data['close'].to_numpy(dtype=float)
+    
+    @classmethod
+    def from_records(cls, records: np.ndarray, tz: Optional[str] = None) -> 'PriceIndex':
+        """Build dari candle records (timestamp ms); arrays di-copy keluar dari buffer sumber"""
+        times = pd.to_datetime(np.asarray(records['timestamp']), unit='ms', utc=True)
+        index = cls.__new__(cls)
+        index.times = pd.DatetimeIndex(times.tz_convert(tz) if tz else times.tz_localize(None))
+        index.ns = index.times.asi8
+        for column in ('open', 'high', 'low', 'close'):
+            setattr(index, column, np.array(records[column], dtype=float))
+        return index
+    
+    def to_records(self) -> np.ndarray:
+        """Candle records (CANDLE_DTYPE, volume 0) untuk shared memory"""
+        from core.candle_store import CANDLE_DTYPE
+        records = np.zeros(len(self), dtype=CANDLE_DTYPE)
+        records['timestamp'] = self.ns // 1_000_000
+        for column in ('open', 'high', 'low', 'close'):
+            records[column] = getattr(self, column)
+        return records
+    
+    @property
+    def tz(self) -> Optional[str]:
+        return str(self.times.tz) if self.times.tz is not None else None
+    
+    def head(self, count: int) -> 'PriceIndex':
+        """Index atas `count` candle pertama (views, tanpa copy)"""
+        index = PriceIndex.__new__(PriceIndex)
+        index.intrabar = self.intrabar
+        index.times = self.times[:count]
+        index.ns = self.ns[:count]
+        for column in ('open', 'high', 'low', 'close'):
+            setattr(index, column, getattr(self, column)[:count])
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.ns)
+    
+    @staticmethod
+    def _to_ns(timestamp) -> int:
+        return pd.Timestamp(timestamp).value
+    
+    def first_after(self, timestamp) -> int:
+        """Index candle pertama dengan timestamp > entry"""
+        return int(np.searchsorted(self.ns, self._to_ns(timestamp), side='right'))
+    
+    def find_exit(self, entry_time, action: str, take_profit: Optional[float],
+                  stop_loss: Optional[float], max_hours: float = MAX_HOLDING_HOURS) -> Optional[Dict[str, Any]]:
+        """
+        First exit setelah entry_time
+        
+        Urutan prioritas per candle sama dengan loop lama: TIME_LIMIT (candle
+        pertama lebih dari max_hours setelah entry), lalu TAKE_PROFIT, lalu STOP_LOSS.
+        Jika TP dan SL tersentuh di candle yang sama, intrabar resolver menentukan
+        mana yang lebih dulu; tanpa resolver (atau data 1m) TAKE_PROFIT menang.
+        Tanpa hit, posisi ditutup di close candle terakhir (END_OF_DATA).
+        """
+        if len(self) == 0:
+            return None
+        
+        entry_ns = self._to_ns(entry_time)
+        start = int(np.searchsorted(self.ns, entry_ns, side='right'))
+        limit = int(np.searchsorted(self.ns, entry_ns + int(max_hours * 3600 * 1e9), side='right'))
+        limit = max(limit, start)
+        
+        high = self.high[start:limit]
+        low = self.low[start:limit]
+        window = limit - start
+        tp_hit = sl_hit = window
+        
+        if window:
+            side = action.upper()
+            if side in ('BUY', 'LONG'):
+                if take_profit:
+                    tp_hit = np.searchsorted(np.maximum.accumulate(high), take_profit, side='left')
+                if stop_loss:
+                    sl_hit = np.searchsorted(-np.minimum.accumulate(low), -stop_loss, side='left')
+            elif side in ('SELL', 'SHORT'):
+                if take_profit:
+                    tp_hit = np.searchsorted(-np.minimum.accumulate(low), -take_profit, side='left')
+                if stop_loss:
+                    sl_hit = np.searchsorted(np.maximum.accumulate(high), stop_loss, side='left')
+        
+        if tp_hit < window and tp_hit == sl_hit and self.intrabar is not None:
+            if self.intrabar.first_touch(self.ns[start + tp_hit], action, take_profit, stop_loss) == 'STOP_LOSS':
+                tp_hit = window
+        
+        if tp_hit < window and tp_hit <= sl_hit:
+            return {'exit_time': self.times[start + tp_hit], 'exit_price': take_profit,
+                    'exit_reason': 'TAKE_PROFIT'}
+        if sl_hit < window:
+            return {'exit_time': self.times[start + sl_hit], 'exit_price': stop_loss,
+                    'exit_reason': 'STOP_LOSS'}
+        if limit < len(self):
+            return {'exit_time': self.times[limit], 'exit_price': float(self.close[limit]),
+                    'exit_reason': 'TIME_LIMIT'}
+        return {'exit_time': self.times[-1], 'exit_price': float(self.close[-1]),
+                'exit_reason': 'END_OF_DATA'}
+
 @dataclass
 class BacktestResult:
     """Results dari backtesting session"""
@@ -67,26 +201,46 @@ class BacktestBuilder:
     - Monte Carlo simulation
     """
     
-    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None):
+    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None, result_store=None):
         """Initialize Backtest Builder"""
         self.okx_fetcher = okx_fetcher
         self.ai_engine = ai_engine
         self.db_session = db_session
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self._optimizer = None
+        self._result_store = result_store
+        self._intrabar_resolvers: Dict[Tuple[str, str], IntrabarResolver] = {}
         
         logger.info("📈 Backtest Builder initialized")
     
-    async def run_backtest(self, config: BacktestConfiguration) -> BacktestResult:
+    @property
+    def result_store(self) -> BacktestStore:
+        """Result store, opened on first use (optimizer workers never touch it)"""
+        if self._result_store is None:
+            self._result_store = BacktestStore()
+        return self._result_store
+    
+    async def run_backtest(self, config: BacktestConfiguration, use_cache: bool = True) -> BacktestResult:
         """
         Run comprehensive backtest with given configuration
         
         Args:
             config: Backtest configuration
+            use_cache: Return the stored result of an identical run (same config,
+                data range and code version) instead of recomputing
             
         Returns:
             BacktestResult: Complete backtest results
         """
         start_time = datetime.now()
+        cache_key = self._backtest_cache_key(config)
+        
+        if use_cache and cache_key is not None:
+            cached = self._load_cached_result(cache_key)
+            if cached is not None:
+                logger.info(f"📈 Backtest cache hit: {cached.backtest_id} for {config.symbol} {config.timeframe}")
+                return cached
+        
         backtest_id = self._generate_backtest_id(config)
         
         try:
@@ -131,7 +285,7 @@ class BacktestBuilder:
             )
             
             # Save results
-            await self._save_backtest_results(result)
+            await self._save_backtest_results(result, config, cache_key)
             
             logger.info(f"📈 Backtest completed: {backtest_id} - Success rate: {result.success_rate:.1f}%")
             return result
@@ -183,77 +337,69 @@ class BacktestBuilder:
             return {'error': str(e)}
     
     async def optimize_parameters(self, base_config: BacktestConfiguration, 
-                                parameter_ranges: Dict[str, List[Any]]) -> Dict[str, Any]:
+                                parameter_ranges: Dict[str, List[Any]],
+                                search: str = 'grid',
+                                n_iter: int = 100,
+                                objective: str = 'sharpe_ratio',
+                                max_workers: Optional[int] = None) -> Dict[str, Any]:
         """
-        Optimize strategy parameters using grid search
+        Optimize strategy parameters (grid, random search atau successive halving)
+        
+        Data di-load sekali, signal di-cache per subset parameter non-eksekusi dan
+        simulasi eksekusi dibagi ke process pool (lihat core.backtest_optimizer).
         
         Args:
             base_config: Base configuration
             parameter_ranges: Parameter ranges to test
+            search: 'grid', 'random' atau 'halving'
+            n_iter: Jumlah kandidat untuk random search
+            objective: Metric yang dioptimasi
+            max_workers: Ukuran process pool
             
         Returns:
             optimization_results: Parameter optimization results
         """
         try:
-            logger.info(f"📈 Starting parameter optimization for {base_config.symbol}")
-            
-            # Generate parameter combinations
-            parameter_combinations = self._generate_parameter_combinations(parameter_ranges)
-            
-            if len(parameter_combinations) > 50:
-                logger.warning(f"Large parameter space ({len(parameter_combinations)} combinations) - limiting to 50")
-                parameter_combinations = parameter_combinations[:50]
-            
-            # Create configurations for each combination
-            configs = []
-            for i, params in enumerate(parameter_combinations):
-                config = BacktestConfiguration(
-                    symbol=base_config.symbol,
-                    timeframe=base_config.timeframe,
-                    start_date=base_config.start_date,
-                    end_date=base_config.end_date,
-                    initial_capital=base_config.initial_capital,
-                    position_size_percent=params.get('position_size_percent', base_config.position_size_percent),
-                    confidence_threshold=params.get('confidence_threshold', base_config.confidence_threshold),
-                    max_concurrent_positions=params.get('max_concurrent_positions', base_config.max_concurrent_positions),
-                    commission_percent=params.get('commission_percent', base_config.commission_percent),
-                    slippage_percent=params.get('slippage_percent', base_config.slippage_percent),
-                    model_type=base_config.model_type,
-                    custom_parameters={**base_config.custom_parameters, **params}
-                )
-                configs.append(config)
-            
-            # Run optimization backtests
-            optimization_results = await self.compare_strategies(configs)
-            
-            # Add optimization-specific analysis
-            if 'detailed_results' in optimization_results:
-                optimization_results['parameter_analysis'] = self._analyze_parameter_impact(
-                    optimization_results['detailed_results'], parameter_ranges
-                )
-                optimization_results['optimal_parameters'] = self._find_optimal_parameters(
-                    optimization_results['detailed_results'], parameter_ranges
-                )
-            
-            return optimization_results
+            from core.backtest_optimizer import BacktestOptimizer
+            
+            logger.info(f"📈 Starting parameter optimization for {base_config.symbol} ({search})")
+            
+            if self._optimizer is None or (max_workers and self._optimizer.max_workers != max_workers):
+                if self._optimizer is not None:
+                    self._optimizer.close()
+                self._optimizer = BacktestOptimizer(self, max_workers=max_workers)
+            
+            return await self._optimizer.optimize(
+                base_config, parameter_ranges, search=search, n_iter=n_iter, objective=objective
+            )
             
         except Exception as e:
             logger.error(f"Error in parameter optimization: {e}")
             return {'error': str(e)}
     
     async def monte_carlo_simulation(self, config: BacktestConfiguration, 
-                                   num_simulations: int = 1000) -> Dict[str, Any]:
+                                   num_simulations: int = 1000,
+                                   block_size: int = 1,
+                                   ruin_drawdown: float = 50.0,
+                                   seed: Optional[int] = None,
+                                   max_detailed: int = 1000) -> Dict[str, Any]:
         """
         Run Monte Carlo simulation untuk risk assessment
         
         Args:
             config: Backtest configuration
             num_simulations: Number of simulations to run
+            block_size: Block bootstrap length (1 = iid resampling)
+            ruin_drawdown: Drawdown dari modal awal (persen) yang dihitung sebagai ruin
+            seed: Random seed
+            max_detailed: Maksimum simulasi yang dikembalikan di detailed_simulations
             
         Returns:
             simulation_results: Monte Carlo simulation results
         """
         try:
+            from core.monte_carlo_engine import MonteCarloEngine
+            
             logger.info(f"📈 Starting Monte Carlo simulation ({num_simulations} runs)")
             
             # Run base backtest
@@ -265,49 +411,26 @@ class BacktestBuilder:
             if not signal_returns:
                 return {'error': 'No signal returns available for simulation'}
             
-            # Run Monte Carlo simulations
-            simulation_results = []
-            
-            for i in range(num_simulations):
-                # Randomly sample from historical returns
-                simulated_returns = np.random.choice(signal_returns, size=len(signal_returns), replace=True)
-                
-                # Calculate simulation metrics
-                cumulative_return = np.prod(1 + np.array(simulated_returns) / 100) - 1
-                max_drawdown = self._calculate_max_drawdown_from_returns(simulated_returns)
-                
-                simulation_results.append({
-                    'simulation_id': i + 1,
-                    'total_return': cumulative_return * 100,
-                    'max_drawdown': max_drawdown,
-                    'final_equity': config.initial_capital * (1 + cumulative_return)
-                })
-            
-            # Analyze simulation results
-            returns = [sim['total_return'] for sim in simulation_results]
-            drawdowns = [sim['max_drawdown'] for sim in simulation_results]
+            # Batched bootstrap (simulations x trades matrix per chunk)
+            simulation = MonteCarloEngine().simulate(
+                signal_returns, num_simulations=num_simulations, block_size=block_size,
+                ruin_drawdown=ruin_drawdown, seed=seed
+            )
             
+            detailed = min(num_simulations, max_detailed)
             analysis = {
                 'base_backtest': asdict(base_result),
-                'simulation_summary': {
-                    'num_simulations': num_simulations,
-                    'avg_return': np.mean(returns),
-                    'std_return': np.std(returns),
-                    'min_return': np.min(returns),
-                    'max_return': np.max(returns),
-                    'percentile_5': np.percentile(returns, 5),
-                    'percentile_95': np.percentile(returns, 95),
-                    'probability_positive': sum(1 for r in returns if r > 0) / len(returns) * 100,
-                    'avg_max_drawdown': np.mean(drawdowns),
-                    'worst_drawdown': np.min(drawdowns)
-                },
-                'risk_metrics': {
-                    'var_95': np.percentile(returns, 5),  # Value at Risk
-                    'cvar_95': np.mean([r for r in returns if r <= np.percentile(returns, 5)]),  # Conditional VaR
-                    'downside_deviation': np.std([r for r in returns if r < 0]),
-                    'upside_deviation': np.std([r for r in returns if r > 0])
-                },
-                'detailed_simulations': simulation_results
+                'simulation_summary': simulation.summary(),
+                'risk_metrics': simulation.risk_metrics(),
+                'detailed_simulations': [
+                    {
+                        'simulation_id': i + 1,
+                        'total_return': float(simulation.total_returns[i]),
+                        'max_drawdown': float(simulation.max_drawdowns[i]),
+                        'final_equity': config.initial_capital * (1 + simulation.total_returns[i] / 100)
+                    }
+                    for i in range(detailed)
+                ]
             }
             
             return analysis
@@ -317,20 +440,25 @@ class BacktestBuilder:
             return {'error': str(e)}
     
     def get_backtest_history(self, symbol: str = None, timeframe: str = None, 
-                           limit: int = 20) -> List[Dict[str, Any]]:
-        """Get history of backtests"""
+                           limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get history of backtests (summary metrics only, newest first)"""
         try:
-            if not self.db_session:
-                return []
-            
-            # This would query a backtests table if it existed
-            # For now, return empty list
-            return []
+            return self.result_store.list_runs(symbol, timeframe, limit=limit, offset=offset)
             
         except Exception as e:
             logger.error(f"Error getting backtest history: {e}")
             return []
     
+    def get_backtest_result(self, backtest_id: str) -> Optional[BacktestResult]:
+        """Full stored result (including signal_details) for a history entry"""
+        try:
+            cache_key = self.result_store.find_by_backtest_id(backtest_id)
+            return self._load_cached_result(cache_key, record_hit=False) if cache_key else None
+            
+        except Exception as e:
+            logger.error(f"Error loading backtest {backtest_id}: {e}")
+            return None
+    
     async def _fetch_historical_data(self, config: BacktestConfiguration) -> Optional[pd.DataFrame]:
         """Fetch historical market data untuk backtesting"""
         try:
@@ -342,48 +470,22 @@ class BacktestBuilder:
             start_date = datetime.fromisoformat(config.start_date.replace('Z', '+00:00'))
             end_date = datetime.fromisoformat(config.end_date.replace('Z', '+00:00'))
             
-            # Calculate number of candles needed
-            timeframe_minutes = self._timeframe_to_minutes(config.timeframe)
-            total_minutes = (end_date - start_date).total_seconds() / 60
-            num_candles = int(total_minutes / timeframe_minutes)
-            
-            # Fetch data in chunks if needed
-            max_candles_per_request = 1000
-            all_candles = []
-            
-            current_end = end_date
-            while len(all_candles) < num_candles and current_end > start_date:
-                chunk_size = min(max_candles_per_request, num_candles - len(all_candles))
-                
-                candles = self.okx_fetcher.get_candles(
-                    symbol=config.symbol,
-                    timeframe=config.timeframe,
-                    limit=chunk_size,
-                    end_time=current_end
-                )
-                
-                if not candles:
-                    break
-                
-                all_candles.extend(candles)
-                
-                # Update current_end for next chunk
-                if candles:
-                    current_end = datetime.fromisoformat(candles[-1]['timestamp'].replace('Z', '+00:00'))
-                    current_end -= timedelta(minutes=timeframe_minutes)
+            # Served from the local candle store; only missing candles hit OKX
+            records = self.okx_fetcher.get_candle_range(
+                config.symbol, config.timeframe, start_date, end_date
+            )
             
-            if not all_candles:
+            if records is None or len(records) == 0:
                 return None
             
-            # Convert to DataFrame
-            df = pd.DataFrame(all_candles)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.sort_values('timestamp')
-            
-            # Convert price columns to float
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = pd.DataFrame({
+                'timestamp': pd.to_datetime(records['timestamp'], unit='ms', utc=True),
+                'open': records['open'],
+                'high': records['high'],
+                'low': records['low'],
+                'close': records['close'],
+                'volume': records['volume']
+            })
             
             return df
             
@@ -400,10 +502,13 @@ class BacktestBuilder:
             # Process data in windows
             window_size = 100  # Process 100 candles at a time
             
+            # Records converted once; each window is a list slice
+            records = historical_data.to_dict('records') if self.ai_engine else None
+            
             for i in range(window_size, len(historical_data), 20):  # Step by 20 for efficiency
-                window_data = historical_data.iloc[max(0, i-window_size):i]
+                window_start = max(0, i - window_size)
                 
-                if len(window_data) < 50:  # Need minimum data for analysis
+                if i - window_start < 50:  # Need minimum data for analysis
                     continue
                 
                 # Generate signal using AI engine
@@ -413,7 +518,7 @@ class BacktestBuilder:
                         
                         # Prepare analysis data
                         analysis_data = {
-                            'price_data': window_data.to_dict('records'),
+                            'price_data': records[window_start:i],
                             'current_price': float(current_candle['close']),
                             'symbol': config.symbol,
                             'timeframe': config.timeframe
@@ -450,8 +555,9 @@ class BacktestBuilder:
             return []
     
     def _simulate_trading(self, signals: List[Dict[str, Any]], 
-                         historical_data: pd.DataFrame, 
-                         config: BacktestConfiguration) -> List[Dict[str, Any]]:
+                         historical_data: Optional[pd.DataFrame], 
+                         config: BacktestConfiguration,
+                         price_index: Optional[PriceIndex] = None) -> List[Dict[str, Any]]:
         """Simulate trading execution dan calculate results"""
         try:
             results = []
@@ -460,16 +566,10 @@ class BacktestBuilder:
             max_equity = current_capital
             min_equity = current_capital
             
-            # Create price lookup untuk fast access
-            price_lookup = {}
-            for _, row in historical_data.iterrows():
-                timestamp = row['timestamp']
-                price_lookup[timestamp] = {
-                    'open': float(row['open']),
-                    'high': float(row['high']),
-                    'low': float(row['low']),
-                    'close': float(row['close'])
-                }
+            # Time-indexed OHLC arrays untuk exit lookup (optimizer passes a shared one)
+            if price_index is None:
+                price_index = PriceIndex(historical_data)
+                price_index.intrabar = self._intrabar_resolver(config)
             
             for signal in signals:
                 try:
@@ -501,7 +601,7 @@ class BacktestBuilder:
                     open_positions.append(position)
                     
                     # Simulate position management
-                    exit_result = self._simulate_position_exit(position, price_lookup, config)
+                    exit_result = self._simulate_position_exit(position, price_index, config)
                     
                     if exit_result:
                         # Close position
@@ -548,73 +648,44 @@ class BacktestBuilder:
             return []
     
     def _simulate_position_exit(self, position: Dict[str, Any], 
-                               price_lookup: Dict[str, Dict[str, float]], 
+                               price_index: PriceIndex, 
                                config: BacktestConfiguration) -> Optional[Dict[str, Any]]:
         """Simulate when dan how position exits"""
         try:
-            entry_time = pd.to_datetime(position['entry_time'])
-            entry_price = position['entry_price']
-            take_profit = position.get('take_profit')
-            stop_loss = position.get('stop_loss')
-            action = position['action']
-            
-            # Look for exit conditions dalam subsequent candles
-            for timestamp, prices in price_lookup.items():
-                if timestamp <= entry_time:
-                    continue
-                
-                # Check time-based exit (max holding period)
-                time_diff = (timestamp - entry_time).total_seconds() / 3600  # Hours
-                if time_diff > 48:  # Max 48 hours holding
-                    return {
-                        'exit_time': timestamp,
-                        'exit_price': prices['close'],
-                        'exit_reason': 'TIME_LIMIT'
-                    }
-                
-                # Check price-based exits
-                if action.upper() in ['BUY', 'LONG']:
-                    # Long position
-                    if take_profit and prices['high'] >= take_profit:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': take_profit,
-                            'exit_reason': 'TAKE_PROFIT'
-                        }
-                    elif stop_loss and prices['low'] <= stop_loss:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': stop_loss,
-                            'exit_reason': 'STOP_LOSS'
-                        }
-                
-                elif action.upper() in ['SELL', 'SHORT']:
-                    # Short position
-                    if take_profit and prices['low'] <= take_profit:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': take_profit,
-                            'exit_reason': 'TAKE_PROFIT'
-                        }
-                    elif stop_loss and prices['high'] >= stop_loss:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': stop_loss,
-                            'exit_reason': 'STOP_LOSS'
-                        }
-            
-            # If no exit condition met, exit at last available price
-            last_timestamp = max(price_lookup.keys())
-            return {
-                'exit_time': last_timestamp,
-                'exit_price': price_lookup[last_timestamp]['close'],
-                'exit_reason': 'END_OF_DATA'
-            }
+            return price_index.find_exit(
+                position['entry_time'],
+                position['action'],
+                position.get('take_profit'),
+                position.get('stop_loss')
+            )
             
         except Exception as e:
             logger.debug(f"Error simulating position exit: {e}")
             return None
     
+    def _intrabar_resolver(self, config: BacktestConfiguration) -> Optional[IntrabarResolver]:
+        """
+        1m drill-down for bars that touch TP and SL together.
+        
+        Only with a real candle source (1m candles are read lazily per ambiguous
+        bar); one resolver per symbol/timeframe so outcomes stay memoized across runs.
+        Disable with custom_parameters['intrabar_fills'] = False.
+        """
+        if not self.okx_fetcher or not hasattr(self.okx_fetcher, 'get_candle_window'):
+            return None
+        if not (config.custom_parameters or {}).get('intrabar_fills', True):
+            return None
+        
+        key = (config.symbol, config.timeframe)
+        resolver = self._intrabar_resolvers.get(key)
+        if resolver is None:
+            from core.okx_fetcher import BAR_MILLISECONDS, OKX_TIMEFRAMES
+            bar_ms = BAR_MILLISECONDS.get(OKX_TIMEFRAMES.get(config.timeframe, ''),
+                                          self._timeframe_to_minutes(config.timeframe) * 60 * 1000)
+            resolver = IntrabarResolver(fetcher_loader(self.okx_fetcher, config.symbol), bar_ms)
+            self._intrabar_resolvers[key] = resolver
+        return resolver
+    
     def _calculate_performance_metrics(self, trading_results: List[Dict[str, Any]], 
                                      config: BacktestConfiguration) -> Dict[str, Any]:
         """Calculate comprehensive performance metrics"""
@@ -905,17 +976,64 @@ class BacktestBuilder:
         except Exception:
             return None
     
-    async def _save_backtest_results(self, result: BacktestResult):
-        """Save backtest results to database"""
+    def _backtest_cache_key(self, config: BacktestConfiguration) -> Optional[str]:
+        """
+        Content address hash(config, data range, code version).
+        
+        None when the range ends in the future: candles are still arriving,
+        so the same config would not reproduce the same result.
+        """
         try:
-            if self.db_session:
-                # This would save to a backtests table if it existed
-                pass
+            end_date = datetime.fromisoformat(config.end_date.replace('Z', '+00:00'))
+            if end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=timezone.utc)
+            if end_date > datetime.now(timezone.utc):
+                return None
+            
+            data_range = {
+                'start_date': config.start_date,
+                'end_date': config.end_date,
+                'data_source': 'okx' if self.okx_fetcher else 'mock',
+                'signal_source': 'ai' if self.ai_engine else 'mock'
+            }
+            return backtest_cache_key(asdict(config), data_range, CODE_VERSION)
+            
+        except Exception as e:
+            logger.debug(f"Backtest not cacheable: {e}")
+            return None
+    
+    def _load_cached_result(self, cache_key: str, record_hit: bool = True) -> Optional[BacktestResult]:
+        try:
+            stored = self.result_store.load(cache_key, record_hit=record_hit)
+            if stored is None:
+                return None
+            summary = stored['summary']
+            return BacktestResult(
+                **{name: summary[name] for name in BacktestResult.__dataclass_fields__ if name != 'signal_details'},
+                signal_details=stored['trades']
+            )
+            
+        except Exception as e:
+            logger.warning(f"Error reading cached backtest: {e}")
+            return None
+    
+    async def _save_backtest_results(self, result: BacktestResult,
+                                     config: Optional[BacktestConfiguration] = None,
+                                     cache_key: Optional[str] = None):
+        """Save backtest results to the result store"""
+        try:
+            summary = {name: value for name, value in vars(result).items() if name != 'signal_details'}
+            self.result_store.save(
+                cache_key or result.backtest_id, summary, result.signal_details,
+                config=asdict(config) if config is not None else None,
+                code_version=CODE_VERSION,
+                initial_capital=config.initial_capital if config is not None else None
+            )
                 
         except Exception as e:
             logger.error(f"Error saving backtest results: {e}")
 
 # Export
 __all__ = [
-    'BacktestBuilder', 'BacktestResult', 'BacktestConfiguration'
+    'BacktestBuilder', 'BacktestResult', 'BacktestConfiguration', 'PriceIndex'
 ]
\ No newline at end of file
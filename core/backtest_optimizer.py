@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Backtest Optimizer - Parameter sweep untuk BacktestBuilder
+Historical data di-load sekali dan di-pack ke shared memory; signal di-cache per
+subset parameter yang mempengaruhi signal, sehingga parameter eksekusi (position
+size, commission, slippage, max positions, confidence threshold) cukup disimulasikan
+ulang di process pool. Mendukung grid penuh, random search dan successive halving.
+"""
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.backtest_builder import BacktestBuilder, BacktestConfiguration, PriceIndex
+from core.shared_buffers import SharedCandleBuffer, attach_buffer, default_mp_context
+
+logger = logging.getLogger(__name__)
+
+# Parameters mapped to BacktestConfiguration fields; everything else goes to custom_parameters
+CONFIG_PARAMETERS = ('position_size_percent', 'confidence_threshold', 'max_concurrent_positions',
+                     'commission_percent', 'slippage_percent')
+
+# Metrics where a lower value is better
+LOWER_IS_BETTER = {'max_drawdown', 'failed_signals'}
+
+SEARCH_METHODS = ('grid', 'random', 'halving')
+
+
+def grid_size(parameter_ranges: Dict[str, Sequence[Any]]) -> int:
+    return math.prod(len(values) for values in parameter_ranges.values()) if parameter_ranges else 0
+
+
+def combination_at(parameter_ranges: Dict[str, Sequence[Any]], position: int) -> Dict[str, Any]:
+    """Combination number `position` of the grid in itertools.product order (mixed radix decode)"""
+    params = {}
+    for name, values in reversed(list(parameter_ranges.items())):
+        position, digit = divmod(position, len(values))
+        params[name] = values[digit]
+    return {name: params[name] for name in parameter_ranges}
+
+
+def expand_grid(parameter_ranges: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    names = list(parameter_ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*parameter_ranges.values())]
+
+
+def signal_key(params: Dict[str, Any]) -> Tuple:
+    """Subset of parameters that changes signal generation (hashable)"""
+    return tuple(sorted((name, repr(value)) for name, value in params.items()
+                        if name not in CONFIG_PARAMETERS))
+
+
+def build_config(base_config: BacktestConfiguration, params: Dict[str, Any]) -> BacktestConfiguration:
+    """Same mapping as the original optimize_parameters loop"""
+    return replace(
+        base_config,
+        **{name: params[name] for name in CONFIG_PARAMETERS if name in params},
+        custom_parameters={**base_config.custom_parameters, **params}
+    )
+
+
+def score_metrics(metrics: Dict[str, Any], objective: str) -> float:
+    """Higher is better; failed runs (empty metrics) and NaN rank last"""
+    value = metrics.get(objective)
+    if value is None or np.isnan(value):
+        return float('-inf')
+    return -float(value) if objective in LOWER_IS_BETTER else float(value)
+
+
+def evaluate_configs(builder: BacktestBuilder, price_index: PriceIndex, signals: List[Dict[str, Any]],
+                     configs: Sequence[BacktestConfiguration],
+                     cutoff: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Simulate execution for configs that share one signal set.
+
+    cutoff limits the run to the first `cutoff` candles (successive halving
+    rungs); signals after the last included candle are dropped.
+    """
+    if cutoff is not None and cutoff < len(price_index):
+        price_index = price_index.head(cutoff)
+        last_ns = price_index.ns[-1] if len(price_index) else np.iinfo(np.int64).min
+        signals = [signal for signal in signals if PriceIndex._to_ns(signal['timestamp']) <= last_ns]
+
+    results = []
+    for config in configs:
+        selected = [signal for signal in signals
+                    if signal.get('confidence', 0) >= config.confidence_threshold]
+        trades = builder._simulate_trading(selected, None, config, price_index=price_index)
+        metrics = builder._calculate_performance_metrics(trades, config)
+        results.append({**metrics, 'total_signals': len(selected), 'total_trades': len(trades)})
+    return results
+
+
+# =================== WORKER SIDE ===================
+
+_worker_builder: Optional[BacktestBuilder] = None
+_worker_indexes: Dict[str, PriceIndex] = {}
+
+
+def _evaluate_chunk(buffer_name: str, total: int, tz: Optional[str], signals: List[Dict[str, Any]],
+                    configs: List[BacktestConfiguration], cutoff: Optional[int]) -> List[Dict[str, Any]]:
+    """Worker entry point: price index dibangun sekali per sweep dari shared memory"""
+    global _worker_builder
+    if _worker_builder is None:
+        _worker_builder = BacktestBuilder()
+
+    price_index = _worker_indexes.get(buffer_name)
+    if price_index is None:
+        _worker_indexes.clear()
+        price_index = PriceIndex.from_records(attach_buffer(buffer_name, total), tz)
+        _worker_indexes[buffer_name] = price_index
+    return evaluate_configs(_worker_builder, price_index, signals, configs, cutoff)
+
+
+# =================== OPTIMIZER ===================
+
+class BacktestOptimizer:
+    """
+    Parameter sweep di atas BacktestBuilder
+
+    Signal generation (AI engine / mock) hanya dijalankan sekali per kombinasi
+    parameter non-eksekusi dan disimpan di cache; confidence threshold diterapkan
+    sebagai filter sehingga tidak memicu generate ulang.
+    """
+
+    def __init__(self, builder: Optional[BacktestBuilder] = None, max_workers: Optional[int] = None,
+                 chunk_size: int = 64, parallel_threshold: int = 32, mp_context=None):
+        self.builder = builder or BacktestBuilder()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self._mp_context = mp_context
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._signal_cache: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self.stats = {'signal_generations': 0, 'signal_cache_hits': 0, 'evaluations': 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=self._mp_context or default_mp_context())
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def clear_cache(self):
+        self._signal_cache.clear()
+
+    # ----- candidates -----
+
+    @staticmethod
+    def _candidates(parameter_ranges: Dict[str, Sequence[Any]], search: str, n_iter: int,
+                    seed: int) -> List[Dict[str, Any]]:
+        total = grid_size(parameter_ranges)
+        if search == 'random' and n_iter < total:
+            rng = np.random.default_rng(seed)
+            positions = np.sort(rng.choice(total, size=n_iter, replace=False))
+            return [combination_at(parameter_ranges, int(position)) for position in positions]
+        return expand_grid(parameter_ranges)
+
+    async def _signals_for(self, historical_data, base_config: BacktestConfiguration,
+                           params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Unfiltered signals for the signal-affecting subset of params (cached)"""
+        key = (base_config.symbol, base_config.timeframe, base_config.start_date,
+               base_config.end_date, base_config.model_type, signal_key(params))
+        if key in self._signal_cache:
+            self.stats['signal_cache_hits'] += 1
+            return self._signal_cache[key]
+
+        config = replace(build_config(base_config, params), confidence_threshold=float('-inf'))
+        signals = await self.builder._generate_historical_signals(historical_data, config)
+        self._signal_cache[key] = signals
+        self.stats['signal_generations'] += 1
+        return signals
+
+    # ----- evaluation -----
+
+    def _evaluate(self, buffer: SharedCandleBuffer, price_index: PriceIndex,
+                  groups: Dict[Tuple, Tuple[List[Dict[str, Any]], List[Tuple[int, BacktestConfiguration]]]],
+                  cutoff: Optional[int]) -> Dict[int, Dict[str, Any]]:
+        """Metrics per candidate id; chunks share one signal set each"""
+        chunks = []
+        for signals, members in groups.values():
+            for start in range(0, len(members), self.chunk_size):
+                chunks.append((signals, members[start:start + self.chunk_size]))
+
+        total = sum(len(members) for _, members in chunks)
+        self.stats['evaluations'] += total
+        results: Dict[int, Dict[str, Any]] = {}
+
+        if total < self.parallel_threshold or self.max_workers <= 1:
+            for signals, members in chunks:
+                metrics = evaluate_configs(self.builder, price_index, signals,
+                                           [config for _, config in members], cutoff)
+                results.update(zip((candidate for candidate, _ in members), metrics))
+            return results
+
+        pool = self._get_pool()
+        futures = [
+            (members, pool.submit(_evaluate_chunk, buffer.name, len(buffer), price_index.tz, signals,
+                                  [config for _, config in members], cutoff))
+            for signals, members in chunks
+        ]
+        for members, future in futures:
+            results.update(zip((candidate for candidate, _ in members), future.result()))
+        return results
+
+    async def optimize(self, base_config: BacktestConfiguration, parameter_ranges: Dict[str, Sequence[Any]],
+                       search: str = 'grid', n_iter: int = 100, objective: str = 'sharpe_ratio',
+                       eta: int = 3, min_fraction: Optional[float] = None, top_k: int = 10,
+                       seed: int = 42) -> Dict[str, Any]:
+        """
+        Run a parameter sweep
+
+        Args:
+            base_config: Base configuration
+            parameter_ranges: Parameter name -> values to test
+            search: 'grid' (full grid), 'random' (n_iter samples) atau 'halving'
+            n_iter: Jumlah kandidat untuk random search
+            objective: Metric dari _calculate_performance_metrics yang dioptimasi
+            eta: Successive halving - keep 1/eta kandidat per rung
+            min_fraction: Successive halving - fraksi data pada rung pertama
+            top_k: Jumlah hasil terbaik yang dikembalikan
+        """
+        if search not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method: {search}")
+        start = time.perf_counter()
+
+        historical_data = await self.builder._fetch_historical_data(base_config)
+        if historical_data is None or len(historical_data) == 0:
+            raise ValueError("No historical data available for optimization")
+        price_index = PriceIndex(historical_data)
+
+        candidates = self._candidates(parameter_ranges, search, n_iter, seed)
+        configs = [build_config(base_config, params) for params in candidates]
+        signal_sets = [await self._signals_for(historical_data, base_config, params) for params in candidates]
+        loaded = time.perf_counter()
+
+        def grouped(candidate_ids):
+            groups = {}
+            for candidate in candidate_ids:
+                key = id(signal_sets[candidate])
+                groups.setdefault(key, (signal_sets[candidate], []))[1].append((candidate, configs[candidate]))
+            return groups
+
+        alive = list(range(len(candidates)))
+        rungs = []
+        with SharedCandleBuffer({(base_config.symbol, base_config.timeframe): price_index.to_records()}) as buffer:
+            if search == 'halving' and len(alive) > 1:
+                rounds = max(int(math.log(len(alive), eta)), 1)
+                fraction = min_fraction or eta ** -rounds
+                while fraction < 1 and len(alive) > 1:
+                    cutoff = max(int(math.ceil(len(price_index) * fraction)), 1)
+                    metrics = self._evaluate(buffer, price_index, grouped(alive), cutoff)
+                    alive.sort(key=lambda candidate: score_metrics(metrics[candidate], objective), reverse=True)
+                    rungs.append({'candles': cutoff, 'candidates': len(alive)})
+                    alive = alive[:max(int(math.ceil(len(alive) / eta)), 1)]
+                    fraction *= eta
+
+            final_metrics = self._evaluate(buffer, price_index, grouped(alive), None)
+        rungs.append({'candles': len(price_index), 'candidates': len(alive)})
+
+        evaluated = [{
+            'parameters': candidates[candidate],
+            'score': score_metrics(final_metrics[candidate], objective),
+            'metrics': final_metrics[candidate]
+        } for candidate in alive]
+        evaluated.sort(key=lambda result: result['score'], reverse=True)
+        elapsed = time.perf_counter() - start
+
+        return {
+            'search': search,
+            'objective': objective,
+            'grid_size': grid_size(parameter_ranges),
+            'total_strategies': len(candidates),
+            'successful_backtests': sum(1 for result in evaluated if result['metrics'].get('success_rate') is not None),
+            'optimal_parameters': evaluated[0]['parameters'] if evaluated else {},
+            'best_strategy': evaluated[0] if evaluated else None,
+            'top_results': evaluated[:top_k],
+            'parameter_analysis': self._parameter_analysis(evaluated, parameter_ranges),
+            'rungs': rungs,
+            'signal_sets': len({id(signals) for signals in signal_sets}),
+            'timing': {
+                'load_seconds': round(loaded - start, 3),
+                'simulation_seconds': round(elapsed - (loaded - start), 3),
+                'total_seconds': round(elapsed, 3),
+                'workers': self.max_workers
+            },
+            'timestamp': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _parameter_analysis(evaluated: List[Dict[str, Any]],
+                            parameter_ranges: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+        """Mean / best objective per value of each parameter (final rung only)"""
+        analysis = {}
+        for name in parameter_ranges:
+            by_value: Dict[str, List[float]] = {}
+            for result in evaluated:
+                if np.isfinite(result['score']):
+                    by_value.setdefault(repr(result['parameters'][name]), []).append(result['score'])
+            analysis[name] = {
+                value: {'count': len(scores), 'mean_score': float(np.mean(scores)),
+                        'best_score': float(np.max(scores))}
+                for value, scores in by_value.items()
+            }
+        return analysis
+
+
+# Export
+__all__ = ['BacktestOptimizer', 'CONFIG_PARAMETERS', 'SEARCH_METHODS', 'build_config',
+           'combination_at', 'evaluate_configs', 'expand_grid', 'grid_size', 'signal_key']
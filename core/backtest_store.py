@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Backtest Store - Content-addressed cache dan history untuk hasil backtest
+Setiap run disimpan dengan key hash(config, data range, code version).
+Summary metrics masuk ke tabel SQLite ber-index (list ribuan run tanpa
+menyentuh trade details), sedangkan signal_details / equity curve disimpan
+sebagai blob kolom NumPy terkompresi (npz) di tabel terpisah.
+"""
+import hashlib
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# BacktestResult fields kept in the indexed summary table
+SUMMARY_COLUMNS = (
+    'backtest_id', 'symbol', 'timeframe', 'start_date', 'end_date',
+    'total_signals', 'successful_signals', 'failed_signals', 'success_rate',
+    'total_return', 'max_drawdown', 'sharpe_ratio', 'win_rate', 'avg_win',
+    'avg_loss', 'profit_factor', 'execution_time_seconds'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    cache_key TEXT PRIMARY KEY,
+    backtest_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    model_type TEXT,
+    code_version TEXT,
+    config_json TEXT,
+    total_signals INTEGER,
+    successful_signals INTEGER,
+    failed_signals INTEGER,
+    success_rate REAL,
+    total_return REAL,
+    max_drawdown REAL,
+    sharpe_ratio REAL,
+    win_rate REAL,
+    avg_win REAL,
+    avg_loss REAL,
+    profit_factor REAL,
+    execution_time_seconds REAL,
+    trade_count INTEGER,
+    created_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_backtest_runs_created ON backtest_runs (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_backtest_runs_symbol ON backtest_runs (symbol, timeframe, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_backtest_runs_id ON backtest_runs (backtest_id);
+CREATE TABLE IF NOT EXISTS backtest_payloads (
+    cache_key TEXT PRIMARY KEY REFERENCES backtest_runs (cache_key) ON DELETE CASCADE,
+    meta_json TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+"""
+
+
+def source_fingerprint(*paths) -> str:
+    """Short hash of source files; changes whenever the simulation code changes"""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            digest.update(Path(path).read_bytes())
+        except OSError:
+            digest.update(str(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def backtest_cache_key(config: Dict[str, Any], data_range: Dict[str, Any], code_version: str) -> str:
+    """Content address of a backtest run"""
+    payload = json.dumps({'config': config, 'data': data_range, 'code': code_version},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:40]
+
+
+# =================== COLUMNAR ENCODING ===================
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def encode_columns(rows: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    List of dicts -> per-column arrays plus decode metadata.
+
+    bool/int/float (None -> NaN + null mask), datetime (int64 ns + tz) dan str
+    disimpan sebagai array; kolom campuran fallback ke JSON di metadata.
+    """
+    columns: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    arrays: Dict[str, np.ndarray] = {}
+    meta: Dict[str, Any] = {'rows': len(rows), 'columns': columns, 'kinds': {}, 'json': {}}
+    for index, column in enumerate(columns):
+        values = [row.get(column) for row in rows]
+        present = [value for value in values if value is not None]
+        name = f"c{index}"
+        kind = 'json'
+
+        if present and all(isinstance(value, (bool, np.bool_)) for value in present) and len(present) == len(values):
+            arrays[name] = np.asarray(values, dtype=bool)
+            kind = 'bool'
+        elif present and all(_is_number(value) for value in present):
+            if len(present) == len(values) and all(isinstance(value, (int, np.integer)) for value in values):
+                arrays[name] = np.asarray(values, dtype=np.int64)
+                kind = 'int'
+            else:
+                nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+                arrays[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+                if nulls.any():
+                    arrays[f"{name}_null"] = nulls
+                kind = 'float'
+        elif (present and len(present) == len(values) and all(isinstance(value, datetime) for value in values)
+              and len({str(pd.Timestamp(value).tz) for value in values}) == 1):
+            stamps = pd.DatetimeIndex([pd.Timestamp(value) for value in values])
+            arrays[name] = stamps.asi8
+            meta.setdefault('tz', {})[column] = str(stamps.tz) if stamps.tz is not None else None
+            kind = 'datetime'
+        elif present and len(present) == len(values) and all(isinstance(value, str) for value in values):
+            arrays[name] = np.asarray(values, dtype=str)
+            kind = 'str'
+        else:
+            meta['json'][column] = json.dumps(values, default=str)
+
+        meta['kinds'][column] = kind
+    return arrays, meta
+
+
+def decode_columns(arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse of encode_columns"""
+    decoded: Dict[str, List[Any]] = {}
+    for index, column in enumerate(meta['columns']):
+        name = f"c{index}"
+        kind = meta['kinds'][column]
+        if kind == 'json':
+            decoded[column] = json.loads(meta['json'][column])
+        elif kind == 'datetime':
+            tz = meta.get('tz', {}).get(column)
+            stamps = pd.to_datetime(arrays[name], unit='ns', utc=tz is not None)
+            decoded[column] = list(stamps.tz_convert(tz) if tz is not None else stamps)
+        else:
+            values = arrays[name].tolist()
+            if f"{name}_null" in arrays:
+                values = [None if null else value for value, null in zip(values, arrays[f"{name}_null"].tolist())]
+            decoded[column] = values
+
+    columns = meta['columns']
+    return [{column: decoded[column][row] for column in columns} for row in range(meta['rows'])]
+
+
+def _pack(arrays: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(payload: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+class BacktestStore:
+    """
+    SQLite-backed store untuk hasil BacktestBuilder
+
+    Layout: `backtests.db` dengan tabel backtest_runs (summary, ber-index pada
+    created_at dan symbol/timeframe) dan backtest_payloads (trade details +
+    equity curve sebagai npz terkompresi). Thread-safe; WAL mode sehingga
+    beberapa worker bisa membaca sambil satu menulis.
+    """
+
+    def __init__(self, base_dir: str = "logs/backtests", db_name: str = "backtests.db"):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.base_dir / db_name
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, cache_key: str, summary: Dict[str, Any], trades: Sequence[Dict[str, Any]],
+             config: Optional[Dict[str, Any]] = None, code_version: Optional[str] = None,
+             initial_capital: Optional[float] = None):
+        """Insert or replace one run (summary row + compressed trade/equity blob)"""
+        arrays, meta = encode_columns(trades)
+        if initial_capital is not None:
+            capital = [row.get('capital_after') for row in trades]
+            if all(_is_number(value) for value in capital):
+                arrays['equity'] = np.asarray([initial_capital] + capital, dtype=np.float64)
+        payload = _pack(arrays)
+
+        row = {column: summary.get(column) for column in SUMMARY_COLUMNS}
+        for column, value in row.items():
+            if isinstance(value, (np.integer, np.floating)):
+                row[column] = value.item()
+        row.update({
+            'cache_key': cache_key,
+            'model_type': (config or {}).get('model_type'),
+            'code_version': code_version,
+            'config_json': json.dumps(config, sort_keys=True, default=str) if config is not None else None,
+            'trade_count': len(trades),
+            'created_at': time.time(),
+        })
+        names = list(row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO backtest_runs ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' for _ in names)})",
+                [row[name] for name in names]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backtest_payloads (cache_key, meta_json, payload) VALUES (?, ?, ?)",
+                (cache_key, json.dumps(meta), sqlite3.Binary(payload))
+            )
+
+    def get_summary(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM backtest_runs WHERE cache_key = ?", (cache_key,)).fetchone()
+        return self._summary_dict(row) if row is not None else None
+
+    def load(self, cache_key: str, record_hit: bool = False) -> Optional[Dict[str, Any]]:
+        """Summary + decoded trades + equity curve, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.*, p.meta_json, p.payload FROM backtest_runs r "
+                "JOIN backtest_payloads p ON p.cache_key = r.cache_key WHERE r.cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            if row is not None and record_hit:
+                with self._conn:
+                    self._conn.execute("UPDATE backtest_runs SET hit_count = hit_count + 1 WHERE cache_key = ?",
+                                       (cache_key,))
+        if row is None:
+            return None
+
+        arrays = _unpack(row['payload'])
+        equity = arrays.pop('equity', None)
+        return {
+            'summary': self._summary_dict(row),
+            'trades': decode_columns(arrays, json.loads(row['meta_json'])),
+            'equity_curve': equity.tolist() if equity is not None else []
+        }
+
+    def find_by_backtest_id(self, backtest_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cache_key FROM backtest_runs WHERE backtest_id = ? ORDER BY created_at DESC LIMIT 1",
+                (backtest_id,)
+            ).fetchone()
+        return row['cache_key'] if row is not None else None
+
+    def list_runs(self, symbol: Optional[str] = None, timeframe: Optional[str] = None,
+                  limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Newest-first summaries; served from the index, blobs are never read"""
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if timeframe:
+            clauses.append("timeframe = ?")
+            params.append(timeframe)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM backtest_runs {where}ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)]
+            ).fetchall()
+        return [self._summary_dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM backtest_runs").fetchone()[0]
+
+    def delete(self, cache_key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM backtest_payloads WHERE cache_key = ?", (cache_key,))
+            self._conn.execute("DELETE FROM backtest_runs WHERE cache_key = ?", (cache_key,))
+
+    @staticmethod
+    def _summary_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        summary = {column: row[column] for column in SUMMARY_COLUMNS}
+        summary.update({
+            'cache_key': row['cache_key'],
+            'model_type': row['model_type'],
+            'code_version': row['code_version'],
+            'trade_count': row['trade_count'],
+            'hit_count': row['hit_count'],
+            'created_at': datetime.fromtimestamp(row['created_at'], tz=timezone.utc).isoformat()
+        })
+        return summary
+
+
+# Export
+__all__ = ['BacktestStore', 'backtest_cache_key', 'decode_columns', 'encode_columns', 'source_fingerprint']
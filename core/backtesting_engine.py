@@ -11,15 +11,21 @@ import logging
 from typing import Dict, List, Optional, Tuple, Any
 import uuid
 
+from core.feature_frame import FeatureFrame
+from core.paper_trading import PaperTradingEngine
+from core.streaming_indicators import iter_candles
+from core.walk_forward import (STEP_STRATEGIES, WARMUP_BARS, StrategyFeatures, WalkForwardRunner,
+                               new_backtest_state, simulate_segment)
+
 logger = logging.getLogger(__name__)
 
 class BacktestingEngine:
     """Professional backtesting engine for trading strategies"""
     
-    def __init__(self, okx_fetcher=None, ml_engine=None):
+    def __init__(self, okx_fetcher=None, ml_engine=None, paper_engine=None):
         self.okx_fetcher = okx_fetcher
         self.ml_engine = ml_engine
-        self.paper_trades = {}
+        self._paper_engine = paper_engine
         self.backtest_results = {}
         logger.info("📊 Backtesting Engine initialized")
     
@@ -36,26 +42,24 @@ class BacktestingEngine:
                 return {"error": "Insufficient historical data"}
             
             # Initialize backtest state
-            state = {
-                'balance': initial_balance,
-                'position': 0,
-                'entry_price': 0,
-                'trades': [],
-                'peak_balance': initial_balance,
-                'drawdown': 0,
-                'max_drawdown': 0
-            }
+            state = new_backtest_state(initial_balance)
             
-            # Run strategy on historical data
-            for i in range(50, len(historical_data)):  # Start after warmup period
-                current_data = historical_data.iloc[:i+1]
-                signal = self._get_strategy_signal(current_data, strategy)
-                
-                if signal:
-                    self._execute_backtest_trade(state, signal, current_data.iloc[-1])
+            if strategy in STEP_STRATEGIES:
+                # Indicators computed once; strategy reads O(1) bar views
+                features = StrategyFeatures(historical_data)
+                simulate_segment(self, historical_data, features, strategy,
+                                 WARMUP_BARS, len(historical_data), state)
+            else:
+                # Run strategy on historical data
+                for i in range(WARMUP_BARS, len(historical_data)):  # Start after warmup period
+                    current_data = historical_data.iloc[:i+1]
+                    signal = self._get_strategy_signal(current_data, strategy)
+                    
+                    if signal:
+                        self._execute_backtest_trade(state, signal, current_data.iloc[-1])
             
             # Calculate final metrics
-            final_results = self._calculate_backtest_metrics(state, historical_data)
+            final_results = self._calculate_backtest_metrics(state, historical_data, initial_balance)
             final_results['backtest_id'] = backtest_id
             final_results['symbol'] = symbol
             final_results['strategy'] = strategy
@@ -70,32 +74,47 @@ class BacktestingEngine:
             logger.error(f"Backtest error: {e}")
             return {"error": f"Backtest failed: {str(e)}"}
     
-    def start_paper_trading(self, symbol: str, strategy: str, 
-                           initial_balance: float = 10000) -> Dict[str, Any]:
-        """Start paper trading session"""
+    def run_walk_forward(self, symbol: str, strategies: List[str], start_date: str,
+                         end_date: str, train_bars: int = 500, test_bars: int = 100,
+                         mode: str = 'rolling', initial_balance: float = 10000,
+                         timeframe: str = '1H') -> Dict[str, Any]:
+        """Walk-forward backtest: pilih strategy di train window, evaluasi di test window"""
         try:
-            session_id = str(uuid.uuid4())[:8]
+            historical_data = self._get_historical_data(symbol, start_date, end_date, timeframe)
+            if historical_data is None or len(historical_data) < WARMUP_BARS + train_bars + test_bars:
+                return {"error": "Insufficient historical data"}
             
-            paper_session = {
-                'session_id': session_id,
-                'symbol': symbol,
-                'strategy': strategy,
-                'balance': initial_balance,
-                'initial_balance': initial_balance,
-                'position': 0,
-                'entry_price': 0,
-                'trades': [],
-                'start_time': datetime.now().isoformat(),
-                'last_update': datetime.now().isoformat(),
-                'status': 'ACTIVE'
-            }
+            results = WalkForwardRunner(self).run(
+                historical_data, strategies, train_bars, test_bars,
+                mode=mode, initial_balance=initial_balance
+            )
+            results['symbol'] = symbol
+            results['period'] = f"{start_date} to {end_date}"
+            return results
             
-            self.paper_trades[session_id] = paper_session
+        except Exception as e:
+            logger.error(f"Walk-forward error: {e}")
+            return {"error": f"Walk-forward failed: {str(e)}"}
+    
+    @property
+    def paper_engine(self) -> PaperTradingEngine:
+        """Persistent paper-trading sessions (shared by all workers), opened on first use"""
+        if self._paper_engine is None:
+            candle_store = getattr(self.okx_fetcher, 'candle_store', None)
+            self._paper_engine = PaperTradingEngine(candle_store=candle_store)
+        return self._paper_engine
+    
+    def start_paper_trading(self, symbol: str, strategy: str, 
+                           initial_balance: float = 10000, timeframe: str = '1H') -> Dict[str, Any]:
+        """Start paper trading session"""
+        try:
+            session = self.paper_engine.start_session(symbol, strategy, initial_balance, timeframe)
             
             return {
-                "session_id": session_id,
+                "session_id": session['session_id'],
                 "status": "Paper trading started",
                 "symbol": symbol,
+                "timeframe": timeframe,
                 "strategy": strategy,
                 "initial_balance": initial_balance,
                 "current_balance": initial_balance
@@ -107,11 +126,10 @@ class BacktestingEngine:
     
     def get_paper_trading_status(self, session_id: str) -> Dict[str, Any]:
         """Get current paper trading status"""
-        if session_id not in self.paper_trades:
+        session = self.paper_engine.get_session(session_id)
+        if session is None:
             return {"error": "Paper trading session not found"}
         
-        session = self.paper_trades[session_id]
-        
         # Calculate performance metrics
         pnl = session['balance'] - session['initial_balance']
         pnl_pct = (pnl / session['initial_balance']) * 100
@@ -126,38 +144,52 @@ class BacktestingEngine:
             "pnl_percentage": round(pnl_pct, 2),
             "current_position": session['position'],
             "entry_price": session['entry_price'],
-            "total_trades": len(session['trades']),
+            "total_trades": session['trade_count'],
             "last_update": session['last_update'],
             "status": session['status'],
-            "recent_trades": session['trades'][-5:] if session['trades'] else []
+            "recent_trades": self.paper_engine.get_trades(session_id, limit=5)
         }
     
     def execute_paper_trade(self, session_id: str) -> Dict[str, Any]:
-        """Execute a paper trade based on current market conditions"""
-        if session_id not in self.paper_trades:
+        """
+        Poll market data for a session without a live feed.
+        
+        Only closed candles newer than the feed state are applied (via
+        PaperTradingEngine.on_candle_close), so repeated polls are O(new candles).
+        """
+        session = self.paper_engine.get_session(session_id)
+        if session is None:
             return {"error": "Paper trading session not found"}
         
         try:
-            session = self.paper_trades[session_id]
+            symbol, timeframe = session['symbol'], session['timeframe']
             
             # Get current market data
-            df = self.okx_fetcher.get_candles(session['symbol'], '1H', limit=100)
+            df = self.okx_fetcher.get_candles(symbol, timeframe, limit=100)
             if df is None or df.empty:
                 return {"error": "No market data available"}
             
-            # Get strategy signal
-            signal = self._get_strategy_signal(df, session['strategy'])
+            # Last row is the live (still forming) candle
+            last_ts = self.paper_engine.feed_timestamp(symbol, timeframe)
+            executed = []
+            for candle in iter_candles(df.iloc[:-1]):
+                if last_ts is None or candle[0] > last_ts:
+                    executed.extend(self.paper_engine.on_candle_close(symbol, timeframe, candle))
             
-            if signal:
-                trade_result = self._execute_paper_trade_signal(session, signal, df.iloc[-1])
-                session['last_update'] = datetime.now().isoformat()
-                return trade_result
-            else:
+            trades = [trade for trade in executed if trade['session_id'] == session_id]
+            if trades:
+                trade = trades[-1]
                 return {
-                    "action": "NO_SIGNAL",
-                    "message": "No trading signal generated",
-                    "current_price": float(df['close'].iloc[-1])
+                    "action": trade['action'],
+                    "price": trade['price'],
+                    "quantity": round(trade['quantity'], 6),
+                    "new_balance": round(trade['balance_after'], 2)
                 }
+            return {
+                "action": "NO_SIGNAL",
+                "message": "No trading signal generated",
+                "current_price": float(df['close'].iloc[-1])
+            }
                 
         except Exception as e:
             logger.error(f"Paper trade execution error: {e}")
@@ -331,12 +363,8 @@ class BacktestingEngine:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        # Uncached frame: run_backtest calls this on every growing slice
+        return FeatureFrame(prices).get('rsi', period=period)
     
     def _execute_backtest_trade(self, state: Dict, signal: Dict, candle: pd.Series):
         """Execute trade in backtest"""
@@ -402,70 +430,10 @@ class BacktestingEngine:
         if current_drawdown > state['max_drawdown']:
             state['max_drawdown'] = current_drawdown
     
-    def _execute_paper_trade_signal(self, session: Dict, signal: Dict, candle: pd.Series) -> Dict:
-        """Execute paper trade signal"""
-        current_price = float(candle['close'])
-        
-        if signal['action'] == 'BUY' and session['position'] <= 0:
-            # Close short and go long
-            if session['position'] < 0:
-                pnl = abs(session['position']) * (session['entry_price'] - current_price)
-                session['balance'] += pnl
-            
-            # New long position
-            quantity = session['balance'] * 0.95 / current_price
-            session['position'] = quantity
-            session['entry_price'] = current_price
-            
-            trade_record = {
-                'action': 'BUY',
-                'price': current_price,
-                'quantity': quantity,
-                'timestamp': datetime.now().isoformat(),
-                'balance_after': session['balance']
-            }
-            session['trades'].append(trade_record)
-            
-            return {
-                "action": "BUY",
-                "price": current_price,
-                "quantity": round(quantity, 6),
-                "new_balance": round(session['balance'], 2)
-            }
-            
-        elif signal['action'] == 'SELL' and session['position'] >= 0:
-            # Close long and go short
-            if session['position'] > 0:
-                pnl = session['position'] * (current_price - session['entry_price'])
-                session['balance'] += pnl
-            
-            # New short position
-            quantity = -(session['balance'] * 0.95 / current_price)
-            session['position'] = quantity
-            session['entry_price'] = current_price
-            
-            trade_record = {
-                'action': 'SELL',
-                'price': current_price,
-                'quantity': abs(quantity),
-                'timestamp': datetime.now().isoformat(),
-                'balance_after': session['balance']
-            }
-            session['trades'].append(trade_record)
-            
-            return {
-                "action": "SELL",
-                "price": current_price,
-                "quantity": round(abs(quantity), 6),
-                "new_balance": round(session['balance'], 2)
-            }
-        
-        return {"action": "NO_ACTION", "reason": "No valid signal or position conflict"}
-    
-    def _calculate_backtest_metrics(self, state: Dict, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_backtest_metrics(self, state: Dict, df: pd.DataFrame,
+                                    initial_balance: float = 10000) -> Dict[str, Any]:
         """Calculate comprehensive backtest metrics"""
         trades = state['trades']
-        initial_balance = 10000  # Default
         final_balance = state['balance']
         
         # Basic metrics
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark Data - Dataset OHLCV deterministik untuk benchmark backtester & indikator
+Synthetic: geometric Brownian motion + jump (Poisson) + regime volume/volatilitas
+(Markov chain). Recorded: fixture candle OKX yang direkam sekali lalu di-replay
+dan diperpanjang ke ukuran berapa pun dengan menyusun ulang return-nya.
+Seed + parameter yang sama selalu menghasilkan dataset yang identik byte-per-byte.
+"""
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.candle_store import CANDLE_DTYPE, candles_to_records
+
+logger = logging.getLogger(__name__)
+
+HOUR_MS = 3600 * 1000
+DEFAULT_START_MS = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / 'benchmarks' / 'fixtures'
+
+
+@dataclass(frozen=True)
+class SyntheticMarket:
+    """Parameter generator synthetic (per bar, bukan annualized)"""
+    start_price: float = 50000.0
+    drift: float = 0.00002
+    volatility: float = 0.004
+    jump_rate: float = 0.002
+    jump_mean: float = 0.0
+    jump_std: float = 0.03
+    # quiet / normal / active: vol multiplier, volume multiplier
+    regime_volatility: Tuple[float, ...] = (0.5, 1.0, 2.5)
+    regime_volume: Tuple[float, ...] = (0.4, 1.0, 3.0)
+    regime_stay: float = 0.995
+    base_volume: float = 250.0
+    wick: float = 0.0015
+
+
+def _regime_path(rng: np.random.Generator, n: int, regimes: int, stay: float) -> np.ndarray:
+    """Markov chain regime index per bar; switch ke regime lain secara uniform"""
+    switches = np.flatnonzero(rng.random(n) > stay)
+    states = rng.integers(0, regimes, len(switches) + 1)
+    path = np.empty(n, dtype=np.int64)
+    bounds = np.concatenate([[0], switches, [n]])
+    for state, start, end in zip(states, bounds[:-1], bounds[1:]):
+        path[start:end] = state
+    return path
+
+
+def _ohlcv_frame(timestamps_ms: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(timestamps_ms, unit='ms', utc=True),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    })
+
+
+def synthetic_ohlcv(n: int, seed: int = 42, market: Optional[SyntheticMarket] = None,
+                    start_ms: int = DEFAULT_START_MS, bar_ms: int = HOUR_MS) -> pd.DataFrame:
+    """
+    Candle synthetic dengan kolom timestamp (UTC) + OHLCV
+
+    Args:
+        n: Jumlah bar
+        seed: Seed RNG; dataset identik untuk seed yang sama
+        market: Parameter GBM/jump/regime
+    """
+    market = market or SyntheticMarket()
+    rng = np.random.default_rng(seed)
+
+    regimes = _regime_path(rng, n, len(market.regime_volatility), market.regime_stay)
+    vol = market.volatility * np.asarray(market.regime_volatility)[regimes]
+
+    # GBM log returns + compound Poisson jumps
+    log_returns = (market.drift - 0.5 * vol ** 2) + vol * rng.standard_normal(n)
+    jumps = rng.random(n) < market.jump_rate
+    log_returns[jumps] += rng.normal(market.jump_mean, market.jump_std, int(jumps.sum()))
+
+    close = market.start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate([[market.start_price], close[:-1]])
+    wick = np.abs(rng.normal(0, market.wick, (2, n))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+
+    # Volume follows the regime and reacts to the size of the move
+    move = np.abs(log_returns) / market.volatility
+    volume = (market.base_volume * np.asarray(market.regime_volume)[regimes]
+              * (1 + move) * rng.lognormal(0, 0.35, n))
+
+    timestamps = start_ms + np.arange(n, dtype=np.int64) * bar_ms
+    return _ohlcv_frame(timestamps, open_, high, low, close, volume)
+
+
+def fixture_path(symbol: str, timeframe: str, fixture_dir: Path = FIXTURE_DIR) -> Path:
+    return Path(fixture_dir) / f"okx_{symbol.replace('-', '_').lower()}_{timeframe.lower()}.json"
+
+
+def save_fixture(symbol: str, timeframe: str, records: np.ndarray,
+                 fixture_dir: Path = FIXTURE_DIR) -> Path:
+    """Tulis candle records (CANDLE_DTYPE) sebagai fixture JSON yang bisa di-review"""
+    path = fixture_path(symbol, timeframe, fixture_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'columns': list(CANDLE_DTYPE.names),
+        'candles': [[int(row[0])] + [float(value) for value in list(row)[1:]] for row in records],
+    }
+    path.write_text(json.dumps(payload, separators=(',', ':')))
+    return path
+
+
+def load_fixture(symbol: str, timeframe: str, fixture_dir: Path = FIXTURE_DIR) -> Optional[np.ndarray]:
+    """Recorded candle records, atau None bila fixture belum direkam"""
+    path = fixture_path(symbol, timeframe, fixture_dir)
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text())
+    columns = payload['columns']
+    return candles_to_records([dict(zip(columns, row)) for row in payload['candles']])
+
+
+def record_fixture(okx_fetcher, symbol: str, timeframe: str, bars: int,
+                   fixture_dir: Path = FIXTURE_DIR) -> Path:
+    """Rekam `bars` candle terakhir dari OKX (via candle store) ke fixture"""
+    from core.okx_fetcher import BAR_MILLISECONDS, OKX_TIMEFRAMES
+
+    span = timedelta(milliseconds=bars * BAR_MILLISECONDS[OKX_TIMEFRAMES.get(timeframe, '1H')])
+    records = okx_fetcher.get_candle_range(symbol, timeframe, datetime.now(timezone.utc) - span)
+    if records is None or len(records) == 0:
+        raise ValueError(f"No candles returned for {symbol} {timeframe}")
+    logger.info(f"Recorded {len(records)} {symbol} {timeframe} candles")
+    return save_fixture(symbol, timeframe, records, fixture_dir)
+
+
+def replay_ohlcv(records: np.ndarray, n: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Recorded candles diperpanjang ke n bar
+
+    Bar-bar awal adalah fixture apa adanya. Setelah itu blok-blok bar dari
+    fixture disusun ulang (block bootstrap, seed tetap): return close, bentuk
+    candle relatif terhadap close, dan volume tetap berasal dari pasar nyata,
+    sementara level harga tetap kontinu.
+    """
+    records = np.sort(np.asarray(records, dtype=CANDLE_DTYPE), order='timestamp')
+    if len(records) < 2:
+        raise ValueError("Fixture needs at least 2 candles")
+
+    close = records['close']
+    log_returns = np.diff(np.log(close))
+    shape = np.stack([records['open'], records['high'], records['low']]) / close
+    bar_ms = int(np.median(np.diff(records['timestamp'])))
+
+    index = np.arange(min(n, len(records)))
+    replay_close = close[:n]
+    if n > len(records):
+        rng = np.random.default_rng(seed)
+        block = min(len(log_returns), 256)
+        blocks = -(-(n - len(records)) // block)
+        starts = rng.integers(1, len(records) - block + 1, blocks)
+        extra = (starts[:, None] + np.arange(block)).ravel()[:n - len(records)]
+        index = np.concatenate([index, extra])
+        replay_close = np.concatenate([close, close[-1] * np.exp(np.cumsum(log_returns[extra - 1]))])
+
+    open_, high, low = shape[:, index] * replay_close
+    timestamps = records['timestamp'][0] + np.arange(n, dtype=np.int64) * bar_ms
+    return _ohlcv_frame(timestamps, open_, high, low, replay_close, records['volume'][index])
+
+
+def make_dataset(source: str, n: int, seed: int = 42, symbol: str = 'BTC-USDT',
+                 timeframe: str = '1H', fixture_dir: Path = FIXTURE_DIR) -> Optional[pd.DataFrame]:
+    """'synthetic' atau 'recorded'; None bila fixture untuk recorded tidak ada"""
+    if source == 'synthetic':
+        return synthetic_ohlcv(n, seed=seed)
+    if source == 'recorded':
+        records = load_fixture(symbol, timeframe, fixture_dir)
+        return replay_ohlcv(records, n, seed=seed) if records is not None else None
+    raise ValueError(f"Unknown dataset source: {source}")
+
+
+# Export
+__all__ = [
+    'SyntheticMarket', 'synthetic_ohlcv', 'replay_ohlcv', 'make_dataset',
+    'save_fixture', 'load_fixture', 'record_fixture', 'fixture_path', 'FIXTURE_DIR'
+]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Candle Pattern Masks - Array-based candlestick pattern engine
+Semua pattern PriceActionAnalyzer (hammer, engulfing, doji, morning/evening star,
+three soldiers/crows, wick trap, momentum candle, compression) dihitung sebagai
+boolean mask dari array OHLC yang di-shift, dengan rolling max/min untuk lookback.
+Satu pass per pattern, sehingga statistik pattern bisa dijalankan atas data bertahun-tahun.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PATTERN_DIRECTIONS = {
+    'hammer': 'bullish',
+    'shooting_star': 'bearish',
+    'bullish_engulfing': 'bullish',
+    'bearish_engulfing': 'bearish',
+    'doji': 'neutral',
+    'morning_star': 'bullish',
+    'evening_star': 'bearish',
+    'three_white_soldiers': 'bullish',
+    'three_black_crows': 'bearish',
+    'upper_wick_trap': 'bearish',
+    'lower_wick_trap': 'bullish',
+    'bullish_momentum': 'bullish',
+    'bearish_momentum': 'bearish',
+    'compression': 'neutral',
+}
+
+
+@dataclass
+class PatternMasks:
+    """Boolean mask per pattern plus the derived arrays used for scoring"""
+    masks: Dict[str, np.ndarray]
+    features: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.masks[name]
+
+    def indices(self, name: str) -> np.ndarray:
+        return np.flatnonzero(self.masks[name])
+
+
+def _shift(values: np.ndarray, periods: int, fill=np.nan) -> np.ndarray:
+    """values[i - periods] at position i (pandas shift on a plain array)"""
+    n = len(values)
+    shifted = np.full(n, fill, dtype=np.result_type(values, type(fill)))
+    if 0 <= periods < n:
+        shifted[periods:] = values[:n - periods]
+    elif -n < periods < 0:
+        shifted[:periods] = values[-periods:]
+    return shifted
+
+
+def _sequential_sum(view: np.ndarray) -> np.ndarray:
+    """Row sums added left to right, matching Python's sum() over a list"""
+    total = view[:, 0].copy()
+    for column in range(1, view.shape[1]):
+        total += view[:, column]
+    return total
+
+
+def previous_window(values: np.ndarray, window: int, fill: float) -> np.ndarray:
+    """Row i holds values[i - window:i]; positions before the start are `fill`"""
+    padded = np.concatenate([np.full(window, fill), values])
+    return sliding_window_view(padded, window)[:len(values)]
+
+
+def rolling_window(values: np.ndarray, window: int, fill: float = np.nan) -> np.ndarray:
+    """Row i holds values[i - window + 1:i + 1]; rows without a full window are `fill`"""
+    view = np.full((len(values), window), fill)
+    if len(values) >= window:
+        view[window - 1:] = sliding_window_view(values, window)
+    return view
+
+
+def candle_anatomy(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                   close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Body, wicks, range and true range per candle"""
+    body_top = np.maximum(open_, close)
+    body_bottom = np.minimum(open_, close)
+    prev_close = _shift(close, 1)
+    with np.errstate(invalid='ignore'):
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    if len(true_range):
+        true_range[0] = np.nan
+    return {
+        'body': np.abs(close - open_),
+        'upper_wick': high - body_top,
+        'lower_wick': body_bottom - low,
+        'total_range': high - low,
+        'true_range': true_range,
+    }
+
+
+def pattern_masks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  volume: np.ndarray, wick_lookback: int = 10, momentum_lookback: int = 5,
+                  compression_lookback: int = 8) -> PatternMasks:
+    """
+    Evaluate every pattern over the whole history.
+
+    Mask position i refers to the candle that completes the pattern (the
+    third candle for 3-candle patterns). Rules are identical to the
+    per-candle checks in PriceActionAnalyzer.
+    """
+    open_, high, low, close, volume = (
+        np.asarray(values, dtype=float) for values in (open_, high, low, close, volume)
+    )
+    n = len(close)
+    anatomy = candle_anatomy(open_, high, low, close)
+    body = anatomy['body']
+    upper = anatomy['upper_wick']
+    lower = anatomy['lower_wick']
+    total = anatomy['total_range']
+
+    bullish = close > open_
+    bearish = close < open_
+    has_body = body > 0
+    masks = {}
+
+    # Single candle
+    masks['hammer'] = (lower > 2 * body) & (upper < 0.5 * body) & has_body
+    masks['shooting_star'] = (upper > 2 * body) & (lower < 0.5 * body) & has_body
+    masks['doji'] = (total > 0) & (body < 0.1 * total)
+
+    # Two candle (previous = shifted by one)
+    prev_open, prev_close = _shift(open_, 1), _shift(close, 1)
+    prev_bullish, prev_bearish = _shift(bullish, 1, False), _shift(bearish, 1, False)
+    with np.errstate(invalid='ignore'):
+        masks['bullish_engulfing'] = (prev_bearish & bullish & (open_ < prev_close)
+                                      & (close > prev_open))
+        masks['bearish_engulfing'] = (prev_bullish & bearish & (open_ > prev_close)
+                                      & (close < prev_open))
+
+    # Three candle: first = shift 2, second = shift 1, third = current
+    first_open, first_close = _shift(open_, 2), _shift(close, 2)
+    first_body, second_body = _shift(body, 2), _shift(body, 1)
+    first_bullish, first_bearish = _shift(bullish, 2, False), _shift(bearish, 2, False)
+    first_has_body, second_has_body = _shift(has_body, 2, False), _shift(has_body, 1, False)
+    with np.errstate(invalid='ignore'):
+        small_second = second_body < first_body * 0.3
+        first_mid = (first_open + first_close) / 2
+        masks['morning_star'] = first_bearish & small_second & bullish & (close > first_mid)
+        masks['evening_star'] = first_bullish & small_second & bearish & (close < first_mid)
+        masks['three_white_soldiers'] = (first_bullish & prev_bullish & bullish
+                                         & (prev_close > first_close) & (close > prev_close)
+                                         & first_has_body & second_has_body & has_body)
+        masks['three_black_crows'] = (first_bearish & prev_bearish & bearish
+                                      & (prev_close < first_close) & (close < prev_close)
+                                      & first_has_body & second_has_body & has_body)
+
+    # Wick traps: long wick into the extreme of the previous `wick_lookback` candles
+    resistance = previous_window(high, wick_lookback, -np.inf).max(axis=1)
+    support = previous_window(low, wick_lookback, np.inf).min(axis=1)
+    has_history = np.arange(n) >= 1
+    ranged = total != 0
+    masks['upper_wick_trap'] = (ranged & has_history & (upper > 3 * body) & (upper > 0.6 * total)
+                                & has_body & (high >= resistance * 0.998))
+    masks['lower_wick_trap'] = (ranged & has_history & (lower > 3 * body) & (lower > 0.6 * total)
+                                & has_body & (low <= support * 1.002))
+
+    # Momentum (marubozu) candles with at least 3 previous candles for context
+    prev_count = np.minimum(np.arange(n), momentum_lookback)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body_percentage = np.where(ranged, body / total, 0.0)
+        prev_volume_mean = previous_window(volume, momentum_lookback, 0.0).mean(axis=1)
+    # Rows with a partial window average only the candles that exist
+    for i in range(1, min(momentum_lookback, n)):
+        prev_volume_mean[i] = volume[:i].mean()
+    marubozu = (ranged & has_body & (prev_count >= 3) & (body_percentage > 0.85)
+                & (np.maximum(upper, lower) < 0.1 * total))
+    masks['bullish_momentum'] = marubozu & bullish
+    masks['bearish_momentum'] = marubozu & ~bullish
+    prev_high = previous_window(high, momentum_lookback, -np.inf).max(axis=1)
+    prev_low = previous_window(low, momentum_lookback, np.inf).min(axis=1)
+    momentum_breakout = (bullish & (close > prev_high)) | (~bullish & (close < prev_low))
+    volume_surge = volume > prev_volume_mean * 1.5
+
+    # Compression: volatility contraction inside a tight 5-candle range.
+    # Like the analyzer loop, "current" TR at candle i is the TR of candle i + 1.
+    true_range = anatomy['true_range']
+    current_atr = _shift(true_range, -1)
+    quarter = compression_lookback // 2
+    tr_sums = _sequential_sum(rolling_window(true_range, quarter))
+    early_atr = _shift(tr_sums, compression_lookback - quarter) / quarter
+    recent_atr = tr_sums / quarter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility_decrease = np.where(early_atr > 0, (early_atr - recent_atr) / early_atr, 0.0)
+        range_high = rolling_window(high, 5).max(axis=1)
+        range_low = rolling_window(low, 5).min(axis=1)
+        mean_close = rolling_window(close, 5).mean(axis=1)
+        range_percentage = np.where(mean_close > 0, (range_high - range_low) / mean_close, 0.0)
+        in_range = (np.arange(n) >= compression_lookback) & (np.arange(n) < n - 3)
+        masks['compression'] = (in_range & (volatility_decrease > 0.3) & (range_percentage < 0.02)
+                                & (current_atr < early_atr * 0.6))
+
+    features = dict(anatomy)
+    features.update({
+        'resistance': resistance,
+        'support': support,
+        'body_percentage': body_percentage,
+        'momentum_breakout': momentum_breakout,
+        'volume_surge': volume_surge,
+        'volatility_decrease': volatility_decrease,
+        'range_percentage': range_percentage,
+        'range_mid': (range_high + range_low) / 2,
+    })
+    return PatternMasks(masks=masks, features=features)
+
+
+def masks_from_dataframe(df: pd.DataFrame, **kwargs) -> PatternMasks:
+    return pattern_masks(df['open'].values, df['high'].values, df['low'].values,
+                         df['close'].values, df['volume'].values, **kwargs)
+
+
+def pattern_statistics(df: pd.DataFrame, horizon: int = 5, **kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    Occurrence and forward-return stats per pattern over the full history.
+
+    Forward return is close[i + horizon] / close[i] - 1; win rate counts a
+    move in the pattern's direction (neutral patterns report absolute move).
+    """
+    patterns = masks_from_dataframe(df, **kwargs)
+    close = np.asarray(df['close'].values, dtype=float)
+    forward = _shift(close, -horizon) / close - 1 if len(close) else close
+
+    stats = {}
+    for name, mask in patterns.masks.items():
+        hits = np.flatnonzero(mask)
+        returns = forward[hits]
+        returns = returns[~np.isnan(returns)]
+        direction = PATTERN_DIRECTIONS.get(name, 'neutral')
+        if direction == 'bullish':
+            wins = returns > 0
+        elif direction == 'bearish':
+            wins = returns < 0
+        else:
+            wins = np.zeros(len(returns), dtype=bool)
+
+        stats[name] = {
+            'direction': direction,
+            'count': int(len(hits)),
+            'frequency': float(len(hits) / len(close)) if len(close) else 0.0,
+            'evaluated': int(len(returns)),
+            'avg_forward_return': float(returns.mean()) if len(returns) else 0.0,
+            'avg_abs_move': float(np.abs(returns).mean()) if len(returns) else 0.0,
+            'win_rate': float(wins.mean()) if len(returns) and direction != 'neutral' else None,
+        }
+    return stats
+
+
+# Export
+__all__ = ['PatternMasks', 'PATTERN_DIRECTIONS', 'pattern_masks', 'masks_from_dataframe',
+           'pattern_statistics', 'candle_anatomy', 'previous_window', 'rolling_window']
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Candle Store - Persistent append-only OHLCV storage per symbol/timeframe
+Menyimpan candle dalam file biner fixed-width yang di-memory-map, sehingga
+fetcher cukup mengambil candle yang lebih baru dari timestamp terakhir
+dan slice `limit` apapun bisa dilayani langsung dari disk.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width record per candle; timestamp is epoch milliseconds (OKX format)
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+EMPTY_CANDLES = np.empty(0, dtype=CANDLE_DTYPE)
+
+
+def candles_to_records(candles) -> np.ndarray:
+    """Convert list of candle dicts (any order) to sorted, de-duplicated records"""
+    if not candles:
+        return EMPTY_CANDLES
+    records = np.fromiter(
+        ((int(c['timestamp']), float(c['open']), float(c['high']), float(c['low']),
+          float(c['close']), float(c.get('volume') or 0.0)) for c in candles),
+        dtype=CANDLE_DTYPE,
+        count=len(candles)
+    )
+    return _sort_unique(records)
+
+
+def _sort_unique(records: np.ndarray) -> np.ndarray:
+    """Sort by timestamp and keep the last occurrence of each duplicate timestamp"""
+    if len(records) < 2:
+        return records
+    order = np.argsort(records['timestamp'], kind='stable')
+    records = records[order]
+    ts = records['timestamp']
+    keep = np.append(ts[1:] != ts[:-1], True)
+    return records[keep]
+
+
+class CandleStore:
+    """
+    Append-only columnar candle storage.
+
+    Layout: satu file `<SYMBOL>_<TF>.bin` per pasangan symbol/timeframe berisi
+    record CANDLE_DTYPE yang terurut berdasarkan timestamp. Candle baru
+    di-append; candle terakhir (live candle) di-overwrite in place ketika
+    timestamp-nya sama. Backfill data lama memicu rewrite atomik (tmp + rename).
+    """
+
+    def __init__(self, base_dir: str = "logs/candles"):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+    def _path(self, symbol: str, timeframe: str) -> Path:
+        safe_symbol = symbol.replace('/', '-').upper()
+        return self.base_dir / f"{safe_symbol}_{timeframe}.bin"
+
+    def _load(self, path: Path) -> np.ndarray:
+        """Memory-map stored records (read-only); ignores a torn trailing record"""
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return EMPTY_CANDLES
+        count = size // CANDLE_DTYPE.itemsize
+        if count == 0:
+            return EMPTY_CANDLES
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(count,))
+
+    def load(self, symbol: str, timeframe: str) -> np.ndarray:
+        """All stored candles for symbol/timeframe, oldest first"""
+        return self._load(self._path(symbol, timeframe))
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        return len(self.load(symbol, timeframe))
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        records = self.load(symbol, timeframe)
+        return int(records['timestamp'][0]) if len(records) else None
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        records = self.load(symbol, timeframe)
+        return int(records['timestamp'][-1]) if len(records) else None
+
+    def tail(self, symbol: str, timeframe: str, limit: int) -> np.ndarray:
+        """Last `limit` candles, oldest first"""
+        records = self.load(symbol, timeframe)
+        if limit <= 0:
+            return EMPTY_CANDLES
+        return records[-limit:]
+
+    def read_range(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None, limit: Optional[int] = None) -> np.ndarray:
+        """Candles with start_ms <= timestamp <= end_ms (inclusive), oldest first"""
+        records = self.load(symbol, timeframe)
+        if not len(records):
+            return records
+        ts = records['timestamp']
+        lo = int(np.searchsorted(ts, start_ms, side='left')) if start_ms is not None else 0
+        hi = int(np.searchsorted(ts, end_ms, side='right')) if end_ms is not None else len(records)
+        if limit is not None and hi - lo > limit:
+            lo = hi - limit
+        return records[lo:hi]
+
+    def merge(self, symbol: str, timeframe: str, records: np.ndarray) -> int:
+        """
+        Merge new candles into the store.
+
+        Returns:
+            Number of candles that were not stored before
+        """
+        records = _sort_unique(np.asarray(records, dtype=CANDLE_DTYPE))
+        if not len(records):
+            return 0
+
+        path = self._path(symbol, timeframe)
+        with self._lock, self._file_lock(path):
+            existing = self._load(path)
+            self._truncate_torn_record(path)
+
+            if not len(existing):
+                self._rewrite(path, records)
+                return len(records)
+
+            last_ts = int(existing['timestamp'][-1])
+            new_ts = records['timestamp']
+
+            if int(new_ts[0]) >= last_ts:
+                # Pure tail update: overwrite the live candle, append the rest
+                if int(new_ts[0]) == last_ts:
+                    with open(path, 'r+b') as f:
+                        f.seek((len(existing) - 1) * CANDLE_DTYPE.itemsize)
+                        f.write(records[:1].tobytes())
+                    records = records[1:]
+                if len(records):
+                    with open(path, 'ab') as f:
+                        f.write(records.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                return len(records)
+
+            # Backfill / out-of-order data: merge and rewrite atomically
+            before = len(existing)
+            merged = _sort_unique(np.concatenate([np.array(existing), records]))
+            self._rewrite(path, merged)
+            return len(merged) - before
+
+    def delete(self, symbol: str, timeframe: str):
+        path = self._path(symbol, timeframe)
+        with self._lock:
+            path.unlink(missing_ok=True)
+
+    def _truncate_torn_record(self, path: Path):
+        """Drop a partially-written trailing record left by a crash mid-append"""
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        remainder = size % CANDLE_DTYPE.itemsize
+        if remainder:
+            logger.warning(f"Truncating torn candle record in {path.name}")
+            os.truncate(path, size - remainder)
+
+    def _rewrite(self, path: Path, records: np.ndarray):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(records).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _file_lock(self, path: Path):
+        return _InterProcessLock(path.with_suffix('.lock'))
+
+
+class _InterProcessLock:
+    """flock-based lock so multiple gunicorn workers can share one store"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fh = open(self.path, 'a')
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fh is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+        return False
+
+
+# Export
+__all__ = ['CandleStore', 'CANDLE_DTYPE', 'candles_to_records']
@@ -6,7 +6,8 @@ Memblokir sinyal saat kondisi tidak ideal atau performance buruk
 import logging
 import time
 import json
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, Any, Deque, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -37,21 +38,24 @@ class BreakerStatus:
     total_signals_today: int
     blocked_signals_count: int
 
+# Circuit breaker thresholds
+DEFAULT_THRESHOLDS = {
+    'max_consecutive_losses': 4,     # 4 loss berturut-turut
+    'max_daily_drawdown_pct': 5.0,   # 5% DD harian
+    'max_signals_per_hour': 20,      # Anti-spam
+    'min_win_rate_30d': 0.35,        # 35% win rate minimum
+    'max_daily_signals': 50,         # Max sinyal per hari
+    'recovery_test_duration': 3600,  # 1 jam testing saat half-open
+    'cooling_period': 7200,          # 2 jam cooling sebelum half-open
+}
+
 class CircuitBreaker:
     def __init__(self, data_dir: str = "logs"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
         # Circuit breaker thresholds
-        self.thresholds = {
-            'max_consecutive_losses': 4,     # 4 loss berturut-turut
-            'max_daily_drawdown_pct': 5.0,   # 5% DD harian
-            'max_signals_per_hour': 20,      # Anti-spam
-            'min_win_rate_30d': 0.35,        # 35% win rate minimum
-            'max_daily_signals': 50,         # Max sinyal per hari
-            'recovery_test_duration': 3600,  # 1 jam testing saat half-open
-            'cooling_period': 7200,          # 2 jam cooling sebelum half-open
-        }
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
         
         # State management
         self.state = BreakerState.CLOSED
@@ -383,4 +387,123 @@ class CircuitBreaker:
             with open(state_file, 'w') as f:
                 json.dump(state_data, f, indent=2)
         except Exception as e:
-            logger.warning(f"Failed to save circuit breaker state: {e}")
\ No newline at end of file
+            logger.warning(f"Failed to save circuit breaker state: {e}")
+
+
+class SimulatedCircuitBreaker:
+    """
+    Circuit breaker rules dengan simulated clock untuk backtesting
+    
+    Threshold dan state machine (CLOSED -> OPEN -> HALF_OPEN) sama dengan
+    CircuitBreaker, tetapi waktu berasal dari timestamp candle, drawdown harian
+    dihitung dari equity awal hari (bukan asumsi akun 10k) dan tidak ada file I/O.
+    """
+    
+    def __init__(self, initial_equity: float, thresholds: Optional[Dict[str, Any]] = None):
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.state = BreakerState.CLOSED
+        self.triggered_at: Optional[float] = None
+        self.recovery_at: Optional[float] = None
+        self.consecutive_losses = 0
+        self.equity = initial_equity
+        self.day: Optional[int] = None
+        self.day_start_equity = initial_equity
+        self.day_signals = 0
+        self.recent_signals: Deque[float] = deque()
+        self.outcomes: Deque[Tuple[float, bool]] = deque()
+        self.wins_30d = 0
+        self.events: List[BreakerEvent] = []
+        self.blocked = 0
+    
+    def _roll_day(self, timestamp: float):
+        day = int(timestamp // 86400)
+        if day != self.day:
+            self.day = day
+            self.day_start_equity = self.equity
+            self.day_signals = 0
+    
+    def _update_state(self, timestamp: float):
+        if self.state == BreakerState.OPEN and self.triggered_at is not None:
+            if timestamp - self.triggered_at >= self.thresholds['cooling_period']:
+                self.state = BreakerState.HALF_OPEN
+                self.recovery_at = timestamp
+        elif self.state == BreakerState.HALF_OPEN and self.recovery_at is not None:
+            if timestamp - self.recovery_at >= self.thresholds['recovery_test_duration']:
+                if self.consecutive_losses < self.thresholds['max_consecutive_losses']:
+                    self.state = BreakerState.CLOSED
+                    self.triggered_at = None
+                    self.recovery_at = None
+                else:
+                    self.state = BreakerState.OPEN
+                    self.triggered_at = timestamp
+                    self.recovery_at = None
+    
+    def _trigger(self, reason: str, timestamp: float, symbol: str = 'ALL'):
+        self.state = BreakerState.OPEN
+        self.triggered_at = timestamp
+        self.recovery_at = None
+        self.events.append(BreakerEvent(timestamp=timestamp, event_type='breaker_triggered',
+                                        value=0.0, symbol=symbol, reason=reason))
+    
+    def _win_rate_ok(self, timestamp: float) -> bool:
+        cutoff = timestamp - 30 * 24 * 3600
+        while self.outcomes and self.outcomes[0][0] <= cutoff:
+            self.wins_30d -= self.outcomes.popleft()[1]
+        if len(self.outcomes) >= 10:
+            return self.wins_30d / len(self.outcomes) >= self.thresholds['min_win_rate_30d']
+        return True
+    
+    def allow_entry(self, timestamp: float, equity: Optional[float] = None, symbol: str = 'ALL') -> bool:
+        """check_signal_permission pada waktu candle; entry yang lolos dihitung ke rate limit"""
+        if equity is not None:
+            self.equity = equity
+        self._roll_day(timestamp)
+        self._update_state(timestamp)
+        
+        hour_ago = timestamp - 3600
+        while self.recent_signals and self.recent_signals[0] <= hour_ago:
+            self.recent_signals.popleft()
+        
+        allowed = self.state != BreakerState.OPEN
+        if allowed and (len(self.recent_signals) >= self.thresholds['max_signals_per_hour']
+                        or self.day_signals >= self.thresholds['max_daily_signals']):
+            allowed = False
+        if allowed and not self._win_rate_ok(timestamp):
+            self._trigger("Poor performance metrics", timestamp, symbol)
+            allowed = False
+        
+        if not allowed:
+            self.blocked += 1
+            return False
+        self.recent_signals.append(timestamp)
+        self.day_signals += 1
+        return True
+    
+    def record_outcome(self, timestamp: float, pnl: float, equity: float, symbol: str = 'ALL'):
+        """record_signal_outcome dengan equity aktual setelah posisi ditutup"""
+        self._roll_day(timestamp)
+        self.equity = equity
+        win = pnl > 0
+        self.outcomes.append((timestamp, win))
+        self.wins_30d += win
+        
+        if win:
+            self.consecutive_losses = 0
+        elif pnl < 0:
+            self.consecutive_losses += 1
+            if self.consecutive_losses >= self.thresholds['max_consecutive_losses']:
+                self._trigger(f"{self.consecutive_losses} consecutive losses", timestamp, symbol)
+        
+        if self.day_start_equity > 0:
+            daily_dd_pct = max(0.0, self.day_start_equity - equity) / self.day_start_equity * 100
+            if daily_dd_pct >= self.thresholds['max_daily_drawdown_pct']:
+                self._trigger(f"Daily drawdown {daily_dd_pct:.1f}%", timestamp, symbol)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state.value,
+            'triggers': len(self.events),
+            'blocked_entries': self.blocked,
+            'consecutive_losses': self.consecutive_losses,
+            'last_reason': self.events[-1].reason if self.events else None
+        }
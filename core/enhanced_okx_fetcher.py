@@ -4,14 +4,14 @@ Enhanced OKX API Fetcher
 Memaksimalkan semua fitur gratis OKX API untuk analisis trading yang lebih komprehensif
 """
 
-import requests
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-import time
 import json
 
+from core.okx_async_client import get_okx_client
+
 logger = logging.getLogger(__name__)
 
 class EnhancedOKXFetcher:
@@ -21,45 +21,14 @@ class EnhancedOKXFetcher:
     """
     
     def __init__(self):
-        self.base_url = "https://www.okx.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'Mozilla/5.0 GPTs-System/1.0'
-        })
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.client = get_okx_client()
+        self.base_url = self.client.base_url
         
         logger.info("🔄 Enhanced OKX Fetcher initialized")
     
-    def _rate_limit(self):
-        """Rate limiting untuk menghindari ban"""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
-    
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
-        """Helper untuk membuat request dengan error handling"""
-        try:
-            self._rate_limit()
-            
-            url = f"{self.base_url}{endpoint}"
-            response = self.session.get(url, params=params or {}, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('code') == '0':
-                return data.get('data', [])
-            else:
-                logger.error(f"OKX API error: {data}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Request error for {endpoint}: {e}")
-            return None
+        """Helper untuk membuat request via shared pooled client (rate limit per endpoint)"""
+        return self.client.request_sync(endpoint, params)
 
     # ===== MARKET DATA ENDPOINTS =====
     
@@ -73,8 +42,9 @@ class EnhancedOKXFetcher:
             'limit': str(min(limit, 100))
         }
         
-        data = self._make_request('/api/v5/public/liquidation-orders', params)
-        
+        return self._parse_liquidation_orders(self._make_request('/api/v5/public/liquidation-orders', params))
+    
+    def _parse_liquidation_orders(self, data: Optional[List[Dict]]) -> Optional[List[Dict]]:
         if data:
             liquidations = []
             for liq in data:
@@ -100,8 +70,9 @@ class EnhancedOKXFetcher:
             'instId': symbol
         }
         
-        data = self._make_request('/api/v5/public/position-tiers', params)
-        
+        return self._parse_position_tiers(self._make_request('/api/v5/public/position-tiers', params), symbol)
+    
+    def _parse_position_tiers(self, data: Optional[List[Dict]], symbol: str) -> Optional[List[Dict]]:
         if data:
             tiers = []
             for tier in data:
@@ -189,8 +160,9 @@ class EnhancedOKXFetcher:
             'ccy': currency
         }
         
-        data = self._make_request('/api/v5/public/insurance-fund', params)
-        
+        return self._parse_insurance_fund(self._make_request('/api/v5/public/insurance-fund', params), currency)
+    
+    def _parse_insurance_fund(self, data: Optional[List[Dict]], currency: str) -> Optional[List[Dict]]:
         if data:
             insurance_data = []
             for fund in data:
@@ -211,8 +183,9 @@ class EnhancedOKXFetcher:
         📊 Get option market summary
         """
         params = {'ccy': currency}
-        data = self._make_request('/api/v5/public/opt-summary', params)
-        
+        return self._parse_option_summary(self._make_request('/api/v5/public/opt-summary', params), currency)
+    
+    def _parse_option_summary(self, data: Optional[List[Dict]], currency: str) -> Optional[List[Dict]]:
         if data:
             option_summary = []
             for opt in data:
@@ -244,8 +217,9 @@ class EnhancedOKXFetcher:
             'limit': str(min(limit, 100))
         }
         
-        data = self._make_request('/api/v5/public/funding-rate-history', params)
-        
+        return self._parse_funding_rate_history(self._make_request('/api/v5/public/funding-rate-history', params), symbol)
+    
+    def _parse_funding_rate_history(self, data: Optional[List[Dict]], symbol: str) -> Optional[List[Dict]]:
         if data:
             funding_history = []
             for rate in data:
@@ -324,26 +298,52 @@ class EnhancedOKXFetcher:
             'data': {}
         }
         
-        # Basic market data
-        market_data['data']['ticker'] = self._make_request('/api/v5/market/ticker', {'instId': symbol})
-        market_data['data']['orderbook'] = self._make_request('/api/v5/market/books', {'instId': symbol, 'sz': '20'})
+        # Semua sub-request dikirim paralel dalam satu batch
+        requests = {
+            'ticker': ('/api/v5/market/ticker', {'instId': symbol}),
+            'orderbook': ('/api/v5/market/books', {'instId': symbol, 'sz': '20'}),
+            'liquidations': ('/api/v5/public/liquidation-orders',
+                             {'instType': 'SWAP', 'state': 'filled', 'limit': '50'})
+        }
         
         # Derivatives data (jika applicable)
-        if 'SWAP' in symbol or 'FUTURES' in symbol:
-            market_data['data']['funding_rate'] = self._make_request('/api/v5/public/funding-rate', {'instId': symbol})
-            market_data['data']['open_interest'] = self._make_request('/api/v5/public/open-interest', {'instId': symbol})
-            market_data['data']['price_limit'] = self._make_request('/api/v5/public/price-limit', {'instId': symbol})
-            market_data['data']['position_tiers'] = self.get_position_tiers(symbol=symbol)
-            market_data['data']['funding_history'] = self.get_funding_rate_history(symbol, limit=20)
-        
-        # Market-wide data
-        market_data['data']['liquidations'] = self.get_liquidation_orders(limit=50)
+        is_derivative = 'SWAP' in symbol or 'FUTURES' in symbol
+        if is_derivative:
+            requests.update({
+                'funding_rate': ('/api/v5/public/funding-rate', {'instId': symbol}),
+                'open_interest': ('/api/v5/public/open-interest', {'instId': symbol}),
+                'price_limit': ('/api/v5/public/price-limit', {'instId': symbol}),
+                'position_tiers': ('/api/v5/public/position-tiers', {'instType': 'SWAP', 'instId': symbol}),
+                'funding_history': ('/api/v5/public/funding-rate-history', {'instId': symbol, 'limit': '20'})
+            })
         
         # Options data (jika BTC atau ETH)
-        if 'BTC' in symbol or 'ETH' in symbol:
+        has_options = 'BTC' in symbol or 'ETH' in symbol
+        if has_options:
             base_currency = symbol.split('-')[0]
-            market_data['data']['option_summary'] = self.get_option_summary(base_currency)
-            market_data['data']['insurance_fund'] = self.get_insurance_fund(currency=base_currency)
+            requests.update({
+                'option_summary': ('/api/v5/public/opt-summary', {'ccy': base_currency}),
+                'insurance_fund': ('/api/v5/public/insurance-fund', {'instType': 'SWAP', 'ccy': base_currency})
+            })
+        
+        raw = self.client.fetch_many(requests)
+        
+        market_data['data']['ticker'] = raw['ticker']
+        market_data['data']['orderbook'] = raw['orderbook']
+        
+        if is_derivative:
+            market_data['data']['funding_rate'] = raw['funding_rate']
+            market_data['data']['open_interest'] = raw['open_interest']
+            market_data['data']['price_limit'] = raw['price_limit']
+            market_data['data']['position_tiers'] = self._parse_position_tiers(raw['position_tiers'], symbol)
+            market_data['data']['funding_history'] = self._parse_funding_rate_history(raw['funding_history'], symbol)
+        
+        # Market-wide data
+        market_data['data']['liquidations'] = self._parse_liquidation_orders(raw['liquidations'])
+        
+        if has_options:
+            market_data['data']['option_summary'] = self._parse_option_summary(raw['option_summary'], base_currency)
+            market_data['data']['insurance_fund'] = self._parse_insurance_fund(raw['insurance_fund'], base_currency)
         
         logger.info(f"✅ Comprehensive market data compiled for {symbol}")
         return market_data
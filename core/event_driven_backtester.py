@@ -154,6 +154,169 @@ class EventDrivenBacktester:
         # Calculate metrics
         return self._calculate_metrics()
     
+    def run_vectorized_backtest(self,
+                                data: pd.DataFrame,
+                                entries,
+                                exits,
+                                size=1.0,
+                                size_type: str = 'fraction',
+                                symbol: str = 'BTC-USDT',
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None) -> BacktestMetrics:
+        """
+        Run bar-level backtest dari signal array yang sudah dihitung (long-only, satu posisi)
+        
+        Fill, fee, slippage dan mark-to-market identik dengan run_backtest (eksekusi
+        di close bar signal), tetapi state posisi, equity dan drawdown dihitung
+        dengan array pass; hanya round trip yang di-loop untuk pembukuan kas.
+        
+        Args:
+            data: DataFrame dengan kolom 'close' (dan 'timestamp' atau DatetimeIndex)
+            entries: Boolean array/Series - buka posisi saat flat
+            exits: Boolean array/Series - tutup seluruh posisi saat long
+            size: Scalar atau array per bar, dibaca pada bar entry
+            size_type: 'fraction' (bagian dari kas, termasuk komisi), 'value' (notional) atau 'quantity'
+            symbol: Symbol untuk trade record
+            start_date: Tanggal mulai backtest
+            end_date: Tanggal akhir backtest
+        """
+        if size_type not in ('fraction', 'value', 'quantity'):
+            raise ValueError(f"Unknown size_type: {size_type}")
+        
+        entries = np.asarray(entries, dtype=bool)
+        exits = np.asarray(exits, dtype=bool)
+        sizes = np.broadcast_to(np.asarray(size, dtype=float), entries.shape)
+        if not (len(entries) == len(exits) == len(data)):
+            raise ValueError("entries/exits must have one value per bar")
+        
+        timestamps = pd.to_datetime(data['timestamp'] if 'timestamp' in data.columns else data.index)
+        timestamps = pd.Series(np.asarray(timestamps), index=np.arange(len(data)))
+        # Filter data by date range
+        keep = np.ones(len(data), dtype=bool)
+        if start_date:
+            keep &= (timestamps >= start_date).to_numpy()
+        if end_date:
+            keep &= (timestamps <= end_date).to_numpy()
+        close = data['close'].to_numpy(dtype=float)[keep]
+        entries, exits, sizes = entries[keep], exits[keep], sizes[keep]
+        timestamps = timestamps[keep].reset_index(drop=True)
+        n = len(close)
+        
+        # Reset state
+        self.capital = self.initial_capital
+        self.positions = {}
+        self.orders = []
+        self.trades = []
+        self.equity_curve = [self.initial_capital]
+        self.daily_returns = []
+        if n == 0:
+            return self._calculate_metrics()
+        
+        # Position state: last non-conflicting signal wins (forward fill via index accumulate)
+        conflict = entries & exits
+        signal = np.full(n, -1, dtype=np.int8)
+        signal[entries & ~conflict] = 1
+        signal[exits & ~conflict] = 0
+        last = np.maximum.accumulate(np.where(signal >= 0, np.arange(n), -1))
+        in_position = (last >= 0) & (signal[np.maximum(last, 0)] == 1)
+        
+        was_in = np.concatenate([[False], in_position[:-1]])
+        entry_bars = np.flatnonzero(in_position & ~was_in)
+        exit_bars = np.flatnonzero(~in_position & was_in)
+        
+        # Cash / quantity only change at fills; loop over round trips, not bars
+        cash_level = np.full(n, np.nan)
+        qty_level = np.full(n, np.nan)
+        trade_pnls = []
+        cash = self.initial_capital
+        buy_price = 0.0
+        price_factor_buy = 1 + self.slippage_rate
+        price_factor_sell = 1 - self.slippage_rate
+        
+        for k, entry in enumerate(entry_bars):
+            exit_bar = exit_bars[k] if k < len(exit_bars) else None
+            execution_price = close[entry] * price_factor_buy
+            if size_type == 'fraction':
+                quantity = sizes[entry] * cash / (execution_price * (1 + self.commission_rate))
+            elif size_type == 'value':
+                quantity = sizes[entry] / execution_price
+            else:
+                quantity = sizes[entry]
+            
+            cost = quantity * execution_price
+            commission = cost * self.commission_rate
+            total_cost = cost + commission
+            if quantity <= 0 or total_cost > cash:
+                # Unfunded entry: stay flat until the matching exit
+                self.logger.warning(f"Insufficient capital for buy order: {total_cost} > {cash}")
+                continue
+            
+            cash -= total_cost
+            cash_level[entry], qty_level[entry] = cash, quantity
+            buy_price = execution_price
+            self.trades.append(Trade(
+                order_id=f"BUY_{timestamps[entry].timestamp()}", symbol=symbol, side=OrderSide.BUY,
+                quantity=quantity, price=execution_price, timestamp=timestamps[entry], commission=commission
+            ))
+            
+            if exit_bar is None:
+                self.positions[symbol] = Position(symbol=symbol, quantity=quantity, avg_price=buy_price)
+                continue
+            
+            execution_price = close[exit_bar] * price_factor_sell
+            proceeds = quantity * execution_price
+            commission = proceeds * self.commission_rate
+            cash += proceeds - commission
+            cash_level[exit_bar], qty_level[exit_bar] = cash, 0.0
+            trade_pnls.append((execution_price - buy_price) * quantity - commission)
+            self.trades.append(Trade(
+                order_id=f"SELL_{timestamps[exit_bar].timestamp()}", symbol=symbol, side=OrderSide.SELL,
+                quantity=quantity, price=execution_price, timestamp=timestamps[exit_bar], commission=commission
+            ))
+        
+        # Forward fill cash / quantity between fills
+        changed = np.maximum.accumulate(np.where(~np.isnan(cash_level), np.arange(n), -1))
+        has_fill = changed >= 0
+        cash_path = np.where(has_fill, cash_level[np.maximum(changed, 0)], self.initial_capital)
+        qty_path = np.where(has_fill, qty_level[np.maximum(changed, 0)], 0.0)
+        
+        equity = cash_path + qty_path * close
+        self.capital = cash
+        self.equity_curve = [self.initial_capital] + equity.tolist()
+        self.daily_returns = (np.diff(equity) / equity[:-1]).tolist()
+        
+        return self._calculate_metrics(trade_pnls=trade_pnls)
+    
+    def run_portfolio_backtest(self,
+                               data: Dict[str, pd.DataFrame],
+                               signals: Dict[str, Dict[str, Any]],
+                               **portfolio_kwargs) -> BacktestMetrics:
+        """
+        Run multi-symbol portfolio backtest (lihat core.portfolio_backtester)
+        
+        Args:
+            data: symbol -> OHLC DataFrame
+            signals: symbol -> {'entries', 'exits', optional 'stop_loss'} arrays
+            portfolio_kwargs: risk_percent, max_positions, max_allocation_pct, ...
+        """
+        from core.portfolio_backtester import PortfolioBacktester
+        
+        portfolio = PortfolioBacktester(self.initial_capital, self.commission_rate,
+                                        self.slippage_rate, **portfolio_kwargs)
+        metrics = portfolio.run_backtest(data, signals)
+        
+        self.trades = portfolio.trades
+        self.equity_curve = portfolio.equity_curve
+        self.daily_returns = portfolio.daily_returns
+        self.positions = {
+            symbol: Position(symbol=symbol, quantity=position['quantity'], avg_price=position['price'])
+            for symbol, position in portfolio.positions.items()
+        }
+        self.capital = self.equity_curve[-1] - sum(
+            position.quantity * data[symbol]['close'].iloc[-1] for symbol, position in self.positions.items()
+        )
+        return metrics
+    
     def _update_positions(self, current_price: float):
         """Update unrealized P&L for all positions"""
         for symbol, position in self.positions.items():
@@ -278,8 +441,13 @@ class EventDrivenBacktester:
             equity += position.quantity * current_price
         return equity
     
-    def _calculate_metrics(self) -> BacktestMetrics:
-        """Calculate comprehensive backtest metrics"""
+    def _calculate_metrics(self, trade_pnls: Optional[List[float]] = None) -> BacktestMetrics:
+        """
+        Calculate comprehensive backtest metrics
+        
+        Args:
+            trade_pnls: P&L per round trip; dihitung dari self.trades jika tidak diberikan
+        """
         if not self.equity_curve or len(self.equity_curve) < 2:
             return BacktestMetrics(
                 total_return=0, sharpe_ratio=0, sortino_ratio=0,
@@ -321,16 +489,17 @@ class EventDrivenBacktester:
         dd_duration = self._calculate_drawdown_duration(equity_array)
         
         # Trade statistics
-        trade_pnls = []
-        for i, trade in enumerate(self.trades):
-            if trade.side == OrderSide.SELL:
-                # Find corresponding buy
-                buy_price = self._find_buy_price(trade.symbol, i)
-                if buy_price:
-                    pnl = (trade.price - buy_price) * trade.quantity - trade.commission
-                    trade_pnls.append(pnl)
-        
-        if trade_pnls:
+        if trade_pnls is None:
+            trade_pnls = []
+            for i, trade in enumerate(self.trades):
+                if trade.side == OrderSide.SELL:
+                    # Find corresponding buy
+                    buy_price = self._find_buy_price(trade.symbol, i)
+                    if buy_price:
+                        pnl = (trade.price - buy_price) * trade.quantity - trade.commission
+                        trade_pnls.append(pnl)
+        
+        if len(trade_pnls):
             trade_pnls = np.array(trade_pnls)
             winning_trades = len(trade_pnls[trade_pnls > 0])
             losing_trades = len(trade_pnls[trade_pnls <= 0])
@@ -393,22 +562,12 @@ class EventDrivenBacktester:
         if not is_drawdown.any():
             return 0
         
-        # Find consecutive drawdown periods
-        drawdown_periods = []
-        current_duration = 0
-        
-        for i in range(len(is_drawdown)):
-            if is_drawdown[i]:
-                current_duration += 1
-            else:
-                if current_duration > 0:
-                    drawdown_periods.append(current_duration)
-                current_duration = 0
-        
-        if current_duration > 0:
-            drawdown_periods.append(current_duration)
-        
-        return max(drawdown_periods) if drawdown_periods else 0
+        # Longest run of consecutive drawdown bars (run boundaries via diff)
+        padded = np.concatenate([[0], is_drawdown.astype(np.int8), [0]])
+        edges = np.diff(padded)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return int((ends - starts).max())
     
     def _find_buy_price(self, symbol: str, sell_index: int) -> Optional[float]:
         """Find average buy price before sell trade"""
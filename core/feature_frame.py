@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Feature Frame - Shared indicator computation graph
+Setiap series indikator (RSI, EMA, MACD, Bollinger, ATR, ...) dihitung sekali
+per candle set lalu di-memoize berdasarkan (data fingerprint, indikator, params).
+Indikator turunan mengambil dependensinya lewat frame yang sama, sehingga
+MACD dan Market Cipher tidak menghitung ulang EMA/RSI yang sudah ada.
+"""
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Registry of feature nodes: name -> (function, signature)
+FEATURES: Dict[str, Any] = {}
+
+
+def feature(name: str):
+    """Register a feature node; the node receives the frame as first argument"""
+    def register(func: Callable):
+        FEATURES[name] = (func, inspect.signature(func))
+        return func
+    return register
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of the OHLCV columns and index; changes whenever a candle changes"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    for column in OHLCV_COLUMNS:
+        if column in df.columns:
+            digest.update(column.encode())
+            digest.update(np.ascontiguousarray(df[column].values, dtype=float).tobytes())
+
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(index.asi8.tobytes())
+    elif isinstance(index, pd.RangeIndex):
+        digest.update(f"{index.start}:{index.stop}:{index.step}".encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class FeatureFrame:
+    """
+    Memoized indicator series for one candle set.
+
+    Hasil get() dibagi ke semua pemanggil - perlakukan sebagai read-only
+    (gunakan .copy() sebelum memodifikasi in place).
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, pd.Series], fingerprint: Optional[str] = None):
+        if isinstance(data, pd.Series):
+            data = data.to_frame('close')
+        self.df = data
+        self.fingerprint = fingerprint
+        self.stats = {'hits': 0, 'computed': 0}
+        self._values = {}
+        self._lock = threading.RLock()
+
+    def get(self, name: str, **params) -> Any:
+        """Get feature `name`, computing it (and its dependencies) on first use"""
+        if name not in FEATURES:
+            raise KeyError(f"Unknown feature: {name}")
+        func, signature = FEATURES[name]
+
+        # Bind defaults so get('rsi') and get('rsi', period=14) share one entry
+        bound = signature.bind(self, **params)
+        bound.apply_defaults()
+        key = (name,) + tuple(list(bound.arguments.items())[1:])
+
+        with self._lock:
+            if key in self._values:
+                self.stats['hits'] += 1
+                return self._values[key]
+            value = func(self, **params)
+            self._values[key] = value
+            self.stats['computed'] += 1
+            return value
+
+    def column(self, name: str) -> pd.Series:
+        return self.df[name]
+
+    def __len__(self):
+        return len(self.df)
+
+
+class FeatureFrameCache:
+    """Thread-safe LRU of FeatureFrames keyed by data fingerprint"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_frame(self, data: Union[pd.DataFrame, pd.Series]) -> FeatureFrame:
+        if isinstance(data, pd.Series):
+            data = data.to_frame('close')
+        fingerprint = data_fingerprint(data)
+
+        with self._lock:
+            frame = self._frames.get(fingerprint)
+            if frame is not None:
+                self._frames.move_to_end(fingerprint)
+                self.hits += 1
+                return frame
+
+            self.misses += 1
+            frame = FeatureFrame(data, fingerprint)
+            self._frames[fingerprint] = frame
+            while len(self._frames) > self.maxsize:
+                self._frames.popitem(last=False)
+            return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': len(self._frames), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+# Shared across engines and requests; a new candle changes the fingerprint
+feature_cache = FeatureFrameCache()
+
+
+def get_feature_frame(data: Union[pd.DataFrame, pd.Series]) -> FeatureFrame:
+    """Shared (cached) feature frame for a candle DataFrame or close Series"""
+    return feature_cache.get_frame(data)
+
+
+# =================== FEATURE NODES ===================
+
+@feature('typical_price')
+def _typical_price(frame: FeatureFrame) -> pd.Series:
+    return (frame.column('high') + frame.column('low') + frame.column('close')) / 3
+
+
+@feature('sma')
+def _sma(frame: FeatureFrame, period: int = 20, column: str = 'close') -> pd.Series:
+    return frame.column(column).rolling(window=period).mean()
+
+
+@feature('rolling_std')
+def _rolling_std(frame: FeatureFrame, period: int = 20, column: str = 'close', ddof: int = 1) -> pd.Series:
+    return frame.column(column).rolling(window=period).std(ddof=ddof)
+
+
+@feature('ema')
+def _ema(frame: FeatureFrame, period: int = 20, column: str = 'close',
+         adjust: bool = True, min_periods: int = 0) -> pd.Series:
+    return frame.column(column).ewm(span=period, adjust=adjust, min_periods=min_periods).mean()
+
+
+@feature('true_range')
+def _true_range(frame: FeatureFrame) -> pd.Series:
+    """True range; first bar falls back to high - low"""
+    prev_close = frame.column('close').shift(1)
+    high_low = frame.column('high') - frame.column('low')
+    high_close = (frame.column('high') - prev_close).abs()
+    low_close = (frame.column('low') - prev_close).abs()
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+
+
+@feature('atr')
+def _atr(frame: FeatureFrame, period: int = 14) -> pd.Series:
+    return frame.get('true_range').rolling(window=period).mean()
+
+
+@feature('rsi')
+def _rsi(frame: FeatureFrame, period: int = 14, method: str = 'sma') -> pd.Series:
+    """
+    RSI. method='sma' memakai rata-rata sederhana gain/loss (default engine
+    internal), method='wilder' memakai smoothing Wilder seperti library `ta`.
+    """
+    delta = frame.column('close').diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+
+    if method == 'wilder':
+        avg_gain = gain.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        avg_loss = loss.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return pd.Series(np.where(avg_loss == 0, 100, rsi), index=frame.df.index)
+
+    if method != 'sma':
+        raise ValueError(f"Unknown RSI method: {method}")
+    rs = gain.rolling(window=period).mean() / loss.rolling(window=period).mean()
+    return 100 - (100 / (1 + rs))
+
+
+@feature('macd')
+def _macd(frame: FeatureFrame, fast: int = 12, slow: int = 26, signal: int = 9,
+          adjust: bool = True) -> Dict[str, pd.Series]:
+    """
+    MACD line/signal/histogram. adjust=False mengikuti konvensi library `ta`
+    (EMA rekursif dengan warm-up min_periods = span).
+    """
+    ema_fast = frame.get('ema', period=fast, adjust=adjust, min_periods=0 if adjust else fast)
+    ema_slow = frame.get('ema', period=slow, adjust=adjust, min_periods=0 if adjust else slow)
+
+    macd_line = ema_fast - ema_slow
+    signal_line = macd_line.ewm(span=signal, adjust=adjust, min_periods=0 if adjust else signal).mean()
+    return {
+        'macd': macd_line,
+        'signal': signal_line,
+        'histogram': macd_line - signal_line
+    }
+
+
+@feature('bollinger')
+def _bollinger(frame: FeatureFrame, period: int = 20, std_dev: float = 2.0,
+               ddof: int = 1) -> Dict[str, pd.Series]:
+    middle = frame.get('sma', period=period)
+    std = frame.get('rolling_std', period=period, ddof=ddof)
+    return {
+        'upper': middle + (std * std_dev),
+        'middle': middle,
+        'lower': middle - (std * std_dev)
+    }
+
+
+# Export
+__all__ = ['FeatureFrame', 'FeatureFrameCache', 'data_fingerprint', 'feature',
+           'feature_cache', 'get_feature_frame']
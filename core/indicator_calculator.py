@@ -8,9 +8,12 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 import logging
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 
+from core.feature_frame import feature_cache, get_feature_frame
+
 # Technical analysis library
 try:
     import ta
@@ -40,11 +43,96 @@ class IndicatorResult:
     parameters: Dict[str, Any]
     interpretation: str = ""  # Add interpretation field
 
+# =================== VECTORIZED KERNELS ===================
+# Pure NumPy replacements for the former per-row Python loops; inputs are
+# 1-D float arrays, outputs match the loop versions (NaN until a full window).
+
+def weighted_moving_average(values: np.ndarray, period: int) -> np.ndarray:
+    """Linear-weighted moving average via convolution (weights 1..period)"""
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if period <= 0 or len(values) < period:
+        return result
+    weights = np.arange(1, period + 1, dtype=float)
+    result[period - 1:] = np.convolve(values, weights[::-1], mode='valid') / weights.sum()
+    return result
+
+def hull_moving_average(values: np.ndarray, period: int) -> np.ndarray:
+    """Hull Moving Average: WMA(2*WMA(n/2) - WMA(n), sqrt(n))"""
+    raw_hma = 2 * weighted_moving_average(values, period // 2) - weighted_moving_average(values, period)
+    return weighted_moving_average(raw_hma, int(np.sqrt(period)))
+
+def rolling_mean_abs_deviation(values: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean absolute deviation around the window mean"""
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if period <= 0 or len(values) < period:
+        return result
+    windows = np.lib.stride_tricks.sliding_window_view(values, period)
+    means = windows.mean(axis=1)
+    result[period - 1:] = np.abs(windows - means[:, None]).mean(axis=1)
+    return result
+
+def on_balance_volume(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """OBV: running sum of volume signed by close-to-close direction"""
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if len(close) == 0:
+        return np.array([], dtype=float)
+    change = np.diff(close)
+    direction = np.where(change > 0, 1.0, np.where(change < 0, -1.0, 0.0))
+    return np.cumsum(np.concatenate(([volume[0]], direction * volume[1:])))
+
+def positive_volume_index(close: np.ndarray, volume: np.ndarray, start: float = 1000.0) -> np.ndarray:
+    """PVI: compounds close-to-close returns only on bars where volume increased"""
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if len(close) == 0:
+        return np.array([], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(volume[1:] > volume[:-1], close[1:] / close[:-1], 1.0)
+    return np.cumprod(np.concatenate(([start], ratio)))
+
+def _spread_over_ranges(first: np.ndarray, last: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    """
+    Add weights[k] to every slot first[k]..last[k] (inclusive) of a zero array.
+
+    Ranges are expanded into flat (slot, weight) pairs and summed with
+    np.bincount, which accumulates in input order - bitwise identical to
+    the nested candle/bin loop it replaces.
+    """
+    counts = np.maximum(last - first + 1, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(size)
+    run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    slots = np.repeat(first, counts) + (np.arange(total) - run_starts)
+    return np.bincount(slots, weights=np.repeat(weights, counts), minlength=size)[:size]
+
+def volume_by_price_bins(low: np.ndarray, high: np.ndarray, volume: np.ndarray,
+                         bin_edges: np.ndarray) -> np.ndarray:
+    """Spread each candle's volume evenly over the price bins its low..high touches"""
+    bins = len(bin_edges) - 1
+    high_bin = np.searchsorted(bin_edges, high) - 1
+    low_bin = np.searchsorted(bin_edges, low) - 1
+    per_bin = np.asarray(volume, dtype=float) / (high_bin - low_bin + 1)
+
+    # Only bins inside [0, bins) receive volume; the split still counts the rest
+    return _spread_over_ranges(np.maximum(low_bin, 0), np.minimum(high_bin, bins - 1), per_bin, bins)
+
+def volume_at_price_levels(low: np.ndarray, high: np.ndarray, volume: np.ndarray,
+                           levels: np.ndarray) -> np.ndarray:
+    """Total volume of candles whose low..high range contains each (sorted) price level"""
+    first = np.searchsorted(levels, low, side='left')
+    last = np.searchsorted(levels, high, side='right') - 1
+    return _spread_over_ranges(first, last, np.asarray(volume, dtype=float), len(levels))
+
 class AdvancedIndicatorCalculator:
     """Advanced technical indicator calculator with comprehensive features"""
     
-    def __init__(self):
-        self.indicators_cache = {}
+    def __init__(self, max_cache_size: int = 512):
+        self.indicators_cache = OrderedDict()
+        self.max_cache_size = max_cache_size
         self.supported_indicators = {
             # Trend indicators
             'sma': self._calculate_sma,
@@ -114,17 +202,21 @@ class AdvancedIndicatorCalculator:
             if indicator_name not in self.supported_indicators:
                 raise ValueError(f"Indicator {indicator_name} not supported")
             
-            # Generate cache key
-            cache_key = f"{indicator_name}_{hash(str(df.values.tobytes()))}_{hash(str(kwargs))}"
+            # Cache key: (data fingerprint, indicator, params)
+            features = get_feature_frame(df)
+            cache_key = (features.fingerprint, indicator_name, repr(sorted(kwargs.items())))
             
             if cache_key in self.indicators_cache:
+                self.indicators_cache.move_to_end(cache_key)
                 return self.indicators_cache[cache_key]
             
             # Calculate indicator
             result = self.supported_indicators[indicator_name](df, **kwargs)
             
-            # Cache result
+            # Cache result (bounded LRU)
             self.indicators_cache[cache_key] = result
+            while len(self.indicators_cache) > self.max_cache_size:
+                self.indicators_cache.popitem(last=False)
             
             return result
             
@@ -243,7 +335,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_sma(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Simple Moving Average"""
         try:
-            sma = df['close'].rolling(window=period).mean()
+            sma = get_feature_frame(df).get('sma', period=period)
             
             # Determine signal
             current_price = df['close'].iloc[-1]
@@ -267,7 +359,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_ema(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Exponential Moving Average"""
         try:
-            ema = df['close'].ewm(span=period).mean()
+            ema = get_feature_frame(df).get('ema', period=period)
             
             current_price = df['close'].iloc[-1]
             current_ema = ema.iloc[-1]
@@ -290,10 +382,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_wma(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Weighted Moving Average"""
         try:
-            weights = np.arange(1, period + 1)
-            wma = df['close'].rolling(window=period).apply(
-                lambda x: np.dot(x, weights) / weights.sum(), raw=True
-            )
+            wma = pd.Series(weighted_moving_average(df['close'].values, period), index=df.index)
             
             current_price = df['close'].iloc[-1]
             current_wma = wma.iloc[-1]
@@ -339,20 +428,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_hma(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Hull Moving Average"""
         try:
-            half_period = period // 2
-            sqrt_period = int(np.sqrt(period))
-            
-            wma1 = df['close'].rolling(window=half_period).apply(
-                lambda x: np.dot(x, np.arange(1, half_period + 1)) / np.arange(1, half_period + 1).sum(), raw=True
-            )
-            wma2 = df['close'].rolling(window=period).apply(
-                lambda x: np.dot(x, np.arange(1, period + 1)) / np.arange(1, period + 1).sum(), raw=True
-            )
-            
-            raw_hma = 2 * wma1 - wma2
-            hma = raw_hma.rolling(window=sqrt_period).apply(
-                lambda x: np.dot(x, np.arange(1, sqrt_period + 1)) / np.arange(1, sqrt_period + 1).sum(), raw=True
-            )
+            hma = pd.Series(hull_moving_average(df['close'].values, period), index=df.index)
             
             current_price = df['close'].iloc[-1]
             current_hma = hma.iloc[-1]
@@ -375,7 +451,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_tema(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Triple Exponential Moving Average"""
         try:
-            ema1 = df['close'].ewm(span=period).mean()
+            ema1 = get_feature_frame(df).get('ema', period=period)
             ema2 = ema1.ewm(span=period).mean()
             ema3 = ema2.ewm(span=period).mean()
             
@@ -430,12 +506,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Relative Strength Index"""
         try:
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
+            rsi = get_feature_frame(df).get('rsi', period=period)
             
             current_rsi = rsi.iloc[-1]
             
@@ -464,18 +535,9 @@ class AdvancedIndicatorCalculator:
     def _calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> IndicatorResult:
         """Moving Average Convergence Divergence"""
         try:
-            ema_fast = df['close'].ewm(span=fast).mean()
-            ema_slow = df['close'].ewm(span=slow).mean()
-            
-            macd_line = ema_fast - ema_slow
-            signal_line = macd_line.ewm(span=signal).mean()
-            histogram = macd_line - signal_line
-            
-            macd_data = {
-                'macd': macd_line,
-                'signal': signal_line,
-                'histogram': histogram
-            }
+            macd_data = dict(get_feature_frame(df).get('macd', fast=fast, slow=slow, signal=signal))
+            macd_line = macd_data['macd']
+            signal_line = macd_data['signal']
             
             current_macd = macd_line.iloc[-1]
             current_signal = signal_line.iloc[-1]
@@ -505,9 +567,7 @@ class AdvancedIndicatorCalculator:
             sma = typical_price.rolling(window=period).mean()
             
             # Calculate mean absolute deviation
-            mad = typical_price.rolling(window=period).apply(
-                lambda x: np.mean(np.abs(x - np.mean(x))), raw=True
-            )
+            mad = pd.Series(rolling_mean_abs_deviation(typical_price.values, period), index=df.index)
             
             # Calculate CCI
             cci = (typical_price - sma) / (0.015 * mad)
@@ -728,16 +788,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_obv(self, df: pd.DataFrame) -> IndicatorResult:
         """On-Balance Volume"""
         try:
-            obv = pd.Series(index=df.index, dtype=float)
-            obv.iloc[0] = df['volume'].iloc[0]
-            
-            for i in range(1, len(df)):
-                if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
-                elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
-                else:
-                    obv.iloc[i] = obv.iloc[i-1]
+            obv = pd.Series(on_balance_volume(df['close'].values, df['volume'].values), index=df.index)
             
             # Calculate OBV trend
             obv_ma = obv.rolling(window=20).mean()
@@ -879,14 +930,10 @@ class AdvancedIndicatorCalculator:
     def _calculate_pvi(self, df: pd.DataFrame) -> IndicatorResult:
         """Positive Volume Index"""
         try:
-            pvi = pd.Series(index=df.index, dtype=float)
-            pvi.iloc[0] = 1000  # Starting value
-            
-            for i in range(1, len(df)):
-                if df['volume'].iloc[i] > df['volume'].iloc[i-1]:
-                    pvi.iloc[i] = pvi.iloc[i-1] * (df['close'].iloc[i] / df['close'].iloc[i-1])
-                else:
-                    pvi.iloc[i] = pvi.iloc[i-1]
+            pvi = pd.Series(
+                positive_volume_index(df['close'].values, df['volume'].values, start=1000),  # Starting value
+                index=df.index
+            )
             
             current_pvi = pvi.iloc[-1]
             previous_pvi = pvi.iloc[-2]
@@ -976,28 +1023,11 @@ class AdvancedIndicatorCalculator:
             
             # Create price levels
             price_levels = np.linspace(price_min, price_max, bins + 1)
-            volume_profile = np.zeros(bins)
             
-            # Calculate volume at each price level
-            for i in range(len(df)):
-                high_price = df['high'].iloc[i]
-                low_price = df['low'].iloc[i]
-                volume = df['volume'].iloc[i]
-                
-                # Find which bins this candle touches
-                high_bin = np.searchsorted(price_levels, high_price) - 1
-                low_bin = np.searchsorted(price_levels, low_price) - 1
-                
-                # Distribute volume across bins
-                if high_bin == low_bin:
-                    if 0 <= high_bin < bins:
-                        volume_profile[high_bin] += volume
-                else:
-                    bins_touched = high_bin - low_bin + 1
-                    volume_per_bin = volume / bins_touched
-                    for bin_idx in range(low_bin, high_bin + 1):
-                        if 0 <= bin_idx < bins:
-                            volume_profile[bin_idx] += volume_per_bin
+            # Distribute each candle's volume across the bins it touches
+            volume_profile = volume_by_price_bins(
+                df['low'].values, df['high'].values, df['volume'].values, price_levels
+            )
             
             # Find POC (Point of Control)
             poc_idx = np.argmax(volume_profile)
@@ -1063,11 +1093,10 @@ class AdvancedIndicatorCalculator:
     def _calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: float = 2.0) -> IndicatorResult:
         """Bollinger Bands"""
         try:
-            sma = df['close'].rolling(window=period).mean()
-            std = df['close'].rolling(window=period).std()
-            
-            upper_band = sma + (std * std_dev)
-            lower_band = sma - (std * std_dev)
+            bands = get_feature_frame(df).get('bollinger', period=period, std_dev=std_dev)
+            sma = bands['middle']
+            upper_band = bands['upper']
+            lower_band = bands['lower']
             
             bb_data = {
                 'upper': upper_band,
@@ -1191,12 +1220,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Average True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            tr = np.maximum(high_low, np.maximum(high_close, low_close))
-            atr = tr.rolling(window=period).mean()
+            atr = get_feature_frame(df).get('atr', period=period)
             
             current_atr = atr.iloc[-1]
             current_price = df['close'].iloc[-1]
@@ -1261,11 +1285,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_true_range(self, df: pd.DataFrame) -> IndicatorResult:
         """True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            tr = np.maximum(high_low, np.maximum(high_close, low_close))
+            tr = get_feature_frame(df).get('true_range')
             
             current_tr = tr.iloc[-1]
             current_price = df['close'].iloc[-1]
@@ -1498,18 +1518,11 @@ class AdvancedIndicatorCalculator:
         try:
             # Calculate liquidity zones based on volume and price clusters
             price_levels = np.linspace(df['low'].min(), df['high'].max(), 50)
-            liquidity_map = np.zeros(len(price_levels))
             
-            # Calculate liquidity at each price level
-            for i in range(len(df)):
-                high_price = df['high'].iloc[i]
-                low_price = df['low'].iloc[i]
-                volume = df['volume'].iloc[i]
-                
-                # Find price levels within this candle's range
-                for j, level in enumerate(price_levels):
-                    if low_price <= level <= high_price:
-                        liquidity_map[j] += volume
+            # Calculate liquidity at each price level within the candles' ranges
+            liquidity_map = volume_at_price_levels(
+                df['low'].values, df['high'].values, df['volume'].values, price_levels
+            )
             
             # Find high liquidity zones
             liquidity_threshold = np.percentile(liquidity_map, 80)
@@ -1711,6 +1724,7 @@ class AdvancedIndicatorCalculator:
     def clear_cache(self):
         """Clear indicators cache"""
         self.indicators_cache.clear()
+        feature_cache.clear()
         logger.info("Indicators cache cleared")
     
     def get_cache_info(self) -> Dict[str, Any]:
@@ -1718,7 +1732,8 @@ class AdvancedIndicatorCalculator:
         return {
             'cached_indicators': len(self.indicators_cache),
             'cache_size_mb': sum(len(str(v)) for v in self.indicators_cache.values()) / (1024 * 1024),
-            'supported_indicators': list(self.supported_indicators.keys())
+            'supported_indicators': list(self.supported_indicators.keys()),
+            'feature_frames': feature_cache.stats()
         }
 
 def create_indicator_calculator() -> AdvancedIndicatorCalculator:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Intrabar Fills - Resolusi TP/SL ambigu dengan candle timeframe lebih kecil
+Jika satu bar menyentuh take profit dan stop loss sekaligus, urutan sebenarnya
+tidak terlihat dari OHLC bar tersebut. Resolver memuat candle 1m hanya untuk
+bar itu (lazy, dari candle store lokal) dan mencari sentuhan pertama. Hasil
+di-memoize per (bar, side, levels); candle 1m per bar disimpan di LRU kecil.
+"""
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Drill-down timeframe and how many bars of it are kept in memory
+INTRABAR_TIMEFRAME = '1m'
+DEFAULT_MAX_CACHED_BARS = 256
+
+# loader(start_ms, end_ms) -> candle records (CANDLE_DTYPE), inclusive range
+CandleLoader = Callable[[int, int], np.ndarray]
+
+
+class IntrabarResolver:
+    """
+    First-touch resolver untuk satu symbol
+
+    Args:
+        loader: Mengembalikan candle lower-timeframe antara start_ms dan end_ms
+        bar_ms: Durasi bar backtest dalam milliseconds
+    """
+
+    def __init__(self, loader: CandleLoader, bar_ms: int, max_cached_bars: int = DEFAULT_MAX_CACHED_BARS):
+        self.loader = loader
+        self.bar_ms = int(bar_ms)
+        self.max_cached_bars = max_cached_bars
+        self._outcomes: Dict[Tuple[int, str, float, float], Optional[str]] = {}
+        self._bars: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        self.stats = {'lookups': 0, 'memo_hits': 0, 'bars_loaded': 0, 'resolved': 0, 'unresolved': 0}
+
+    def _minute_candles(self, bar_ms: int) -> np.ndarray:
+        records = self._bars.get(bar_ms)
+        if records is not None:
+            self._bars.move_to_end(bar_ms)
+            return records
+
+        try:
+            records = self.loader(bar_ms, bar_ms + self.bar_ms - 1)
+        except Exception as e:
+            logger.debug(f"Intrabar candles unavailable for bar {bar_ms}: {e}")
+            records = None
+        if records is None:
+            records = np.empty(0, dtype=[('timestamp', '<i8'), ('high', '<f8'), ('low', '<f8')])
+        self.stats['bars_loaded'] += 1
+
+        self._bars[bar_ms] = records
+        if len(self._bars) > self.max_cached_bars:
+            self._bars.popitem(last=False)
+        return records
+
+    def first_touch(self, bar_ns: int, action: str, take_profit: float, stop_loss: float) -> Optional[str]:
+        """
+        'TAKE_PROFIT' / 'STOP_LOSS' untuk bar yang menyentuh keduanya, atau None
+        bila candle 1m tidak tersedia atau keduanya tersentuh di menit yang sama.
+        """
+        side = action.upper()
+        key = (int(bar_ns), side, float(take_profit), float(stop_loss))
+        self.stats['lookups'] += 1
+        if key in self._outcomes:
+            self.stats['memo_hits'] += 1
+            return self._outcomes[key]
+
+        records = self._minute_candles(int(bar_ns) // 1_000_000)
+        outcome = None
+        if len(records):
+            high = np.asarray(records['high'], dtype=float)
+            low = np.asarray(records['low'], dtype=float)
+            if side in ('BUY', 'LONG'):
+                tp_mask, sl_mask = high >= take_profit, low <= stop_loss
+            else:
+                tp_mask, sl_mask = low <= take_profit, high >= stop_loss
+            tp_first = int(np.argmax(tp_mask)) if tp_mask.any() else len(records)
+            sl_first = int(np.argmax(sl_mask)) if sl_mask.any() else len(records)
+            if tp_first < sl_first:
+                outcome = 'TAKE_PROFIT'
+            elif sl_first < tp_first:
+                outcome = 'STOP_LOSS'
+
+        self.stats['resolved' if outcome else 'unresolved'] += 1
+        self._outcomes[key] = outcome
+        return outcome
+
+
+def store_loader(candle_store, symbol: str, timeframe: str = INTRABAR_TIMEFRAME) -> CandleLoader:
+    """Loader that only reads the local CandleStore (no network)"""
+    def load(start_ms: int, end_ms: int) -> np.ndarray:
+        return candle_store.read_range(symbol, timeframe, start_ms, end_ms)
+    return load
+
+
+def fetcher_loader(okx_fetcher, symbol: str, timeframe: str = INTRABAR_TIMEFRAME) -> CandleLoader:
+    """Loader via OKXFetcher.get_candle_window: local store first, one bar fetched on a miss"""
+    def load(start_ms: int, end_ms: int) -> np.ndarray:
+        return okx_fetcher.get_candle_window(symbol, timeframe, start_ms, end_ms)
+    return load
+
+
+# Export
+__all__ = ['INTRABAR_TIMEFRAME', 'IntrabarResolver', 'fetcher_loader', 'store_loader']
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Market Scanner - Multi-symbol, multi-timeframe scan over a process pool
+Candle (symbol, timeframe) di-pack ke satu blok shared memory; worker hanya
+menerima nama blok + offset sehingga tidak ada DataFrame yang di-pickle.
+Setiap unit dianalisa dengan rule MultiTimeframeAnalyzer + SMC kernel, lalu
+hasil per symbol digabung menjadi confluence dan diranking.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.shared_buffers import ScanUnit, SharedCandleBuffer, attach_buffer, default_mp_context
+from core.smc_kernel import BULLISH, CHOCH, analyze_smc
+
+logger = logging.getLogger(__name__)
+
+SCAN_TIMEFRAMES = ('15m', '1H', '4H', '1D')
+DEFAULT_SCAN_SYMBOLS = ['BTC-USDT', 'ETH-USDT', 'SOL-USDT', 'XRP-USDT', 'DOGE-USDT',
+                        'BNB-USDT', 'ADA-USDT', 'AVAX-USDT', 'LINK-USDT', 'DOT-USDT']
+
+
+# =================== WORKER SIDE ===================
+
+_worker_analyzer = None
+
+
+def _timeframe_label(timeframe: str) -> str:
+    """OKX bar ('15m') to the analyzer's timeframe key ('15M')"""
+    return timeframe.upper()
+
+
+def analyze_unit(records: np.ndarray, timeframe: str) -> Dict[str, Any]:
+    """Trend/momentum (MultiTimeframeAnalyzer rules) plus SMC structure for one candle set"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        from core.multi_timeframe_analyzer import MultiTimeframeAnalyzer
+        _worker_analyzer = MultiTimeframeAnalyzer()
+
+    df = pd.DataFrame({
+        column: np.array(records[column], dtype=np.float64)  # copy out of shared memory
+        for column in ('open', 'high', 'low', 'close', 'volume')
+    })
+    analysis = _worker_analyzer._analyze_timeframe(df, _timeframe_label(timeframe))
+
+    smc = analyze_smc(df['open'].values, df['high'].values, df['low'].values,
+                      df['close'].values, df['volume'].values)
+    last_event = None
+    if len(smc.structure):
+        event = smc.structure[-1]
+        direction = 'bullish' if event['direction'] == BULLISH else 'bearish'
+        last_event = {
+            'type': f"{direction}_{'choch' if event['kind'] == CHOCH else 'bos'}",
+            'level': float(event['level']),
+            'bars_ago': int(len(df) - 1 - event['index'])
+        }
+    analysis['smc'] = {
+        'last_event': last_event,
+        'bullish_fvg': bool(len(smc.fvgs) and smc.fvgs['direction'][-1] == BULLISH),
+        'bullish_ob': bool(len(smc.order_blocks) and smc.order_blocks['direction'][-1] == BULLISH),
+        'equal_levels': int(len(smc.liquidity))
+    }
+    analysis['price'] = float(df['close'].iloc[-1])
+    analysis['last_timestamp'] = int(records['timestamp'][-1])
+    return analysis
+
+
+def _analyze_shard(records: np.ndarray, units: Sequence[ScanUnit]) -> List[Tuple[int, Dict[str, Any]]]:
+    results = []
+    for unit_id, symbol, timeframe, start, length in units:
+        try:
+            results.append((unit_id, analyze_unit(records[start:start + length], timeframe)))
+        except Exception as e:
+            results.append((unit_id, {'timeframe': _timeframe_label(timeframe), 'trend': 'UNKNOWN',
+                                      'error': str(e)}))
+    return results
+
+
+def _scan_shard(buffer_name: str, total: int, units: Sequence[ScanUnit]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Worker entry point: analyze a shard of units straight from shared memory"""
+    return _analyze_shard(attach_buffer(buffer_name, total), units)
+
+
+# =================== SCANNER ===================
+
+class MarketScanner:
+    """
+    Scan banyak symbol x timeframe sekaligus.
+
+    Candle dibaca dari CandleStore (di-update oleh WebSocket ingestor /
+    OKXFetcher), di-pack ke shared memory, lalu dibagi ke process pool
+    dalam shard yang seimbang berdasarkan jumlah candle.
+    """
+
+    def __init__(self, fetcher=None, max_workers: Optional[int] = None, limit: int = 300,
+                 min_candles: int = 60, parallel_threshold: int = 8, mp_context=None):
+        self._fetcher = fetcher
+        self._mtf_analyzer = None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.limit = limit
+        self.min_candles = min_candles
+        self.parallel_threshold = parallel_threshold
+        self._mp_context = mp_context
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.stats = {'scans': 0, 'units': 0, 'last_scan_seconds': 0.0}
+
+    @property
+    def mtf_analyzer(self):
+        if self._mtf_analyzer is None:
+            from core.multi_timeframe_analyzer import MultiTimeframeAnalyzer
+            self._mtf_analyzer = MultiTimeframeAnalyzer()
+        return self._mtf_analyzer
+
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            from core.okx_fetcher import OKXFetcher
+            self._fetcher = OKXFetcher()
+        return self._fetcher
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=self._mp_context or default_mp_context())
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    # ----- universe & data -----
+
+    def top_symbols(self, limit: int = 100) -> List[str]:
+        """Top USDT perpetuals by 24h quote volume, as underlying instIds (BTC-USDT)"""
+        try:
+            from core.okx_async_client import get_okx_client
+            tickers = get_okx_client().request_sync('/api/v5/market/tickers', {'instType': 'SWAP'}) or []
+        except Exception as e:
+            logger.error(f"Failed to load SWAP tickers: {e}")
+            tickers = []
+
+        ranked = []
+        for ticker in tickers:
+            inst_id = ticker.get('instId', '')
+            if not inst_id.endswith('-USDT-SWAP'):
+                continue
+            try:
+                quote_volume = float(ticker.get('volCcy24h') or 0) * float(ticker.get('last') or 0)
+            except (TypeError, ValueError):
+                continue
+            ranked.append((quote_volume, inst_id[:-len('-SWAP')]))
+
+        if not ranked:
+            return DEFAULT_SCAN_SYMBOLS[:limit]
+        ranked.sort(reverse=True)
+        return [symbol for _, symbol in ranked[:limit]]
+
+    def load_candles(self, symbols: Iterable[str], timeframes: Iterable[str],
+                     refresh: bool = False) -> Dict[Tuple[str, str], np.ndarray]:
+        """Latest `limit` stored candles per unit; refresh=True syncs the store from OKX first"""
+        fetcher = self.fetcher
+        units = [(fetcher._normalize_symbol(symbol), timeframe)
+                 for symbol in symbols for timeframe in timeframes]
+
+        if refresh:
+            # Network bound; the shared token buckets keep this within OKX limits
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list(executor.map(
+                    lambda unit: fetcher.get_candles(unit[0], unit[1], limit=self.limit, copy=False),
+                    units
+                ))
+
+        candles = {}
+        for inst_id, timeframe in units:
+            records = fetcher.candle_store.tail(inst_id, timeframe, self.limit)
+            if len(records) >= self.min_candles:
+                candles[(inst_id, timeframe)] = records
+        return candles
+
+    # ----- scanning -----
+
+    def _shards(self, units: List[ScanUnit]) -> List[List[ScanUnit]]:
+        """Greedy balance by candle count; a few shards per worker smooths stragglers"""
+        shard_count = min(len(units), self.max_workers * 4)
+        shards = [[] for _ in range(shard_count)]
+        loads = np.zeros(shard_count)
+        for unit in sorted(units, key=lambda unit: unit[4], reverse=True):
+            target = int(loads.argmin())
+            shards[target].append(unit)
+            loads[target] += unit[4]
+        return [shard for shard in shards if shard]
+
+    def analyze_units(self, candles: Dict[Tuple[str, str], np.ndarray]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Analyze every (symbol, timeframe) unit, in the pool when the job is large enough"""
+        if not candles:
+            return {}
+
+        with SharedCandleBuffer(candles) as buffer:
+            units = buffer.units
+            results = []
+            if len(units) < self.parallel_threshold or self.max_workers <= 1:
+                # Small scans run in-process (no pool start-up cost)
+                results = _analyze_shard(buffer.records, units)
+            else:
+                pool = self._get_pool()
+                futures = [pool.submit(_scan_shard, buffer.name, len(buffer), shard)
+                           for shard in self._shards(units)]
+                for future in futures:
+                    results.extend(future.result())
+
+        keys = {unit[0]: (unit[1], unit[2]) for unit in units}
+        return {keys[unit_id]: analysis for unit_id, analysis in results}
+
+    def scan(self, symbols: Optional[List[str]] = None, timeframes: Sequence[str] = SCAN_TIMEFRAMES,
+             top_n: int = 20, universe_size: int = 100, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Scan symbols x timeframes and return symbols ranked by MTF confluence
+
+        Args:
+            symbols: Symbols to scan (default: top `universe_size` USDT perpetuals)
+            timeframes: OKX bar sizes
+            top_n: Number of ranked signals to return
+            refresh: Sync candle store from OKX before scanning
+        """
+        start = time.perf_counter()
+        symbols = symbols or self.top_symbols(universe_size)
+        candles = self.load_candles(symbols, timeframes, refresh=refresh)
+        loaded = time.perf_counter()
+        unit_results = self.analyze_units(candles)
+
+        by_symbol: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (symbol, timeframe), analysis in unit_results.items():
+            by_symbol.setdefault(symbol, {})[_timeframe_label(timeframe)] = analysis
+
+        ranked = [self._rank_symbol(symbol, tf_analysis) for symbol, tf_analysis in by_symbol.items()]
+        ranked.sort(key=lambda signal: (signal['conviction'], signal['confidence']), reverse=True)
+
+        elapsed = time.perf_counter() - start
+        self.stats['scans'] += 1
+        self.stats['units'] += len(unit_results)
+        self.stats['last_scan_seconds'] = round(elapsed, 3)
+
+        return {
+            'signals': ranked[:top_n],
+            'scanned_symbols': len(by_symbol),
+            'scanned_units': len(unit_results),
+            'skipped_units': len(symbols) * len(timeframes) - len(candles),
+            'timeframes': list(timeframes),
+            'timing': {
+                'load_seconds': round(loaded - start, 3),
+                'analysis_seconds': round(elapsed - (loaded - start), 3),
+                'total_seconds': round(elapsed, 3),
+                'workers': self.max_workers if len(candles) >= self.parallel_threshold else 1
+            },
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _rank_symbol(self, symbol: str, tf_analysis: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Confluence + recommendation from the MultiTimeframeAnalyzer rules, plus SMC alignment"""
+        analyzer = self.mtf_analyzer
+        confluence = analyzer._calculate_confluence(tf_analysis)
+        recommendation = analyzer._generate_mtf_recommendation(tf_analysis, confluence)
+        direction = 1 if confluence['score'] > 50 else -1 if confluence['score'] < 50 else 0
+
+        # Structure breaks agreeing with the confluence direction add conviction
+        smc_aligned = 0
+        for analysis in tf_analysis.values():
+            event = (analysis.get('smc') or {}).get('last_event')
+            if event and direction:
+                smc_aligned += 1 if event['type'].startswith('bullish') == (direction > 0) else 0
+
+        prices = [analysis['price'] for analysis in tf_analysis.values() if 'price' in analysis]
+        return {
+            'symbol': symbol,
+            'signal': recommendation['action'],
+            'confidence': recommendation['confidence'],
+            'confluence_score': confluence['score'],
+            'conviction': round(abs(confluence['score'] - 50) + 5 * smc_aligned, 2),
+            'smc_aligned_timeframes': smc_aligned,
+            'reasoning': recommendation['reasoning'],
+            'divergence': recommendation['divergence'],
+            'price': prices[0] if prices else None,
+            'timeframes': tf_analysis
+        }
+
+
+_market_scanner = None
+_market_scanner_lock = threading.Lock()
+
+
+def get_market_scanner() -> MarketScanner:
+    """Get global shared scanner (one process pool per server process)"""
+    global _market_scanner
+    if _market_scanner is None:
+        with _market_scanner_lock:
+            if _market_scanner is None:
+                _market_scanner = MarketScanner()
+    return _market_scanner
+
+
+# Export
+__all__ = ['MarketScanner', 'SharedCandleBuffer', 'SCAN_TIMEFRAMES', 'analyze_unit', 'get_market_scanner']
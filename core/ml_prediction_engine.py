@@ -20,6 +20,8 @@ from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import xgboost as xgb
 
+from core.feature_frame import get_feature_frame
+
 # Conditional TensorFlow import
 try:
     import tensorflow as tf
@@ -550,34 +552,36 @@ class HybridPredictor:
     def _add_technical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicator features"""
         try:
+            features = get_feature_frame(df)
+            
             # RSI
-            df['rsi_14'] = self._calculate_rsi(df['close'], 14)
+            df['rsi_14'] = features.get('rsi', period=14)
             df['rsi_oversold'] = (df['rsi_14'] < 30).astype(int)
             df['rsi_overbought'] = (df['rsi_14'] > 70).astype(int)
             
             # Moving Averages
-            df['sma_20'] = df['close'].rolling(20).mean()
-            df['sma_50'] = df['close'].rolling(50).mean()
-            df['ema_12'] = df['close'].ewm(span=12).mean()
-            df['ema_26'] = df['close'].ewm(span=26).mean()
+            df['sma_20'] = features.get('sma', period=20)
+            df['sma_50'] = features.get('sma', period=50)
+            df['ema_12'] = features.get('ema', period=12)
+            df['ema_26'] = features.get('ema', period=26)
             
             # MACD
-            df['macd'] = df['ema_12'] - df['ema_26']
-            df['macd_signal'] = df['macd'].ewm(span=9).mean()
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
+            macd = features.get('macd', fast=12, slow=26, signal=9)
+            df['macd'] = macd['macd']
+            df['macd_signal'] = macd['signal']
+            df['macd_histogram'] = macd['histogram']
             df['macd_bullish'] = (df['macd'] > df['macd_signal']).astype(int)
             
             # Bollinger Bands
-            bb_period = 20
-            df['bb_middle'] = df['close'].rolling(bb_period).mean()
-            bb_std = df['close'].rolling(bb_period).std()
-            df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-            df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
+            bands = features.get('bollinger', period=20, std_dev=2)
+            df['bb_middle'] = bands['middle']
+            df['bb_upper'] = bands['upper']
+            df['bb_lower'] = bands['lower']
             df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
             df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
             
             # Volume indicators
-            df['volume_sma'] = df['volume'].rolling(20).mean()
+            df['volume_sma'] = features.get('sma', period=20, column='volume')
             df['volume_ratio'] = df['volume'] / df['volume_sma']
             df['volume_high'] = (df['volume_ratio'] > 1.5).astype(int)
             
@@ -632,17 +636,7 @@ class HybridPredictor:
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator"""
         try:
-            delta = prices.diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-            
-            avg_gain = gain.rolling(period).mean()
-            avg_loss = loss.rolling(period).mean()
-            
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-            
-            return rsi
+            return get_feature_frame(prices).get('rsi', period=period)
             
         except Exception:
             return pd.Series(index=prices.index, dtype=float)
@@ -650,14 +644,7 @@ class HybridPredictor:
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift())
-            low_close = abs(df['low'] - df['close'].shift())
-            
-            true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = true_range.rolling(period).mean()
-            
-            return atr
+            return get_feature_frame(df).get('atr', period=period)
             
         except Exception:
             return pd.Series(index=df.index, dtype=float)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Engine - Batched bootstrap risk simulation
+Trade returns di-resample sebagai matrix (simulations x trades) per chunk, lalu
+equity, max drawdown, VaR/CVaR dan risk of ruin dihitung dengan cumprod dan
+maximum.accumulate. Block bootstrap (circular) menjaga autokorelasi antar trade.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+# Max matrix elements per chunk (~16MB per float64 working array)
+DEFAULT_CHUNK_ELEMENTS = 2_000_000
+
+
+def bootstrap_indices(rng: np.random.Generator, num_trades: int, num_simulations: int,
+                      block_size: int = 1) -> np.ndarray:
+    """
+    Resample indices, shape (num_simulations, num_trades).
+
+    block_size 1 is the plain iid bootstrap; larger blocks draw random
+    start points and take `block_size` consecutive trades (wrapping around).
+    """
+    if block_size <= 1:
+        return rng.integers(0, num_trades, size=(num_simulations, num_trades))
+
+    block_size = min(block_size, num_trades)
+    num_blocks = -(-num_trades // block_size)
+    starts = rng.integers(0, num_trades, size=(num_simulations, num_blocks, 1))
+    indices = (starts + np.arange(block_size)) % num_trades
+    return indices.reshape(num_simulations, -1)[:, :num_trades]
+
+
+def path_statistics(returns: np.ndarray, ruin_level: float) -> Dict[str, np.ndarray]:
+    """
+    Per-path stats for a (simulations x trades) matrix of percent returns.
+
+    Equity starts at 1.0 before the first trade, matching
+    BacktestBuilder._calculate_max_drawdown_from_returns.
+    """
+    equity = np.cumprod(1 + returns / 100, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    drawdown = (peak - equity) / peak * 100
+    lowest = equity.min(axis=1)
+    return {
+        'total_return': (equity[:, -1] - 1) * 100,
+        'max_drawdown': np.maximum(drawdown.max(axis=1), 0.0),
+        'min_equity': np.minimum(lowest, 1.0),
+        'ruined': lowest <= ruin_level,
+    }
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-simulation outcome arrays plus the summary helpers"""
+    total_returns: np.ndarray
+    max_drawdowns: np.ndarray
+    min_equity: np.ndarray
+    ruined: np.ndarray
+    num_trades: int
+    block_size: int
+    ruin_level: float
+
+    def __len__(self) -> int:
+        return len(self.total_returns)
+
+    def var(self, confidence: float = 0.95) -> float:
+        return float(np.percentile(self.total_returns, (1 - confidence) * 100))
+
+    def cvar(self, confidence: float = 0.95) -> float:
+        """Mean return of the tail at or below VaR (expected shortfall)"""
+        var = self.var(confidence)
+        return float(self.total_returns[self.total_returns <= var].mean())
+
+    def risk_of_ruin(self) -> float:
+        return float(self.ruined.mean() * 100)
+
+    def drawdown_probability(self, threshold: float) -> float:
+        """Probability (%) that max drawdown exceeds `threshold` percent"""
+        return float((self.max_drawdowns > threshold).mean() * 100)
+
+    def summary(self) -> Dict[str, Any]:
+        returns = self.total_returns
+        return {
+            'num_simulations': len(self),
+            'avg_return': float(returns.mean()),
+            'std_return': float(returns.std()),
+            'min_return': float(returns.min()),
+            'max_return': float(returns.max()),
+            'percentile_5': float(np.percentile(returns, 5)),
+            'percentile_95': float(np.percentile(returns, 95)),
+            'probability_positive': float((returns > 0).mean() * 100),
+            'avg_max_drawdown': float(self.max_drawdowns.mean()),
+            'worst_drawdown': float(self.max_drawdowns.max()),
+            'block_size': self.block_size
+        }
+
+    def risk_metrics(self) -> Dict[str, Any]:
+        returns = self.total_returns
+        downside = returns[returns < 0]
+        upside = returns[returns > 0]
+        return {
+            'var_95': self.var(0.95),
+            'cvar_95': self.cvar(0.95),
+            'var_99': self.var(0.99),
+            'cvar_99': self.cvar(0.99),
+            'downside_deviation': float(downside.std()) if len(downside) else 0.0,
+            'upside_deviation': float(upside.std()) if len(upside) else 0.0,
+            'risk_of_ruin': self.risk_of_ruin(),
+            'ruin_level': self.ruin_level,
+            'drawdown_over_20': self.drawdown_probability(20),
+            'drawdown_over_50': self.drawdown_probability(50)
+        }
+
+
+class MonteCarloEngine:
+    """
+    Batched bootstrap over a trade return series
+
+    Simulasi dijalankan per chunk sehingga memory dibatasi oleh
+    chunk_elements, bukan oleh num_simulations x num_trades.
+    """
+
+    def __init__(self, chunk_elements: int = DEFAULT_CHUNK_ELEMENTS):
+        self.chunk_elements = chunk_elements
+
+    def _chunks(self, num_simulations: int, num_trades: int) -> Iterator[int]:
+        rows = max(self.chunk_elements // max(num_trades, 1), 1)
+        for start in range(0, num_simulations, rows):
+            yield min(rows, num_simulations - start)
+
+    def simulate(self, trade_returns: Sequence[float], num_simulations: int = 10000,
+                 block_size: int = 1, ruin_drawdown: float = 50.0,
+                 seed: Optional[int] = None) -> MonteCarloResult:
+        """
+        Bootstrap trade returns (in percent per trade)
+
+        Args:
+            trade_returns: Return per trade dalam persen
+            num_simulations: Jumlah path
+            block_size: Panjang block untuk block bootstrap (1 = iid)
+            ruin_drawdown: Equity turun lebih dari persen ini dari modal awal = ruin
+            seed: Seed untuk reproducible results
+        """
+        returns = np.asarray(trade_returns, dtype=float)
+        if returns.ndim != 1 or len(returns) == 0:
+            raise ValueError("trade_returns must be a non-empty 1-D sequence")
+        if num_simulations < 1:
+            raise ValueError("num_simulations must be >= 1")
+
+        rng = np.random.default_rng(seed)
+        ruin_level = 1 - ruin_drawdown / 100
+        parts = {'total_return': [], 'max_drawdown': [], 'min_equity': [], 'ruined': []}
+
+        for rows in self._chunks(num_simulations, len(returns)):
+            indices = bootstrap_indices(rng, len(returns), rows, block_size)
+            for name, values in path_statistics(returns[indices], ruin_level).items():
+                parts[name].append(values)
+
+        return MonteCarloResult(
+            total_returns=np.concatenate(parts['total_return']),
+            max_drawdowns=np.concatenate(parts['max_drawdown']),
+            min_equity=np.concatenate(parts['min_equity']),
+            ruined=np.concatenate(parts['ruined']),
+            num_trades=len(returns),
+            block_size=max(block_size, 1),
+            ruin_level=ruin_level
+        )
+
+
+# Export
+__all__ = ['MonteCarloEngine', 'MonteCarloResult', 'bootstrap_indices', 'path_statistics']
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+OKX Async Client - Shared connection-pooled REST client untuk semua fetcher
+Token bucket per endpoint group sesuai rate limit OKX, HTTP keep-alive
+pooling, dan batch API gather-style supaya sub-request bisa paralel.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# OKX public REST limits: requests per 2 seconds per IP (OKX API v5 docs)
+RATE_WINDOW_SECONDS = 2.0
+OKX_RATE_LIMITS = {
+    '/api/v5/market/ticker': 20,
+    '/api/v5/market/tickers': 20,
+    '/api/v5/market/books': 40,
+    '/api/v5/market/candles': 40,
+    '/api/v5/market/history-candles': 20,
+    '/api/v5/market/trades': 100,
+    '/api/v5/public/funding-rate': 20,
+    '/api/v5/public/funding-rate-history': 10,
+    '/api/v5/public/open-interest': 20,
+    '/api/v5/public/price-limit': 20,
+    '/api/v5/public/liquidation-orders': 40,
+    '/api/v5/public/position-tiers': 10,
+    '/api/v5/public/opt-summary': 20,
+    '/api/v5/public/option-trades': 20,
+    '/api/v5/public/insurance-fund': 10,
+    '/api/v5/public/underlying': 20,
+    '/api/v5/public/interest-rate-loan-quota': 2,
+    '/api/v5/public/vip-interest-rate-loan-quota': 2,
+}
+DEFAULT_RATE_LIMIT = 10
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    reserve() mengambil token sekarang (boleh minus) dan mengembalikan waktu
+    tunggu, sehingga caller sync (time.sleep) dan async (asyncio.sleep) bisa
+    berbagi bucket yang sama.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+    def acquire(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class OKXRateLimiter:
+    """
+    Process-wide token buckets keyed by OKX endpoint group
+
+    Bucket hanya berlaku per proses: dengan gunicorn workers=2 setiap worker
+    punya bucket sendiri, sehingga rate efektif per IP menjadi 2x limit di sini.
+    Turunkan `limits` (atau window) sesuai jumlah worker bila mendekati limit OKX.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, window: float = RATE_WINDOW_SECONDS):
+        self.limits = limits or OKX_RATE_LIMITS
+        self.window = window
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, endpoint: str) -> TokenBucket:
+        group = endpoint.split('?', 1)[0]
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(group)
+                if bucket is None:
+                    limit = self.limits.get(group, DEFAULT_RATE_LIMIT)
+                    bucket = TokenBucket(capacity=limit, refill_per_second=limit / self.window)
+                    self._buckets[group] = bucket
+        return bucket
+
+    def acquire(self, endpoint: str):
+        self.bucket_for(endpoint).acquire()
+
+    async def acquire_async(self, endpoint: str):
+        await self.bucket_for(endpoint).acquire_async()
+
+
+rate_limiter = OKXRateLimiter()
+
+
+class OKXAsyncClient:
+    """
+    Shared OKX public REST client.
+
+    Semua request berjalan di satu event loop background dengan satu
+    aiohttp session (keep-alive pooling). Caller sync (Flask routes) memakai
+    request_sync()/fetch_many(); caller async bisa await request()/gather().
+    """
+
+    def __init__(self, base_url: str = "https://www.okx.com", timeout: float = 10,
+                 pool_size: int = 20, limiter: Optional[OKXRateLimiter] = None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.limiter = limiter or rate_limiter
+        self._session = None
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0}
+
+    # ===== EVENT LOOP =====
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start background loop lazily; restart after gunicorn fork"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._session = None
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="okx-async-client", daemon=True
+                )
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._loop
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'Content-Type': 'application/json',
+                    'User-Agent': 'Mozilla/5.0 GPTs-System/1.0'
+                }
+            )
+        return self._session
+
+    # ===== ASYNC API =====
+
+    async def request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """GET endpoint; returns OKX `data` payload or None on error"""
+        await self.limiter.acquire_async(endpoint)
+        session = await self._get_session()
+        self.stats['requests'] += 1
+
+        try:
+            async with session.get(f"{self.base_url}{endpoint}", params=params or {}) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+
+            if data.get('code') == '0':
+                return data.get('data', [])
+
+            logger.error(f"OKX API error for {endpoint}: {data.get('msg', data)}")
+            self.stats['errors'] += 1
+            return None
+
+        except Exception as e:
+            logger.error(f"Request error for {endpoint}: {e}")
+            self.stats['errors'] += 1
+            return None
+
+    async def gather(self, requests: Dict[str, Tuple[str, Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+        """
+        Run many requests concurrently.
+
+        Args:
+            requests: {key: (endpoint, params)}
+
+        Returns:
+            {key: data or None}
+        """
+        keys = list(requests.keys())
+        results = await asyncio.gather(
+            *(self.request(endpoint, params) for endpoint, params in requests.values())
+        )
+        return dict(zip(keys, results))
+
+    # ===== SYNC API =====
+
+    def request_sync(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Blocking wrapper around request() for sync callers"""
+        return self.fetch_many({'result': (endpoint, params)})['result']
+
+    def fetch_many(self, requests: Dict[str, Tuple[str, Optional[Dict[str, Any]]]],
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking wrapper around gather() for sync callers"""
+        if not requests:
+            return {}
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self.gather(requests), loop)
+        try:
+            return future.result(timeout=timeout or self.timeout * 2)
+        except Exception as e:
+            future.cancel()
+            logger.error(f"Batch OKX request failed: {e}")
+            return {key: None for key in requests}
+
+    def close(self):
+        """Close pooled connections and stop the background loop"""
+        with self._lock:
+            loop, session = self._loop, self._session
+            self._loop = self._session = None
+        if loop is None:
+            return
+        if session is not None and not session.closed:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_okx_client = None
+_okx_client_lock = threading.Lock()
+
+
+def get_okx_client() -> OKXAsyncClient:
+    """Get global shared OKX client instance"""
+    global _okx_client
+    if _okx_client is None:
+        with _okx_client_lock:
+            if _okx_client is None:
+                _okx_client = OKXAsyncClient()
+    return _okx_client
+
+
+# Export
+__all__ = ['OKXAsyncClient', 'OKXRateLimiter', 'TokenBucket', 'get_okx_client', 'rate_limiter']
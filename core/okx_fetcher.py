@@ -14,9 +14,107 @@ from typing import Optional, Dict, Any, List
 import time
 import os
 import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from core.candle_store import CandleStore, candles_to_records
+from core.okx_async_client import rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Map timeframe - Maksimal support semua OKX timeframes (8H tidak didukung OKX)
+OKX_TIMEFRAMES = {
+    '1m': '1m', '3m': '3m', '5m': '5m', '15m': '15m', '30m': '30m',
+    '1H': '1H', '2H': '2H', '4H': '4H', '6H': '6H', '12H': '12H',
+    '1D': '1D', '2D': '2D', '3D': '3D', '1W': '1W', '1M': '1M', '3M': '3M'
+}
+
+_MINUTE_MS = 60 * 1000
+BAR_MILLISECONDS = {
+    '1m': _MINUTE_MS, '3m': 3 * _MINUTE_MS, '5m': 5 * _MINUTE_MS,
+    '15m': 15 * _MINUTE_MS, '30m': 30 * _MINUTE_MS,
+    '1H': 60 * _MINUTE_MS, '2H': 120 * _MINUTE_MS, '4H': 240 * _MINUTE_MS,
+    '6H': 360 * _MINUTE_MS, '12H': 720 * _MINUTE_MS,
+    '1D': 1440 * _MINUTE_MS, '2D': 2880 * _MINUTE_MS, '3D': 4320 * _MINUTE_MS,
+    '1W': 10080 * _MINUTE_MS, '1M': 44640 * _MINUTE_MS, '3M': 133920 * _MINUTE_MS
+}
+
+CANDLES_PAGE_LIMIT = 300   # /market/candles max per request
+HISTORY_PAGE_LIMIT = 100   # /market/history-candles max per request
+MAX_BACKFILL_PAGES = 500
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class CandleFrameCache:
+    """
+    Bounded LRU + TTL cache for candle DataFrames.
+    
+    One module-level instance is shared by every OKXFetcher, so engines that
+    build their own fetcher still reuse frames converted by other engines.
+    """
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (time.time() - entry[0]) >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, frame: pd.DataFrame):
+        with self._lock:
+            self._entries[key] = (time.time(), frame)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total * 100) if total else 0.0
+            }
+
+
+shared_candle_cache = CandleFrameCache()
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """Candle records (oldest first) to float64 OHLCV DataFrame with UTC DatetimeIndex"""
+    index = pd.DatetimeIndex(
+        pd.to_datetime(np.asarray(records['timestamp']), unit='ms', utc=True),
+        name='timestamp'
+    )
+    return pd.DataFrame(
+        {col: np.array(records[col], dtype=np.float64) for col in CANDLE_COLUMNS},
+        index=index
+    )
+
+
 class OKXFetcher:
     """Simplified OKX API fetcher optimized for VPS deployment"""
     
@@ -49,10 +147,12 @@ class OKXFetcher:
             self.authenticated = False
             logger.info("OKX Fetcher initialized with public API")
         
-        self.cache = {}
+        self.candle_store = CandleStore()
+        # Drill-down windows (get_candle_window) live apart from the contiguous series
+        self.window_store = CandleStore(str(self.candle_store.base_dir / "windows"))
+        self._store_synced_at = {}
+        self._store_depth = {}
         self.cache_ttl = 30 if self.authenticated else 60  # Shorter cache for authenticated
-        self.last_request_time = 0
-        self.min_request_interval = 0.05 if self.authenticated else 0.1  # Faster for authenticated
     
     def _generate_signature(self, timestamp, method, request_path, body=''):
         """Generate signature for authenticated requests"""
@@ -69,12 +169,9 @@ class OKXFetcher:
         ).decode('utf-8')
         return signature
     
-    def _rate_limit(self):
-        """Rate limiting with better handling for authenticated API"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+    def _rate_limit(self, endpoint: str):
+        """Wait for the shared per-endpoint OKX token bucket"""
+        rate_limiter.acquire(endpoint)
     
     def _make_authenticated_request(self, method, endpoint, params=None):
         """Make authenticated request to OKX API"""
@@ -118,88 +215,178 @@ class OKXFetcher:
         else:
             return self.session.post(url, json=params)
     
-    def _is_cached(self, cache_key: str) -> bool:
-        """Check if data is cached and still valid"""
-        if cache_key not in self.cache:
-            return False
+    def _normalize_symbol(self, symbol: str) -> str:
+        """Convert symbol to OKX instId format (BTCUSDT -> BTC-USDT)"""
+        if '-' not in symbol and symbol.endswith('USDT'):
+            return symbol.replace('USDT', '-USDT')
+        elif '-' not in symbol:
+            return f"{symbol}-USDT"
+        return symbol
+    
+    def _request_candles(self, endpoint: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Request one page of candles, returned newest first (OKX order)"""
+        self._rate_limit(endpoint)
+        
+        if self.authenticated:
+            response = self._make_authenticated_request('GET', endpoint, params)
+        else:
+            response = self._make_public_request('GET', endpoint, params)
+        
+        if response is None:
+            raise Exception("Failed to get response from OKX API")
+        
+        response.raise_for_status()
+        data = response.json()
         
-        cache_time = self.cache[cache_key]['timestamp']
-        return (time.time() - cache_time) < self.cache_ttl
+        if data['code'] != '0':
+            raise Exception(f"OKX API error: {data.get('msg', 'Unknown error')}")
+        
+        candles = []
+        for candle in data.get('data', []):
+            candles.append({
+                'timestamp': int(candle[0]),
+                'open': float(candle[1]),
+                'high': float(candle[2]),
+                'low': float(candle[3]),
+                'close': float(candle[4]),
+                'volume': float(candle[5]) if candle[5] else 0.0
+            })
+        return candles
     
-    def get_historical_data(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Dict[str, Any]:
-        """Get historical candlestick data from OKX"""
+    def _sync_candle_store(self, inst_id: str, okx_tf: str, limit: int) -> int:
+        """
+        Bring the local candle store up to date for inst_id/okx_tf.
         
-        cache_key = f"{symbol}_{timeframe}_{limit}"
+        Only candles newer than the last stored timestamp are requested; an empty
+        store is seeded with the most recent `limit` candles. A store that is more
+        than MAX_BACKFILL_PAGES behind catches up in chunks that start right after
+        the last stored candle, so the series stays contiguous and the next sync
+        resumes where this one stopped. Returns number of candles fetched from OKX.
+        """
+        last_ts = self.candle_store.last_timestamp(inst_id, okx_tf)
+        bar_ms = BAR_MILLISECONDS[okx_tf]
+        now_ms = int(time.time() * 1000)
         
-        # Check cache first
-        if self._is_cached(cache_key):
-            logger.debug(f"Returning cached data for {symbol}")
-            return self.cache[cache_key]['data']
+        after = None
+        if last_ts is None:
+            wanted = limit
+        else:
+            # Missing bars since last stored candle, plus the (possibly updated) live candle
+            wanted = int((now_ms - last_ts) // bar_ms) + 1
+            # Sized with the smaller history page so the chunk always reaches last_ts
+            max_bars = MAX_BACKFILL_PAGES * HISTORY_PAGE_LIMIT
+            if wanted > max_bars:
+                logger.warning(f"{inst_id} {okx_tf} store is {wanted} bars behind; "
+                               f"catching up {max_bars} bars from the last stored candle")
+                wanted = max_bars
+                after = last_ts + max_bars * bar_ms
         
-        try:
-            # Rate limiting
-            self._rate_limit()
-            
-            # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
-            
-            # Map timeframe - Maksimal support semua OKX timeframes (8H tidak didukung OKX)
-            tf_map = {
-                '1m': '1m', '3m': '3m', '5m': '5m', '15m': '15m', '30m': '30m',
-                '1H': '1H', '2H': '2H', '4H': '4H', '6H': '6H', '12H': '12H',
-                '1D': '1D', '2D': '2D', '3D': '3D', '1W': '1W', '1M': '1M', '3M': '3M'
-            }
-            okx_tf = tf_map.get(timeframe, '1H')
-            
-            # Build request URL
-            url = f"{self.base_url}/api/v5/market/candles"
+        fetched = []
+        reached = last_ts is None
+        for _ in range(MAX_BACKFILL_PAGES):
+            remaining = wanted - len(fetched)
             params = {
-                'instId': symbol,
+                'instId': inst_id,
                 'bar': okx_tf,
-                'limit': min(limit, 1440)  # OKX maksimal limit untuk candles
+                'limit': min(remaining, CANDLES_PAGE_LIMIT) if remaining > 0 else CANDLES_PAGE_LIMIT
             }
+            if after is not None:
+                params['after'] = after
             
-            logger.info(f"Fetching {symbol} {okx_tf} data from OKX ({'authenticated' if self.authenticated else 'public'} API)")
+            page = self._request_candles('/api/v5/market/candles', params)
+            if not page and after is not None:
+                # Recent-candles endpoint exhausted, continue in history endpoint
+                page = self._request_candles('/api/v5/market/history-candles', params)
+            if not page:
+                # OKX has nothing older: whatever lies between is a real exchange gap
+                reached = True
+                break
             
-            # Use authenticated request if available
-            if self.authenticated:
-                response = self._make_authenticated_request('GET', '/api/v5/market/candles', params)
-            else:
-                response = self._make_public_request('GET', '/api/v5/market/candles', params)
-            
-            if response is None:
-                raise Exception("Failed to get response from OKX API")
-                
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data['code'] != '0':
-                logger.error(f"OKX API error: {data.get('msg', 'Unknown error')}")
-                return self._get_fallback_data(symbol, timeframe)
+            fetched.extend(page)
+            oldest = page[-1]['timestamp']
+            if last_ts is not None:
+                if oldest <= last_ts:
+                    reached = True
+                    break
+            elif len(fetched) >= wanted:
+                break
+            after = oldest
+        
+        if fetched and not reached:
+            # Page cap hit before meeting the stored series: merging would leave a hole
+            # that first/last timestamp coverage cannot see, so drop and retry next sync
+            logger.warning(f"{inst_id} {okx_tf} sync stopped at {MAX_BACKFILL_PAGES} pages before "
+                           f"reaching the stored series; discarded {len(fetched)} candles")
+            return 0
+        
+        if fetched:
+            self.candle_store.merge(inst_id, okx_tf, candles_to_records(fetched))
+        return len(fetched)
+    
+    def _backfill_candle_store(self, inst_id: str, okx_tf: str, start_ms: int):
+        """
+        Page backwards through OKX history until the store covers start_ms
+        
+        Pages extend the stored series from its first candle, so stopping at the
+        page cap never leaves a hole; the next call resumes from the new first
+        candle.
+        """
+        first_ts = self.candle_store.first_timestamp(inst_id, okx_tf)
+        fetched = []
+        pages = 0
+        while first_ts is not None and first_ts > start_ms and pages < MAX_BACKFILL_PAGES:
+            params = {
+                'instId': inst_id,
+                'bar': okx_tf,
+                'limit': HISTORY_PAGE_LIMIT,
+                'after': first_ts
+            }
+            page = self._request_candles('/api/v5/market/history-candles', params)
+            if not page:
+                break
+            fetched.extend(page)
+            first_ts = page[-1]['timestamp']
+            pages += 1
+        
+        if pages >= MAX_BACKFILL_PAGES and first_ts > start_ms:
+            logger.warning(f"{inst_id} {okx_tf} backfill stopped at {MAX_BACKFILL_PAGES} pages; "
+                           f"history before {first_ts} is fetched on the next call")
+        
+        if fetched:
+            # Single rewrite for the whole backfill instead of one per page
+            self.candle_store.merge(inst_id, okx_tf, candles_to_records(fetched))
+    
+    def _records_to_candles(self, records) -> List[Dict[str, Any]]:
+        """Stored records (oldest first) to candle dicts, newest first like OKX"""
+        return [
+            {
+                'timestamp': int(r['timestamp']),
+                'open': float(r['open']),
+                'high': float(r['high']),
+                'low': float(r['low']),
+                'close': float(r['close']),
+                'volume': float(r['volume'])
+            }
+            for r in records[::-1]
+        ]
+    
+    def get_historical_data(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Dict[str, Any]:
+        """Get historical candlestick data from OKX (served from local candle store)"""
+        
+        symbol = self._normalize_symbol(symbol)
+        okx_tf = OKX_TIMEFRAMES.get(timeframe, '1H')
+        limit = min(limit, 1440)  # OKX maksimal limit untuk candles
+        
+        try:
+            self._ensure_candles(symbol, okx_tf, limit)
             
-            # Parse candles data
-            candles_raw = data.get('data', [])
-            if not candles_raw:
+            records = self.candle_store.tail(symbol, okx_tf, limit)
+            if not len(records):
                 logger.warning(f"No data received for {symbol}")
                 return self._get_fallback_data(symbol, timeframe)
             
-            # Convert to standard format
-            candles = []
-            for candle in candles_raw:
-                candles.append({
-                    'timestamp': int(candle[0]),
-                    'open': float(candle[1]),
-                    'high': float(candle[2]),
-                    'low': float(candle[3]),
-                    'close': float(candle[4]),
-                    'volume': float(candle[5]) if candle[5] else 0.0
-                })
-            
-            result = {
+            candles = self._records_to_candles(records)
+            return {
                 'symbol': symbol,
                 'timeframe': timeframe,
                 'candles': candles,
@@ -208,22 +395,179 @@ class OKXFetcher:
                 'timestamp': datetime.now().isoformat()
             }
             
-            # Cache the result
-            self.cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
-            
-            logger.info(f"Successfully fetched {len(candles)} candles for {symbol}")
-            return result
-            
         except requests.exceptions.RequestException as e:
             logger.error(f"Network error fetching {symbol}: {e}")
-            return self._get_fallback_data(symbol, timeframe, error=str(e))
+            return self._get_stored_or_fallback(symbol, timeframe, okx_tf, limit, str(e))
             
         except Exception as e:
             logger.error(f"Unexpected error fetching {symbol}: {e}")
-            return self._get_fallback_data(symbol, timeframe, error=str(e))
+            return self._get_stored_or_fallback(symbol, timeframe, okx_tf, limit, str(e))
+    
+    def _ensure_candles(self, inst_id: str, okx_tf: str, limit: int):
+        """Sync the store when it is older than cache_ttl or shallower than `limit`"""
+        sync_key = f"{inst_id}_{okx_tf}"
+        last_sync = self._store_synced_at.get(sync_key, 0)
+        stored = self.candle_store.count(inst_id, okx_tf)
+        # Only try to deepen the store once per requested depth (new listings have short history)
+        needs_depth = stored < limit and self._store_depth.get(sync_key, 0) < limit
+        
+        if (time.time() - last_sync) >= self.cache_ttl or needs_depth:
+            logger.info(f"Syncing {inst_id} {okx_tf} candles from OKX ({'authenticated' if self.authenticated else 'public'} API)")
+            self._sync_candle_store(inst_id, okx_tf, limit)
+            if needs_depth:
+                self._backfill_short_store(inst_id, okx_tf, limit)
+                self._store_depth[sync_key] = limit
+            self._store_synced_at[sync_key] = time.time()
+        else:
+            logger.debug(f"Returning stored candles for {inst_id}")
+    
+    def get_candles(self, symbol: str, timeframe: str = '1H', limit: int = 100,
+                    start_time: Optional[datetime] = None, end_time: Optional[datetime] = None,
+                    copy: bool = True) -> pd.DataFrame:
+        """
+        Get candles as a float64 OHLCV DataFrame indexed by UTC timestamp (oldest first).
+        
+        Args:
+            symbol: Trading pair (BTCUSDT, BTC-USDT, BTC)
+            timeframe: OKX bar size
+            limit: Number of candles
+            start_time: If set, first `limit` candles from start_time (up to end_time)
+            end_time: If set without start_time, last `limit` candles up to end_time
+            copy: False returns the shared cached frame itself; callers must not mutate it
+            
+        Returns:
+            DataFrame with open/high/low/close/volume columns; empty if no data
+        """
+        inst_id = self._normalize_symbol(symbol)
+        okx_tf = OKX_TIMEFRAMES.get(timeframe, '1H')
+        start_ms = int(start_time.timestamp() * 1000) if start_time else None
+        end_ms = int(end_time.timestamp() * 1000) if end_time else None
+        if start_ms is None and end_ms is None:
+            limit = min(limit, 1440)  # OKX maksimal limit untuk candles
+        
+        cache_key = (inst_id, okx_tf, limit, start_ms, end_ms)
+        frame = shared_candle_cache.get(cache_key)
+        
+        if frame is None:
+            try:
+                if start_ms is None and end_ms is None:
+                    self._ensure_candles(inst_id, okx_tf, limit)
+                    records = self.candle_store.tail(inst_id, okx_tf, limit)
+                elif start_time is not None:
+                    records = self.get_candle_range(inst_id, timeframe, start_time, end_time)[:limit]
+                else:
+                    range_start = end_time - timedelta(milliseconds=limit * BAR_MILLISECONDS[okx_tf])
+                    records = self.get_candle_range(inst_id, timeframe, range_start, end_time)[-limit:]
+            except Exception as e:
+                logger.error(f"Error fetching candles for {inst_id}: {e}")
+                records = self.candle_store.tail(inst_id, okx_tf, limit) if start_ms is None and end_ms is None else []
+            
+            frame = records_to_frame(records) if len(records) else pd.DataFrame(
+                columns=CANDLE_COLUMNS, index=pd.DatetimeIndex([], name='timestamp', tz='UTC'), dtype=np.float64
+            )
+            if not frame.empty:
+                shared_candle_cache.put(cache_key, frame)
+        
+        return frame.copy() if copy else frame
+    
+    def _backfill_short_store(self, inst_id: str, okx_tf: str, limit: int):
+        """Extend a store that holds fewer than `limit` candles further into the past"""
+        stored = self.candle_store.count(inst_id, okx_tf)
+        first_ts = self.candle_store.first_timestamp(inst_id, okx_tf)
+        if first_ts is None or stored >= limit:
+            return
+        start_ms = first_ts - (limit - stored) * BAR_MILLISECONDS[okx_tf]
+        self._backfill_candle_store(inst_id, okx_tf, start_ms)
+    
+    def _get_stored_or_fallback(self, symbol: str, timeframe: str, okx_tf: str,
+                                limit: int, error: str) -> Dict[str, Any]:
+        """Serve last known candles from the store when OKX is unreachable"""
+        records = self.candle_store.tail(symbol, okx_tf, limit)
+        if not len(records):
+            return self._get_fallback_data(symbol, timeframe, error=error)
+        
+        candles = self._records_to_candles(records)
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'candles': candles,
+            'count': len(candles),
+            'status': 'stale',
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def get_candle_range(self, symbol: str, timeframe: str, start_time: datetime,
+                         end_time: Optional[datetime] = None):
+        """
+        Candle records (CANDLE_DTYPE, oldest first) between start_time and end_time.
+        
+        Missing history is fetched once and persisted, so repeated backtests over
+        the same range are served entirely from disk.
+        """
+        symbol = self._normalize_symbol(symbol)
+        okx_tf = OKX_TIMEFRAMES.get(timeframe, '1H')
+        start_ms = int(start_time.timestamp() * 1000)
+        end_ms = int(end_time.timestamp() * 1000) if end_time else None
+        
+        try:
+            last_ts = self.candle_store.last_timestamp(symbol, okx_tf)
+            if last_ts is None or end_ms is None or last_ts < end_ms:
+                span = (end_ms or int(time.time() * 1000)) - start_ms
+                self._sync_candle_store(symbol, okx_tf, max(1, int(span // BAR_MILLISECONDS[okx_tf]) + 1))
+            self._backfill_candle_store(symbol, okx_tf, start_ms)
+        except Exception as e:
+            logger.error(f"Error syncing candle range for {symbol}: {e}")
+        
+        return self.candle_store.read_range(symbol, okx_tf, start_ms, end_ms)
+    
+    def get_candle_window(self, symbol: str, timeframe: str, start_ms: int, end_ms: int):
+        """
+        Candle records for a short window (e.g. the 1m candles inside one bar).
+        
+        Unlike get_candle_range this never syncs or backfills the whole series:
+        when the local store does not cover the window, only the pages for that
+        window are requested from the history endpoint. They are kept in the
+        separate window store - merged into the main store they would leave holes
+        that first/last timestamp based sync and backfill take as covered.
+        """
+        symbol = self._normalize_symbol(symbol)
+        okx_tf = OKX_TIMEFRAMES.get(timeframe, '1H')
+        bar_ms = BAR_MILLISECONDS[okx_tf]
+        expected = int((end_ms - start_ms) // bar_ms) + 1
+        
+        stored = self.candle_store.read_range(symbol, okx_tf, start_ms, end_ms)
+        if len(stored) >= expected:
+            return stored
+        cached = self.window_store.read_range(symbol, okx_tf, start_ms, end_ms)
+        if len(cached) >= expected:
+            return cached
+        
+        try:
+            fetched = []
+            after = end_ms + 1
+            for _ in range(min(MAX_BACKFILL_PAGES, -(-expected // HISTORY_PAGE_LIMIT))):
+                params = {
+                    'instId': symbol,
+                    'bar': okx_tf,
+                    'limit': HISTORY_PAGE_LIMIT,
+                    'after': after
+                }
+                page = self._request_candles('/api/v5/market/history-candles', params)
+                if not page:
+                    break
+                fetched.extend(page)
+                after = page[-1]['timestamp']
+                if after <= start_ms:
+                    break
+            
+            if fetched:
+                self.window_store.merge(symbol, okx_tf, candles_to_records(fetched))
+        except Exception as e:
+            logger.error(f"Error fetching candle window for {symbol}: {e}")
+        
+        cached = self.window_store.read_range(symbol, okx_tf, start_ms, end_ms)
+        return cached if len(cached) >= len(stored) else stored
     
     def _get_fallback_data(self, symbol: str, timeframe: str, error: str = "") -> Dict[str, Any]:
         """Generate fallback data when API fails"""
@@ -259,13 +603,9 @@ class OKXFetcher:
     def get_ticker_data(self, symbol: str) -> Dict[str, Any]:
         """Get real-time ticker data from OKX"""
         try:
-            self._rate_limit()
+            self._rate_limit('/api/v5/market/ticker')
             
-            # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
+            symbol = self._normalize_symbol(symbol)
             
             params = {'instId': symbol}
             
@@ -300,13 +640,9 @@ class OKXFetcher:
     def get_order_book(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
         """Get order book data from OKX"""
         try:
-            self._rate_limit()
+            self._rate_limit('/api/v5/market/books')
             
-            # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
+            symbol = self._normalize_symbol(symbol)
             
             params = {'instId': symbol, 'sz': min(depth, 400)}
             
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from core.okx_fetcher import OKXFetcher
+from core.okx_async_client import get_okx_client
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +19,27 @@ class OKXMaximizer:
     
     def __init__(self):
         self.okx_fetcher = OKXFetcher()
+        self.client = get_okx_client()
         logger.info("🚀 OKX Maximizer initialized")
     
     def get_funding_rate_trends(self, symbol: str, limit: int = 50) -> Dict[str, Any]:
         """
         📈 Analisis trend funding rate untuk prediksi sentiment
         """
+        funding_data = self.client.request_sync('/api/v5/public/funding-rate', {'instId': symbol})
+        return self._build_funding_analysis(symbol, funding_data)
+    
+    def _build_funding_analysis(self, symbol: str, funding_data: Optional[List[Dict]]) -> Dict[str, Any]:
+        """Funding analysis dari raw OKX /public/funding-rate payload"""
         try:
             # Get funding rate history
             funding_history = []
-            current_funding = self.okx_fetcher.get_funding_rate(symbol)
+            current_funding = None
+            if funding_data:
+                current_funding = {
+                    'funding_rate': float(funding_data[0].get('fundingRate', 0) or 0),
+                    'next_funding_time': funding_data[0].get('nextFundingTime')
+                }
             
             if current_funding:
                 funding_history.append({
@@ -86,25 +98,23 @@ class OKXMaximizer:
         """
         ⚡ Analisis risiko berdasarkan price limits
         """
+        raw = self.client.fetch_many({
+            'ticker': ('/api/v5/market/ticker', {'instId': symbol}),
+            'price_limit': ('/api/v5/public/price-limit', {'instId': symbol})
+        })
+        return self._build_price_risk_analysis(symbol, raw['ticker'], raw['price_limit'])
+    
+    def _build_price_risk_analysis(self, symbol: str, ticker_data: Optional[List[Dict]],
+                                   price_limit_data: Optional[List[Dict]]) -> Dict[str, Any]:
+        """Price risk analysis dari raw ticker dan price-limit payload"""
         try:
-            # Get current price and limits
-            ticker = self.okx_fetcher.get_ticker(symbol)
-            
-            if not ticker:
+            if not ticker_data:
                 return {'error': 'Failed to get ticker data'}
             
-            current_price = float(ticker.get('last', 0))
-            
-            # Get price limits (menggunakan request langsung karena method belum ada)
-            import requests
-            url = f"{self.okx_fetcher.base_url}/api/v5/public/price-limit"
-            params = {'instId': symbol}
-            
-            response = requests.get(url, params=params, timeout=10)
-            price_limit_data = response.json()
+            current_price = float(ticker_data[0].get('last', 0))
             
-            if price_limit_data.get('code') == '0' and price_limit_data.get('data'):
-                limit_data = price_limit_data['data'][0]
+            if price_limit_data:
+                limit_data = price_limit_data[0]
                 buy_limit = float(limit_data.get('buyLmt', 0))
                 sell_limit = float(limit_data.get('sellLmt', 0))
             else:
@@ -158,8 +168,13 @@ class OKXMaximizer:
         """
         📊 Analisis kedalaman market dari orderbook
         """
+        books_data = self.client.request_sync('/api/v5/market/books', {'instId': symbol, 'sz': str(depth)})
+        return self._build_depth_analysis(symbol, books_data, depth)
+    
+    def _build_depth_analysis(self, symbol: str, books_data: Optional[List[Dict]], depth: int = 20) -> Dict[str, Any]:
+        """Market depth analysis dari raw /market/books payload"""
         try:
-            orderbook = self.okx_fetcher.get_orderbook(symbol, depth)
+            orderbook = books_data[0] if books_data else None
             
             if not orderbook or not orderbook.get('bids') or not orderbook.get('asks'):
                 return {'error': 'Failed to get orderbook data'}
@@ -262,8 +277,20 @@ class OKXMaximizer:
             'components': {}
         }
         
+        # Semua sub-request dikirim paralel dalam satu batch
+        is_derivative = 'SWAP' in symbol or 'FUTURES' in symbol
+        requests = {
+            'ticker': ('/api/v5/market/ticker', {'instId': symbol}),
+            'funding_rate': ('/api/v5/public/funding-rate', {'instId': symbol}),
+            'price_limit': ('/api/v5/public/price-limit', {'instId': symbol}),
+            'books': ('/api/v5/market/books', {'instId': symbol, 'sz': '20'})
+        }
+        if is_derivative:
+            requests['open_interest'] = ('/api/v5/public/open-interest', {'instId': symbol})
+        raw = self.client.fetch_many(requests)
+        
         # 1. Basic market data
-        ticker = self.okx_fetcher.get_ticker(symbol)
+        ticker = raw['ticker'][0] if raw['ticker'] else None
         if ticker:
             analysis['components']['market_data'] = {
                 'price': float(ticker.get('last', 0)),
@@ -274,22 +301,23 @@ class OKXMaximizer:
             }
         
         # 2. Funding rate analysis
-        analysis['components']['funding_analysis'] = self.get_funding_rate_trends(symbol)
+        analysis['components']['funding_analysis'] = self._build_funding_analysis(symbol, raw['funding_rate'])
         
         # 3. Price risk analysis
-        analysis['components']['risk_analysis'] = self.get_price_risk_analysis(symbol)
+        analysis['components']['risk_analysis'] = self._build_price_risk_analysis(
+            symbol, raw['ticker'], raw['price_limit']
+        )
         
         # 4. Market depth analysis
-        analysis['components']['depth_analysis'] = self.get_market_depth_analysis(symbol)
+        analysis['components']['depth_analysis'] = self._build_depth_analysis(symbol, raw['books'])
         
         # 5. Open interest (jika futures/swap)
-        if 'SWAP' in symbol or 'FUTURES' in symbol:
-            oi = self.okx_fetcher.get_open_interest(symbol)
-            if oi:
-                analysis['components']['open_interest'] = {
-                    'open_interest': oi['open_interest'],
-                    'open_interest_ccy': oi['open_interest_ccy']
-                }
+        if is_derivative and raw.get('open_interest'):
+            oi = raw['open_interest'][0]
+            analysis['components']['open_interest'] = {
+                'open_interest': float(oi.get('oi', 0)),
+                'open_interest_ccy': float(oi.get('oiCcy', 0))
+            }
         
         # 6. Overall assessment
         analysis['overall_assessment'] = self._generate_overall_assessment(analysis['components'])
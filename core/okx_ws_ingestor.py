@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+OKX WebSocket Ingestor - Push-based market data untuk menggantikan REST polling
+Multiplex semua symbol lewat satu koneksi per endpoint OKX (public/business),
+menyimpan candle live dalam ring buffer per symbol/timeframe dan meneruskan
+event ke subscriber (SocketIO, signal engines).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from core.candle_store import CANDLE_DTYPE, CandleStore
+from core.okx_fetcher import BAR_MILLISECONDS, records_to_frame
+
+logger = logging.getLogger(__name__)
+
+OKX_WS_PUBLIC_URL = "wss://ws.okx.com:8443/ws/v5/public"
+OKX_WS_BUSINESS_URL = "wss://ws.okx.com:8443/ws/v5/business"  # candle channels live here
+
+DEFAULT_CHANNELS = ('tickers', 'candle', 'books5', 'funding-rate', 'liquidation-orders')
+EVENTS = ('ticker', 'candle', 'candle_close', 'books', 'funding', 'liquidation')
+
+
+class CandleRingBuffer:
+    """Fixed-capacity candle buffer; live candle di-update in place"""
+
+    def __init__(self, capacity: int = 1440):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=CANDLE_DTYPE)
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _last_index(self) -> int:
+        return (self._start + self._size - 1) % self.capacity
+
+    def last_timestamp(self) -> Optional[int]:
+        with self._lock:
+            return int(self._data['timestamp'][self._last_index()]) if self._size else None
+
+    def update(self, record) -> bool:
+        """
+        Insert or update a candle.
+
+        Returns:
+            True if the record opened a new bar, False if it updated the live bar
+            or was older than the buffer head (ignored).
+        """
+        with self._lock:
+            ts = int(record['timestamp'])
+            if self._size:
+                last = self._last_index()
+                last_ts = int(self._data['timestamp'][last])
+                if ts == last_ts:
+                    self._data[last] = record
+                    return False
+                if ts < last_ts:
+                    return False
+
+            if self._size < self.capacity:
+                self._data[(self._start + self._size) % self.capacity] = record
+                self._size += 1
+            else:
+                self._data[self._start] = record
+                self._start = (self._start + 1) % self.capacity
+            return True
+
+    def extend(self, records: np.ndarray):
+        for record in records:
+            self.update(record)
+
+    def to_records(self, limit: Optional[int] = None) -> np.ndarray:
+        """Ordered copy of buffered candles, oldest first"""
+        with self._lock:
+            count = self._size if limit is None else min(limit, self._size)
+            first = (self._start + self._size - count) % self.capacity
+            idx = (first + np.arange(count)) % self.capacity
+            return self._data[idx]
+
+    def to_frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        return records_to_frame(self.to_records(limit))
+
+
+def _swap_inst_id(symbol: str) -> str:
+    return symbol if symbol.endswith('-SWAP') else f"{symbol}-SWAP"
+
+
+class OKXWebSocketIngestor:
+    """
+    OKX public WebSocket ingestion service.
+
+    Satu koneksi per endpoint (public untuk tickers/books5/funding/liquidation,
+    business untuk candles) membawa semua symbol. Jika business_url sama dengan
+    public_url, semua channel berjalan di satu koneksi (mis. stand-in server lokal).
+    """
+
+    def __init__(self, symbols: Sequence[str], timeframes: Sequence[str] = ('1m', '15m', '1H', '4H'),
+                 channels: Sequence[str] = DEFAULT_CHANNELS, public_url: str = OKX_WS_PUBLIC_URL,
+                 business_url: Optional[str] = OKX_WS_BUSINESS_URL, buffer_size: int = 1440,
+                 candle_store: Optional[CandleStore] = None, ping_interval: float = 25,
+                 max_backoff: float = 30):
+        self.symbols = [s.upper() for s in symbols]
+        self.timeframes = list(timeframes)
+        self.channels = set(channels)
+        self.public_url = public_url
+        self.business_url = business_url or public_url
+        self.buffer_size = buffer_size
+        self.candle_store = candle_store
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+
+        self.buffers: Dict[tuple, CandleRingBuffer] = {}
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.order_books: Dict[str, Dict[str, Any]] = {}
+        self.funding_rates: Dict[str, Dict[str, Any]] = {}
+        self.liquidations = deque(maxlen=500)
+        self._listeners: Dict[str, List[Callable]] = defaultdict(list)
+        self._closed_bars: Dict[tuple, int] = {}
+        # (symbol, timeframe) whose store is behind the feed; REST sync has to fill it first
+        self._store_gaps = set()
+
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+        self.is_running = False
+        self.stats = {
+            'messages': 0,
+            'reconnects': 0,
+            'errors': 0,
+            'connected': {},
+            'last_message_at': None
+        }
+
+        for symbol in self.symbols:
+            for timeframe in self.timeframes:
+                self.buffers[(symbol, timeframe)] = self._seed_buffer(symbol, timeframe)
+
+    def _seed_buffer(self, symbol: str, timeframe: str) -> CandleRingBuffer:
+        """Prefill ring buffer from the local candle store so engines have history immediately"""
+        buffer = CandleRingBuffer(self.buffer_size)
+        if self.candle_store is not None:
+            try:
+                buffer.extend(self.candle_store.tail(symbol, timeframe, self.buffer_size))
+            except Exception as e:
+                logger.warning(f"Could not seed {symbol} {timeframe} buffer: {e}")
+        return buffer
+
+    # ===== SUBSCRIBERS =====
+
+    def on(self, event: str, callback: Callable):
+        """Register callback(symbol, payload) untuk event di EVENTS"""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event '{event}', expected one of {EVENTS}")
+        self._listeners[event].append(callback)
+
+    def _emit(self, event: str, symbol: str, payload: Any):
+        for callback in self._listeners.get(event, []):
+            try:
+                callback(symbol, payload)
+            except Exception as e:
+                logger.error(f"Listener error on {event} for {symbol}: {e}")
+
+    # ===== SUBSCRIPTION ARGS =====
+
+    def _subscription_args(self) -> Dict[str, List[Dict[str, str]]]:
+        """Group OKX subscribe args by connection URL"""
+        groups: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+        for symbol in self.symbols:
+            if 'tickers' in self.channels:
+                groups[self.public_url].append({'channel': 'tickers', 'instId': symbol})
+            if 'books5' in self.channels:
+                groups[self.public_url].append({'channel': 'books5', 'instId': symbol})
+            if 'funding-rate' in self.channels:
+                groups[self.public_url].append({'channel': 'funding-rate', 'instId': _swap_inst_id(symbol)})
+            if 'candle' in self.channels:
+                for timeframe in self.timeframes:
+                    groups[self.business_url].append({'channel': f'candle{timeframe}', 'instId': symbol})
+        if 'liquidation-orders' in self.channels:
+            groups[self.public_url].append({'channel': 'liquidation-orders', 'instType': 'SWAP'})
+        return dict(groups)
+
+    # ===== MESSAGE HANDLING =====
+
+    def handle_message(self, raw: str):
+        """Parse and dispatch one WebSocket text frame"""
+        if raw == 'pong':
+            return
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.debug(f"Ignoring non-JSON frame: {raw[:80]}")
+            return
+
+        if 'event' in message:
+            if message['event'] == 'error':
+                self.stats['errors'] += 1
+                logger.error(f"OKX WS error: {message.get('msg')} ({message.get('code')})")
+            return
+
+        arg = message.get('arg', {})
+        channel = arg.get('channel', '')
+        data = message.get('data') or []
+        self.stats['messages'] += 1
+        self.stats['last_message_at'] = time.time()
+
+        if channel == 'tickers':
+            for ticker in data:
+                self._on_ticker(ticker)
+        elif channel.startswith('candle'):
+            timeframe = channel[len('candle'):]
+            for candle in data:
+                self._on_candle(arg.get('instId', '').upper(), timeframe, candle)
+        elif channel == 'books5':
+            for book in data:
+                self._on_books(arg.get('instId', '').upper(), book)
+        elif channel == 'funding-rate':
+            for funding in data:
+                self._on_funding(funding)
+        elif channel == 'liquidation-orders':
+            for liquidation in data:
+                self._on_liquidation(liquidation)
+
+    def _on_ticker(self, ticker: Dict[str, Any]):
+        symbol = ticker.get('instId', '').upper()
+        last = float(ticker.get('last', 0) or 0)
+        open_24h = float(ticker.get('open24h', 0) or 0)
+        parsed = {
+            'symbol': symbol,
+            'last_price': last,
+            'bid_price': float(ticker.get('bidPx') or last),
+            'ask_price': float(ticker.get('askPx') or last),
+            'open_24h': open_24h,
+            'high_24h': float(ticker.get('high24h', 0) or 0),
+            'low_24h': float(ticker.get('low24h', 0) or 0),
+            'volume_24h': float(ticker.get('vol24h', 0) or 0),
+            'volume_ccy_24h': float(ticker.get('volCcy24h', 0) or 0),
+            'change_24h': ((last - open_24h) / open_24h * 100) if open_24h > 0 else 0.0,
+            'timestamp': int(ticker.get('ts', 0) or 0)
+        }
+        self.tickers[symbol] = parsed
+        self._emit('ticker', symbol, parsed)
+
+    def _on_candle(self, symbol: str, timeframe: str, candle: List[str]):
+        key = (symbol, timeframe)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = CandleRingBuffer(self.buffer_size)
+
+        record = np.array(
+            (int(candle[0]), float(candle[1]), float(candle[2]), float(candle[3]),
+             float(candle[4]), float(candle[5] or 0)),
+            dtype=CANDLE_DTYPE
+        )
+        previous_ts = buffer.last_timestamp()
+        opened_new_bar = buffer.update(record)
+        self._emit('candle', symbol, {'timeframe': timeframe, 'candle': record})
+
+        # Bar closes when OKX marks it confirmed, or implicitly when the next bar opens
+        confirmed = len(candle) > 8 and candle[8] == '1'
+        if confirmed:
+            self._close_bar(key, record)
+        elif opened_new_bar and previous_ts is not None and self._closed_bars.get(key) != previous_ts:
+            closed = buffer.to_records(2)
+            if len(closed) == 2 and int(closed[0]['timestamp']) == previous_ts:
+                self._close_bar(key, closed[0])
+
+    def _close_bar(self, key: tuple, record):
+        ts = int(record['timestamp'])
+        if self._closed_bars.get(key) == ts:
+            return
+        self._closed_bars[key] = ts
+        symbol, timeframe = key
+
+        if self.candle_store is not None:
+            try:
+                self._persist_closed_bar(key, record)
+            except Exception as e:
+                logger.error(f"Failed to persist closed candle {symbol} {timeframe}: {e}")
+
+        self._emit('candle_close', symbol, {'timeframe': timeframe, 'candle': record})
+
+    def _persist_closed_bar(self, key: tuple, record):
+        """
+        Append a closed bar only when it continues the stored series. After a
+        disconnect the missed bars are not in the store; appending would leave a
+        hole that first/last timestamp coverage treats as filled, so the bar is
+        skipped and the next REST sync fetches everything since the last candle.
+        """
+        symbol, timeframe = key
+        ts = int(record['timestamp'])
+        last_ts = self.candle_store.last_timestamp(symbol, timeframe)
+        bar_ms = BAR_MILLISECONDS.get(timeframe)
+        if last_ts is not None and bar_ms and ts - last_ts > bar_ms:
+            if key not in self._store_gaps:
+                self._store_gaps.add(key)
+                logger.info(f"{symbol} {timeframe} store ends at {last_ts}, feed at {ts}; "
+                            f"leaving the gap to REST sync")
+            return
+        self._store_gaps.discard(key)
+        self.candle_store.merge(symbol, timeframe, np.atleast_1d(np.asarray(record, dtype=CANDLE_DTYPE)))
+
+    def _on_books(self, symbol: str, book: Dict[str, Any]):
+        parsed = {
+            'symbol': symbol,
+            'bids': [[float(b[0]), float(b[1])] for b in book.get('bids', [])],
+            'asks': [[float(a[0]), float(a[1])] for a in book.get('asks', [])],
+            'timestamp': int(book.get('ts', 0) or 0)
+        }
+        self.order_books[symbol] = parsed
+        self._emit('books', symbol, parsed)
+
+    def _on_funding(self, funding: Dict[str, Any]):
+        inst_id = funding.get('instId', '').upper()
+        symbol = inst_id[:-len('-SWAP')] if inst_id.endswith('-SWAP') else inst_id
+        parsed = {
+            'symbol': symbol,
+            'funding_rate': float(funding.get('fundingRate', 0) or 0),
+            'next_funding_rate': float(funding.get('nextFundingRate', 0) or 0),
+            'funding_time': funding.get('fundingTime'),
+            'next_funding_time': funding.get('nextFundingTime')
+        }
+        self.funding_rates[symbol] = parsed
+        self._emit('funding', symbol, parsed)
+
+    def _on_liquidation(self, liquidation: Dict[str, Any]):
+        inst_id = liquidation.get('instId', '').upper()
+        for detail in liquidation.get('details', []):
+            parsed = {
+                'inst_id': inst_id,
+                'side': detail.get('side'),
+                'pos_side': detail.get('posSide'),
+                'size': float(detail.get('sz', 0) or 0),
+                'bankruptcy_price': float(detail.get('bkPx', 0) or 0),
+                'timestamp': int(detail.get('ts', 0) or 0)
+            }
+            self.liquidations.append(parsed)
+            self._emit('liquidation', inst_id, parsed)
+
+    # ===== ACCESSORS =====
+
+    def get_candles(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> pd.DataFrame:
+        buffer = self.buffers.get((symbol.upper(), timeframe))
+        if buffer is None:
+            return records_to_frame(np.empty(0, dtype=CANDLE_DTYPE))
+        return buffer.to_frame(limit)
+
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.tickers.get(symbol.upper())
+
+    def get_order_book(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.order_books.get(symbol.upper())
+
+    def get_funding_rate(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.funding_rates.get(symbol.upper())
+
+    def get_recent_liquidations(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return list(self.liquidations)[-limit:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'is_running': self.is_running,
+            'symbols': len(self.symbols),
+            'buffers': {f"{s}_{tf}": len(b) for (s, tf), b in self.buffers.items()}
+        }
+
+    # ===== CONNECTION LIFECYCLE =====
+
+    def start(self):
+        """Start ingestion on a background event loop thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="okx-ws-ingestor", daemon=True)
+        self._thread.start()
+        logger.info(f"OKX WebSocket ingestion started for {len(self.symbols)} symbols")
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._tasks = [
+            self._loop.create_task(self._run_connection(url, args))
+            for url, args in self._subscription_args().items()
+        ]
+        try:
+            self._loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    def stop(self, timeout: float = 5):
+        """Stop ingestion and close connections"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._loop is not None and not self._loop.is_closed():
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info("OKX WebSocket ingestion stopped")
+
+    async def _run_connection(self, url: str, args: List[Dict[str, str]]):
+        """Keep one multiplexed connection alive with exponential backoff reconnects"""
+        backoff = 1.0
+        async with aiohttp.ClientSession() as session:
+            while self.is_running:
+                try:
+                    async with session.ws_connect(url, heartbeat=None, autoping=True) as ws:
+                        await ws.send_str(json.dumps({'op': 'subscribe', 'args': args}))
+                        self.stats['connected'][url] = True
+                        backoff = 1.0
+                        await self._read_loop(ws)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.warning(f"OKX WS connection to {url} failed: {e}")
+
+                self.stats['connected'][url] = False
+                if not self.is_running:
+                    break
+                self.stats['reconnects'] += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _read_loop(self, ws):
+        while self.is_running:
+            try:
+                msg = await ws.receive(timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                # OKX drops idle connections after 30s; keepalive with text ping
+                await ws.send_str('ping')
+                continue
+
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self.handle_message(msg.data)
+            elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                break
+
+
+# Export
+__all__ = ['OKXWebSocketIngestor', 'CandleRingBuffer', 'OKX_WS_PUBLIC_URL', 'OKX_WS_BUSINESS_URL']
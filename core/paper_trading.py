@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Paper Trading Engine - Persistent sessions, candle-close driven
+Session, trade dan state indikator per feed (symbol/timeframe) disimpan di
+SQLite (WAL), sehingga sesi bertahan saat gunicorn worker restart dan bisa
+dibaca semua worker. Setiap candle close meng-update state strategy feed
+sekali (O(1), tanpa refetch DataFrame) lalu semua sesi aktif di feed itu
+dievaluasi dalam satu transaksi.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.streaming_indicators import NAN, RollingWindow, StreamingBollinger, candle_tuple, iter_candles
+from core.walk_forward import STEP_STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the balance committed per paper position (same as the old in-memory sessions)
+POSITION_FRACTION = 0.95
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paper_sessions (
+    session_id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    status TEXT NOT NULL,
+    balance REAL NOT NULL,
+    initial_balance REAL NOT NULL,
+    position REAL NOT NULL DEFAULT 0,
+    entry_price REAL NOT NULL DEFAULT 0,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT NOT NULL,
+    last_update TEXT NOT NULL,
+    last_candle_ts INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_paper_sessions_feed ON paper_sessions (symbol, timeframe, status);
+CREATE TABLE IF NOT EXISTS paper_trades (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    balance_after REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS paper_feeds (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    last_timestamp INTEGER,
+    state_json TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe)
+);
+"""
+
+
+class StreamingEWM:
+    """ewm(span, adjust=True).mean() sebagai rasio dua jumlah rekursif"""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def push(self, x: float) -> float:
+        self.num = self.num * self.decay + x
+        self.den = self.den * self.decay + 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.num / self.den if self.den else NAN
+
+    def get_state(self) -> Dict[str, float]:
+        return {'num': self.num, 'den': self.den}
+
+    def set_state(self, state: Dict[str, float]):
+        self.num, self.den = state['num'], state['den']
+
+
+class StrategyStream:
+    """
+    O(1) per closed candle equivalent of walk_forward.StrategyFeatures
+
+    Definisi indikator sama dengan FeatureFrame default yang dipakai strategy
+    BacktestingEngine: RSI rata-rata sederhana (14), MACD ewm adjust=True
+    (12/26/9), SMA 20/50 dan Bollinger (20, 2).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_timestamp: Optional[int] = None
+        self.prev_close = NAN
+        self.gains = RollingWindow(14)
+        self.losses = RollingWindow(14)
+        self.ema_fast = StreamingEWM(12)
+        self.ema_slow = StreamingEWM(26)
+        self.ema_signal = StreamingEWM(9)
+        self.bollinger = StreamingBollinger(20, 2.0)
+        self.sma50 = RollingWindow(50)
+        self.current: Dict[str, float] = {}
+        self.previous: Dict[str, float] = {}
+
+    def _rsi(self) -> float:
+        count = len(self.losses.values)
+        if count < self.losses.size:
+            return NAN
+        avg_gain = self.gains.mean(count, self.gains.s1)
+        avg_loss = self.losses.mean(count, self.losses.s1)
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else NAN
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def update(self, candle) -> bool:
+        """Commit a closed candle; returns False for stale/duplicate timestamps"""
+        timestamp, close = candle[0], candle[4]
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        # The first bar counts as a zero gain/loss, like diff().where(..., 0.0)
+        delta = close - self.prev_close if self.count else 0.0
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        signal = self.ema_signal.push(macd)
+        self.bollinger.update(candle)
+        self.sma50.push(close)
+        bands = self.bollinger.value
+
+        self.previous = self.current
+        self.current = {
+            'close': close,
+            'rsi': self._rsi(),
+            'macd': macd,
+            'macd_signal': signal,
+            'sma20': bands['middle'],
+            'sma50': self.sma50.mean(len(self.sma50.values), self.sma50.s1)
+            if len(self.sma50.values) == self.sma50.size else NAN,
+            'upper_band': bands['upper'],
+            'lower_band': bands['lower'],
+        }
+        self.prev_close = close
+        self.last_timestamp = timestamp
+        self.count += 1
+        return True
+
+    def bar(self) -> 'StreamBar':
+        return StreamBar(self)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'last_timestamp': self.last_timestamp,
+            'prev_close': self.prev_close,
+            'gains': self.gains.get_state(),
+            'losses': self.losses.get_state(),
+            'ema_fast': self.ema_fast.get_state(),
+            'ema_slow': self.ema_slow.get_state(),
+            'ema_signal': self.ema_signal.get_state(),
+            'bollinger': self.bollinger.get_state(),
+            'sma50': self.sma50.get_state(),
+            'current': self.current,
+            'previous': self.previous,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StrategyStream':
+        stream = cls()
+        stream.count = state['count']
+        stream.last_timestamp = state['last_timestamp']
+        stream.prev_close = state['prev_close']
+        for name in ('gains', 'losses', 'ema_fast', 'ema_slow', 'ema_signal', 'bollinger', 'sma50'):
+            getattr(stream, name).set_state(state[name])
+        stream.current = state['current']
+        stream.previous = state['previous']
+        return stream
+
+
+class StreamBar:
+    """BarView-compatible view of the latest closed candle of a StrategyStream"""
+    __slots__ = ('stream',)
+
+    def __init__(self, stream: StrategyStream):
+        self.stream = stream
+
+    def __getitem__(self, name: str) -> float:
+        return self.stream.current[name]
+
+    def prev(self, name: str, bars: int = 1) -> float:
+        if bars != 1:
+            raise ValueError("StreamBar keeps only the previous bar")
+        return self.stream.previous.get(name, NAN)
+
+    def __len__(self) -> int:
+        return self.stream.count
+
+
+def apply_paper_signal(session: Dict[str, Any], action: str, price: float,
+                       timestamp: str) -> Optional[Dict[str, Any]]:
+    """
+    Apply BUY/SELL to a paper session (close the opposite side, flip).
+
+    Mutates balance/position/entry_price; returns the trade record or None
+    when the signal does not change the position.
+    """
+    if action == 'BUY' and session['position'] <= 0:
+        if session['position'] < 0:
+            session['balance'] += abs(session['position']) * (session['entry_price'] - price)
+        quantity = session['balance'] * POSITION_FRACTION / price
+        session['position'] = quantity
+    elif action == 'SELL' and session['position'] >= 0:
+        if session['position'] > 0:
+            session['balance'] += session['position'] * (price - session['entry_price'])
+        quantity = session['balance'] * POSITION_FRACTION / price
+        session['position'] = -quantity
+    else:
+        return None
+
+    session['entry_price'] = price
+    return {
+        'action': action,
+        'price': price,
+        'quantity': quantity,
+        'timestamp': timestamp,
+        'balance_after': session['balance']
+    }
+
+
+class PaperTradingEngine:
+    """
+    Paper trading sessions yang di-drive oleh candle close dari shared feed
+
+    Pakai attach(ingestor) untuk OKXWebSocketIngestor, atau panggil
+    on_candle_close() langsung. Semua worker yang membuka database yang
+    sama melihat sesi yang sama; transaksi BEGIN IMMEDIATE + last_timestamp
+    per feed menjamin setiap candle hanya diproses sekali.
+    """
+
+    def __init__(self, db_path: str = "logs/paper_trading.db", candle_store=None, warmup_bars: int = 200):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.candle_store = candle_store
+        self.warmup_bars = warmup_bars
+        self._feeds: Dict[tuple, StrategyStream] = {}
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None,
+                                     timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    # ===== FEEDS =====
+
+    def _load_feed(self, conn, symbol: str, timeframe: str) -> Optional[StrategyStream]:
+        """Feed state as committed in the database (worker cache reused when current)"""
+        row = conn.execute("SELECT last_timestamp FROM paper_feeds WHERE symbol = ? AND timeframe = ?",
+                           (symbol, timeframe)).fetchone()
+        if row is None:
+            return None
+        cached = self._feeds.get((symbol, timeframe))
+        if cached is not None and cached.last_timestamp == row['last_timestamp']:
+            return cached
+        state = conn.execute("SELECT state_json FROM paper_feeds WHERE symbol = ? AND timeframe = ?",
+                             (symbol, timeframe)).fetchone()['state_json']
+        stream = StrategyStream.from_state(json.loads(state))
+        self._feeds[(symbol, timeframe)] = stream
+        return stream
+
+    def _save_feed(self, conn, symbol: str, timeframe: str, stream: StrategyStream):
+        conn.execute(
+            "INSERT OR REPLACE INTO paper_feeds (symbol, timeframe, last_timestamp, state_json) VALUES (?, ?, ?, ?)",
+            (symbol, timeframe, stream.last_timestamp, json.dumps(stream.to_state()))
+        )
+        self._feeds[(symbol, timeframe)] = stream
+
+    def _warm_up(self, symbol: str, timeframe: str) -> StrategyStream:
+        stream = StrategyStream()
+        if self.candle_store is None:
+            return stream
+        try:
+            candles = list(iter_candles(self.candle_store.tail(symbol, timeframe, self.warmup_bars + 1)))
+            # The newest stored candle may still be forming
+            for candle in candles[:-1]:
+                stream.update(candle)
+        except Exception as e:
+            logger.warning(f"Paper feed warm-up failed for {symbol} {timeframe}: {e}")
+        return stream
+
+    def feed_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT last_timestamp FROM paper_feeds WHERE symbol = ? AND timeframe = ?",
+                                     (symbol, timeframe)).fetchone()
+        return row['last_timestamp'] if row is not None else None
+
+    # ===== SESSIONS =====
+
+    def start_session(self, symbol: str, strategy: str, initial_balance: float = 10000,
+                      timeframe: str = '1H') -> Dict[str, Any]:
+        if strategy not in STEP_STRATEGIES:
+            raise ValueError(f"Paper trading supports {list(STEP_STRATEGIES)}; got {strategy}")
+
+        session_id = str(uuid.uuid4())[:8]
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            stream = self._load_feed(conn, symbol, timeframe)
+            if stream is None:
+                stream = self._warm_up(symbol, timeframe)
+                self._save_feed(conn, symbol, timeframe, stream)
+            conn.execute(
+                "INSERT INTO paper_sessions (session_id, symbol, timeframe, strategy, status, balance, "
+                "initial_balance, start_time, last_update, last_candle_ts) VALUES (?, ?, ?, ?, 'ACTIVE', ?, ?, ?, ?, ?)",
+                (session_id, symbol, timeframe, strategy, initial_balance, initial_balance, now, now,
+                 stream.last_timestamp)
+            )
+        return {'session_id': session_id, 'symbol': symbol, 'timeframe': timeframe, 'strategy': strategy,
+                'initial_balance': initial_balance, 'warmed_up_bars': stream.count}
+
+    def stop_session(self, session_id: str) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE paper_sessions SET status = 'STOPPED', last_update = ? WHERE session_id = ? AND status = 'ACTIVE'",
+                (datetime.now().isoformat(), session_id)
+            ).rowcount
+        return bool(updated)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM paper_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_trades(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trades oldest first; `limit` returns only the most recent ones"""
+        query = "SELECT action, price, quantity, timestamp, balance_after FROM paper_trades WHERE session_id = ?"
+        with self._lock:
+            if limit is None:
+                rows = self._conn.execute(query + " ORDER BY seq", (session_id,)).fetchall()
+            else:
+                rows = self._conn.execute(query + " ORDER BY seq DESC LIMIT ?", (session_id, limit)).fetchall()[::-1]
+        return [dict(row) for row in rows]
+
+    def list_sessions(self, status: Optional[str] = 'ACTIVE', limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute("SELECT * FROM paper_sessions ORDER BY start_time DESC LIMIT ?",
+                                          (limit,)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM paper_sessions WHERE status = ? ORDER BY start_time DESC LIMIT ?",
+                    (status, limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    # ===== EVENTS =====
+
+    def on_candle_close(self, symbol: str, timeframe: str, candle) -> List[Dict[str, Any]]:
+        """
+        Process one closed candle for every active session on the feed.
+
+        Strategy signals are computed once per strategy (not per session);
+        returns the executed trades.
+        """
+        candle = candle if isinstance(candle, tuple) else candle_tuple(candle)
+        timestamp = datetime.fromtimestamp(candle[0] / 1000, tz=timezone.utc).isoformat()
+        executed = []
+        with self._transaction() as conn:
+            stream = self._load_feed(conn, symbol, timeframe)
+            if stream is None or not stream.update(candle):
+                # No sessions on this feed yet, or candle already processed by another worker
+                return executed
+
+            sessions = conn.execute(
+                "SELECT * FROM paper_sessions WHERE symbol = ? AND timeframe = ? AND status = 'ACTIVE' "
+                "AND (last_candle_ts IS NULL OR last_candle_ts < ?)",
+                (symbol, timeframe, candle[0])
+            ).fetchall()
+
+            bar = stream.bar()
+            signals: Dict[str, Optional[Dict[str, Any]]] = {}
+            for row in sessions:
+                strategy = row['strategy']
+                if strategy not in signals:
+                    step = STEP_STRATEGIES.get(strategy)
+                    signals[strategy] = step(bar) if step else None
+                signal = signals[strategy]
+                if not signal:
+                    continue
+
+                session = dict(row)
+                trade = apply_paper_signal(session, signal['action'], float(candle[4]), timestamp)
+                if trade is None:
+                    continue
+                conn.execute(
+                    "UPDATE paper_sessions SET balance = ?, position = ?, entry_price = ?, "
+                    "trade_count = trade_count + 1, last_update = ? WHERE session_id = ?",
+                    (session['balance'], session['position'], session['entry_price'], timestamp,
+                     session['session_id'])
+                )
+                conn.execute(
+                    "INSERT INTO paper_trades (session_id, seq, action, price, quantity, timestamp, balance_after) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session['session_id'], session['trade_count'] + 1, trade['action'], trade['price'],
+                     trade['quantity'], trade['timestamp'], trade['balance_after'])
+                )
+                executed.append({'session_id': session['session_id'], **trade})
+
+            conn.execute(
+                "UPDATE paper_sessions SET last_candle_ts = ? WHERE symbol = ? AND timeframe = ? AND status = 'ACTIVE'",
+                (candle[0], symbol, timeframe)
+            )
+            self._save_feed(conn, symbol, timeframe, stream)
+        return executed
+
+    def attach(self, ingestor):
+        """Subscribe to OKXWebSocketIngestor bar closes"""
+        ingestor.on('candle_close', lambda symbol, payload: self.on_candle_close(
+            symbol, payload['timeframe'], payload['candle']))
+
+
+# Export
+__all__ = ['POSITION_FRACTION', 'PaperTradingEngine', 'StrategyStream', 'StreamBar', 'apply_paper_signal']
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Portfolio Backtester - Multi-symbol backtest dengan synchronized event clock
+Candle semua symbol di-merge (heap) ke satu timestamp index bersama. Hanya
+event signal dan stop yang diproses di loop (O(events)), sedangkan equity
+portfolio dihitung dengan matrix forward-fill (timestamps x symbols). Sizing
+memakai RiskManager.calculate_position_size dan entry disaring oleh aturan
+CircuitBreaker dengan simulated clock.
+"""
+import heapq
+import logging
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.circuit_breaker import SimulatedCircuitBreaker
+from core.event_driven_backtester import BacktestMetrics, EventDrivenBacktester, OrderSide, Trade
+
+logger = logging.getLogger(__name__)
+
+EXIT, ENTRY = 0, 1
+
+
+def _timestamps_ns(df: pd.DataFrame) -> np.ndarray:
+    times = df['timestamp'] if 'timestamp' in df.columns else df.index
+    return pd.DatetimeIndex(pd.to_datetime(times)).asi8
+
+
+def _forward_fill_rows(matrix: np.ndarray) -> np.ndarray:
+    """Forward fill NaN down each column (rows before the first value stay NaN)"""
+    rows = np.where(np.isnan(matrix), 0, np.arange(len(matrix))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return matrix[rows, np.arange(matrix.shape[1])]
+
+
+def merge_clock(timestamps: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Heap-merge sorted per-symbol timestamps into one clock.
+
+    Returns the common clock (int64 ns) and, per symbol, the clock row of
+    each of its bars.
+    """
+    clock: List[int] = []
+    rows: List[List[int]] = [[] for _ in timestamps]
+    last = None
+    streams = [zip(stamps.tolist(), repeat(symbol)) for symbol, stamps in enumerate(timestamps)]
+    for timestamp, symbol in heapq.merge(*streams):
+        if timestamp != last:
+            clock.append(timestamp)
+            last = timestamp
+        rows[symbol].append(len(clock) - 1)
+    return np.asarray(clock, dtype=np.int64), [np.asarray(symbol_rows, dtype=np.int64) for symbol_rows in rows]
+
+
+class PortfolioBacktester:
+    """
+    Long-only portfolio backtest atas banyak symbol sekaligus
+
+    Signal per symbol: boolean array 'entries' dan 'exits' (satu nilai per bar)
+    dan opsional 'stop_loss' (harga per bar). Fill di close bar signal dengan
+    slippage/commission yang sama dengan EventDrivenBacktester; stop loss
+    dieksekusi pada bar pertama yang low-nya menyentuh stop.
+    """
+
+    def __init__(self, initial_capital: float = 100000, commission_rate: float = 0.001,
+                 slippage_rate: float = 0.0005, risk_percent: float = 1.0, stop_loss_pct: float = 2.0,
+                 max_positions: int = 10, max_allocation_pct: Optional[float] = None,
+                 risk_manager=None, use_circuit_breaker: bool = True,
+                 breaker_thresholds: Optional[Dict[str, Any]] = None):
+        self.initial_capital = initial_capital
+        self.commission_rate = commission_rate
+        self.slippage_rate = slippage_rate
+        self.risk_percent = risk_percent
+        self.stop_loss_pct = stop_loss_pct
+        self.max_positions = max_positions
+        self.max_allocation_pct = max_allocation_pct
+        self.use_circuit_breaker = use_circuit_breaker
+        self.breaker_thresholds = breaker_thresholds
+        self._risk_manager = risk_manager
+
+        self.trades: List[Trade] = []
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.equity_curve: List[float] = [initial_capital]
+        self.daily_returns: List[float] = []
+        self.clock: Optional[pd.DatetimeIndex] = None
+        self.symbol_stats: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {}
+
+    @property
+    def risk_manager(self):
+        if self._risk_manager is None:
+            from core.risk_manager import RiskManager
+            self._risk_manager = RiskManager()
+        return self._risk_manager
+
+    def run_backtest(self, data: Dict[str, pd.DataFrame],
+                     signals: Dict[str, Dict[str, Any]]) -> BacktestMetrics:
+        """
+        Run portfolio backtest
+
+        Args:
+            data: symbol -> DataFrame dengan 'open', 'low', 'close' (dan 'timestamp' atau DatetimeIndex)
+            signals: symbol -> {'entries': bool array, 'exits': bool array, 'stop_loss': optional array}
+        """
+        symbols = [symbol for symbol in data if symbol in signals and len(data[symbol])]
+        if not symbols:
+            raise ValueError("No symbols with both candles and signals")
+
+        stamps = [_timestamps_ns(data[symbol]) for symbol in symbols]
+        clock, rows = merge_clock(stamps)
+        n_rows, n_symbols = len(clock), len(symbols)
+
+        opens, lows, closes, stops, exit_bars = [], [], [], [], []
+        event_parts = []
+        for s, symbol in enumerate(symbols):
+            df = data[symbol]
+            entries = np.asarray(signals[symbol]['entries'], dtype=bool)
+            exits = np.asarray(signals[symbol]['exits'], dtype=bool)
+            if not (len(entries) == len(exits) == len(df)):
+                raise ValueError(f"{symbol}: entries/exits must have one value per bar")
+            stop = signals[symbol].get('stop_loss')
+            stops.append(np.full(len(df), np.nan) if stop is None else np.asarray(stop, dtype=float))
+            closes.append(df['close'].to_numpy(dtype=float))
+            lows.append(df['low'].to_numpy(dtype=float) if 'low' in df.columns else closes[-1])
+            opens.append(df['open'].to_numpy(dtype=float) if 'open' in df.columns else closes[-1])
+
+            # Conflicting bars (entry and exit together) are ignored
+            exit_only = np.flatnonzero(exits & ~entries)
+            entry_only = np.flatnonzero(entries & ~exits)
+            exit_bars.append(exit_only)
+            for kind, bars in ((EXIT, exit_only), (ENTRY, entry_only)):
+                event_parts.append(np.column_stack([rows[s][bars], np.full(len(bars), kind),
+                                                    np.full(len(bars), s), bars]))
+
+        # Signal events in clock order; exits before entries on the same row
+        events = np.concatenate(event_parts) if event_parts else np.empty((0, 4), dtype=np.int64)
+        events = events[np.lexsort((events[:, 2], events[:, 1], events[:, 0]))]
+
+        close_matrix = np.full((n_rows, n_symbols), np.nan)
+        for s in range(n_symbols):
+            close_matrix[rows[s], s] = closes[s]
+        close_matrix = _forward_fill_rows(close_matrix)
+
+        breaker = (SimulatedCircuitBreaker(self.initial_capital, self.breaker_thresholds)
+                   if self.use_circuit_breaker else None)
+        max_allocation = (self.max_allocation_pct or 100 / n_symbols) / 100
+
+        cash = self.initial_capital
+        positions: Dict[int, Dict[str, Any]] = {}
+        pending_stops: List[Tuple[int, int, int, int, int]] = []
+        fills: List[Tuple[int, int, float]] = []
+        cash_fills: List[Tuple[int, float]] = []
+        trade_pnls: List[float] = []
+        self.trades = []
+        self.symbol_stats = {symbol: {'trades': 0, 'wins': 0, 'pnl': 0.0, 'stops': 0} for symbol in symbols}
+        counters = {'skipped_max_positions': 0, 'skipped_size': 0, 'blocked_by_breaker': 0}
+        position_id = 0
+
+        def timestamp_at(row):
+            return pd.Timestamp(clock[row], unit='ns')
+
+        def close_position(s, bar, row, price, reason):
+            nonlocal cash
+            position = positions.pop(s)
+            execution_price = price * (1 - self.slippage_rate)
+            proceeds = position['quantity'] * execution_price
+            commission = proceeds * self.commission_rate
+            cash += proceeds - commission
+            pnl = (execution_price - position['price']) * position['quantity'] - commission
+            trade_pnls.append(pnl)
+            fills.append((row, s, 0.0))
+            cash_fills.append((row, cash))
+            self.trades.append(Trade(order_id=f"SELL_{symbols[s]}_{bar}", symbol=symbols[s],
+                                     side=OrderSide.SELL, quantity=position['quantity'],
+                                     price=execution_price, timestamp=timestamp_at(row),
+                                     commission=commission))
+            stats = self.symbol_stats[symbols[s]]
+            stats['trades'] += 1
+            stats['wins'] += pnl > 0
+            stats['pnl'] += pnl
+            stats['stops'] += reason == 'STOP_LOSS'
+            if breaker is not None:
+                breaker.record_outcome(clock[row] / 1e9, pnl, self._equity(cash, positions, close_matrix[row]),
+                                       symbols[s])
+
+        def open_position(s, bar, row):
+            nonlocal cash, position_id
+            if len(positions) >= self.max_positions:
+                counters['skipped_max_positions'] += 1
+                return
+            equity = self._equity(cash, positions, close_matrix[row])
+            if breaker is not None and not breaker.allow_entry(clock[row] / 1e9, equity, symbols[s]):
+                counters['blocked_by_breaker'] += 1
+                return
+
+            price = closes[s][bar]
+            execution_price = price * (1 + self.slippage_rate)
+            stop = stops[s][bar]
+            if not np.isfinite(stop):
+                stop = price * (1 - self.stop_loss_pct / 100)
+            if stop >= execution_price:
+                counters['skipped_size'] += 1
+                return
+
+            sizing = self.risk_manager.calculate_position_size(
+                entry_price=execution_price, stop_loss=stop,
+                account_balance=equity, risk_percent=self.risk_percent
+            )
+            quantity = min(sizing.get('position_size', 0),
+                           equity * max_allocation / execution_price,
+                           cash / (execution_price * (1 + self.commission_rate)))
+            if quantity <= 0:
+                counters['skipped_size'] += 1
+                return
+
+            cost = quantity * execution_price
+            commission = cost * self.commission_rate
+            cash -= cost + commission
+            position_id += 1
+            positions[s] = {'id': position_id, 'quantity': quantity, 'price': execution_price}
+            fills.append((row, s, quantity))
+            cash_fills.append((row, cash))
+            self.trades.append(Trade(order_id=f"BUY_{symbols[s]}_{bar}", symbol=symbols[s],
+                                     side=OrderSide.BUY, quantity=quantity, price=execution_price,
+                                     timestamp=timestamp_at(row), commission=commission))
+
+            # Schedule the stop on the first bar (up to the next exit signal) whose low touches it
+            next_exit = np.searchsorted(exit_bars[s], bar, side='right')
+            last_bar = exit_bars[s][next_exit] if next_exit < len(exit_bars[s]) else len(lows[s]) - 1
+            hits = np.flatnonzero(lows[s][bar + 1:last_bar + 1] <= stop)
+            if len(hits):
+                stop_bar = bar + 1 + int(hits[0])
+                heapq.heappush(pending_stops, (int(rows[s][stop_bar]), EXIT, s, stop_bar, position_id))
+                positions[s]['stop'] = stop
+
+        def fire_next_stop():
+            stop_row, _, s, stop_bar, stop_id = heapq.heappop(pending_stops)
+            position = positions.get(s)
+            if position is not None and position['id'] == stop_id:
+                # Gap through the stop fills at the open
+                close_position(s, stop_bar, stop_row, min(position['stop'], opens[s][stop_bar]), 'STOP_LOSS')
+
+        # Event loop: pre-sorted signal events merged with the stop heap
+        for row, kind, s, bar in events.tolist():
+            while pending_stops and pending_stops[0][:3] <= (row, kind, s):
+                fire_next_stop()
+
+            if kind == EXIT:
+                if s in positions:
+                    close_position(s, bar, row, closes[s][bar], 'SIGNAL')
+            elif s not in positions:
+                open_position(s, bar, row)
+
+        while pending_stops:
+            fire_next_stop()
+
+        # Equity = cash + sum(quantity x close), forward filled between fills
+        quantity_matrix = np.full((n_rows, n_symbols), np.nan)
+        cash_path = np.full(n_rows, np.nan)
+        if fills:
+            # Several fills on one row: the last one holds at the close of that row
+            last_quantity = {(row, s): quantity for row, s, quantity in fills}
+            last_cash = dict(cash_fills)
+            fill_rows, fill_symbols = (np.asarray(column, dtype=np.int64) for column in zip(*last_quantity))
+            quantity_matrix[fill_rows, fill_symbols] = list(last_quantity.values())
+            cash_path[np.fromiter(last_cash, dtype=np.int64)] = list(last_cash.values())
+        quantity_matrix = np.nan_to_num(_forward_fill_rows(quantity_matrix))
+        cash_path = np.nan_to_num(_forward_fill_rows(cash_path[:, None])[:, 0], nan=self.initial_capital)
+        holdings = np.where(quantity_matrix != 0, quantity_matrix * np.nan_to_num(close_matrix), 0.0)
+        equity = cash_path + holdings.sum(axis=1)
+
+        self.clock = pd.DatetimeIndex(pd.to_datetime(clock, unit='ns'))
+        self.positions = {symbols[s]: dict(position) for s, position in positions.items()}
+        self.equity_curve = [self.initial_capital] + equity.tolist()
+        self.daily_returns = (np.diff(equity) / equity[:-1]).tolist() if n_rows > 1 else []
+        self.stats = {
+            'symbols': n_symbols,
+            'clock_length': n_rows,
+            'signal_events': len(events),
+            **counters,
+            'circuit_breaker': breaker.stats() if breaker is not None else None
+        }
+
+        # Shared metrics with the single-symbol engine
+        metrics_engine = EventDrivenBacktester(self.initial_capital, self.commission_rate, self.slippage_rate)
+        metrics_engine.trades = self.trades
+        metrics_engine.equity_curve = self.equity_curve
+        metrics_engine.daily_returns = self.daily_returns
+        return metrics_engine._calculate_metrics(trade_pnls=trade_pnls)
+
+    @staticmethod
+    def _equity(cash: float, positions: Dict[int, Dict[str, Any]], closes: np.ndarray) -> float:
+        return cash + sum(position['quantity'] * closes[s] for s, position in positions.items())
+
+
+# Export
+__all__ = ['PortfolioBacktester', 'merge_clock']
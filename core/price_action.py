@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, List, Optional, Any
 import logging
 
+from core.candle_patterns import PatternMasks, masks_from_dataframe, pattern_statistics
+
 logger = logging.getLogger(__name__)
 
 class PriceActionAnalyzer:
@@ -78,11 +80,14 @@ class PriceActionAnalyzer:
             if len(df) < 3:
                 return self._empty_analysis()
             
+            # Evaluate every pattern mask once for the whole history
+            pattern_masks = masks_from_dataframe(df)
+
             # Detect patterns
-            patterns_detected = self._detect_patterns(df)
+            patterns_detected = self._detect_patterns(df, pattern_masks)
             
             # Add advanced pattern analysis
-            advanced_patterns = self.analyze_advanced_patterns(df)
+            advanced_patterns = self.analyze_advanced_patterns(df, pattern_masks)
             
             # Generate signals
             signals = self._generate_signals(patterns_detected)
@@ -112,115 +117,36 @@ class PriceActionAnalyzer:
             logger.error(f"Error in price action analysis: {e}")
             return self._empty_analysis()
     
-    def _detect_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_patterns(self, df: pd.DataFrame,
+                         pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """Detect various candlestick patterns"""
-        patterns = []
-        
-        for i in range(2, len(df)):
-            current = df.iloc[i]
-            prev = df.iloc[i-1]
-            prev2 = df.iloc[i-2]
-            
-            # Hammer pattern
-            if self._is_hammer(current):
-                patterns.append({
-                    'name': 'hammer',
-                    'type': 'bullish',
-                    'strength': 0.7,
-                    'index': i,
-                    'description': 'Hammer pattern detected - potential bullish reversal'
-                })
-            
-            # Shooting star pattern
-            if self._is_shooting_star(current):
-                patterns.append({
-                    'name': 'shooting_star',
-                    'type': 'bearish',
-                    'strength': 0.8,
-                    'index': i,
-                    'description': 'Shooting star pattern detected - potential bearish reversal'
-                })
-            
-            # Bullish engulfing pattern
-            if self._is_bullish_engulfing(prev, current):
-                patterns.append({
-                    'name': 'bullish_engulfing',
-                    'type': 'bullish',
-                    'strength': 0.9,
-                    'index': i,
-                    'description': 'Bullish engulfing pattern detected - strong bullish signal'
-                })
-            
-            # Bearish engulfing pattern
-            if self._is_bearish_engulfing(prev, current):
-                patterns.append({
-                    'name': 'bearish_engulfing',
-                    'type': 'bearish',
-                    'strength': 0.9,
-                    'index': i,
-                    'description': 'Bearish engulfing pattern detected - strong bearish signal'
-                })
-            
-            # Doji pattern
-            if self._is_doji(current):
-                patterns.append({
-                    'name': 'doji',
-                    'type': 'neutral',
-                    'strength': 0.5,
-                    'index': i,
-                    'description': 'Doji pattern detected - market indecision'
-                })
-        
-        return patterns
-    
-    def _is_hammer(self, candle) -> bool:
-        """Check if candle is a hammer pattern"""
-        body = abs(candle['close'] - candle['open'])
-        lower_shadow = candle['open'] - candle['low'] if candle['close'] > candle['open'] else candle['close'] - candle['low']
-        upper_shadow = candle['high'] - candle['close'] if candle['close'] > candle['open'] else candle['high'] - candle['open']
-        
-        return (
-            lower_shadow > 2 * body and
-            upper_shadow < 0.5 * body and
-            body > 0
-        )
-    
-    def _is_shooting_star(self, candle) -> bool:
-        """Check if candle is a shooting star pattern"""
-        body = abs(candle['close'] - candle['open'])
-        lower_shadow = candle['open'] - candle['low'] if candle['close'] > candle['open'] else candle['close'] - candle['low']
-        upper_shadow = candle['high'] - candle['close'] if candle['close'] > candle['open'] else candle['high'] - candle['open']
-        
-        return (
-            upper_shadow > 2 * body and
-            lower_shadow < 0.5 * body and
-            body > 0
-        )
-    
-    def _is_bullish_engulfing(self, prev_candle, current_candle) -> bool:
-        """Check if current candle engulfs previous bearish candle"""
-        return (
-            prev_candle['close'] < prev_candle['open'] and  # Previous candle is bearish
-            current_candle['close'] > current_candle['open'] and  # Current candle is bullish
-            current_candle['open'] < prev_candle['close'] and  # Current opens below previous close
-            current_candle['close'] > prev_candle['open']  # Current closes above previous open
-        )
-    
-    def _is_bearish_engulfing(self, prev_candle, current_candle) -> bool:
-        """Check if current candle engulfs previous bullish candle"""
-        return (
-            prev_candle['close'] > prev_candle['open'] and  # Previous candle is bullish
-            current_candle['close'] < current_candle['open'] and  # Current candle is bearish
-            current_candle['open'] > prev_candle['close'] and  # Current opens above previous close
-            current_candle['close'] < prev_candle['open']  # Current closes below previous open
-        )
-    
-    def _is_doji(self, candle) -> bool:
-        """Check if candle is a doji pattern"""
-        body = abs(candle['close'] - candle['open'])
-        total_range = candle['high'] - candle['low']
-        
-        return body < 0.1 * total_range if total_range > 0 else False
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
+        descriptions = {
+            'hammer': 'Hammer pattern detected - potential bullish reversal',
+            'shooting_star': 'Shooting star pattern detected - potential bearish reversal',
+            'bullish_engulfing': 'Bullish engulfing pattern detected - strong bullish signal',
+            'bearish_engulfing': 'Bearish engulfing pattern detected - strong bearish signal',
+            'doji': 'Doji pattern detected - market indecision'
+        }
+
+        # Candle order first, then pattern order within a candle
+        hits = []
+        for rank, name in enumerate(descriptions):
+            for i in pattern_masks.indices(name):
+                if i >= 2:
+                    hits.append((int(i), rank, name))
+        hits.sort()
+
+        return [
+            {
+                'name': name,
+                'type': self.patterns[name]['type'],
+                'strength': self.patterns[name]['strength'],
+                'index': i,
+                'description': descriptions[name]
+            }
+            for i, _, name in hits
+        ]
     
     def _generate_signals(self, patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate trading signals from detected patterns"""
@@ -316,7 +242,8 @@ class PriceActionAnalyzer:
     # 🕯️ ADVANCED PRICE ACTION FEATURES - FITUR LANJUTAN
     # ======================================================================
     
-    def analyze_advanced_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def analyze_advanced_patterns(self, df: pd.DataFrame,
+                                  pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """
         🚀 Advanced Price Action Pattern Analysis
         
@@ -325,6 +252,7 @@ class PriceActionAnalyzer:
         
         Args:
             df: DataFrame with OHLCV data
+            pattern_masks: Precomputed masks (dihitung jika tidak diberikan)
             
         Returns:
             List of advanced pattern detections
@@ -333,9 +261,11 @@ class PriceActionAnalyzer:
         
         if len(df) < 10:
             return advanced_patterns
+
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
         
         # 1. Pattern Stacking - Multi-candle patterns
-        stacked_patterns = self._detect_pattern_stacking(df)
+        stacked_patterns = self._detect_pattern_stacking(df, pattern_masks)
         advanced_patterns.extend(stacked_patterns)
         
         # 2. SNR Flip Detection - Support/Resistance flips
@@ -343,20 +273,21 @@ class PriceActionAnalyzer:
         advanced_patterns.extend(snr_flips)
         
         # 3. Wick Trap Detector - Long wick patterns
-        wick_traps = self._detect_wick_traps(df)
+        wick_traps = self._detect_wick_traps(df, pattern_masks)
         advanced_patterns.extend(wick_traps)
         
         # 4. Momentum Candle Detection - Marubozu patterns
-        momentum_candles = self._detect_momentum_candles(df)
+        momentum_candles = self._detect_momentum_candles(df, pattern_masks)
         advanced_patterns.extend(momentum_candles)
         
         # 5. Compression Pattern - Volatility compression
-        compression_patterns = self._detect_compression_patterns(df)
+        compression_patterns = self._detect_compression_patterns(df, pattern_masks)
         advanced_patterns.extend(compression_patterns)
         
         return advanced_patterns
     
-    def _detect_pattern_stacking(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_pattern_stacking(self, df: pd.DataFrame,
+                                 pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """
         🕯️ Pattern Stacking Detection
         
@@ -375,73 +306,32 @@ class PriceActionAnalyzer:
         
         if len(df) < 3:
             return stacked_patterns
-        
-        # Convert to list of dicts for easier processing
-        candles = []
-        for i in range(len(df)):
-            candles.append({
-                'timestamp': df.index[i] if hasattr(df.index, '__getitem__') else i,
-                'open': float(df['open'].iloc[i]),
-                'high': float(df['high'].iloc[i]),
-                'low': float(df['low'].iloc[i]),
-                'close': float(df['close'].iloc[i]),
-                'volume': float(df['volume'].iloc[i])
+
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
+        closes = df['close'].values
+        definitions = {
+            'morning_star': ('bullish', 0.85, 'Morning Star - Strong bullish reversal pattern'),
+            'evening_star': ('bearish', 0.85, 'Evening Star - Strong bearish reversal pattern'),
+            'three_white_soldiers': ('bullish', 0.8, 'Three White Soldiers - Strong bullish momentum'),
+            'three_black_crows': ('bearish', 0.8, 'Three Black Crows - Strong bearish momentum')
+        }
+
+        # The four 3-candle patterns are mutually exclusive, so one hit per candle
+        hits = sorted(
+            (int(i), name) for name in definitions for i in pattern_masks.indices(name)
+        )
+        for i, name in hits:
+            direction, confidence, description = definitions[name]
+            stacked_patterns.append({
+                'type': name,
+                'direction': direction,
+                'confidence_score': confidence,
+                'timestamp': df.index[i],
+                'price_level': float(closes[i]),
+                'candle_count': 3,
+                'description': description
             })
         
-        # Check for 3-candle patterns
-        for i in range(2, len(candles)):
-            first = candles[i-2]
-            second = candles[i-1]
-            third = candles[i]
-            
-            # Morning Star Pattern
-            if self._is_morning_star(first, second, third):
-                stacked_patterns.append({
-                    'type': 'morning_star',
-                    'direction': 'bullish',
-                    'confidence_score': 0.85,
-                    'timestamp': third['timestamp'],
-                    'price_level': third['close'],
-                    'candle_count': 3,
-                    'description': 'Morning Star - Strong bullish reversal pattern'
-                })
-            
-            # Evening Star Pattern
-            elif self._is_evening_star(first, second, third):
-                stacked_patterns.append({
-                    'type': 'evening_star',
-                    'direction': 'bearish',
-                    'confidence_score': 0.85,
-                    'timestamp': third['timestamp'],
-                    'price_level': third['close'],
-                    'candle_count': 3,
-                    'description': 'Evening Star - Strong bearish reversal pattern'
-                })
-            
-            # Three White Soldiers
-            elif self._is_three_white_soldiers(first, second, third):
-                stacked_patterns.append({
-                    'type': 'three_white_soldiers',
-                    'direction': 'bullish',
-                    'confidence_score': 0.8,
-                    'timestamp': third['timestamp'],
-                    'price_level': third['close'],
-                    'candle_count': 3,
-                    'description': 'Three White Soldiers - Strong bullish momentum'
-                })
-            
-            # Three Black Crows
-            elif self._is_three_black_crows(first, second, third):
-                stacked_patterns.append({
-                    'type': 'three_black_crows',
-                    'direction': 'bearish',
-                    'confidence_score': 0.8,
-                    'timestamp': third['timestamp'],
-                    'price_level': third['close'],
-                    'candle_count': 3,
-                    'description': 'Three Black Crows - Strong bearish momentum'
-                })
-        
         return stacked_patterns
     
     def _detect_snr_flips(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -512,7 +402,8 @@ class PriceActionAnalyzer:
         
         return snr_flips
     
-    def _detect_wick_traps(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_wick_traps(self, df: pd.DataFrame,
+                           pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """
         🪤 Wick Trap Detector
         
@@ -529,79 +420,48 @@ class PriceActionAnalyzer:
         
         if len(df) < 5:
             return wick_traps
-        
-        # Analyze recent candles for wick traps
-        for i in range(2, len(df) - 2):
-            candle = {
-                'open': float(df['open'].iloc[i]),
-                'high': float(df['high'].iloc[i]),
-                'low': float(df['low'].iloc[i]),
-                'close': float(df['close'].iloc[i]),
-                'timestamp': df.index[i] if hasattr(df.index, '__getitem__') else i
-            }
-            
-            # Calculate body and wick sizes
-            body_size = abs(candle['close'] - candle['open'])
-            upper_wick = candle['high'] - max(candle['open'], candle['close'])
-            lower_wick = min(candle['open'], candle['close']) - candle['low']
-            total_range = candle['high'] - candle['low']
-            
-            if total_range == 0:
-                continue
-            
-            # Check for upper wick trap (rejection at high)
-            if (upper_wick > 3 * body_size and 
-                upper_wick > 0.6 * total_range and
-                body_size > 0):
-                
-                # Check if it's near a significant level
-                prev_highs = [float(df['high'].iloc[j]) for j in range(max(0, i-10), i)]
-                if prev_highs:
-                    resistance_level = max(prev_highs)
-                    if candle['high'] >= resistance_level * 0.998:
-                        
-                        confidence = 0.6 + (upper_wick / total_range) * 0.3
-                        
-                        wick_traps.append({
-                            'type': 'upper_wick_trap',
-                            'direction': 'bearish',
-                            'confidence_score': confidence,
-                            'timestamp': candle['timestamp'],
-                            'trap_level': candle['high'],
-                            'body_size': body_size,
-                            'wick_size': upper_wick,
-                            'wick_to_body_ratio': upper_wick / body_size if body_size > 0 else 0,
-                            'description': f'Upper wick trap at {candle["high"]:.4f} - rejection of resistance'
-                        })
-            
-            # Check for lower wick trap (rejection at low)
-            if (lower_wick > 3 * body_size and 
-                lower_wick > 0.6 * total_range and
-                body_size > 0):
-                
-                # Check if it's near a significant level
-                prev_lows = [float(df['low'].iloc[j]) for j in range(max(0, i-10), i)]
-                if prev_lows:
-                    support_level = min(prev_lows)
-                    if candle['low'] <= support_level * 1.002:
-                        
-                        confidence = 0.6 + (lower_wick / total_range) * 0.3
-                        
-                        wick_traps.append({
-                            'type': 'lower_wick_trap',
-                            'direction': 'bullish',
-                            'confidence_score': confidence,
-                            'timestamp': candle['timestamp'],
-                            'trap_level': candle['low'],
-                            'body_size': body_size,
-                            'wick_size': lower_wick,
-                            'wick_to_body_ratio': lower_wick / body_size if body_size > 0 else 0,
-                            'description': f'Lower wick trap at {candle["low"]:.4f} - rejection of support'
-                        })
+
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
+        features = pattern_masks.features
+        body_sizes = features['body']
+        total_ranges = features['total_range']
+        highs = df['high'].values
+        lows = df['low'].values
+
+        # Upper trap = rejection of the 10-candle high, lower trap = rejection of the 10-candle low
+        traps = {
+            'upper_wick_trap': ('bearish', features['upper_wick'], highs,
+                                'Upper wick trap at {:.4f} - rejection of resistance'),
+            'lower_wick_trap': ('bullish', features['lower_wick'], lows,
+                                'Lower wick trap at {:.4f} - rejection of support')
+        }
+        hits = sorted(
+            (int(i), rank, name)
+            for rank, name in enumerate(traps)
+            for i in pattern_masks.indices(name)
+            if 2 <= i < len(df) - 2
+        )
+        for i, _, name in hits:
+            direction, wicks, levels, description = traps[name]
+            body_size = float(body_sizes[i])
+            wick_size = float(wicks[i])
+            total_range = float(total_ranges[i])
+            wick_traps.append({
+                'type': name,
+                'direction': direction,
+                'confidence_score': 0.6 + (wick_size / total_range) * 0.3,
+                'timestamp': df.index[i],
+                'trap_level': float(levels[i]),
+                'body_size': body_size,
+                'wick_size': wick_size,
+                'wick_to_body_ratio': wick_size / body_size if body_size > 0 else 0,
+                'description': description.format(float(levels[i]))
+            })
         
         return wick_traps
     
-    def _detect_momentum_candles(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_momentum_candles(self, df: pd.DataFrame,
+                                 pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """
         🚀 Momentum Candle Detection
         
@@ -618,70 +478,39 @@ class PriceActionAnalyzer:
         
         if len(df) < 3:
             return momentum_candles
-        
-        # Analyze each candle for momentum characteristics
-        for i in range(1, len(df) - 1):
-            candle = {
-                'open': float(df['open'].iloc[i]),
-                'high': float(df['high'].iloc[i]),
-                'low': float(df['low'].iloc[i]),
-                'close': float(df['close'].iloc[i]),
-                'volume': float(df['volume'].iloc[i]),
-                'timestamp': df.index[i] if hasattr(df.index, '__getitem__') else i
-            }
-            
-            # Calculate body and wick sizes
-            body_size = abs(candle['close'] - candle['open'])
-            upper_wick = candle['high'] - max(candle['open'], candle['close'])
-            lower_wick = min(candle['open'], candle['close']) - candle['low']
-            total_range = candle['high'] - candle['low']
-            
-            if total_range == 0 or body_size == 0:
-                continue
-            
-            # Check for Marubozu characteristics
-            body_percentage = body_size / total_range
-            max_wick_size = max(upper_wick, lower_wick)
-            
-            if (body_percentage > 0.85 and  # Body is >85% of total range
-                max_wick_size < 0.1 * total_range):  # Minimal wicks
-                
-                direction = 'bullish' if candle['close'] > candle['open'] else 'bearish'
-                
-                # Check if it's breaking out of a range
-                prev_candles = df.iloc[max(0, i-5):i]
-                if len(prev_candles) >= 3:
-                    prev_high = prev_candles['high'].max()
-                    prev_low = prev_candles['low'].min()
-                    
-                    is_breakout = False
-                    if direction == 'bullish' and candle['close'] > prev_high:
-                        is_breakout = True
-                    elif direction == 'bearish' and candle['close'] < prev_low:
-                        is_breakout = True
-                    
-                    # Check volume confirmation
-                    avg_volume = prev_candles['volume'].mean()
-                    volume_surge = candle['volume'] > avg_volume * 1.5
-                    
-                    confidence = 0.6 + (body_percentage * 0.2) + (0.1 if is_breakout else 0) + (0.1 if volume_surge else 0)
-                    confidence = min(confidence, 0.9)
-                    
-                    momentum_candles.append({
-                        'type': 'momentum_candle',
-                        'direction': direction,
-                        'confidence_score': confidence,
-                        'timestamp': candle['timestamp'],
-                        'price_level': candle['close'],
-                        'body_percentage': body_percentage,
-                        'is_breakout': is_breakout,
-                        'volume_surge': volume_surge,
-                        'description': f'{direction.title()} momentum candle with {body_percentage:.1%} body size'
-                    })
+
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
+        features = pattern_masks.features
+        closes = df['close'].values
+        marubozu = pattern_masks['bullish_momentum'] | pattern_masks['bearish_momentum']
+
+        # Marubozu (>85% body, minimal wicks) with at least 3 previous candles
+        for i in np.flatnonzero(marubozu[:len(df) - 1]):
+            i = int(i)
+            direction = 'bullish' if pattern_masks['bullish_momentum'][i] else 'bearish'
+            body_percentage = float(features['body_percentage'][i])
+            is_breakout = bool(features['momentum_breakout'][i])
+            volume_surge = bool(features['volume_surge'][i])
+
+            confidence = 0.6 + (body_percentage * 0.2) + (0.1 if is_breakout else 0) + (0.1 if volume_surge else 0)
+            confidence = min(confidence, 0.9)
+            
+            momentum_candles.append({
+                'type': 'momentum_candle',
+                'direction': direction,
+                'confidence_score': confidence,
+                'timestamp': df.index[i],
+                'price_level': float(closes[i]),
+                'body_percentage': body_percentage,
+                'is_breakout': is_breakout,
+                'volume_surge': volume_surge,
+                'description': f'{direction.title()} momentum candle with {body_percentage:.1%} body size'
+            })
         
         return momentum_candles
     
-    def _detect_compression_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_compression_patterns(self, df: pd.DataFrame,
+                                     pattern_masks: Optional[PatternMasks] = None) -> List[Dict[str, Any]]:
         """
         🔄 Compression Pattern Detection
         
@@ -698,110 +527,46 @@ class PriceActionAnalyzer:
         
         if len(df) < 10:
             return compression_patterns
-        
-        # Calculate Average True Range (ATR) for volatility measurement
-        atr_values = []
-        for i in range(1, len(df)):
-            high = float(df['high'].iloc[i])
-            low = float(df['low'].iloc[i])
-            prev_close = float(df['close'].iloc[i-1])
-            
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            atr_values.append(tr)
-        
-        # Look for compression patterns
-        lookback = 8
-        for i in range(lookback, len(atr_values) - 2):
-            current_atr = atr_values[i]
-            recent_atr = atr_values[i-lookback:i]
-            
-            if len(recent_atr) >= lookback:
-                # Check for decreasing volatility
-                avg_early_atr = sum(recent_atr[:4]) / 4
-                avg_recent_atr = sum(recent_atr[4:]) / 4
-                
-                volatility_decrease = (avg_early_atr - avg_recent_atr) / avg_early_atr if avg_early_atr > 0 else 0
-                
-                # Check for tight range
-                recent_candles = df.iloc[i-4:i+1]
-                price_range = recent_candles['high'].max() - recent_candles['low'].min()
-                avg_price = recent_candles['close'].mean()
-                range_percentage = price_range / avg_price if avg_price > 0 else 0
-                
-                # Compression criteria
-                if (volatility_decrease > 0.3 and  # 30% decrease in volatility
-                    range_percentage < 0.02 and  # Tight 2% range
-                    current_atr < avg_early_atr * 0.6):  # Current ATR is 40% lower
-                    
-                    # Calculate compression strength
-                    compression_strength = volatility_decrease * 0.7 + (1 - range_percentage * 50) * 0.3
-                    compression_strength = min(compression_strength, 0.9)
-                    
-                    # Determine potential breakout direction
-                    last_candle = df.iloc[i]
-                    mid_price = (recent_candles['high'].max() + recent_candles['low'].min()) / 2
-                    
-                    if float(last_candle['close']) > mid_price:
-                        bias = 'bullish'
-                    else:
-                        bias = 'bearish'
-                    
-                    compression_patterns.append({
-                        'type': 'compression_pattern',
-                        'direction': 'neutral',  # Compression is neutral until breakout
-                        'breakout_bias': bias,
-                        'confidence_score': compression_strength,
-                        'timestamp': last_candle.name if hasattr(last_candle, 'name') else i,
-                        'price_level': float(last_candle['close']),
-                        'volatility_decrease': volatility_decrease,
-                        'range_percentage': range_percentage,
-                        'compression_strength': compression_strength,
-                        'description': f'Compression pattern with {volatility_decrease:.1%} volatility decrease, {bias} bias'
-                    })
+
+        pattern_masks = pattern_masks if pattern_masks is not None else masks_from_dataframe(df)
+        features = pattern_masks.features
+        closes = df['close'].values
+
+        # ATR contraction (>30%) inside a tight (<2%) 5-candle range
+        for i in pattern_masks.indices('compression'):
+            i = int(i)
+            volatility_decrease = float(features['volatility_decrease'][i])
+            range_percentage = float(features['range_percentage'][i])
+
+            # Calculate compression strength
+            compression_strength = volatility_decrease * 0.7 + (1 - range_percentage * 50) * 0.3
+            compression_strength = min(compression_strength, 0.9)
+
+            # Determine potential breakout direction
+            bias = 'bullish' if float(closes[i]) > features['range_mid'][i] else 'bearish'
+
+            compression_patterns.append({
+                'type': 'compression_pattern',
+                'direction': 'neutral',  # Compression is neutral until breakout
+                'breakout_bias': bias,
+                'confidence_score': compression_strength,
+                'timestamp': df.index[i],
+                'price_level': float(closes[i]),
+                'volatility_decrease': volatility_decrease,
+                'range_percentage': range_percentage,
+                'compression_strength': compression_strength,
+                'description': f'Compression pattern with {volatility_decrease:.1%} volatility decrease, {bias} bias'
+            })
         
         return compression_patterns
-    
-    # Helper methods for pattern stacking
-    def _is_morning_star(self, first, second, third):
-        """Check for Morning Star pattern"""
-        return (
-            first['close'] < first['open'] and  # First candle is bearish
-            abs(second['close'] - second['open']) < abs(first['close'] - first['open']) * 0.3 and  # Second is small
-            third['close'] > third['open'] and  # Third is bullish
-            third['close'] > (first['open'] + first['close']) / 2  # Third closes above midpoint of first
-        )
-    
-    def _is_evening_star(self, first, second, third):
-        """Check for Evening Star pattern"""
-        return (
-            first['close'] > first['open'] and  # First candle is bullish
-            abs(second['close'] - second['open']) < abs(first['close'] - first['open']) * 0.3 and  # Second is small
-            third['close'] < third['open'] and  # Third is bearish
-            third['close'] < (first['open'] + first['close']) / 2  # Third closes below midpoint of first
-        )
-    
-    def _is_three_white_soldiers(self, first, second, third):
-        """Check for Three White Soldiers pattern"""
-        return (
-            first['close'] > first['open'] and  # All bullish
-            second['close'] > second['open'] and
-            third['close'] > third['open'] and
-            second['close'] > first['close'] and  # Each closes higher
-            third['close'] > second['close'] and
-            abs(first['close'] - first['open']) > 0 and  # Reasonable body sizes
-            abs(second['close'] - second['open']) > 0 and
-            abs(third['close'] - third['open']) > 0
-        )
-    
-    def _is_three_black_crows(self, first, second, third):
-        """Check for Three Black Crows pattern"""
-        return (
-            first['close'] < first['open'] and  # All bearish
-            second['close'] < second['open'] and
-            third['close'] < third['open'] and
-            second['close'] < first['close'] and  # Each closes lower
-            third['close'] < second['close'] and
-            abs(first['close'] - first['open']) > 0 and  # Reasonable body sizes
-            abs(second['close'] - second['open']) > 0 and
-            abs(third['close'] - third['open']) > 0
-        )
\ No newline at end of file
+
+    def get_pattern_statistics(self, df: pd.DataFrame, horizon: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistik semua pattern atas seluruh history (count, frekuensi,
+        forward return dan win rate setelah `horizon` candle)
+        """
+        try:
+            return pattern_statistics(df, horizon=horizon)
+        except Exception as e:
+            logger.error(f"Error computing pattern statistics: {e}")
+            return {}
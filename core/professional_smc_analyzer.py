@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, Any, List, Optional
 import logging
 
+from core.smc_kernel import SMCStructure, analyze_smc, BULLISH, CHOCH
+
 logger = logging.getLogger(__name__)
 
 class ProfessionalSMCAnalyzer:
@@ -43,12 +45,15 @@ class ProfessionalSMCAnalyzer:
                 if col in df.columns:
                     df[col] = pd.to_numeric(df[col], errors='coerce')
             
+            # One kernel pass for swings, BOS/CHoCH, order blocks, FVG and pools
+            smc = self._run_kernel(df)
+
             # Calculate SMC indicators
             smc_analysis = {
-                'structure_analysis': self._analyze_structure(df),
-                'order_blocks': self._identify_order_blocks(df),
-                'fair_value_gaps': self._identify_fvg(df),
-                'liquidity_analysis': self._analyze_liquidity(df),
+                'structure_analysis': self._analyze_structure(df, smc),
+                'order_blocks': self._identify_order_blocks(df, smc),
+                'fair_value_gaps': self._identify_fvg(df, smc),
+                'liquidity_analysis': self._analyze_liquidity(df, smc),
                 'market_bias': self._determine_market_bias(df),
                 'confidence': self._calculate_confidence(df),
                 'key_levels': self._identify_key_levels(df)
@@ -61,9 +66,24 @@ class ProfessionalSMCAnalyzer:
             self.logger.error(f"SMC analysis error: {e}")
             return self._get_fallback_smc_analysis()
     
-    def _analyze_structure(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _run_kernel(self, df: pd.DataFrame) -> SMCStructure:
+        """Run the NumPy SMC kernel over the candle columns"""
+        return analyze_smc(
+            df['open'].values, df['high'].values, df['low'].values,
+            df['close'].values, df['volume'].values
+        )
+
+    def _timestamp_at(self, df: pd.DataFrame, index: int):
+        """Candle timestamp, falling back to the positional index"""
+        if 'timestamp' in df.columns:
+            return df['timestamp'].iloc[index]
+        return index
+
+    def _analyze_structure(self, df: pd.DataFrame, smc: Optional[SMCStructure] = None) -> Dict[str, Any]:
         """Analyze market structure for CHoCH and BOS"""
         try:
+            smc = smc if smc is not None else self._run_kernel(df)
+
             # Calculate swing highs and lows
             highs = df['high'].values
             lows = df['low'].values
@@ -80,85 +100,89 @@ class ProfessionalSMCAnalyzer:
                 structure_break = "bullish_bos"
             elif current_price < recent_low:
                 structure_break = "bearish_bos"
+
+            swings = smc.swings
+            swing_highs = swings[swings['kind'] == 1][-5:]
+            swing_lows = swings[swings['kind'] == -1][-5:]
+            events = smc.structure
+            choch_count = int(np.count_nonzero(events['kind'] == CHOCH))
+
+            last_event = None
+            if len(events):
+                event = events[-1]
+                direction = 'bullish' if event['direction'] == BULLISH else 'bearish'
+                last_event = {
+                    'type': f"{direction}_{'choch' if event['kind'] == CHOCH else 'bos'}",
+                    'level': float(event['level']),
+                    'timestamp': self._timestamp_at(df, int(event['index'])),
+                    'bars_ago': int(len(df) - 1 - event['index'])
+                }
             
             return {
                 'structure_break': structure_break,
                 'recent_high': float(recent_high),
                 'recent_low': float(recent_low),
                 'current_price': float(current_price),
-                'trend': 'bullish' if current_price > recent_low * 1.02 else 'bearish'
+                'trend': 'bullish' if current_price > recent_low * 1.02 else 'bearish',
+                'swing_highs': [float(price) for price in swing_highs['price']],
+                'swing_lows': [float(price) for price in swing_lows['price']],
+                'last_event': last_event,
+                'bos_count': int(len(events) - choch_count),
+                'choch_count': choch_count
             }
             
         except Exception as e:
             self.logger.error(f"Structure analysis error: {e}")
             return {'structure_break': 'none', 'trend': 'neutral'}
     
-    def _identify_order_blocks(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _identify_order_blocks(self, df: pd.DataFrame, smc: Optional[SMCStructure] = None) -> List[Dict[str, Any]]:
         """Identify order blocks"""
         try:
-            order_blocks = []
-            
-            # Simple order block identification
-            for i in range(10, len(df) - 5):
-                candle = df.iloc[i]
-                
-                # Look for strong candles with high volume
-                body_size = abs(candle['close'] - candle['open'])
-                avg_volume = df['volume'].rolling(20).mean().iloc[i]
-                
-                if candle['volume'] > avg_volume * 1.5 and body_size > 0:
-                    order_blocks.append({
-                        'type': 'bullish' if candle['close'] > candle['open'] else 'bearish',
-                        'price_high': float(candle['high']),
-                        'price_low': float(candle['low']),
-                        'timestamp': candle.get('timestamp', i),
-                        'strength': min(candle['volume'] / avg_volume, 3.0)
-                    })
-            
-            # Return most recent order blocks
-            return order_blocks[-5:] if order_blocks else []
+            smc = smc if smc is not None else self._run_kernel(df)
+
+            # Strong candles with high volume; return most recent order blocks
+            return [
+                {
+                    'type': 'bullish' if block['direction'] == BULLISH else 'bearish',
+                    'price_high': float(block['high']),
+                    'price_low': float(block['low']),
+                    'timestamp': self._timestamp_at(df, int(block['index'])),
+                    'strength': float(block['strength'])
+                }
+                for block in smc.order_blocks[-5:]
+            ]
             
         except Exception as e:
             self.logger.error(f"Order block identification error: {e}")
             return []
     
-    def _identify_fvg(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _identify_fvg(self, df: pd.DataFrame, smc: Optional[SMCStructure] = None) -> List[Dict[str, Any]]:
         """Identify Fair Value Gaps"""
         try:
-            fvgs = []
-            
-            for i in range(2, len(df)):
-                candle1 = df.iloc[i-2]
-                candle2 = df.iloc[i-1] 
-                candle3 = df.iloc[i]
-                
-                # Bullish FVG: candle1.high < candle3.low
-                if candle1['high'] < candle3['low']:
-                    fvgs.append({
-                        'type': 'bullish',
-                        'high': float(candle1['high']),
-                        'low': float(candle3['low']),
-                        'timestamp': candle2.get('timestamp', i-1)
-                    })
-                
-                # Bearish FVG: candle1.low > candle3.high
-                elif candle1['low'] > candle3['high']:
-                    fvgs.append({
-                        'type': 'bearish',
-                        'high': float(candle1['low']),
-                        'low': float(candle3['high']),
-                        'timestamp': candle2.get('timestamp', i-1)
-                    })
-            
-            return fvgs[-3:] if fvgs else []
+            smc = smc if smc is not None else self._run_kernel(df)
+
+            # Bullish FVG: candle1.high < candle3.low, bearish: candle1.low > candle3.high
+            # Legacy output: 'high' = candle1 edge, 'low' = candle3 edge (for bullish gaps
+            # that is the kernel's bottom/top)
+            return [
+                {
+                    'type': 'bullish' if gap['direction'] == BULLISH else 'bearish',
+                    'high': float(gap['bottom'] if gap['direction'] == BULLISH else gap['top']),
+                    'low': float(gap['top'] if gap['direction'] == BULLISH else gap['bottom']),
+                    'timestamp': self._timestamp_at(df, int(gap['index']))
+                }
+                for gap in smc.fvgs[-3:]
+            ]
             
         except Exception as e:
             self.logger.error(f"FVG identification error: {e}")
             return []
     
-    def _analyze_liquidity(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_liquidity(self, df: pd.DataFrame, smc: Optional[SMCStructure] = None) -> Dict[str, Any]:
         """Analyze liquidity levels"""
         try:
+            smc = smc if smc is not None else self._run_kernel(df)
+
             highs = df['high'].values
             lows = df['low'].values
             volumes = df['volume'].values
@@ -179,10 +203,23 @@ class ProfessionalSMCAnalyzer:
                     'type': 'support',
                     'strength': float(volumes[idx] / avg_volume)
                 })
+
+            # Equal highs / equal lows from clustered swing points
+            pools = [
+                {
+                    'price': float(pool['price']),
+                    'touches': int(pool['touches']),
+                    'first_timestamp': self._timestamp_at(df, int(pool['first_index'])),
+                    'last_timestamp': self._timestamp_at(df, int(pool['last_index']))
+                }
+                for pool in smc.liquidity
+            ]
             
             return {
                 'levels': liquidity_levels,
-                'total_levels': len(liquidity_levels)
+                'total_levels': len(liquidity_levels),
+                'equal_highs': [pool for pool, side in zip(pools, smc.liquidity['side']) if side == 1][-5:],
+                'equal_lows': [pool for pool, side in zip(pools, smc.liquidity['side']) if side == -1][-5:]
             }
             
         except Exception as e:
@@ -1,34 +1,67 @@
 """
 GPT Query Logger
 Utility untuk log dan track semua interaksi GPTs
+
+log_query tidak menyentuh database di request path: record dimasukkan ke
+write-behind queue dan ditulis secara bulk oleh background flusher. Cache
+analytics di-invalidate dengan menaikkan generation counter di Redis (O(1)),
+bukan dengan KEYS + DELETE.
 """
 
+import atexit
+import itertools
 import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
-from flask import request, g
+from flask import request, g, current_app, has_app_context, has_request_context
 from functools import wraps
 
-from models import GPTQueryLog, db
+from models import GPTQueryLog, QueryRollup, db
+from core.analytics_rollup import (
+    QUERY_KEY_FIELDS, apply_increments, load_window, query_rollup_increments, summarize_query_rollups
+)
 from core.redis_manager import redis_manager
+from core.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
+# Cached analytics keys embed this counter; bumping it orphans old entries (they expire by TTL)
+ANALYTICS_GENERATION_KEY = "analytics:generation"
+
+# Write-behind defaults
+QUERY_LOG_BATCH_SIZE = 200
+QUERY_LOG_FLUSH_INTERVAL_MS = 500
+QUERY_LOG_MAX_QUEUE_SIZE = 10000
+
 class QueryLogger:
     """
     Service untuk logging dan tracking GPT queries
     """
     
-    def __init__(self):
+    def __init__(self, batch_size: int = QUERY_LOG_BATCH_SIZE,
+                 flush_interval_ms: float = QUERY_LOG_FLUSH_INTERVAL_MS,
+                 max_queue_size: int = QUERY_LOG_MAX_QUEUE_SIZE, put_timeout: float = 0.0):
         self.redis_client = redis_manager.redis_client
+        # Flask app captured from the first request, used by the flusher thread
+        self._app = None
+        self._sequence = itertools.count()
+        self.write_queue = WriteBehindQueue(
+            self._write_batch,
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+            max_queue_size=max_queue_size,
+            put_timeout=put_timeout,
+            name='query-log-writer'
+        )
+        atexit.register(self.close)
         logger.info("🔍 GPT Query Logger initialized")
     
     def log_query(self, query_text: str, response_text: str = None, 
                   source: str = 'gpts', endpoint: str = None,
                   processing_time_ms: float = None, **kwargs) -> str:
         """
-        Log query ke database
+        Queue query log untuk ditulis ke database (write-behind)
         
         Args:
             query_text: Original query text
@@ -39,7 +72,7 @@ class QueryLogger:
             **kwargs: Additional metadata
             
         Returns:
-            query_id: ID dari log entry
+            query_id: query_id dari log entry (row id belum ada sampai batch di-flush)
         """
         try:
             # Extract additional info from kwargs
@@ -51,37 +84,73 @@ class QueryLogger:
             tokens_used = kwargs.get('tokens_used')
             metadata = kwargs.get('metadata', {})
             
-            # Create log entry with correct field mapping
-            query_log = GPTQueryLog(
-                query_id=f"qry_{int(datetime.utcnow().timestamp() * 1000)}",
-                endpoint=endpoint or '/api/gpts/unknown',
-                method=getattr(request, 'method', 'POST') if request else 'POST',
-                request_params=json.dumps(metadata) if metadata else None,
-                user_query=query_text,
-                response_status=kwargs.get('response_status', 200),
-                response_data=response_text,
-                processing_time_ms=int(processing_time_ms) if processing_time_ms else None,
-                ai_model_used=gpt_model,
-                tokens_used=tokens_used,
-                confidence_score=confidence_score,
-                session_id=session_id
-            )
-            
-            db.session.add(query_log)
-            db.session.commit()
-            
-            logger.info(f"✅ Query logged: {query_log.id} - {source} - {query_category}")
+            if self._app is None and has_app_context():
+                self._app = current_app._get_current_object()
+            
+            created_at = datetime.utcnow()
+            query_id = f"qry_{int(created_at.timestamp() * 1000)}_{next(self._sequence)}"
+            
+            # Row mapping for the bulk insert; request data is captured now, not at flush time
+            row = {
+                'query_id': query_id,
+                'endpoint': endpoint or '/api/gpts/unknown',
+                'method': request.method if has_request_context() else 'POST',
+                'request_params': json.dumps(metadata) if metadata else None,
+                'user_query': query_text,
+                'response_status': kwargs.get('response_status', 200),
+                'response_data': response_text,
+                'processing_time_ms': int(processing_time_ms) if processing_time_ms else None,
+                'ai_model_used': gpt_model,
+                'tokens_used': tokens_used,
+                'confidence_score': confidence_score,
+                'session_id': session_id,
+                'created_at': created_at
+            }
             
-            # Invalidate related cache
-            self._invalidate_analytics_cache()
+            if self.write_queue.put(row):
+                logger.debug(f"Query queued: {query_id} - {source} - {query_category}")
+            else:
+                logger.warning(f"⚠️ Query log queue full, dropped {query_id} - {source}")
             
-            return str(query_log.id)
+            return query_id
             
         except Exception as e:
             logger.error(f"❌ Failed to log query: {e}")
+            raise
+    
+    def _write_batch(self, rows: List[Dict[str, Any]]):
+        """Flusher: bulk insert satu batch lalu invalidate analytics cache sekali"""
+        if self._app is not None:
+            with self._app.app_context():
+                self._insert_rows(rows)
+        else:
+            self._insert_rows(rows)
+        
+        logger.info(f"✅ Query logs flushed: {len(rows)} rows")
+        self._invalidate_analytics_cache()
+    
+    def _insert_rows(self, rows: List[Dict[str, Any]]):
+        try:
+            db.session.bulk_insert_mappings(GPTQueryLog, rows)
+            # Rollups move in the same transaction as the raw rows
+            apply_increments(db.session, QueryRollup, QUERY_KEY_FIELDS, query_rollup_increments(rows))
+            db.session.commit()
+        except Exception:
             db.session.rollback()
             raise
     
+    def flush(self) -> int:
+        """Tulis semua query yang masih di antrian (blocking); returns jumlah row"""
+        return self.write_queue.flush()
+    
+    def close(self):
+        """Stop flusher thread dan flush sisa antrian"""
+        self.write_queue.close()
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Backpressure metrics dari write-behind queue"""
+        return self.write_queue.stats()
+    
     def get_query_history(self, limit: int = 50, source: str = None, 
                          days: int = 7, category: str = None) -> List[Dict]:
         """
@@ -97,6 +166,9 @@ class QueryLogger:
             List of query logs
         """
         try:
+            # Read-your-writes: queued logs are written before querying
+            self.flush()
+            
             query = db.session.query(GPTQueryLog)
             
             # Apply time filter
@@ -130,8 +202,6 @@ class QueryLogger:
         Returns:
             Analytics data
         """
-        cache_key = f"query_analytics_{days}d"
-        
         # Try cache first
         if use_cache:
             cached_data = self._get_cached_analytics('queries', f"{days}d")
@@ -139,82 +209,11 @@ class QueryLogger:
                 return cached_data
         
         try:
-            date_from = datetime.utcnow() - timedelta(days=days)
-            
-            # Basic stats
-            total_queries = db.session.query(GPTQueryLog).filter(
-                GPTQueryLog.created_at >= date_from
-            ).count()
-            
-            successful_queries = db.session.query(GPTQueryLog).filter(
-                GPTQueryLog.created_at >= date_from,
-                GPTQueryLog.response_status < 400
-            ).count()
-            
-            # Success rate
-            success_rate = (successful_queries / total_queries * 100) if total_queries > 0 else 0
-            
-            # Average processing time
-            avg_processing_time = db.session.query(
-                db.func.avg(GPTQueryLog.processing_time_ms)
-            ).filter(
-                GPTQueryLog.created_at >= date_from,
-                GPTQueryLog.processing_time_ms.isnot(None)
-            ).scalar() or 0
-            
-            # Top sources (using endpoint as source indicator)
-            top_sources = db.session.query(
-                GPTQueryLog.endpoint,
-                db.func.count(GPTQueryLog.id).label('count')
-            ).filter(
-                GPTQueryLog.created_at >= date_from
-            ).group_by(GPTQueryLog.endpoint).order_by(
-                db.func.count(GPTQueryLog.id).desc()
-            ).limit(10).all()
-            
-            # Top categories (using endpoint as category proxy)
-            top_categories = db.session.query(
-                GPTQueryLog.endpoint,
-                db.func.count(GPTQueryLog.id).label('count')
-            ).filter(
-                GPTQueryLog.created_at >= date_from,
-                GPTQueryLog.endpoint.isnot(None)
-            ).group_by(GPTQueryLog.endpoint).order_by(
-                db.func.count(GPTQueryLog.id).desc()
-            ).limit(10).all()
-            
-            # Top endpoints
-            top_endpoints = db.session.query(
-                GPTQueryLog.endpoint,
-                db.func.count(GPTQueryLog.id).label('count')
-            ).filter(
-                GPTQueryLog.created_at >= date_from,
-                GPTQueryLog.endpoint.isnot(None)
-            ).group_by(GPTQueryLog.endpoint).order_by(
-                db.func.count(GPTQueryLog.id).desc()
-            ).limit(10).all()
-            
-            # Daily stats
-            daily_stats = db.session.query(
-                db.func.date(GPTQueryLog.created_at).label('date'),
-                db.func.count(GPTQueryLog.id).label('count')
-            ).filter(
-                GPTQueryLog.created_at >= date_from
-            ).group_by(
-                db.func.date(GPTQueryLog.created_at)
-            ).order_by('date').all()
-            
-            analytics_data = {
-                'period_days': days,
-                'total_queries': total_queries,
-                'successful_queries': successful_queries,
-                'success_rate': round(success_rate, 2),
-                'avg_processing_time_ms': round(float(avg_processing_time), 2),
-                'top_sources': [{'source': s[0] or 'unknown', 'count': s[1]} for s in top_sources],
-                'top_categories': [{'category': c[0], 'count': c[1]} for c in top_categories],
-                'top_endpoints': [{'endpoint': e[0], 'count': e[1]} for e in top_endpoints],
-                'daily_stats': [{'date': str(d[0]), 'count': d[1]} for d in daily_stats]
-            }
+            # Served from minute/hour/day rollups; cost depends on the window, not the log size
+            now = datetime.utcnow()
+            self.flush()
+            rollups = load_window(db.session, QueryRollup, now - timedelta(days=days), now)
+            analytics_data = summarize_query_rollups(rollups, days)
             
             # Cache results
             if use_cache:
@@ -253,10 +252,14 @@ class QueryLogger:
         else:
             return 'other'
     
+    def _analytics_cache_key(self, analytics_type: str, time_period: str) -> str:
+        generation = int(self.redis_client.get(ANALYTICS_GENERATION_KEY) or 0)
+        return f"analytics:{analytics_type}:{time_period}:g{generation}"
+    
     def _get_cached_analytics(self, analytics_type: str, time_period: str) -> Optional[Dict]:
         """Get cached analytics data using Redis"""
         try:
-            cache_key = f"analytics:{analytics_type}:{time_period}"
+            cache_key = self._analytics_cache_key(analytics_type, time_period)
             cached_data = self.redis_client.get(cache_key)
             
             if cached_data:
@@ -273,7 +276,7 @@ class QueryLogger:
                         data: Dict, expire_minutes: int = 15):
         """Cache analytics data using Redis"""
         try:
-            cache_key = f"analytics:{analytics_type}:{time_period}"
+            cache_key = self._analytics_cache_key(analytics_type, time_period)
             expire_seconds = expire_minutes * 60
             
             self.redis_client.setex(
@@ -288,15 +291,10 @@ class QueryLogger:
             logger.error(f"❌ Failed to cache analytics: {e}")
     
     def _invalidate_analytics_cache(self):
-        """Invalidate all analytics cache"""
+        """Invalidate all analytics cache (generation bump, no key scan)"""
         try:
-            # Pattern match for analytics keys
-            pattern = "analytics:*"
-            keys = self.redis_client.keys(pattern)
-            
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"🗑️ Invalidated {len(keys)} analytics cache entries")
+            generation = self.redis_client.incr(ANALYTICS_GENERATION_KEY)
+            logger.debug(f"🗑️ Analytics cache generation bumped to {generation}")
             
         except Exception as e:
             logger.error(f"❌ Failed to invalidate cache: {e}")
@@ -336,7 +334,7 @@ def log_gpt_query(source: str = 'gpts', category: str = None):
                     confidence_score = result.json.get('confidence')
                 
                 # Log the query
-                query_logger = QueryLogger()
+                query_logger = get_query_logger()
                 query_logger.log_query(
                     query_text=query_text,
                     response_text=str(result.data) if hasattr(result, 'data') else None,
@@ -354,7 +352,7 @@ def log_gpt_query(source: str = 'gpts', category: str = None):
                 # Log failed query
                 processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
                 
-                query_logger = QueryLogger()
+                query_logger = get_query_logger()
                 query_logger.log_query(
                     query_text=str(request.json) if request and request.json else "",
                     response_text=str(e),
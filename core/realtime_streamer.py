@@ -3,20 +3,25 @@ Real-time Market Data Streamer
 Enhanced from OkxCandleTracker for live market updates
 """
 
-import time
-import threading
 import json
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Callable, Optional
 from dataclasses import dataclass, asdict
 
-import requests
 import pandas as pd
-from flask_socketio import SocketIO, emit
+
+try:
+    from flask_socketio import SocketIO
+except ImportError:
+    SocketIO = None
 
 from core.okx_fetcher import OKXAPIManager
+from core.okx_ws_ingestor import OKXWebSocketIngestor
+from core.streaming_indicators import StreamingIndicatorManager
+from core.paper_trading import PaperTradingEngine
 from core.analyzer import TechnicalAnalyzer
-from config import Config
+
+DEFAULT_STREAM_SYMBOLS = ['BTC-USDT', 'ETH-USDT', 'SOL-USDT', 'BNB-USDT', 'XRP-USDT']
 
 @dataclass
 class StreamingData:
@@ -33,41 +38,53 @@ class StreamingData:
         return asdict(self)
 
 class RealtimeDataStreamer:
-    """Real-time data streaming system"""
+    """Real-time data streaming system (OKX WebSocket push feed)"""
     
-    def __init__(self, socketio: SocketIO = None):
+    def __init__(self, socketio: "SocketIO" = None, symbols: Optional[List[str]] = None,
+                 ingestor: Optional[OKXWebSocketIngestor] = None,
+                 indicators: Optional[StreamingIndicatorManager] = None,
+                 paper_engine: Optional[PaperTradingEngine] = None):
         self.socketio = socketio
         self.okx_manager = OKXAPIManager()
         self.analyzer = TechnicalAnalyzer()
-        self.streaming_threads = {}
         self.is_streaming = False
-        self.stream_interval = 30  # seconds
         self.subscribers = {}
         self.last_prices = {}
         
         # Trading pairs to stream
-        self.symbols = Config.TRADING_SYMBOLS
+        self.symbols = symbols or DEFAULT_STREAM_SYMBOLS
+        
+        # One multiplexed WebSocket feed for all symbols instead of a polling thread per symbol
+        self.ingestor = ingestor or OKXWebSocketIngestor(
+            self.symbols, candle_store=self.okx_manager.candle_store
+        )
+        
+        # O(1) indicator state per symbol/timeframe, fed before our own listeners run
+        self.indicators = indicators or StreamingIndicatorManager(
+            candle_store=self.okx_manager.candle_store
+        )
+        self.indicators.attach(self.ingestor)
+        
+        # Paper trading sessions advance on every bar close, not only when a client polls
+        self.paper_engine = paper_engine or PaperTradingEngine(
+            candle_store=self.okx_manager.candle_store
+        )
+        self.paper_engine.attach(self.ingestor)
+        
+        self.ingestor.on('ticker', self._on_ticker)
+        self.ingestor.on('candle_close', self._on_candle_close)
         
     def start_streaming(self):
         """Start real-time streaming for all symbols"""
         self.is_streaming = True
-        
-        for symbol in self.symbols:
-            if symbol not in self.streaming_threads:
-                thread = threading.Thread(
-                    target=self._stream_symbol,
-                    args=(symbol,),
-                    daemon=True
-                )
-                thread.start()
-                self.streaming_threads[symbol] = thread
-                
+        self.ingestor.start()
         print(f"✅ Real-time streaming started for {len(self.symbols)} symbols")
     
     def stop_streaming(self):
         """Stop real-time streaming"""
         self.is_streaming = False
-        self.streaming_threads.clear()
+        self.ingestor.stop()
+        self.indicators.checkpoint()
         print("❌ Real-time streaming stopped")
     
     def subscribe(self, symbol: str, callback: Callable):
@@ -76,65 +93,63 @@ class RealtimeDataStreamer:
             self.subscribers[symbol] = []
         self.subscribers[symbol].append(callback)
     
-    def _stream_symbol(self, symbol: str):
-        """Stream real-time data for a specific symbol"""
-        while self.is_streaming:
-            try:
-                # Get current ticker data
-                ticker_data = self.okx_manager.get_ticker(symbol)
-                
-                if ticker_data:
-                    # Calculate 24h price change percentage correctly
-                    current_price = float(ticker_data.get('last', 0))
-                    open_24h = float(ticker_data.get('open24h', 0))
-                    
-                    try:
-                        if open_24h > 0:
-                            price_change = ((current_price - open_24h) / open_24h) * 100
-                        else:
-                            price_change = 0.0
-                    except (ValueError, TypeError, ZeroDivisionError):
-                        price_change = 0.0
-                    
-                    # Create streaming data object
-                    streaming_data = StreamingData(
-                        symbol=symbol,
-                        price=current_price,
-                        change_24h=round(price_change, 2),
-                        volume=float(ticker_data.get('volCcy24h', 0)),
-                        timestamp=int(datetime.now(timezone.utc).timestamp() * 1000),
-                        high_24h=float(ticker_data.get('high24h', 0)),
-                        low_24h=float(ticker_data.get('low24h', 0))
-                    )
-                    
-                    # Check for significant price changes
-                    price_change = self._calculate_price_change(symbol, streaming_data.price)
-                    
-                    # Emit to WebSocket clients
-                    if self.socketio:
-                        self.socketio.emit('price_update', {
-                            'symbol': symbol,
-                            'data': streaming_data.to_dict(),
-                            'price_change': price_change,
-                            'timestamp': streaming_data.timestamp
-                        })
-                    
-                    # Notify subscribers
-                    if symbol in self.subscribers:
-                        for callback in self.subscribers[symbol]:
-                            callback(streaming_data, price_change)
-                    
-                    # Store last price for comparison
-                    self.last_prices[symbol] = streaming_data.price
-                    
-                    # If significant change, trigger analysis
-                    if abs(price_change) > 0.5:  # 0.5% threshold
-                        self._trigger_analysis(symbol, streaming_data)
-                
-            except Exception as e:
-                print(f"❌ Error streaming {symbol}: {e}")
+    def _on_ticker(self, symbol: str, ticker: Dict[str, Any]):
+        """Handle pushed ticker update"""
+        try:
+            streaming_data = StreamingData(
+                symbol=symbol,
+                price=ticker['last_price'],
+                change_24h=round(ticker['change_24h'], 2),
+                volume=ticker['volume_ccy_24h'],
+                timestamp=ticker['timestamp'] or int(datetime.now(timezone.utc).timestamp() * 1000),
+                high_24h=ticker['high_24h'],
+                low_24h=ticker['low_24h']
+            )
+            
+            # Check for significant price changes
+            price_change = self._calculate_price_change(symbol, streaming_data.price)
+            
+            # Emit to WebSocket clients
+            if self.socketio:
+                self.socketio.emit('price_update', {
+                    'symbol': symbol,
+                    'data': streaming_data.to_dict(),
+                    'price_change': price_change,
+                    'timestamp': streaming_data.timestamp
+                })
             
-            time.sleep(self.stream_interval)
+            # Notify subscribers
+            if symbol in self.subscribers:
+                for callback in self.subscribers[symbol]:
+                    callback(streaming_data, price_change)
+            
+            # Tick-level comparison would fire on every push; compare against the last
+            # reference price and only move the reference when the move was significant
+            if symbol not in self.last_prices or abs(price_change) > 0.5:
+                self.last_prices[symbol] = streaming_data.price
+            
+            # If significant change, trigger analysis
+            if abs(price_change) > 0.5:  # 0.5% threshold
+                self._trigger_analysis(symbol, streaming_data)
+                
+        except Exception as e:
+            print(f"❌ Error streaming {symbol}: {e}")
+    
+    def _on_candle_close(self, symbol: str, payload: Dict[str, Any]):
+        """Forward closed candles to SocketIO clients"""
+        if self.socketio:
+            candle = payload['candle']
+            self.socketio.emit('candle_close', {
+                'symbol': symbol,
+                'timeframe': payload['timeframe'],
+                'timestamp': int(candle['timestamp']),
+                'open': float(candle['open']),
+                'high': float(candle['high']),
+                'low': float(candle['low']),
+                'close': float(candle['close']),
+                'volume': float(candle['volume']),
+                'indicators': self.indicators.snapshot(symbol, payload['timeframe'])['values']
+            })
     
     def _calculate_price_change(self, symbol: str, current_price: float) -> float:
         """Calculate percentage price change from last known price"""
@@ -150,12 +165,14 @@ class RealtimeDataStreamer:
     def _trigger_analysis(self, symbol: str, streaming_data: StreamingData):
         """Trigger technical analysis on significant price changes"""
         try:
-            # Get recent candle data
-            df = self.okx_manager.get_candles(symbol, timeframe='1H', limit=100)
+            # Live ring buffer first, REST candle store as fallback
+            df = self.ingestor.get_candles(symbol, '1H', limit=100)
+            if len(df) < 100:
+                df = self.okx_manager.get_candles(symbol, timeframe='1H', limit=100)
             
             if df is not None and not df.empty:
                 # Run technical analysis
-                analysis = self.analyzer.analyze_comprehensive(df, symbol, '1H')
+                analysis = self.analyzer.analyze(df, symbol, '1H')
                 
                 if analysis.get('signal_detected'):
                     # Emit signal alert
@@ -176,18 +193,34 @@ class RealtimeDataStreamer:
         """Get streaming statistics"""
         return {
             'is_streaming': self.is_streaming,
-            'active_streams': len(self.streaming_threads),
+            'active_streams': len(self.symbols) if self.is_streaming else 0,
             'symbols': self.symbols,
             'subscribers': {k: len(v) for k, v in self.subscribers.items()},
             'last_prices': self.last_prices,
-            'stream_interval': self.stream_interval
+            'ingestion': self.ingestor.get_stats(),
+            'indicator_sets': len(self.indicators.sets)
         }
     
+    def get_live_indicators(self, symbol: str, timeframe: str = '1H') -> Dict[str, Any]:
+        """Latest streaming indicator values (live candle preview when available)"""
+        return self.indicators.snapshot(symbol, timeframe)
+    
     def get_market_overview(self) -> Dict[str, Any]:
         """Get quick market overview for all symbols"""
         market_data = {}
         
         for symbol in self.symbols:
+            live_ticker = self.ingestor.get_ticker(symbol)
+            if live_ticker:
+                market_data[symbol] = {
+                    'price': live_ticker['last_price'],
+                    'change_24h': round(live_ticker['change_24h'], 2),
+                    'volume': live_ticker['volume_ccy_24h'],
+                    'high_24h': live_ticker['high_24h'],
+                    'low_24h': live_ticker['low_24h']
+                }
+                continue
+            
             try:
                 ticker_data = self.okx_manager.get_ticker(symbol)
                 if ticker_data:
@@ -1,15 +1,130 @@
 """
 Redis Manager untuk caching dan deduplication
+Operasi bulk (MGET / pipelined SETEX) memakai satu round trip; invalidasi lewat
+versi namespace (INCR `<namespace>:__version__`) sehingga key lama cukup expire
+sendiri tanpa KEYS/DEL. Fallback in-memory memakai TTLCache berbasis min-heap.
 """
-import redis
+import heapq
 import os
 import json
 import logging
-from typing import Optional, Any
+import time
+from typing import Optional, Any, Callable, Dict, Hashable, Iterable, List
 from datetime import datetime
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+SIGNAL_NAMESPACE = "signal"
+CACHE_NAMESPACE = "cache"
+SCAN_BATCH_SIZE = 500
+VERSION_SUFFIX = "__version__"
+
+
+def select_codec(name: Optional[str] = None):
+    """
+    Codec untuk nilai cache: (name, dumps, loads)
+    REDIS_CACHE_CODEC=auto|json|orjson|msgpack; auto memilih orjson bila terpasang
+    """
+    name = (name or os.environ.get('REDIS_CACHE_CODEC', 'auto')).lower()
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+
+    if name == 'msgpack' and msgpack is not None:
+        return 'msgpack', lambda value: msgpack.packb(value, use_bin_type=True, default=str), \
+            lambda raw: msgpack.unpackb(raw, raw=False)
+
+    if name == 'orjson' and orjson is not None:
+        def dumps(value):
+            try:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            except TypeError:
+                return json.dumps(value, default=str)
+        return 'orjson', dumps, orjson.loads
+
+    if name != 'json':
+        logger.warning(f"⚠️ Cache codec {name} not available. Using json.")
+    return 'json', json.dumps, json.loads
+
+
+class TTLCache:
+    """
+    Dict dengan expiry per key untuk fallback in-memory
+    Expiry disimpan di min-heap, jadi purge hanya menyentuh entry yang memang
+    kadaluarsa (O(k log n)) alih-alih menelusuri seluruh dict.
+    """
+
+    def __init__(self, max_size: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.clock = clock
+        self._data: Dict[Hashable, tuple] = {}
+        self._heap: List[tuple] = []
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        expire_at = self.clock() + ttl
+        self._data[key] = (value, expire_at)
+        heapq.heappush(self._heap, (expire_at, key))
+        # Overwritten keys leave stale heap entries; rebuild once they dominate
+        if len(self._heap) > 2 * len(self._data) + 64:
+            self._heap = [(expire_at, key) for key, (_, expire_at) in self._data.items()]
+            heapq.heapify(self._heap)
+        if len(self._data) > self.max_size:
+            self.purge_expired()
+            while len(self._data) > self.max_size:
+                self._pop_next()
+
+    def _pop_next(self):
+        """Buang entry dengan expiry paling awal"""
+        while self._heap:
+            expire_at, key = heapq.heappop(self._heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expire_at:
+                del self._data[key]
+                return
+
+    def purge_expired(self) -> int:
+        now = self.clock()
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expire_at, key = heapq.heappop(self._heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expire_at:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= self.clock():
+            return default
+        return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > self.clock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self._heap.clear()
+
+
 class RedisManager:
     def __init__(self):
         """Initialize Redis connection with robust fallback"""
@@ -17,10 +132,20 @@ class RedisManager:
         self.redis_client = None
         
         # In-memory fallback cache
-        self.memory_cache = {}
-        self.signal_cache = {}
+        self.memory_cache = TTLCache()
+        self.signal_cache = TTLCache()
+        
+        # Cache value codec; msgpack needs a client without decode_responses
+        self.codec, self._dumps, self._loads = select_codec()
+        self.cache_client = None
+        
+        # Last seen namespace versions
+        self._versions: Dict[str, int] = {}
         
         try:
+            if redis is None:
+                raise ImportError("redis")
+            
             # Get Redis configuration from environment
             redis_url = os.environ.get('REDIS_URL')
             redis_host = os.environ.get('REDIS_HOST', 'localhost')
@@ -51,6 +176,14 @@ class RedisManager:
             # Test connection with timeout
             self.redis_client.ping()
             self.connected = True
+            
+            self.cache_client = self.redis_client
+            if self.codec == 'msgpack':
+                pool = self.redis_client.connection_pool
+                self.cache_client = redis.Redis(connection_pool=redis.ConnectionPool(
+                    connection_class=pool.connection_class,
+                    **{**pool.connection_kwargs, 'decode_responses': False}
+                ))
             logger.info(f"✅ Redis connected successfully at {redis_host}:{redis_port}")
             
         except ImportError:
@@ -58,55 +191,93 @@ class RedisManager:
         except Exception as e:
             logger.warning(f"⚠️ Redis connection failed: {e}. Using in-memory cache.")
             self.redis_client = None
+            self.cache_client = None
             self.connected = False
     
+    @staticmethod
+    def _namespaced(namespace: str, version: int, key: str) -> str:
+        # Version 0 keeps the pre-versioning key layout
+        return f"{namespace}:{key}" if version == 0 else f"{namespace}:v{version}:{key}"
+    
+    def _run_versioned(self, namespace: str, client, build: Callable) -> List[Any]:
+        """
+        Satu pipeline: GET versi namespace + operasi `build(pipe, key_fn)` dengan versi
+        terakhir yang diketahui. Bila versi sudah berubah, operasi diulang sekali.
+        """
+        for _ in range(2):
+            version = self._versions.get(namespace, 0)
+            pipe = client.pipeline(transaction=False)
+            pipe.get(f"{namespace}:{VERSION_SUFFIX}")
+            build(pipe, lambda key: self._namespaced(namespace, version, key))
+            current, *results = pipe.execute()
+            current = int(current or 0)
+            if current == version:
+                break
+            self._versions[namespace] = current
+        return results
+    
+    def invalidate_namespace(self, namespace: str) -> int:
+        """Invalidate semua key di namespace (INCR versi; key lama expire sendiri)"""
+        version = int(self.redis_client.incr(f"{namespace}:{VERSION_SUFFIX}"))
+        self._versions[namespace] = version
+        return version
+    
     def is_signal_sent(self, signal_id: str) -> bool:
         """Check if signal already sent"""
-        if not self.connected:
-            # Use in-memory cache
-            self._cleanup_expired_signals()
-            return signal_id in self.signal_cache
-            
-        try:
-            return bool(self.redis_client.get(f"signal:{signal_id}"))
-        except Exception as e:
-            logger.error(f"Redis error checking signal: {e}")
-            # Fallback to in-memory
-            self._cleanup_expired_signals()
-            return signal_id in self.signal_cache
+        return self.are_signals_sent([signal_id])[signal_id]
+    
+    def are_signals_sent(self, signal_ids: Iterable[str]) -> Dict[str, bool]:
+        """Check many signals in one round trip (MGET)"""
+        signal_ids = list(signal_ids)
+        if not signal_ids:
+            return {}
+        
+        if self.connected:
+            try:
+                values, = self._run_versioned(
+                    SIGNAL_NAMESPACE, self.redis_client,
+                    lambda pipe, key: pipe.mget([key(signal_id) for signal_id in signal_ids])
+                )
+                return {signal_id: bool(value) for signal_id, value in zip(signal_ids, values)}
+            except Exception as e:
+                logger.error(f"Redis error checking signal: {e}")
+        
+        # Use in-memory cache
+        self._cleanup_expired_signals()
+        return {signal_id: signal_id in self.signal_cache for signal_id in signal_ids}
     
     def mark_signal_sent(self, signal_id: str, expire_seconds: int = 3600):
         """Mark signal as sent with expiration"""
-        if not self.connected:
-            # Use in-memory cache
-            self.signal_cache[signal_id] = {
-                'timestamp': datetime.now().isoformat(),
-                'sent': True,
-                'expire_at': datetime.now().timestamp() + expire_seconds
-            }
-            logger.info(f"✅ Signal {signal_id} marked as sent (in-memory)")
+        self.mark_signals_sent([signal_id], expire_seconds)
+    
+    def mark_signals_sent(self, signal_ids: Iterable[str], expire_seconds: int = 3600):
+        """Mark many signals as sent in one pipelined round trip"""
+        signal_ids = list(signal_ids)
+        if not signal_ids:
             return
-            
-        try:
-            key = f"signal:{signal_id}"
-            value = {
-                'timestamp': datetime.now().isoformat(),
-                'sent': True
-            }
-            self.redis_client.setex(
-                key, 
-                expire_seconds, 
-                json.dumps(value)
-            )
-            logger.info(f"✅ Signal {signal_id} marked as sent")
-        except Exception as e:
-            logger.error(f"Redis error marking signal: {e}")
-            # Fallback to in-memory
-            self.signal_cache[signal_id] = {
-                'timestamp': datetime.now().isoformat(),
-                'sent': True,
-                'expire_at': datetime.now().timestamp() + expire_seconds
-            }
+        value = {
+            'timestamp': datetime.now().isoformat(),
+            'sent': True
+        }
+        
+        if self.connected:
+            try:
+                payload = json.dumps(value)
+                
+                def build(pipe, key):
+                    for signal_id in signal_ids:
+                        pipe.setex(key(signal_id), expire_seconds, payload)
+                
+                self._run_versioned(SIGNAL_NAMESPACE, self.redis_client, build)
+                logger.info(f"✅ {len(signal_ids)} signal(s) marked as sent: {signal_ids[0]}")
+                return
+            except Exception as e:
+                logger.error(f"Redis error marking signal: {e}")
+        
+        # Use in-memory cache
+        for signal_id in signal_ids:
+            self.signal_cache.set(signal_id, value, expire_seconds)
+        logger.info(f"✅ {len(signal_ids)} signal(s) marked as sent (in-memory): {signal_ids[0]}")
     
     def generate_signal_id(self, symbol: str, signal_type: str, entry_price: float) -> str:
         """Generate unique signal ID"""
@@ -118,61 +289,109 @@ class RedisManager:
     
     def get_cache(self, key: str) -> Optional[Any]:
         """Get cached value"""
+        return self.get_cache_many([key]).get(key)
+    
+    def get_cache_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get many cached values in one round trip (MGET); misses are left out"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        
         if not self.connected:
-            return None
-            
+            return {key: self.memory_cache.get(key) for key in keys if key in self.memory_cache}
+        
         try:
-            value = self.redis_client.get(f"cache:{key}")
-            if value:
-                return json.loads(value)
-            return None
+            values, = self._run_versioned(
+                CACHE_NAMESPACE, self.cache_client,
+                lambda pipe, cache_key: pipe.mget([cache_key(key) for key in keys])
+            )
+            result = {}
+            for key, value in zip(keys, values):
+                if value:
+                    try:
+                        result[key] = self._loads(value)
+                    except Exception:
+                        # Written with another codec; treat as a miss
+                        continue
+            return result
         except Exception as e:
             logger.error(f"Redis error getting cache: {e}")
-            return None
+            return {}
     
     def set_cache(self, key: str, value: Any, expire_seconds: int = 300):
         """Set cache value with expiration"""
+        self.set_cache_many({key: value}, expire_seconds)
+    
+    def set_cache_many(self, values: Dict[str, Any], expire_seconds: int = 300):
+        """Set many cache values in one pipelined round trip"""
+        if not values:
+            return
+        
         if not self.connected:
+            for key, value in values.items():
+                self.memory_cache.set(key, value, expire_seconds)
             return
-            
+        
         try:
-            cache_key = f"cache:{key}"
-            self.redis_client.setex(
-                cache_key,
-                expire_seconds,
-                json.dumps(value)
-            )
+            payloads = {key: self._dumps(value) for key, value in values.items()}
+            
+            def build(pipe, cache_key):
+                for key, payload in payloads.items():
+                    pipe.setex(cache_key(key), expire_seconds, payload)
+            
+            self._run_versioned(CACHE_NAMESPACE, self.cache_client, build)
         except Exception as e:
             logger.error(f"Redis error setting cache: {e}")
     
+    def invalidate_cache(self):
+        """Invalidate all cached values"""
+        self.memory_cache.clear()
+        if not self.connected:
+            return
+        
+        try:
+            self.invalidate_namespace(CACHE_NAMESPACE)
+        except Exception as e:
+            logger.error(f"Redis error invalidating cache: {e}")
+    
     def clear_signal_history(self, pattern: str = "signal:*"):
         """Clear signal history (for testing)"""
+        self.signal_cache.clear()
         if not self.connected:
             return
             
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"Cleared {len(keys)} signal records")
+            if pattern == f"{SIGNAL_NAMESPACE}:*":
+                version = self.invalidate_namespace(SIGNAL_NAMESPACE)
+                logger.info(f"Cleared signal records (namespace version {version})")
+            else:
+                logger.info(f"Cleared {self.purge_keys(pattern)} signal records")
         except Exception as e:
             logger.error(f"Redis error clearing history: {e}")
+    
+    def purge_keys(self, pattern: str, batch_size: int = SCAN_BATCH_SIZE) -> int:
+        """
+        Hapus key yang cocok dengan pattern pakai SCAN + UNLINK per batch
+        (tidak memblok server seperti KEYS); namespace version key dilewati
+        """
+        removed = 0
+        batch = []
+        for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+            if key.endswith(f":{VERSION_SUFFIX}"):
+                continue
+            batch.append(key)
+            if len(batch) >= batch_size:
+                removed += self.redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            removed += self.redis_client.unlink(*batch)
+        return removed
 
     def _cleanup_expired_signals(self):
         """Clean up expired signals from in-memory cache"""
-        if not hasattr(self, 'signal_cache'):
-            return
-            
-        current_time = datetime.now().timestamp()
-        expired_keys = []
-        
-        for signal_id, data in self.signal_cache.items():
-            if 'expire_at' in data and data['expire_at'] < current_time:
-                expired_keys.append(signal_id)
-        
-        for key in expired_keys:
-            del self.signal_cache[key]
-            logger.debug(f"Cleaned expired signal: {key}")
+        removed = self.signal_cache.purge_expired()
+        if removed:
+            logger.debug(f"Cleaned {removed} expired signals")
 
 # Singleton instance
 redis_manager = RedisManager()
\ No newline at end of file
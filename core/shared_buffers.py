@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Shared Buffers - Candle records di shared memory untuk process pool
+Dipakai MarketScanner dan BacktestOptimizer: proses induk mem-pack candle ke
+satu blok SharedMemory, worker cukup menerima nama blok + offset lalu attach
+sekali per scan/sweep - tidak ada DataFrame yang di-pickle.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from core.candle_store import CANDLE_DTYPE
+
+# (unit id, symbol, timeframe, start offset, length) inside the shared buffer
+ScanUnit = Tuple[int, str, str, int, int]
+
+
+class SharedCandleBuffer:
+    """
+    Candle records for many (symbol, timeframe) pairs packed into one
+    SharedMemory block. Pemilik (proses induk) yang membuat dan unlink blok.
+    """
+
+    def __init__(self, candles: Dict[Tuple[str, str], np.ndarray]):
+        total = sum(len(records) for records in candles.values())
+        self.shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * CANDLE_DTYPE.itemsize)
+        self.records = np.ndarray((total,), dtype=CANDLE_DTYPE, buffer=self.shm.buf)
+        self.units: List[ScanUnit] = []
+
+        offset = 0
+        for unit_id, ((symbol, timeframe), records) in enumerate(candles.items()):
+            self.records[offset:offset + len(records)] = records
+            self.units.append((unit_id, symbol, timeframe, offset, len(records)))
+            offset += len(records)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        self.records = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# =================== WORKER SIDE ===================
+
+_worker_buffers: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def attach_buffer(name: str, total: int) -> np.ndarray:
+    """Attach (once per scan) to the parent's shared block; older scans are released"""
+    cached = _worker_buffers.get(name)
+    if cached is not None:
+        return cached[1]
+
+    release_buffers()
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: untrack so the worker does not unlink the parent's block
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+    records = np.ndarray((total,), dtype=CANDLE_DTYPE, buffer=shm.buf)
+    _worker_buffers[name] = (shm, records)
+    return records
+
+
+def release_buffers():
+    """Close every block attached by this process (the owner still unlinks them)"""
+    for name in list(_worker_buffers):
+        _worker_buffers.pop(name)[0].close()
+
+
+def default_mp_context():
+    """forkserver bila tersedia, selain itu spawn - worker tidak mewarisi state Flask/threads"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+# Export
+__all__ = ['SharedCandleBuffer', 'ScanUnit', 'attach_buffer', 'release_buffers', 'default_mp_context']
@@ -9,6 +9,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 
+from .feature_frame import get_feature_frame
 from .professional_smc_analyzer import ProfessionalSMCAnalyzer
 from .analyzer import TechnicalAnalyzer
 from .enhanced_ai_engine import EnhancedAIEngine
@@ -935,17 +936,8 @@ class SharpSignalEngine:
     def _calculate_atr(self, df, period=14):
         """Calculate Average True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift(1))
-            low_close = abs(df['low'] - df['close'].shift(1))
-            
-            true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = true_range.rolling(window=period).mean()
-            
-            if hasattr(atr, 'iloc'):
-                return float(atr.iloc[-1])
-            else:
-                return 0.0
+            atr = get_feature_frame(df).get('atr', period=period)
+            return float(atr.iloc[-1])
         except:
             return 0.0
     
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+from .feature_frame import get_feature_frame
 from .professional_smc_analyzer import ProfessionalSMCAnalyzer
 from .price_action import PriceActionAnalyzer
 
@@ -41,8 +42,10 @@ class SignalEngine:
             # Convert DataFrame to list of dictionaries if needed
             if hasattr(df, 'to_dict'):
                 data = df.to_dict('records')
+                features = get_feature_frame(df)
             else:
                 data = df
+                features = None
             
             # 1. SMC Analysis
             smc_result = self.smc_analyzer.analyze_comprehensive(df, symbol, timeframe)
@@ -55,7 +58,7 @@ class SignalEngine:
             volume_signals = self._analyze_volume(data)
             
             # 4. Technical Indicators Analysis
-            technical_signals = self._analyze_technical_indicators(data)
+            technical_signals = self._analyze_technical_indicators(data, features)
             
             # 5. Orderbook Analysis (if available)
             orderbook_signals = self._analyze_orderbook(orderbook) if orderbook else {}
@@ -70,7 +73,7 @@ class SignalEngine:
             )
             
             # 8. Risk Management
-            risk_assessment = self._assess_risk(data, final_signal)
+            risk_assessment = self._assess_risk(data, final_signal, features)
             
             return {
                 'timestamp': datetime.now().isoformat(),
@@ -283,14 +286,14 @@ class SignalEngine:
             'volume_ratio': current_volume / avg_volume if avg_volume > 0 else 1
         }
     
-    def _analyze_technical_indicators(self, data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_technical_indicators(self, data: List[Dict], features=None) -> Dict[str, Any]:
         """Analyze technical indicators for signal generation"""
         signals = []
         
         # Basic RSI calculation
         closes = [candle['close'] for candle in data[-50:]]  # Last 50 closes
         if len(closes) >= 14:
-            rsi = self._calculate_rsi(closes)
+            rsi = self._calculate_rsi(closes) if features is None else self._latest_rsi(features)
             
             if rsi < 30:
                 signals.append({'type': 'rsi', 'signal': 'buy', 'strength': 70})
@@ -299,8 +302,12 @@ class SignalEngine:
         
         # Basic EMA trend
         if len(closes) >= 21:
-            ema_21 = self._calculate_ema(closes, 21)
-            ema_50 = self._calculate_ema(closes, 50) if len(closes) >= 50 else ema_21
+            if features is None:
+                ema_21 = self._calculate_ema(closes, 21)
+                ema_50 = self._calculate_ema(closes, 50) if len(closes) >= 50 else ema_21
+            else:
+                ema_21 = float(features.get('ema', period=21, adjust=False).iloc[-1])
+                ema_50 = float(features.get('ema', period=50, adjust=False).iloc[-1]) if len(closes) >= 50 else ema_21
             
             current_price = closes[-1]
             if ema_21 > ema_50 and current_price > ema_21:
@@ -398,12 +405,15 @@ class SignalEngine:
             'reasoning': f"Weighted analysis across multiple timeframes and indicators"
         }
     
-    def _assess_risk(self, data: List[Dict], final_signal: Dict) -> Dict[str, Any]:
+    def _assess_risk(self, data: List[Dict], final_signal: Dict, features=None) -> Dict[str, Any]:
         """Assess risk for the trade setup"""
         current_price = data[-1]['close']
         
         # Calculate ATR for volatility
-        atr = self._calculate_atr(data[-20:])
+        if features is not None and len(features) > 14:
+            atr = float(features.get('atr', period=14).iloc[-1])
+        else:
+            atr = self._calculate_atr(data[-20:])
         
         # Risk management based on signal strength
         confidence = final_signal.get('confidence', 0)
@@ -462,6 +472,13 @@ class SignalEngine:
             'risk_reward_ratio': abs(take_profit_1 - current_price) / abs(stop_loss - current_price)
         }
     
+    def _latest_rsi(self, features, period: int = 14) -> float:
+        """Latest RSI from the shared feature frame (same rules as _calculate_rsi)"""
+        if len(features) < period + 1:
+            return 50.0
+        rsi = float(features.get('rsi', period=period).iloc[-1])
+        return 100.0 if np.isnan(rsi) else rsi  # flat window: avg_loss == 0
+    
     def _calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """Calculate RSI"""
         if len(prices) < period + 1:
@@ -321,8 +321,8 @@ class SignalSelfLearningEngine:
                 end_time=end_dt
             )
             
-            if candles and len(candles) > 0:
-                return pd.DataFrame(candles)
+            if candles is not None and not candles.empty:
+                return candles.reset_index()
             
         except Exception as e:
             logger.error(f"Error fetching historical data: {e}")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+SMC Kernel - NumPy structure detection for ProfessionalSMCAnalyzer
+Swing high/low, BOS/CHoCH, order block, FVG dan equal high/low liquidity pool
+dihitung dalam beberapa pass array (tanpa loop per candle) dan dikembalikan
+sebagai structured array yang ringkas.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BULLISH = 1
+BEARISH = -1
+
+BOS = 0
+CHOCH = 1
+
+SWING_DTYPE = np.dtype([
+    ('index', '<i8'),
+    ('price', '<f8'),
+    ('kind', 'i1'),        # +1 swing high, -1 swing low
+])
+
+STRUCTURE_DTYPE = np.dtype([
+    ('index', '<i8'),       # candle whose close broke the level
+    ('swing_index', '<i8'), # swing that was broken
+    ('level', '<f8'),
+    ('direction', 'i1'),    # BULLISH / BEARISH
+    ('kind', 'i1'),         # BOS / CHOCH
+])
+
+ORDER_BLOCK_DTYPE = np.dtype([
+    ('index', '<i8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('direction', 'i1'),
+    ('strength', '<f8'),
+])
+
+FVG_DTYPE = np.dtype([
+    ('index', '<i8'),       # middle candle of the three-candle pattern
+    ('top', '<f8'),
+    ('bottom', '<f8'),
+    ('direction', 'i1'),
+])
+
+LIQUIDITY_DTYPE = np.dtype([
+    ('first_index', '<i8'),
+    ('last_index', '<i8'),
+    ('price', '<f8'),
+    ('touches', '<i8'),
+    ('side', 'i1'),         # +1 equal highs (buy-side), -1 equal lows (sell-side)
+])
+
+
+@dataclass
+class SMCStructure:
+    """Kernel output; every field is a structured array ordered by index"""
+    swings: np.ndarray
+    structure: np.ndarray
+    order_blocks: np.ndarray
+    fvgs: np.ndarray
+    liquidity: np.ndarray
+
+
+def swing_masks(high: np.ndarray, low: np.ndarray, length: int = 2):
+    """
+    Boolean masks of swing highs / lows.
+
+    Candle i is a swing high when it holds the first maximum of the
+    window [i - length, i + length]; swing lows mirror this on the lows.
+    """
+    n = len(high)
+    is_high = np.zeros(n, dtype=bool)
+    is_low = np.zeros(n, dtype=bool)
+    window = 2 * length + 1
+    if n < window:
+        return is_high, is_low
+    is_high[length:n - length] = sliding_window_view(high, window).argmax(axis=1) == length
+    is_low[length:n - length] = sliding_window_view(low, window).argmin(axis=1) == length
+    return is_high, is_low
+
+
+def find_swings(high: np.ndarray, low: np.ndarray, length: int = 2) -> np.ndarray:
+    is_high, is_low = swing_masks(high, low, length)
+    indices = np.flatnonzero(is_high | is_low)
+    swings = np.empty(len(indices), dtype=SWING_DTYPE)
+    swings['index'] = indices
+    swings['kind'] = np.where(is_high[indices], 1, -1)
+    swings['price'] = np.where(is_high[indices], high[indices], low[indices])
+    return swings
+
+
+def _first_breaks(close: np.ndarray, swing_idx: np.ndarray, levels: np.ndarray,
+                  confirm_lag: int, direction: int):
+    """
+    For each swing, the first close beyond its level while it is the latest
+    confirmed swing of its side. Returns (break_index, swing_position).
+    """
+    n = len(close)
+    if not len(swing_idx):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # Swing k becomes known `confirm_lag` bars later; forward-fill the active swing id
+    active = np.full(n, -1, dtype=np.int64)
+    confirmed_at = np.minimum(swing_idx + confirm_lag, n - 1)
+    active[confirmed_at] = np.arange(len(swing_idx))
+    active = np.maximum.accumulate(active)
+
+    valid = active >= 0
+    level = np.where(valid, levels[np.maximum(active, 0)], np.nan)
+    with np.errstate(invalid='ignore'):
+        crossed = valid & ((close > level) if direction == BULLISH else (close < level))
+
+    bars = np.flatnonzero(crossed)
+    swing_pos, first = np.unique(active[bars], return_index=True)
+    return bars[first], swing_pos
+
+
+def detect_structure(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     swings: np.ndarray, length: int = 2) -> np.ndarray:
+    """
+    BOS / CHoCH events.
+
+    A close above the active swing high is a bullish break, below the active
+    swing low a bearish break. A break in the same direction as the previous
+    one is a BOS, a break against it is a CHoCH.
+    """
+    highs = swings[swings['kind'] == 1]
+    lows = swings[swings['kind'] == -1]
+
+    up_bars, up_pos = _first_breaks(close, highs['index'], highs['price'], length, BULLISH)
+    down_bars, down_pos = _first_breaks(close, lows['index'], lows['price'], length, BEARISH)
+
+    events = np.empty(len(up_bars) + len(down_bars), dtype=STRUCTURE_DTYPE)
+    events['index'] = np.concatenate([up_bars, down_bars])
+    events['swing_index'] = np.concatenate([highs['index'][up_pos], lows['index'][down_pos]])
+    events['level'] = np.concatenate([highs['price'][up_pos], lows['price'][down_pos]])
+    events['direction'] = np.concatenate([
+        np.full(len(up_bars), BULLISH), np.full(len(down_bars), BEARISH)
+    ])
+    events = events[np.argsort(events['index'], kind='stable')]
+
+    previous = np.concatenate([[0], events['direction'][:-1]])
+    events['kind'] = np.where((previous != 0) & (previous != events['direction']), CHOCH, BOS)
+    return events
+
+
+def find_order_blocks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                      volume: np.ndarray, volume_window: int = 20, volume_factor: float = 1.5,
+                      start: int = 10, end_offset: int = 5) -> np.ndarray:
+    """High-volume displacement candles (volume > factor x rolling mean, non-zero body)"""
+    n = len(close)
+    avg_volume = np.full(n, np.nan)
+    if n >= volume_window:
+        avg_volume[volume_window - 1:] = sliding_window_view(volume, volume_window).mean(axis=1)
+
+    candidates = np.zeros(n, dtype=bool)
+    candidates[start:max(n - end_offset, start)] = True
+    with np.errstate(invalid='ignore'):
+        mask = candidates & (volume > avg_volume * volume_factor) & (np.abs(close - open_) > 0)
+
+    indices = np.flatnonzero(mask)
+    blocks = np.empty(len(indices), dtype=ORDER_BLOCK_DTYPE)
+    blocks['index'] = indices
+    blocks['high'] = high[indices]
+    blocks['low'] = low[indices]
+    blocks['direction'] = np.where(close[indices] > open_[indices], BULLISH, BEARISH)
+    blocks['strength'] = np.minimum(volume[indices] / avg_volume[indices], 3.0)
+    return blocks
+
+
+def find_fvgs(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """Three-candle fair value gaps between candle i-2 and candle i"""
+    if len(high) < 3:
+        return np.empty(0, dtype=FVG_DTYPE)
+    first_high, first_low = high[:-2], low[:-2]
+    third_high, third_low = high[2:], low[2:]
+
+    bullish = first_high < third_low
+    bearish = ~bullish & (first_low > third_high)
+    positions = np.flatnonzero(bullish | bearish)
+    is_bullish = bullish[positions]
+
+    gaps = np.empty(len(positions), dtype=FVG_DTYPE)
+    gaps['index'] = positions + 1
+    gaps['direction'] = np.where(is_bullish, BULLISH, BEARISH)
+    gaps['top'] = np.where(is_bullish, third_low[positions], first_low[positions])
+    gaps['bottom'] = np.where(is_bullish, first_high[positions], third_high[positions])
+    return gaps
+
+
+def _equal_level_pools(indices: np.ndarray, prices: np.ndarray, tolerance: float, side: int) -> np.ndarray:
+    if len(prices) < 2:
+        return np.empty(0, dtype=LIQUIDITY_DTYPE)
+    order = np.argsort(prices, kind='stable')
+    sorted_prices = prices[order]
+    sorted_indices = indices[order]
+
+    # Neighbouring (sorted) swings within tolerance share a pool
+    breaks = np.diff(sorted_prices) > tolerance * np.abs(sorted_prices[:-1])
+    starts = np.concatenate([[0], np.flatnonzero(breaks) + 1])
+    touches = np.diff(np.concatenate([starts, [len(sorted_prices)]]))
+    keep = touches >= 2
+
+    pools = np.empty(int(keep.sum()), dtype=LIQUIDITY_DTYPE)
+    pools['price'] = (np.add.reduceat(sorted_prices, starts) / touches)[keep]
+    pools['first_index'] = np.minimum.reduceat(sorted_indices, starts)[keep]
+    pools['last_index'] = np.maximum.reduceat(sorted_indices, starts)[keep]
+    pools['touches'] = touches[keep]
+    pools['side'] = side
+    return pools
+
+
+def find_liquidity_pools(swings: np.ndarray, tolerance: float = 0.001) -> np.ndarray:
+    """Equal highs / equal lows: swing prices clustered within a relative tolerance"""
+    highs = swings[swings['kind'] == 1]
+    lows = swings[swings['kind'] == -1]
+    pools = np.concatenate([
+        _equal_level_pools(highs['index'], highs['price'], tolerance, 1),
+        _equal_level_pools(lows['index'], lows['price'], tolerance, -1),
+    ])
+    return pools[np.argsort(pools['last_index'], kind='stable')]
+
+
+def analyze_smc(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                volume: np.ndarray, swing_length: int = 2,
+                equal_tolerance: float = 0.001) -> SMCStructure:
+    """Run every detector over float arrays (oldest candle first)"""
+    open_, high, low, close, volume = (
+        np.asarray(values, dtype=float) for values in (open_, high, low, close, volume)
+    )
+    swings = find_swings(high, low, swing_length)
+    return SMCStructure(
+        swings=swings,
+        structure=detect_structure(high, low, close, swings, swing_length),
+        order_blocks=find_order_blocks(open_, high, low, close, volume),
+        fvgs=find_fvgs(high, low),
+        liquidity=find_liquidity_pools(swings, equal_tolerance),
+    )
+
+
+# Export
+__all__ = [
+    'SMCStructure', 'analyze_smc', 'find_swings', 'swing_masks', 'detect_structure',
+    'find_order_blocks', 'find_fvgs', 'find_liquidity_pools',
+    'SWING_DTYPE', 'STRUCTURE_DTYPE', 'ORDER_BLOCK_DTYPE', 'FVG_DTYPE', 'LIQUIDITY_DTYPE',
+    'BULLISH', 'BEARISH', 'BOS', 'CHOCH'
+]
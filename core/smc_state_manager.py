@@ -2,9 +2,15 @@
 """
 SMC State Manager - Deterministik SMC rule tracking per simbol/TF
 Menyimpan state struktur untuk audit dan konsistensi
+
+State disimpan per key (symbol_timeframe) di SQLite WAL: setiap update hanya
+meng-upsert satu row (O(1) I/O, crash-safe lewat WAL), bukan menulis ulang
+seluruh file JSON. logs/smc_states.json lama di-import sekali bila database kosong.
 """
 import logging
 import json
+import sqlite3
+import threading
 import time
 from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
@@ -13,6 +19,16 @@ from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS smc_states (
+    state_key TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    last_updated REAL NOT NULL,
+    state_json TEXT NOT NULL
+);
+"""
+
 class StructureType(Enum):
     BOS = "break_of_structure"
     CHOCH = "change_of_character"
@@ -68,6 +84,39 @@ class SMCState:
         if self.liquidity_sweeps is None:
             self.liquidity_sweeps = []
 
+
+def _swing_type(value: Any) -> SwingType:
+    """SwingType dari value enum, nama, atau format lama 'SwingType.HH'"""
+    if isinstance(value, SwingType):
+        return value
+    text = str(value)
+    if text.startswith('SwingType.'):
+        return SwingType[text.split('.', 1)[1]]
+    try:
+        return SwingType(text)
+    except ValueError:
+        return SwingType[text]
+
+
+def state_to_dict(state: SMCState) -> Dict[str, Any]:
+    """JSON-serializable dict (SwingType disimpan sebagai value)"""
+    data = asdict(state)
+    for field in ('swing_highs', 'swing_lows'):
+        for swing in data[field]:
+            swing['swing_type'] = _swing_type(swing['swing_type']).value
+    return data
+
+
+def state_from_dict(data: Dict[str, Any]) -> SMCState:
+    state = SMCState(**data)
+    for field in ('swing_highs', 'swing_lows'):
+        setattr(state, field, [
+            SwingPoint(**{**sp, 'swing_type': _swing_type(sp['swing_type'])}) if isinstance(sp, dict) else sp
+            for sp in getattr(state, field)
+        ])
+    return state
+
+
 class SMCStateManager:
     def __init__(self, data_dir: str = "logs"):
         self.data_dir = Path(data_dir)
@@ -76,6 +125,15 @@ class SMCStateManager:
         # In-memory state cache
         self.states: Dict[str, SMCState] = {}
         
+        # Per-key persistent store
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.data_dir / "smc_states.db"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        
         # Load existing states
         self._load_states()
         
@@ -336,62 +394,72 @@ class SMCStateManager:
     
     def _load_states(self):
         """Load SMC states from disk"""
+        try:
+            with self._lock:
+                rows = self._conn.execute("SELECT state_key, state_json FROM smc_states").fetchall()
+            
+            for key, state_json in rows:
+                self.states[key] = state_from_dict(json.loads(state_json))
+            
+            if not rows:
+                self._import_legacy_json()
+            
+            logger.info(f"Loaded {len(self.states)} SMC states")
+            
+        except Exception as e:
+            logger.warning(f"Failed to load SMC states: {e}")
+    
+    def _import_legacy_json(self):
+        """One-time import dari smc_states.json (format lama); file tidak diubah"""
         states_file = self.data_dir / "smc_states.json"
+        if not states_file.exists():
+            return
         
-        if states_file.exists():
-            try:
-                with open(states_file, 'r') as f:
-                    data = json.load(f)
-                    
-                for key, state_data in data.items():
-                    # Convert back to SMCState object
-                    state = SMCState(**state_data)
-                    
-                    # Convert swing points back to objects
-                    state.swing_highs = [
-                        SwingPoint(**sp) if isinstance(sp, dict) else sp 
-                        for sp in state.swing_highs
-                    ]
-                    state.swing_lows = [
-                        SwingPoint(**sp) if isinstance(sp, dict) else sp
-                        for sp in state.swing_lows
-                    ]
-                    
-                    self.states[key] = state
-                    
-                logger.info(f"Loaded {len(self.states)} SMC states")
-                
-            except Exception as e:
-                logger.warning(f"Failed to load SMC states: {e}")
+        with open(states_file, 'r') as f:
+            data = json.load(f)
+        
+        for key, state_data in data.items():
+            self.states[key] = state_from_dict(state_data)
+        
+        self._save_all_states()
+        logger.info(f"Imported {len(data)} SMC states from {states_file}")
+    
+    @staticmethod
+    def _state_row(state_key: str, state: SMCState) -> Tuple[str, str, str, float, str]:
+        return (state_key, state.symbol, state.timeframe, state.last_updated,
+                json.dumps(state_to_dict(state), separators=(',', ':'), default=str))
     
     def _save_state(self, state_key: str, state: SMCState):
-        """Save single state update"""
+        """Save single state update (satu upsert, hanya key ini)"""
         try:
             # Update in-memory cache
             self.states[state_key] = state
             
-            # Save to disk periodically
-            self._save_all_states()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO smc_states VALUES (?, ?, ?, ?, ?)",
+                    self._state_row(state_key, state)
+                )
             
         except Exception as e:
             logger.warning(f"Failed to save state {state_key}: {e}")
     
     def _save_all_states(self):
-        """Save all states to disk"""
+        """Save all states to disk (satu transaksi)"""
         try:
-            states_file = self.data_dir / "smc_states.json"
-            
-            # Convert states to serializable format
-            serializable_states = {}
-            for key, state in self.states.items():
-                state_dict = asdict(state)
-                # Convert SwingPoint objects to dicts
-                state_dict['swing_highs'] = [asdict(sp) if hasattr(sp, '__dict__') else sp for sp in state_dict['swing_highs']]
-                state_dict['swing_lows'] = [asdict(sp) if hasattr(sp, '__dict__') else sp for sp in state_dict['swing_lows']]
-                serializable_states[key] = state_dict
-            
-            with open(states_file, 'w') as f:
-                json.dump(serializable_states, f, indent=2, default=str)
+            rows = [self._state_row(key, state) for key, state in self.states.items()]
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany("INSERT OR REPLACE INTO smc_states VALUES (?, ?, ?, ?, ?)", rows)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
                 
         except Exception as e:
-            logger.error(f"Failed to save all SMC states: {e}")
\ No newline at end of file
+            logger.error(f"Failed to save all SMC states: {e}")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicators - Incremental indicator state per symbol/timeframe
+Setiap indikator menyimpan state ringkas (EMA terakhir, rata-rata Wilder,
+running sums window) sehingga candle baru cukup di-update O(1) tanpa
+menghitung ulang seluruh window. Live candle (belum close) hanya di-preview
+tanpa mengubah state, dan state bisa di-checkpoint ke disk.
+"""
+import json
+import logging
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+DAY_MS = 24 * 60 * 60 * 1000
+
+# (timestamp_ms, open, high, low, close, volume)
+Candle = Tuple[int, float, float, float, float, float]
+
+
+def candle_tuple(candle) -> Candle:
+    """Normalize a candle dict / CANDLE_DTYPE record / Series to a plain tuple"""
+    if isinstance(candle, tuple):
+        # Already normalized (e.g. from iter_candles)
+        return candle
+    return (int(candle['timestamp']), float(candle['open']), float(candle['high']),
+            float(candle['low']), float(candle['close']), float(candle['volume'] or 0.0))
+
+
+class StreamingIndicator(ABC):
+    """
+    Base class.
+
+    update(candle) meng-commit candle yang sudah close; preview(candle)
+    menghitung nilai untuk live candle dari state ter-commit tanpa mengubahnya.
+    """
+
+    state_fields: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def update(self, candle: Candle):
+        ...
+
+    @abstractmethod
+    def preview(self, candle: Candle) -> Any:
+        ...
+
+    @property
+    @abstractmethod
+    def value(self) -> Any:
+        ...
+
+    def params(self) -> Dict[str, Any]:
+        return {}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.state_fields}
+
+    def set_state(self, state: Dict[str, Any]):
+        for field in self.state_fields:
+            setattr(self, field, state[field])
+
+
+class RollingWindow:
+    """
+    Fixed-size window with running sum / sum of squares.
+
+    Sums are kept relative to a shift (close to the window mean) to avoid
+    cancellation on large prices, and recomputed exactly once per `size`
+    pushes so floating-point drift cannot accumulate (amortized O(1)).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.shift = 0.0
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self.pushes = 0
+
+    def sums_with(self, x: float) -> Tuple[int, float, float]:
+        """(count, s1, s2) the window would have after pushing x"""
+        shift = self.shift if self.values else x
+        s1, s2 = self.s1 + (x - shift), self.s2 + (x - shift) ** 2
+        if len(self.values) == self.size:
+            old = self.values[0] - shift
+            s1, s2 = s1 - old, s2 - old * old
+        return min(len(self.values) + 1, self.size), s1, s2
+
+    def push(self, x: float):
+        if not self.values:
+            self.shift = x
+        _, self.s1, self.s2 = self.sums_with(x)
+        self.values.append(x)
+        self.pushes += 1
+        if self.pushes % self.size == 0:
+            self._resync()
+
+    def _resync(self):
+        self.shift = sum(self.values) / len(self.values)
+        deviations = [v - self.shift for v in self.values]
+        self.s1 = sum(deviations)
+        self.s2 = sum(d * d for d in deviations)
+
+    def mean(self, count: int, s1: float) -> float:
+        return self.shift + s1 / count if count else NAN
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'values': list(self.values), 'shift': self.shift, 's1': self.s1,
+                's2': self.s2, 'pushes': self.pushes}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.values = deque(state['values'], maxlen=self.size)
+        self.shift, self.s1, self.s2 = state['shift'], state['s1'], state['s2']
+        self.pushes = state['pushes']
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA rekursif (setara ewm(span, adjust=False)); seeded dengan nilai pertama"""
+
+    state_fields = ('ema', 'count')
+
+    def __init__(self, period: int = 20, min_periods: int = 0):
+        self.period = period
+        self.min_periods = min_periods
+        self.alpha = 2 / (period + 1)
+        self.ema = NAN
+        self.count = 0
+
+    def next_value(self, x: float) -> float:
+        return x if self.count == 0 else (1 - self.alpha) * self.ema + self.alpha * x
+
+    def push(self, x: float):
+        self.ema = self.next_value(x)
+        self.count += 1
+
+    def _output(self, ema: float, count: int) -> float:
+        return ema if count >= max(self.min_periods, 1) else NAN
+
+    def update(self, candle: Candle):
+        self.push(candle[4])
+
+    def preview(self, candle: Candle) -> float:
+        return self._output(self.next_value(candle[4]), self.count + 1)
+
+    @property
+    def value(self) -> float:
+        return self._output(self.ema, self.count)
+
+    def params(self) -> Dict[str, Any]:
+        return {'period': self.period, 'min_periods': self.min_periods}
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI (setara feature 'rsi' method='wilder' / library ta)"""
+
+    state_fields = ('prev_close', 'avg_gain', 'avg_loss', 'count')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1 / period
+        self.prev_close = NAN
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+
+    def _next(self, close: float) -> Tuple[float, float]:
+        if self.count == 0:
+            return 0.0, 0.0
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        return ((1 - self.alpha) * self.avg_gain + self.alpha * gain,
+                (1 - self.alpha) * self.avg_loss + self.alpha * loss)
+
+    def _output(self, avg_gain: float, avg_loss: float, count: int) -> float:
+        if count < self.period:
+            return NAN
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def update(self, candle: Candle):
+        self.avg_gain, self.avg_loss = self._next(candle[4])
+        self.prev_close = candle[4]
+        self.count += 1
+
+    def preview(self, candle: Candle) -> float:
+        return self._output(*self._next(candle[4]), self.count + 1)
+
+    @property
+    def value(self) -> float:
+        return self._output(self.avg_gain, self.avg_loss, self.count)
+
+    def params(self) -> Dict[str, Any]:
+        return {'period': self.period}
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD dari tiga EMA rekursif (setara feature 'macd' adjust=False)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.ema_fast = StreamingEMA(fast)
+        self.ema_slow = StreamingEMA(slow)
+        self.ema_signal = StreamingEMA(signal, min_periods=signal)
+        self.count = 0
+
+    def _output(self, macd: float, signal: float, count: int) -> Dict[str, float]:
+        if count < self.slow:
+            return {'macd': NAN, 'signal': NAN, 'histogram': NAN}
+        return {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+
+    def update(self, candle: Candle):
+        self.ema_fast.push(candle[4])
+        self.ema_slow.push(candle[4])
+        self.count += 1
+        if self.count >= self.slow:
+            # Signal line starts at the first valid MACD value
+            self.ema_signal.push(self.ema_fast.ema - self.ema_slow.ema)
+
+    def preview(self, candle: Candle) -> Dict[str, float]:
+        macd = self.ema_fast.next_value(candle[4]) - self.ema_slow.next_value(candle[4])
+        signal = NAN
+        if self.count + 1 >= self.slow:
+            signal = self.ema_signal._output(self.ema_signal.next_value(macd), self.ema_signal.count + 1)
+        return self._output(macd, signal, self.count + 1)
+
+    @property
+    def value(self) -> Dict[str, float]:
+        return self._output(self.ema_fast.ema - self.ema_slow.ema, self.ema_signal.value, self.count)
+
+    def params(self) -> Dict[str, Any]:
+        return {'fast': self.fast, 'slow': self.slow, 'signal': self.signal}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'count': self.count, 'fast': self.ema_fast.get_state(),
+                'slow': self.ema_slow.get_state(), 'signal': self.ema_signal.get_state()}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.count = state['count']
+        self.ema_fast.set_state(state['fast'])
+        self.ema_slow.set_state(state['slow'])
+        self.ema_signal.set_state(state['signal'])
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger Bands via running sums atas window close"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0, ddof: int = 1):
+        self.period = period
+        self.std_dev = std_dev
+        self.ddof = ddof
+        self.window = RollingWindow(period)
+
+    def _output(self, count: int, s1: float, s2: float) -> Dict[str, float]:
+        if count < self.period or count <= self.ddof:
+            return {'upper': NAN, 'middle': NAN, 'lower': NAN, 'width': NAN}
+        middle = self.window.mean(count, s1)
+        variance = max((s2 - s1 * s1 / count) / (count - self.ddof), 0.0)
+        band = math.sqrt(variance) * self.std_dev
+        return {
+            'upper': middle + band,
+            'middle': middle,
+            'lower': middle - band,
+            'width': (2 * band) / middle if middle else NAN
+        }
+
+    def update(self, candle: Candle):
+        self.window.push(candle[4])
+
+    def preview(self, candle: Candle) -> Dict[str, float]:
+        return self._output(*self.window.sums_with(candle[4]))
+
+    @property
+    def value(self) -> Dict[str, float]:
+        return self._output(len(self.window.values), self.window.s1, self.window.s2)
+
+    def params(self) -> Dict[str, Any]:
+        return {'period': self.period, 'std_dev': self.std_dev, 'ddof': self.ddof}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'window': self.window.get_state()}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.window.set_state(state['window'])
+
+
+class StreamingATR(StreamingIndicator):
+    """ATR sebagai rolling mean true range (setara feature 'atr')"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = NAN
+        self.window = RollingWindow(period)
+
+    def _true_range(self, candle: Candle) -> float:
+        high_low = candle[2] - candle[3]
+        if math.isnan(self.prev_close):
+            return high_low
+        return max(high_low, abs(candle[2] - self.prev_close), abs(candle[3] - self.prev_close))
+
+    def _output(self, count: int, s1: float, s2: float) -> float:
+        return self.window.mean(count, s1) if count >= self.period else NAN
+
+    def update(self, candle: Candle):
+        self.window.push(self._true_range(candle))
+        self.prev_close = candle[4]
+
+    def preview(self, candle: Candle) -> float:
+        return self._output(*self.window.sums_with(self._true_range(candle)))
+
+    @property
+    def value(self) -> float:
+        return self._output(len(self.window.values), self.window.s1, self.window.s2)
+
+    def params(self) -> Dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'prev_close': self.prev_close, 'window': self.window.get_state()}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.prev_close = state['prev_close']
+        self.window.set_state(state['window'])
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-Balance Volume (setara on_balance_volume)"""
+
+    state_fields = ('obv', 'prev_close', 'count')
+
+    def __init__(self):
+        self.obv = 0.0
+        self.prev_close = NAN
+        self.count = 0
+
+    def _next(self, candle: Candle) -> float:
+        close, volume = candle[4], candle[5]
+        if self.count == 0:
+            return volume
+        if close > self.prev_close:
+            return self.obv + volume
+        if close < self.prev_close:
+            return self.obv - volume
+        return self.obv
+
+    def update(self, candle: Candle):
+        self.obv = self._next(candle)
+        self.prev_close = candle[4]
+        self.count += 1
+
+    def preview(self, candle: Candle) -> float:
+        return self._next(candle)
+
+    @property
+    def value(self) -> float:
+        return self.obv if self.count else NAN
+
+
+class StreamingVWAP(StreamingIndicator):
+    """VWAP kumulatif dari typical price; reset per sesi bila session_ms diisi"""
+
+    state_fields = ('cum_pv', 'cum_volume', 'session_start')
+
+    def __init__(self, session_ms: Optional[int] = DAY_MS):
+        self.session_ms = session_ms
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+        self.session_start = None
+
+    def _next(self, candle: Candle) -> Tuple[float, float, Optional[int]]:
+        session = candle[0] - candle[0] % self.session_ms if self.session_ms else 0
+        cum_pv, cum_volume = (self.cum_pv, self.cum_volume) if session == self.session_start else (0.0, 0.0)
+        typical_price = (candle[2] + candle[3] + candle[4]) / 3
+        return cum_pv + typical_price * candle[5], cum_volume + candle[5], session
+
+    @staticmethod
+    def _output(cum_pv: float, cum_volume: float) -> float:
+        return cum_pv / cum_volume if cum_volume > 0 else NAN
+
+    def update(self, candle: Candle):
+        self.cum_pv, self.cum_volume, self.session_start = self._next(candle)
+
+    def preview(self, candle: Candle) -> float:
+        cum_pv, cum_volume, _ = self._next(candle)
+        return self._output(cum_pv, cum_volume)
+
+    @property
+    def value(self) -> float:
+        return self._output(self.cum_pv, self.cum_volume)
+
+    def params(self) -> Dict[str, Any]:
+        return {'session_ms': self.session_ms}
+
+
+INDICATOR_TYPES = {
+    cls.__name__: cls for cls in (
+        StreamingEMA, StreamingRSI, StreamingMACD, StreamingBollinger,
+        StreamingATR, StreamingOBV, StreamingVWAP
+    )
+}
+
+
+def default_indicators() -> Dict[str, StreamingIndicator]:
+    """Indicator set maintained per symbol/timeframe"""
+    return {
+        'ema_20': StreamingEMA(20),
+        'ema_50': StreamingEMA(50),
+        'rsi': StreamingRSI(14),
+        'macd': StreamingMACD(12, 26, 9),
+        'bollinger': StreamingBollinger(20, 2.0),
+        'atr': StreamingATR(14),
+        'obv': StreamingOBV(),
+        'vwap': StreamingVWAP(),
+    }
+
+
+def _clean(value: Any) -> Any:
+    """NaN -> None so snapshots stay JSON/SocketIO friendly"""
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class StreamingIndicatorSet:
+    """All streaming indicators for one symbol/timeframe"""
+
+    def __init__(self, symbol: str, timeframe: str,
+                 indicators: Optional[Dict[str, StreamingIndicator]] = None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.indicators = indicators if indicators is not None else default_indicators()
+        self.last_timestamp: Optional[int] = None
+        self.closed_count = 0
+        self._live_candle: Optional[Candle] = None
+        self._live_values: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def update(self, candle, closed: bool = True) -> Dict[str, Any]:
+        """
+        Apply a candle.
+
+        closed=True meng-commit bar ke state; closed=False (live tick) hanya
+        menghitung preview. Candle dengan timestamp <= bar terakhir di-skip.
+        """
+        candle = candle_tuple(candle)
+        with self._lock:
+            if self.last_timestamp is not None and candle[0] <= self.last_timestamp:
+                return self._snapshot()
+
+            if closed:
+                for indicator in self.indicators.values():
+                    indicator.update(candle)
+                self.last_timestamp = candle[0]
+                self.closed_count += 1
+                if self._live_candle is not None and self._live_candle[0] <= candle[0]:
+                    self._live_candle = None
+            else:
+                self._live_candle = candle
+
+            # A live bar can arrive before the previous bar's close; re-preview after commits
+            self._live_values = None
+            if self._live_candle is not None:
+                self._live_values = {
+                    name: indicator.preview(self._live_candle)
+                    for name, indicator in self.indicators.items()
+                }
+            return self._snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        live = self._live_values is not None
+        values = self._live_values if live else {
+            name: indicator.value for name, indicator in self.indicators.items()
+        }
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'timestamp': self._live_candle[0] if live else self.last_timestamp,
+            'live': live,
+            'closed_bars': self.closed_count,
+            'values': _clean(values)
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'symbol': self.symbol,
+                'timeframe': self.timeframe,
+                'last_timestamp': self.last_timestamp,
+                'closed_count': self.closed_count,
+                'indicators': {
+                    name: {
+                        'type': type(indicator).__name__,
+                        'params': indicator.params(),
+                        'state': indicator.get_state()
+                    }
+                    for name, indicator in self.indicators.items()
+                }
+            }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingIndicatorSet':
+        indicators = {}
+        for name, spec in state['indicators'].items():
+            indicator = INDICATOR_TYPES[spec['type']](**spec['params'])
+            indicator.set_state(spec['state'])
+            indicators[name] = indicator
+        restored = cls(state['symbol'], state['timeframe'], indicators)
+        restored.last_timestamp = state['last_timestamp']
+        restored.closed_count = state.get('closed_count', 0)
+        return restored
+
+
+def iter_candles(candles) -> Iterable[Candle]:
+    """Oldest-first candle tuples from CANDLE_DTYPE records, a DataFrame or a list of dicts"""
+    if candles is None:
+        return []
+    if isinstance(candles, pd.DataFrame):
+        if 'timestamp' in candles.columns:
+            timestamps = candles['timestamp']
+            if pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = pd.DatetimeIndex(timestamps).asi8 // 10**6
+        else:
+            timestamps = pd.DatetimeIndex(candles.index).asi8 // 10**6
+        rows = zip(np.asarray(timestamps, dtype=np.int64), candles['open'], candles['high'],
+                   candles['low'], candles['close'], candles['volume'])
+        return sorted(((int(ts), float(o), float(h), float(l), float(c), float(v))
+                       for ts, o, h, l, c, v in rows), key=lambda candle: candle[0])
+    return sorted((candle_tuple(candle) for candle in candles), key=lambda candle: candle[0])
+
+
+class StreamingIndicatorManager:
+    """
+    Streaming indicator sets per (symbol, timeframe).
+
+    Set baru di-restore dari checkpoint lalu di-catch-up dari CandleStore
+    (hanya candle setelah checkpoint), sehingga restart worker tidak perlu
+    menghitung ulang seluruh history.
+    """
+
+    def __init__(self, checkpoint_dir: str = "logs/indicator_state", candle_store=None,
+                 indicator_factory: Callable[[], Dict[str, StreamingIndicator]] = default_indicators,
+                 warmup_bars: int = 1000, checkpoint_every: int = 50):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.candle_store = candle_store
+        self.indicator_factory = indicator_factory
+        self.warmup_bars = warmup_bars
+        self.checkpoint_every = checkpoint_every
+        self.sets: Dict[Tuple[str, str], StreamingIndicatorSet] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, timeframe: str) -> Path:
+        safe_symbol = symbol.replace('/', '-').upper()
+        return self.checkpoint_dir / f"{safe_symbol}_{timeframe}.json"
+
+    def get(self, symbol: str, timeframe: str) -> StreamingIndicatorSet:
+        """Get (or create, restore and catch up) the set for symbol/timeframe"""
+        key = (symbol, timeframe)
+        indicator_set = self.sets.get(key)
+        if indicator_set is not None:
+            return indicator_set
+
+        with self._lock:
+            indicator_set = self.sets.get(key)
+            if indicator_set is None:
+                indicator_set = self.restore(symbol, timeframe) or \
+                    StreamingIndicatorSet(symbol, timeframe, self.indicator_factory())
+                self._catch_up(indicator_set)
+                self.sets[key] = indicator_set
+        return indicator_set
+
+    def _catch_up(self, indicator_set: StreamingIndicatorSet):
+        if self.candle_store is None:
+            return
+        try:
+            if indicator_set.last_timestamp is None:
+                records = self.candle_store.tail(indicator_set.symbol, indicator_set.timeframe, self.warmup_bars)
+            else:
+                records = self.candle_store.read_range(
+                    indicator_set.symbol, indicator_set.timeframe, start_ms=indicator_set.last_timestamp + 1
+                )
+            # The newest stored candle may still be forming
+            self.warm_up(indicator_set.symbol, indicator_set.timeframe, records,
+                         last_is_live=True, indicator_set=indicator_set)
+        except Exception as e:
+            logger.error(f"Indicator catch-up failed for {indicator_set.symbol} {indicator_set.timeframe}: {e}")
+
+    def warm_up(self, symbol: str, timeframe: str, candles, last_is_live: bool = False,
+                indicator_set: Optional[StreamingIndicatorSet] = None) -> int:
+        """Feed historical candles; returns number of bars committed"""
+        indicator_set = indicator_set or self.get(symbol, timeframe)
+        candles = list(iter_candles(candles))
+        if last_is_live and candles:
+            live = candles.pop()
+        else:
+            live = None
+
+        before = indicator_set.closed_count
+        for candle in candles:
+            indicator_set.update(candle, closed=True)
+        if live is not None:
+            indicator_set.update(live, closed=False)
+        return indicator_set.closed_count - before
+
+    def update(self, symbol: str, timeframe: str, candle, closed: bool = True) -> Dict[str, Any]:
+        indicator_set = self.get(symbol, timeframe)
+        before = indicator_set.closed_count
+        snapshot = indicator_set.update(candle, closed=closed)
+
+        if (closed and self.checkpoint_every and indicator_set.closed_count != before
+                and indicator_set.closed_count % self.checkpoint_every == 0):
+            self._write_checkpoint(indicator_set)
+        return snapshot
+
+    def snapshot(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        return self.get(symbol, timeframe).snapshot()
+
+    # ===== CHECKPOINTS =====
+
+    def checkpoint(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> int:
+        """Write checkpoints for matching sets; returns number written"""
+        written = 0
+        for (set_symbol, set_timeframe), indicator_set in list(self.sets.items()):
+            if symbol is not None and set_symbol != symbol:
+                continue
+            if timeframe is not None and set_timeframe != timeframe:
+                continue
+            if self._write_checkpoint(indicator_set):
+                written += 1
+        return written
+
+    def _write_checkpoint(self, indicator_set: StreamingIndicatorSet) -> bool:
+        path = self._path(indicator_set.symbol, indicator_set.timeframe)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(indicator_set.to_state(), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to checkpoint indicators {indicator_set.symbol} {indicator_set.timeframe}: {e}")
+            return False
+
+    def restore(self, symbol: str, timeframe: str) -> Optional[StreamingIndicatorSet]:
+        path = self._path(symbol, timeframe)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r') as f:
+                return StreamingIndicatorSet.from_state(json.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable indicator checkpoint {path.name}: {e}")
+            return None
+
+    # ===== INGESTION =====
+
+    def attach(self, ingestor):
+        """Subscribe to OKXWebSocketIngestor live ticks and bar closes"""
+        ingestor.on('candle', lambda symbol, payload: self.update(
+            symbol, payload['timeframe'], payload['candle'], closed=False))
+        ingestor.on('candle_close', lambda symbol, payload: self.update(
+            symbol, payload['timeframe'], payload['candle'], closed=True))
+
+
+# Export
+__all__ = [
+    'StreamingIndicator', 'StreamingEMA', 'StreamingRSI', 'StreamingMACD', 'StreamingBollinger',
+    'StreamingATR', 'StreamingOBV', 'StreamingVWAP', 'StreamingIndicatorSet',
+    'StreamingIndicatorManager', 'default_indicators'
+]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Trade Journal - Append-only JSONL journal yang dipartisi per hari (UTC)
+Segment `YYYY-MM-DD.jsonl` berisi trade dengan entry timestamp di hari itu.
+Setiap segment punya sparse index `YYYY-MM-DD.idx`: satu baris per blok
+`block_size` record dengan byte offset dan min/max timestamp, sehingga query
+"sejak cutoff" hanya membuka segment yang relevan dan melompati blok lama -
+biaya baca sebanding dengan hasil, bukan dengan ukuran seluruh log.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 64
+SEGMENT_SUFFIX = '.jsonl'
+INDEX_SUFFIX = '.idx'
+
+
+def segment_name(timestamp: float) -> str:
+    """Nama segment (hari UTC) untuk sebuah timestamp"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class _OpenBlock:
+    """Blok yang belum penuh di ekor segment"""
+
+    __slots__ = ('offset', 'end', 'count', 'min_ts', 'max_ts')
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        self.end = offset
+        self.count = 0
+        self.min_ts = None
+        self.max_ts = None
+
+    def add(self, timestamp: float, end: int):
+        self.end = end
+        self.count += 1
+        self.min_ts = timestamp if self.min_ts is None else min(self.min_ts, timestamp)
+        self.max_ts = timestamp if self.max_ts is None else max(self.max_ts, timestamp)
+
+
+def _flock(f, operation: str):
+    """flock bila tersedia (POSIX); operation: 'LOCK_EX' / 'LOCK_SH' / 'LOCK_UN'"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), getattr(fcntl, operation))
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive flock pada lock file terpisah (tetap valid walau file data di-replace)"""
+    with open(path, 'a') as f:
+        _flock(f, 'LOCK_EX')
+        try:
+            yield
+        finally:
+            _flock(f, 'LOCK_UN')
+
+
+def _line_timestamp(line: bytes) -> float:
+    try:
+        return json.loads(line).get('timestamp', 0)
+    except ValueError:
+        return 0
+
+
+class TradeJournal:
+    """
+    Segmented, time-partitioned journal untuk record dict dengan field `timestamp`
+    Aman dipakai beberapa proses sekaligus (mis. worker gunicorn): penulisan ke
+    segment diserialisasi dengan flock dan posisi ekor selalu dihitung dari disk.
+
+    Args:
+        journal_dir: Folder segment + index
+        block_size: Jumlah record per entri sparse index
+    """
+
+    def __init__(self, journal_dir: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+
+    def _paths(self, name: str) -> Tuple[Path, Path]:
+        return self.journal_dir / f"{name}{SEGMENT_SUFFIX}", self.journal_dir / f"{name}{INDEX_SUFFIX}"
+
+    def segments(self) -> List[str]:
+        return sorted(path.stem for path in self.journal_dir.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def is_empty(self) -> bool:
+        return not self.segments()
+
+    def _load_index(self, index_path: Path) -> List[Dict[str, Any]]:
+        if not index_path.exists():
+            return []
+        with open(index_path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _tail_block(self, f, index: List[Dict[str, Any]]) -> _OpenBlock:
+        """Blok ekor segment: dari akhir index terakhir sampai baris utuh terakhir"""
+        block = _OpenBlock(index[-1]['end'] if index else 0)
+        f.seek(block.offset)
+        for line in iter(f.readline, b''):
+            if not line.endswith(b'\n'):
+                break
+            block.add(_line_timestamp(line), f.tell())
+        return block
+
+    def append(self, record: Dict[str, Any]):
+        self.extend([record])
+
+    def extend(self, records: List[Dict[str, Any]]):
+        """Append records; satu open/write per segment yang tersentuh"""
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_segment.setdefault(segment_name(record.get('timestamp', 0)), []).append(record)
+
+        with self._lock:
+            for name, items in by_segment.items():
+                segment_path, index_path = self._paths(name)
+                with open(segment_path, 'a+b') as f:
+                    _flock(f, 'LOCK_EX')
+                    try:
+                        self._append_locked(f, index_path, items)
+                    finally:
+                        _flock(f, 'LOCK_UN')
+
+    def _append_locked(self, f, index_path: Path, items: List[Dict[str, Any]]):
+        block = self._tail_block(f, self._load_index(index_path))
+        size = os.fstat(f.fileno()).st_size
+        if size > block.end:
+            # Writers hold the lock for the whole write, so a partial last line
+            # can only be left by a writer that crashed mid-append
+            logger.warning(f"Dropping {size - block.end} byte torn tail from {f.name}")
+            f.truncate(block.end)
+
+        lines = []
+        index_lines = []
+        position = block.end
+        for record in items:
+            line = (json.dumps(record) + '\n').encode()
+            lines.append(line)
+            position += len(line)
+            block.add(record.get('timestamp', 0), position)
+            if block.count >= self.block_size:
+                index_lines.append(json.dumps({
+                    'offset': block.offset, 'end': block.end, 'count': block.count,
+                    'min_ts': block.min_ts, 'max_ts': block.max_ts
+                }))
+                block = _OpenBlock(block.end)
+
+        f.write(b''.join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+        if index_lines:
+            with open(index_path, 'a') as index_file:
+                index_file.write('\n'.join(index_lines) + '\n')
+
+    def read_since(self, cutoff_time: float) -> Iterator[Dict[str, Any]]:
+        """Record dengan timestamp >= cutoff_time, urut per segment lalu urutan tulis"""
+        first = segment_name(max(cutoff_time, 0))
+        for name in [name for name in self.segments() if name >= first]:
+            segment_path, index_path = self._paths(name)
+            chunks = []
+            try:
+                f = open(segment_path, 'rb')
+            except FileNotFoundError:
+                # Pruned meanwhile
+                continue
+            with f:
+                _flock(f, 'LOCK_SH')
+                try:
+                    index = self._load_index(index_path)
+                    # Blocks wholly older than the cutoff are skipped without reading
+                    ranges = [(entry['offset'], entry['end']) for entry in index if entry['max_ts'] >= cutoff_time]
+                    ranges.append((index[-1]['end'] if index else 0, None))
+                    for start, end in ranges:
+                        f.seek(start)
+                        chunks.append(f.read() if end is None else f.read(end - start))
+                finally:
+                    _flock(f, 'LOCK_UN')
+
+            for data in chunks:
+                for line in data.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn line at the tail of a crashed write
+                        continue
+                    if record.get('timestamp', 0) >= cutoff_time:
+                        yield record
+
+    def prune_before(self, cutoff_time: float) -> int:
+        """Hapus segment yang seluruhnya lebih tua dari cutoff; returns segment count"""
+        first = segment_name(max(cutoff_time, 0))
+        removed = 0
+        with self._lock:
+            for name in self.segments():
+                if name >= first:
+                    break
+                for path in self._paths(name):
+                    if path.exists():
+                        path.unlink()
+                removed += 1
+        return removed
+
+
+# Export
+__all__ = ['TradeJournal', 'file_lock', 'segment_name']
@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """
 TradeLogger - Mencatat features dan outcome untuk learning loop
-Format JSONL untuk mudah diproses ML models
+Trade selesai ditulis ke TradeJournal (JSONL per hari + sparse index), active
+trades ke log operasi append-only yang dipadatkan sesekali
 """
 import logging
 import json
+import os
 import time
-from typing import Dict, Any, Optional, List
+import uuid
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
-import hashlib
+
+import numpy as np
+
+from core.trade_journal import TradeJournal, file_lock
 
 logger = logging.getLogger(__name__)
 
@@ -71,17 +77,35 @@ class TradeEntry:
         if self.execution_warnings is None:
             self.execution_warnings = []
 
+# Kolom numerik/kategori untuk export columnar (urutan = urutan kolom)
+TRAINING_FEATURES = [
+    'smc_score', 'orderbook_score', 'volatility_score', 'momentum_score', 'funding_score',
+    'news_score', 'total_score', 'spread_bps', 'depth_score', 'liquidity_score',
+    'structure_break', 'ob_quality', 'fvg_count', 'timeframe', 'symbol'
+]
+TRAINING_TARGETS = ['outcome', 'pnl', 'hold_time']
+
+# Padatkan log active trades bila jumlah operasi melebihi ini + 2x trade aktif
+ACTIVE_LOG_SLACK = 256
+
+
 class TradeLogger:
     def __init__(self, log_dir: str = "logs"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
-        # Main trade log file
+        # Completed trades, partitioned per day; trade_log.jsonl is the legacy single file
+        self.journal = TradeJournal(self.log_dir / "trade_journal")
         self.trade_log_file = self.log_dir / "trade_log.jsonl"
+        self._import_legacy_log()
         
-        # Active trades tracking
+        # Active trades tracking (append-only op log; active_trades.json is the legacy snapshot)
         self.active_trades: Dict[str, TradeEntry] = {}
         self.active_trades_file = self.log_dir / "active_trades.json"
+        self.active_log_file = self.log_dir / "active_trades.jsonl"
+        # Serializes appends/compaction across gunicorn workers (the log itself is replaced)
+        self.active_lock_file = self.log_dir / "active_trades.lock"
+        self._active_log_ops = 0
         
         # Load active trades on startup
         self._load_active_trades()
@@ -144,7 +168,7 @@ class TradeLogger:
             
             # Add to active trades
             self.active_trades[trade_id] = trade_entry
-            self._save_active_trades()
+            self._append_active_op({'op': 'open', 'trade': asdict(trade_entry)})
             
             logger.info(f"Trade entry logged: {trade_id} - {signal_data.get('symbol')} {signal_data.get('direction')}")
             return trade_id
@@ -186,7 +210,7 @@ class TradeLogger:
             
             # Remove from active trades
             del self.active_trades[trade_id]
-            self._save_active_trades()
+            self._append_active_op({'op': 'close', 'trade_id': trade_id})
             
             logger.info(f"Trade outcome updated: {trade_id} - {outcome} ({pnl:+.2f})")
             
@@ -238,12 +262,37 @@ class TradeLogger:
             logger.error(f"Failed to get performance metrics: {e}")
             return {'error': str(e)}
     
-    def export_training_data(self, days: int = 90) -> str:
+    def get_training_columns(self, days: int = 90) -> Dict[str, np.ndarray]:
+        """
+        Completed trades sebagai kolom numpy (satu array per feature/target)
+        Siap dipakai langsung oleh model tanpa parsing per baris
+        """
+        cutoff_time = time.time() - (days * 24 * 3600)
+        rows = [self._trade_to_features(t) for t in self._read_trades_since(cutoff_time)
+                if t.outcome in ['win', 'loss']]
+        
+        columns = {name: np.array([row['features'][name] for row in rows],
+                                  dtype=str if name in ('timeframe', 'symbol') else float)
+                   for name in TRAINING_FEATURES}
+        columns.update({f"target_{name}": np.array([row['target'][name] if row['target'][name] is not None else np.nan
+                                                    for row in rows], dtype=float)
+                        for name in TRAINING_TARGETS})
+        return columns
+    
+    def export_training_data(self, days: int = 90, format: str = "jsonl") -> str:
         """
         Export recent trade data for ML training
+        format: "jsonl" (satu trade per baris) atau "npz" (columnar, lihat get_training_columns)
         Returns filename of exported data
         """
         try:
+            if format == "npz":
+                columns = self.get_training_columns(days)
+                export_file = self.log_dir / f"training_data_{int(time.time())}.npz"
+                np.savez_compressed(export_file, **columns)
+                logger.info(f"Exported {len(columns['target_outcome'])} trades to {export_file}")
+                return str(export_file)
+            
             cutoff_time = time.time() - (days * 24 * 3600)
             trades = self._read_trades_since(cutoff_time)
             
@@ -266,38 +315,45 @@ class TradeLogger:
             return ""
     
     def _generate_trade_id(self, signal_data: Dict[str, Any]) -> str:
-        """Generate unique trade ID"""
-        base_string = f"{signal_data.get('symbol', 'UNK')}_{signal_data.get('direction', 'UNK')}_{int(time.time())}"
-        hash_obj = hashlib.md5(base_string.encode())
-        return hash_obj.hexdigest()[:12]
+        """Generate unique trade ID (random, tidak bergantung pada symbol/detik)"""
+        return uuid.uuid4().hex[:16]
     
     def _write_trade_to_log(self, trade_entry: TradeEntry):
-        """Write completed trade to JSONL log file"""
+        """Write completed trade to the trade journal"""
         try:
-            with open(self.trade_log_file, 'a') as f:
-                json_line = json.dumps(asdict(trade_entry))
-                f.write(json_line + '\n')
+            self.journal.append(asdict(trade_entry))
         except Exception as e:
             logger.error(f"Failed to write trade to log: {e}")
     
     def _read_trades_since(self, cutoff_time: float) -> List[TradeEntry]:
-        """Read trades from log file since cutoff time"""
+        """Read trades from the journal since cutoff time (hanya segment/blok yang relevan)"""
         trades = []
         
-        if not self.trade_log_file.exists():
-            return trades
-        
         try:
-            with open(self.trade_log_file, 'r') as f:
-                for line in f:
-                    trade_data = json.loads(line.strip())
-                    if trade_data.get('timestamp', 0) >= cutoff_time:
-                        trades.append(TradeEntry(**trade_data))
+            trades = [TradeEntry(**trade_data) for trade_data in self.journal.read_since(cutoff_time)]
         except Exception as e:
             logger.error(f"Failed to read trades from log: {e}")
         
         return trades
     
+    def _import_legacy_log(self):
+        """One-time import trade_log.jsonl ke journal; file lama tidak diubah"""
+        if not self.trade_log_file.exists() or not self.journal.is_empty():
+            return
+        
+        try:
+            # Workers start together: only the first to take the lock imports,
+            # the others see a non-empty journal once they get it
+            with file_lock(self.journal.journal_dir / "legacy_import.lock"):
+                if not self.journal.is_empty():
+                    return
+                with open(self.trade_log_file, 'r') as f:
+                    records = [json.loads(line) for line in f if line.strip()]
+                self.journal.extend(records)
+            logger.info(f"Imported {len(records)} trades from {self.trade_log_file}")
+        except Exception as e:
+            logger.error(f"Failed to import legacy trade log: {e}")
+    
     def _trade_to_features(self, trade: TradeEntry) -> Dict[str, Any]:
         """Convert trade entry to ML feature format"""
         return {
@@ -326,21 +382,77 @@ class TradeLogger:
         }
     
     def _load_active_trades(self):
-        """Load active trades from file"""
-        if self.active_trades_file.exists():
-            try:
-                with open(self.active_trades_file, 'r') as f:
-                    data = json.load(f)
+        """Replay active trades op log (atau snapshot JSON lama)"""
+        try:
+            with file_lock(self.active_lock_file):
+                if self.active_log_file.exists():
+                    self.active_trades, self._active_log_ops = self._replay_active_log()
+                    if self._active_log_ops > ACTIVE_LOG_SLACK + 2 * len(self.active_trades):
+                        self._compact_active_log()
+                elif self.active_trades_file.exists():
+                    with open(self.active_trades_file, 'r') as f:
+                        data = json.load(f)
                     self.active_trades = {k: TradeEntry(**v) for k, v in data.items()}
-            except Exception as e:
-                logger.warning(f"Failed to load active trades: {e}")
-                self.active_trades = {}
+                    self._write_active_log(self.active_trades)
+        except Exception as e:
+            logger.warning(f"Failed to load active trades: {e}")
+            self.active_trades = {}
+    
+    def _replay_active_log(self) -> Tuple[Dict[str, TradeEntry], int]:
+        """Active trades menurut op log di disk (semua worker); returns (trades, jumlah op)"""
+        trades: Dict[str, TradeEntry] = {}
+        ops = 0
+        if not self.active_log_file.exists():
+            return trades, ops
+        with open(self.active_log_file, 'r') as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                ops += 1
+                if op['op'] == 'open':
+                    trades[op['trade']['trade_id']] = TradeEntry(**op['trade'])
+                else:
+                    trades.pop(op['trade_id'], None)
+        return trades, ops
+    
+    def _append_active_op(self, op: Dict[str, Any]):
+        """Append satu operasi open/close; compaction bila log sudah jauh lebih besar dari state"""
+        try:
+            with file_lock(self.active_lock_file):
+                with open(self.active_log_file, 'a') as f:
+                    f.write(json.dumps(op) + '\n')
+                self._active_log_ops += 1
+                if self._active_log_ops > ACTIVE_LOG_SLACK + 2 * len(self.active_trades):
+                    self._compact_active_log()
+        except Exception as e:
+            logger.error(f"Failed to save active trades: {e}")
     
     def _save_active_trades(self):
-        """Save active trades to file"""
+        """Compact op log menjadi satu 'open' per active trade (atomic replace)"""
         try:
-            data = {k: asdict(v) for k, v in self.active_trades.items()}
-            with open(self.active_trades_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with file_lock(self.active_lock_file):
+                self._compact_active_log()
         except Exception as e:
-            logger.error(f"Failed to save active trades: {e}")
\ No newline at end of file
+            logger.error(f"Failed to save active trades: {e}")
+    
+    def _compact_active_log(self):
+        """
+        Compaction dengan lock dipegang caller. State dibangun ulang dari log di
+        disk, bukan dari memory worker ini, supaya trade yang dibuka worker lain
+        tidak hilang; memory ikut disinkronkan ke hasil replay.
+        """
+        self.active_trades, _ = self._replay_active_log()
+        self._write_active_log(self.active_trades)
+    
+    def _write_active_log(self, trades: Dict[str, TradeEntry]):
+        tmp_file = self.active_log_file.with_suffix(f'.jsonl.{os.getpid()}.tmp')
+        with open(tmp_file, 'w') as f:
+            for trade_entry in trades.values():
+                f.write(json.dumps({'op': 'open', 'trade': asdict(trade_entry)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.active_log_file)
+        self._active_log_ops = len(trades)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Runner - Precomputed features untuk BacktestingEngine strategies
+Indikator (RSI, MACD, SMA, Bollinger) dihitung sekali atas seluruh history;
+strategy menerima BarView O(1) per bar alih-alih slice iloc[:i+1] yang terus
+membesar. Semua indikator kausal, jadi nilai di bar i sama persis dengan
+perhitungan atas prefix. Mendukung split train/test anchored dan rolling.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.feature_frame import FeatureFrame
+
+logger = logging.getLogger(__name__)
+
+# Bars skipped before the first signal (same warm-up as BacktestingEngine.run_backtest)
+WARMUP_BARS = 50
+
+SPLIT_MODES = ('rolling', 'anchored')
+
+
+class StrategyFeatures:
+    """Indicator arrays for the built-in strategies, computed once per history"""
+
+    def __init__(self, historical_data: pd.DataFrame):
+        frame = FeatureFrame(historical_data['close'])
+        macd = frame.get('macd')
+        bands = frame.get('bollinger', period=20, std_dev=2)
+        self.arrays: Dict[str, np.ndarray] = {
+            'close': historical_data['close'].to_numpy(dtype=float),
+            'rsi': frame.get('rsi', period=14).to_numpy(),
+            'macd': macd['macd'].to_numpy(),
+            'macd_signal': macd['signal'].to_numpy(),
+            'sma20': frame.get('sma', period=20).to_numpy(),
+            'sma50': frame.get('sma', period=50).to_numpy(),
+            'upper_band': bands['upper'].to_numpy(),
+            'lower_band': bands['lower'].to_numpy(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.arrays['close'])
+
+    def view(self, index: int = 0) -> 'BarView':
+        return BarView(self.arrays, index)
+
+
+class BarView:
+    """
+    Bar `index` of the precomputed arrays; len() mirrors len(df) of the
+    old growing slice. Reuse one view and move `index` along the loop.
+    """
+    __slots__ = ('arrays', 'index')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], index: int):
+        self.arrays = arrays
+        self.index = index
+
+    def __getitem__(self, name: str) -> float:
+        return self.arrays[name][self.index]
+
+    def prev(self, name: str, bars: int = 1) -> float:
+        return self.arrays[name][self.index - bars]
+
+    def __len__(self) -> int:
+        return self.index + 1
+
+
+# =================== STEP STRATEGIES ===================
+# Same rules as BacktestingEngine._rsi_macd_strategy / _sma_crossover_strategy / _breakout_strategy
+
+def rsi_macd_step(bar: BarView) -> Optional[Dict]:
+    if len(bar) < 50:
+        return None
+
+    current_rsi = bar['rsi']
+    current_macd = bar['macd']
+    current_signal = bar['macd_signal']
+
+    if current_rsi < 30 and current_macd > current_signal:
+        return {
+            'action': 'BUY',
+            'strength': 'STRONG' if current_rsi < 25 else 'MODERATE',
+            'confidence': 75,
+            'price': float(bar['close'])
+        }
+    elif current_rsi > 70 and current_macd < current_signal:
+        return {
+            'action': 'SELL',
+            'strength': 'STRONG' if current_rsi > 75 else 'MODERATE',
+            'confidence': 75,
+            'price': float(bar['close'])
+        }
+    return None
+
+
+def sma_crossover_step(bar: BarView) -> Optional[Dict]:
+    if len(bar) < 50:
+        return None
+
+    current_20, current_50 = bar['sma20'], bar['sma50']
+    prev_20, prev_50 = bar.prev('sma20'), bar.prev('sma50')
+
+    if prev_20 <= prev_50 and current_20 > current_50:
+        return {'action': 'BUY', 'strength': 'MODERATE', 'confidence': 65, 'price': float(bar['close'])}
+    elif prev_20 >= prev_50 and current_20 < current_50:
+        return {'action': 'SELL', 'strength': 'MODERATE', 'confidence': 65, 'price': float(bar['close'])}
+    return None
+
+
+def breakout_step(bar: BarView) -> Optional[Dict]:
+    if len(bar) < 20:
+        return None
+
+    current_price = bar['close']
+    if current_price > bar['upper_band']:
+        return {'action': 'BUY', 'strength': 'STRONG', 'confidence': 70, 'price': float(current_price)}
+    elif current_price < bar['lower_band']:
+        return {'action': 'SELL', 'strength': 'STRONG', 'confidence': 70, 'price': float(current_price)}
+    return None
+
+
+STEP_STRATEGIES: Dict[str, Callable[[BarView], Optional[Dict]]] = {
+    'RSI_MACD': rsi_macd_step,
+    'SMA_CROSSOVER': sma_crossover_step,
+    'BREAKOUT': breakout_step,
+}
+
+
+def new_backtest_state(initial_balance: float) -> Dict[str, Any]:
+    return {
+        'balance': initial_balance,
+        'position': 0,
+        'entry_price': 0,
+        'trades': [],
+        'peak_balance': initial_balance,
+        'drawdown': 0,
+        'max_drawdown': 0
+    }
+
+
+def simulate_segment(engine, historical_data: pd.DataFrame, features: StrategyFeatures,
+                     strategy: str, start: int, end: int,
+                     state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run `strategy` over bars [start, end) using engine._execute_backtest_trade"""
+    step = STEP_STRATEGIES[strategy]
+    bar = features.view()
+    for i in range(max(start, 0), min(end, len(features))):
+        bar.index = i
+        signal = step(bar)
+        if signal:
+            engine._execute_backtest_trade(state, signal, historical_data.iloc[i])
+    return state
+
+
+def walk_forward_splits(total: int, train_size: int, test_size: int, mode: str = 'rolling',
+                        step: Optional[int] = None, start: int = WARMUP_BARS) -> List[Tuple[int, int, int]]:
+    """
+    (train_start, train_end, test_end) bar indices per fold.
+
+    rolling: train window has a fixed length and slides by `step`
+    anchored: train always starts at `start` and grows by `step`
+    """
+    if mode not in SPLIT_MODES:
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size and test_size must be positive")
+
+    step = step or test_size
+    splits = []
+    train_end = start + train_size
+    while train_end + test_size <= total:
+        train_start = start if mode == 'anchored' else train_end - train_size
+        splits.append((train_start, train_end, train_end + test_size))
+        train_end += step
+    return splits
+
+
+def _metric(result: Dict[str, Any], name: str) -> float:
+    for section in ('performance', 'risk_metrics'):
+        if name in result.get(section, {}):
+            return float(result[section][name])
+    raise KeyError(f"Unknown metric: {name}")
+
+
+class WalkForwardRunner:
+    """
+    Walk-forward evaluation untuk strategy bawaan BacktestingEngine
+
+    Per fold, setiap kandidat strategy dijalankan di train window; yang terbaik
+    (menurut select_by) dijalankan di test window berikutnya. Features dihitung
+    sekali untuk seluruh history dan dipakai ulang oleh semua fold.
+    """
+
+    def __init__(self, engine=None):
+        if engine is None:
+            from core.backtesting_engine import BacktestingEngine
+            engine = BacktestingEngine()
+        self.engine = engine
+
+    def _evaluate(self, historical_data, features, strategy, start, end, initial_balance) -> Dict[str, Any]:
+        state = simulate_segment(self.engine, historical_data, features, strategy, start, end,
+                                 new_backtest_state(initial_balance))
+        return self.engine._calculate_backtest_metrics(state, historical_data, initial_balance)
+
+    def run(self, historical_data: pd.DataFrame, strategies: Sequence[str], train_size: int,
+            test_size: int, mode: str = 'rolling', step: Optional[int] = None,
+            initial_balance: float = 10000, select_by: str = 'total_return_pct') -> Dict[str, Any]:
+        """
+        Walk-forward run
+
+        Args:
+            historical_data: OHLCV DataFrame (index = timestamp)
+            strategies: Kandidat strategy (RSI_MACD, SMA_CROSSOVER, BREAKOUT)
+            train_size: Jumlah bar per train window
+            test_size: Jumlah bar per test window
+            mode: 'rolling' atau 'anchored'
+            step: Geser antar fold (default test_size)
+            select_by: Metric untuk memilih strategy di train window
+        """
+        unknown = [strategy for strategy in strategies if strategy not in STEP_STRATEGIES]
+        if unknown:
+            raise ValueError(f"Walk-forward supports {list(STEP_STRATEGIES)}; got {unknown}")
+
+        features = StrategyFeatures(historical_data)
+        splits = walk_forward_splits(len(features), train_size, test_size, mode, step)
+        index = historical_data.index
+
+        folds = []
+        oos_equity = 1.0
+        for fold, (train_start, train_end, test_end) in enumerate(splits, 1):
+            in_sample = {
+                strategy: self._evaluate(historical_data, features, strategy, train_start, train_end,
+                                         initial_balance)
+                for strategy in strategies
+            }
+            selected = max(strategies, key=lambda strategy: _metric(in_sample[strategy], select_by))
+            out_of_sample = self._evaluate(historical_data, features, selected, train_end, test_end,
+                                           initial_balance)
+            oos_return = _metric(out_of_sample, 'total_return_pct')
+            oos_equity *= 1 + oos_return / 100
+
+            folds.append({
+                'fold': fold,
+                'train': {'start': str(index[train_start]), 'end': str(index[train_end - 1]),
+                          'bars': train_end - train_start},
+                'test': {'start': str(index[train_end]), 'end': str(index[test_end - 1]),
+                         'bars': test_end - train_end},
+                'selected_strategy': selected,
+                'in_sample': {strategy: result['performance'] for strategy, result in in_sample.items()},
+                'out_of_sample': {**out_of_sample['performance'], **out_of_sample['risk_metrics']}
+            })
+
+        oos_returns = [fold['out_of_sample']['total_return_pct'] for fold in folds]
+        return {
+            'mode': mode,
+            'strategies': list(strategies),
+            'select_by': select_by,
+            'total_bars': len(features),
+            'folds': folds,
+            'summary': {
+                'total_folds': len(folds),
+                'oos_compounded_return_pct': round((oos_equity - 1) * 100, 2),
+                'oos_mean_return_pct': round(float(np.mean(oos_returns)), 2) if oos_returns else 0.0,
+                'oos_positive_folds': sum(1 for value in oos_returns if value > 0),
+                'selection_counts': {strategy: sum(1 for fold in folds if fold['selected_strategy'] == strategy)
+                                     for strategy in strategies}
+            },
+            'generated_at': datetime.now().isoformat()
+        }
+
+
+# Export
+__all__ = ['BarView', 'STEP_STRATEGIES', 'StrategyFeatures', 'WalkForwardRunner', 'new_backtest_state',
+           'simulate_segment', 'walk_forward_splits']
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Queue - Buffer in-memory untuk penulisan batch di background
+Producer hanya menaruh item di antrian (O(1), tanpa I/O); satu worker thread
+mengosongkan antrian ke `sink(batch)` setiap `flush_interval_ms` atau begitu
+`batch_size` item terkumpul. Antrian dibatasi `max_queue_size`: bila penuh,
+put() menunggu maksimal `put_timeout` detik lalu membuang item (dihitung di stats).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL_MS = 250
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+
+class WriteBehindQueue:
+    """
+    Bounded write-behind buffer dengan satu flusher thread
+
+    Args:
+        sink: Menulis satu batch (list item) secara bulk; exception dihitung sebagai failed
+        batch_size: Flush segera begitu jumlah item ini tercapai
+        flush_interval_ms: Umur maksimal item tertua sebelum di-flush
+        max_queue_size: Kapasitas antrian (backpressure)
+        put_timeout: Detik menunggu ruang kosong sebelum item dibuang (0 = langsung buang)
+    """
+
+    def __init__(self, sink: Callable[[List[Any]], None], batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval_ms: float = DEFAULT_FLUSH_INTERVAL_MS,
+                 max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE, put_timeout: float = 0.0,
+                 name: str = 'write-behind'):
+        self.sink = sink
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.put_timeout = put_timeout
+        self.name = name
+
+        self._items = deque()
+        self._oldest = None
+        self._cond = threading.Condition()
+        # Held while a batch is taken and written, so batches reach the sink in order
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0,
+            'blocked_puts': 0, 'high_watermark': 0, 'last_batch_size': 0, 'last_flush_ms': 0.0
+        }
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any) -> bool:
+        """Queue one item; False when the queue stayed full (item dropped) or is closed"""
+        with self._cond:
+            if self._closed:
+                self._stats['dropped'] += 1
+                return False
+
+            if len(self._items) >= self.max_queue_size:
+                self._stats['blocked_puts'] += 1
+                deadline = time.monotonic() + self.put_timeout
+                while len(self._items) >= self.max_queue_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if len(self._items) >= self.max_queue_size or self._closed:
+                    self._stats['dropped'] += 1
+                    return False
+
+            first = not self._items
+            if first:
+                self._oldest = time.monotonic()
+            self._items.append(item)
+            self._stats['enqueued'] += 1
+            self._stats['high_watermark'] = max(self._stats['high_watermark'], len(self._items))
+            # Wake the flusher to start the interval timer, or to write a full batch
+            if first or len(self._items) >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def _take(self) -> List[Any]:
+        with self._cond:
+            count = min(self.batch_size, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            self._oldest = time.monotonic() if self._items else None
+            if batch:
+                # Wake producers waiting for space
+                self._cond.notify_all()
+            return batch
+
+    def _write_next(self) -> int:
+        with self._write_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                self.sink(batch)
+                ok = True
+            except Exception as e:
+                ok = False
+                logger.error(f"{self.name}: failed to write batch of {len(batch)}: {e}")
+
+            with self._cond:
+                self._stats['written' if ok else 'failed'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['last_batch_size'] = len(batch)
+                self._stats['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            return len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Wait for a full batch or for the oldest item to reach flush_interval
+                while self._items and len(self._items) < self.batch_size and not self._closed:
+                    remaining = self._oldest + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self._write_next()
+
+    def flush(self) -> int:
+        """Write everything queued so far from the calling thread; returns items written"""
+        total = 0
+        while True:
+            written = self._write_next()
+            if not written:
+                return total
+            total += written
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Stop the flusher thread and write what is left"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._stats, 'queue_depth': len(self._items), 'capacity': self.max_queue_size,
+                    'batch_size': self.batch_size, 'flush_interval_ms': self.flush_interval * 1000}
+
+
+# Export
+__all__ = ['WriteBehindQueue']
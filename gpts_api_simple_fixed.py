@@ -464,7 +464,8 @@ def get_chart_data():
         
         # Format for trading view
         chart_data = []
-        for _, row in df.iterrows():
+        # get_candles returns the candle time as the (DatetimeIndex) index
+        for _, row in df.reset_index().iterrows():
             chart_data.append({
                 "time": int(row['timestamp'].timestamp()) if hasattr(row['timestamp'], 'timestamp') else int(row['timestamp']),
                 "open": float(row['open']),
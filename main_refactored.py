@@ -34,7 +34,7 @@ def create_app():
     # Import modular setup functions
     from config.app_setup import (
         setup_database, setup_security, setup_cors, setup_logging,
-        setup_blueprints, setup_routes, setup_telegram_integration,
+        setup_blueprints, setup_routes, setup_telegram_integration, setup_realtime_streaming,
         check_dependencies
     )
     from config.keep_alive import setup_keep_alive
@@ -107,7 +107,16 @@ def create_app():
         logger.error(f"❌ Keep-alive setup failed: {e}", exc_info=True)
         setup_success['keep_alive'] = False
     
-    # 7. Initialize enhanced systems
+    # 7. Start realtime OKX feed (streaming indicators + paper trading)
+    logger.info("📡 Starting realtime streaming...")
+    try:
+        streaming_result = setup_realtime_streaming(app)
+        setup_success['realtime_streaming'] = streaming_result['status'] in ('active', 'disabled')
+    except Exception as e:
+        logger.error(f"❌ Realtime streaming setup failed: {e}", exc_info=True)
+        setup_success['realtime_streaming'] = False
+    
+    # 8. Initialize enhanced systems
     logger.info("🔧 Initializing enhanced systems...")
     try:
         from core.enhanced_logging_system import enhanced_logger, log_success, log_info
@@ -122,7 +131,7 @@ def create_app():
         logger.error(f"❌ Enhanced systems initialization failed: {e}", exc_info=True)
         setup_success['enhanced_systems'] = False
     
-    # 8. Final setup summary
+    # 9. Final setup summary
     successful_components = sum(setup_success.values())
     total_components = len(setup_success)
     
@@ -85,8 +85,8 @@ class SignalHistory(db.Model):
     actual_return = db.Column(db.Float)
     ai_reasoning = db.Column(db.Text)  # Original AI reasoning for the signal
     signal_timestamp = db.Column(db.DateTime)  # Original signal timestamp
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -105,4 +105,53 @@ class SignalHistory(db.Model):
             'signal_timestamp': self.signal_timestamp.isoformat() if self.signal_timestamp else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+
+class QueryRollup(db.Model):
+    """Pre-aggregated GPT query counts per minute/hour/day bucket"""
+    __tablename__ = 'query_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)  # minute, hour, day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    endpoint = db.Column(db.String(200), nullable=False)
+    is_successful = db.Column(db.Boolean, nullable=False)
+    latency_bucket_ms = db.Column(db.Integer, nullable=False)  # histogram upper bound, -1 = unknown
+    query_count = db.Column(db.Integer, nullable=False, default=0)
+    latency_sum_ms = db.Column(db.Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'bucket_start', 'endpoint', 'is_successful', 'latency_bucket_ms',
+                            name='uq_query_rollup_bucket'),
+        db.Index('ix_query_rollup_window', 'resolution', 'bucket_start'),
+    )
+
+
+class SignalRollup(db.Model):
+    """Pre-aggregated signal counts and win/loss per symbol/timeframe bucket"""
+    __tablename__ = 'signal_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)  # minute, hour, day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    symbol = db.Column(db.String(20), nullable=False)
+    timeframe = db.Column(db.String(10), nullable=False)
+    signal_count = db.Column(db.Integer, nullable=False, default=0)
+    executed_count = db.Column(db.Integer, nullable=False, default=0)
+    win_count = db.Column(db.Integer, nullable=False, default=0)
+    loss_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'bucket_start', 'symbol', 'timeframe', name='uq_signal_rollup_bucket'),
+        db.Index('ix_signal_rollup_window', 'resolution', 'bucket_start'),
+    )
+
+
+class RollupWatermark(db.Model):
+    """Last source timestamp folded into a rollup table"""
+    __tablename__ = 'rollup_watermarks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)
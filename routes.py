@@ -204,6 +204,14 @@ except ImportError as e:
     backtest_available = False
     backtest_api = None
 
+try:
+    from api.scan_endpoints import scan_bp
+    scan_available = True
+except ImportError as e:
+    logger.warning(f"Market scan blueprint not available: {e}")
+    scan_available = False
+    scan_bp = None
+
 try:
     from api.chart_endpoints import chart_bp
     chart_available = True
@@ -363,6 +371,10 @@ if backtest_available and backtest_api:
     app.register_blueprint(backtest_api)
     logger.info("✅ Backtest API blueprint registered")
 
+if scan_available and scan_bp:
+    app.register_blueprint(scan_bp)
+    logger.info("✅ Market scan blueprint registered")
+
 if chart_available and chart_bp:
     app.register_blueprint(chart_bp)
     logger.info("✅ Chart blueprint registered")
@@ -9,7 +9,14 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy import desc, func
+from sqlalchemy.schema import CreateIndex
+
+from core.analytics_rollup import (
+    QUERY_KEY_FIELDS, SIGNAL_KEY_FIELDS, apply_increments, expired, floor_time, load_window, prune_rollups,
+    query_rollup_increments, replace_rollups, signal_rollup_values, summarize_query_rollups,
+    summarize_signal_rollups
+)
 
 # Import models (akan di-import dalam function untuk avoid circular import)
 # from models import SignalHistory, GPTQueryLog, UserInteraction, db
@@ -197,7 +204,7 @@ class StateManager:
             query_id: Unique identifier untuk query log
         """
         try:
-            from models import GPTQueryLog, db
+            from models import GPTQueryLog, QueryRollup, db
             
             # Generate unique query ID
             query_id = f"qry_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}"
@@ -224,8 +231,15 @@ class StateManager:
                 error_message=response_data.get('error_message')
             )
             
-            # Save to database
+            # Save to database (rollup increment in the same transaction)
+            query_log.created_at = datetime.utcnow()
             db.session.add(query_log)
+            apply_increments(db.session, QueryRollup, QUERY_KEY_FIELDS, query_rollup_increments([{
+                'created_at': query_log.created_at,
+                'endpoint': query_log.endpoint,
+                'response_status': query_log.response_status,
+                'processing_time_ms': query_log.processing_time_ms
+            }]))
             db.session.commit()
             
             logger.info(f"✅ GPT query logged: {query_id} - {query_data.get('endpoint')}")
@@ -247,44 +261,18 @@ class StateManager:
             Dictionary dengan analytics data
         """
         try:
-            from models import GPTQueryLog, db
-            date_from = datetime.now() - timedelta(days=days)
-            
-            # Basic stats
-            total_queries = db.session.query(GPTQueryLog).filter(
-                GPTQueryLog.created_at >= date_from
-            ).count()
-            
-            successful_queries = db.session.query(GPTQueryLog).filter(
-                and_(GPTQueryLog.created_at >= date_from, GPTQueryLog.is_successful == True)
-            ).count()
-            
-            # Average processing time
-            avg_processing_time = db.session.query(
-                func.avg(GPTQueryLog.processing_time_ms)
-            ).filter(GPTQueryLog.created_at >= date_from).scalar() or 0
-            
-            # Top endpoints
-            top_endpoints = db.session.query(
-                GPTQueryLog.endpoint,
-                func.count(GPTQueryLog.id).label('count')
-            ).filter(
-                GPTQueryLog.created_at >= date_from
-            ).group_by(GPTQueryLog.endpoint).order_by(desc('count')).limit(10).all()
+            from models import QueryRollup, db
+            now = datetime.utcnow()
             
-            # Success rate
-            success_rate = (successful_queries / total_queries * 100) if total_queries > 0 else 0
+            # Minute/hour/day rollups instead of aggregates over the raw log
+            rollups = load_window(db.session, QueryRollup, now - timedelta(days=days), now)
+            analytics = summarize_query_rollups(rollups, days)
             
             return {
-                'period_days': days,
-                'total_queries': total_queries,
-                'successful_queries': successful_queries,
-                'success_rate': round(success_rate, 2),
-                'avg_processing_time_ms': round(avg_processing_time, 2),
-                'top_endpoints': [
-                    {'endpoint': endpoint, 'count': count} 
-                    for endpoint, count in top_endpoints
-                ]
+                key: analytics[key] for key in (
+                    'period_days', 'total_queries', 'successful_queries', 'success_rate',
+                    'avg_processing_time_ms', 'top_endpoints', 'latency_histogram'
+                )
             }
             
         except Exception as e:
@@ -353,74 +341,141 @@ class StateManager:
             Dictionary dengan performance stats
         """
         try:
-            from models import SignalHistory, db
-            date_from = datetime.now() - timedelta(days=days)
+            from models import SignalRollup, db
             
-            # Total signals generated
-            total_signals = db.session.query(SignalHistory).filter(
-                SignalHistory.created_at >= date_from
-            ).count()
+            try:
+                self.refresh_signal_rollups()
+            except Exception as refresh_error:
+                # Another worker may be refreshing the same day; serve current rollups
+                logger.warning(f"Signal rollup refresh skipped: {refresh_error}")
+                db.session.rollback()
             
-            # Executed signals
-            executed_signals = db.session.query(SignalHistory).filter(
-                and_(
-                    SignalHistory.created_at >= date_from,
-                    SignalHistory.is_executed == True
-                )
-            ).count()
-            
-            # Win rate (jika ada outcome data)
-            winning_signals = db.session.query(SignalHistory).filter(
-                and_(
-                    SignalHistory.created_at >= date_from,
-                    SignalHistory.outcome == 'WIN'
-                )
-            ).count()
-            
-            closed_signals = db.session.query(SignalHistory).filter(
-                and_(
-                    SignalHistory.created_at >= date_from,
-                    SignalHistory.outcome.in_(['WIN', 'LOSS'])
-                )
-            ).count()
-            
-            # Top performing symbols
-            top_symbols = db.session.query(
-                SignalHistory.symbol,
-                func.count(SignalHistory.id).label('count'),
-                func.avg(SignalHistory.confidence).label('avg_confidence')
-            ).filter(
-                SignalHistory.created_at >= date_from
-            ).group_by(SignalHistory.symbol).order_by(desc('count')).limit(10).all()
-            
-            # Execution rate
-            execution_rate = (executed_signals / total_signals * 100) if total_signals > 0 else 0
-            
-            # Win rate
-            win_rate = (winning_signals / closed_signals * 100) if closed_signals > 0 else 0
-            
-            return {
-                'period_days': days,
-                'total_signals': total_signals,
-                'executed_signals': executed_signals,
-                'execution_rate': round(execution_rate, 2),
-                'winning_signals': winning_signals,
-                'closed_signals': closed_signals,
-                'win_rate': round(win_rate, 2),
-                'top_symbols': [
-                    {
-                        'symbol': symbol, 
-                        'count': count, 
-                        'avg_confidence': round(float(avg_confidence), 2)
-                    } 
-                    for symbol, count, avg_confidence in top_symbols
-                ]
-            }
+            now = datetime.utcnow()
+            rollups = load_window(db.session, SignalRollup, now - timedelta(days=days), now)
+            return summarize_signal_rollups(rollups, days)
             
         except Exception as e:
             logger.error(f"❌ Failed to get signal performance stats: {e}")
             return {}
     
+    def refresh_signal_rollups(self) -> int:
+        """
+        Hitung ulang signal rollup untuk hari yang berubah sejak refresh terakhir
+        
+        Outcome dan eksekusi di-update belakangan oleh banyak modul, jadi rollup
+        tidak di-increment saat insert; setiap hari yang punya signal baru/ter-update
+        (updated_at >= watermark) dihitung ulang utuh dari signal_history.
+        
+        Returns:
+            Jumlah hari yang dihitung ulang
+        """
+        from models import SignalHistory, SignalRollup, RollupWatermark, db
+        
+        state = db.session.get(RollupWatermark, 'signal_history')
+        since = state.watermark if state else datetime.min
+        # Captured before reading so updates made during the refresh are picked up next time
+        now = datetime.utcnow()
+        
+        # Two single-column range scans instead of an OR that defeats both indexes
+        changed = db.session.query(SignalHistory.created_at).filter(
+            SignalHistory.updated_at >= since
+        ).union(
+            db.session.query(SignalHistory.created_at).filter(SignalHistory.created_at >= since)
+        )
+        days = sorted({floor_time(created_at, 'day') for (created_at,) in changed if created_at})
+        
+        for day in days:
+            rows = db.session.query(
+                SignalHistory.created_at, SignalHistory.symbol, SignalHistory.timeframe,
+                SignalHistory.confidence, SignalHistory.is_executed, SignalHistory.outcome
+            ).filter(
+                SignalHistory.created_at >= day, SignalHistory.created_at < day + timedelta(days=1)
+            )
+            values = signal_rollup_values((row._asdict() for row in rows), now=now)
+            replace_rollups(db.session, SignalRollup, SIGNAL_KEY_FIELDS, values, day, day + timedelta(days=1))
+        
+        if state is None:
+            db.session.add(RollupWatermark(name='signal_history', watermark=now))
+        else:
+            state.watermark = now
+        db.session.commit()
+        
+        if days:
+            logger.info(f"📊 Signal rollups refreshed for {len(days)} day(s)")
+        return len(days)
+    
+    def rebuild_query_rollups(self, days: int = 90) -> int:
+        """
+        Backfill query rollup dari gpt query log mentah (sekali, atau setelah import data)
+        
+        Args:
+            days: Jumlah hari ke belakang yang dibangun ulang (dibulatkan ke awal hari)
+            
+        Returns:
+            Jumlah query log yang di-rollup
+        """
+        from models import GPTQueryLog, QueryRollup, db
+        
+        now = datetime.utcnow()
+        start = floor_time(now - timedelta(days=days), 'day')
+        rows = db.session.query(
+            GPTQueryLog.created_at, GPTQueryLog.endpoint,
+            GPTQueryLog.response_status, GPTQueryLog.processing_time_ms
+        ).filter(GPTQueryLog.created_at >= start).yield_per(5000)
+        
+        increments = query_rollup_increments(row._asdict() for row in rows)
+        rolled_up = sum(values['query_count'] for key, values in increments.items() if key[0] == 'day')
+        increments = {key: values for key, values in increments.items() if not expired(key[0], key[1], now)}
+        replace_rollups(db.session, QueryRollup, QUERY_KEY_FIELDS, increments, start, now + timedelta(days=1))
+        db.session.commit()
+        
+        logger.info(f"📊 Query rollups rebuilt from {rolled_up} logs since {start.date()}")
+        return rolled_up
+    
+    def ensure_signal_indexes(self) -> int:
+        """
+        Buat index signal_history yang ditambahkan setelah tabelnya ada
+        
+        db.create_all() tidak mengubah tabel yang sudah ada, jadi index baru
+        (created_at/updated_at untuk refresh rollup) dibuat di sini dengan
+        IF NOT EXISTS - aman dijalankan setiap startup oleh setiap worker.
+        
+        Returns:
+            Jumlah index yang dipastikan ada
+        """
+        from models import SignalHistory, db
+        
+        try:
+            indexes = list(SignalHistory.__table__.indexes)
+            for index in indexes:
+                db.session.execute(CreateIndex(index, if_not_exists=True))
+            db.session.commit()
+            return len(indexes)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Signal history index creation skipped: {e}")
+            return 0
+    
+    def ensure_query_rollups(self, days: int = 90) -> int:
+        """
+        Backfill query rollup saat startup bila tabel query_rollups masih kosong
+        (deploy pertama setelah rollup ditambahkan); no-op setelahnya
+        
+        Returns:
+            Jumlah query log yang di-rollup (0 bila tidak perlu backfill)
+        """
+        from models import QueryRollup, db
+        
+        try:
+            if db.session.query(QueryRollup.id).first() is not None:
+                return 0
+            return self.rebuild_query_rollups(days)
+        except Exception as e:
+            # e.g. another worker backfilling at the same time
+            db.session.rollback()
+            logger.warning(f"Query rollup backfill skipped: {e}")
+            return 0
+    
     def get_user_interaction_stats(self, days: int = 7) -> Dict[str, Any]:
         """
         Ambil statistik user interaction
@@ -488,8 +543,10 @@ class StateManager:
             Dictionary dengan jumlah records yang dihapus
         """
         try:
-            from models import SignalHistory, GPTQueryLog, UserInteraction, db
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            from models import SignalHistory, GPTQueryLog, UserInteraction, QueryRollup, SignalRollup, db
+            # Whole UTC days only, so a day is never left partially purged and a
+            # later rollup recompute of that day cannot shrink its day bucket
+            cutoff_date = floor_time(datetime.utcnow() - timedelta(days=days_to_keep), 'day')
             
             # Delete old signal history
             deleted_signals = db.session.query(SignalHistory).filter(
@@ -506,6 +563,13 @@ class StateManager:
                 UserInteraction.created_at < cutoff_date
             ).delete()
             
+            # Compaction: day rollups outlive the raw rows, minute/hour buckets are pruned
+            now = datetime.utcnow()
+            pruned_rollups = {
+                'queries': prune_rollups(db.session, QueryRollup, now),
+                'signals': prune_rollups(db.session, SignalRollup, now)
+            }
+            
             db.session.commit()
             
             logger.info(f"✅ Cleanup completed: {deleted_signals} signals, {deleted_queries} queries, {deleted_interactions} interactions")
@@ -514,6 +578,7 @@ class StateManager:
                 'deleted_signals': deleted_signals,
                 'deleted_queries': deleted_queries,
                 'deleted_interactions': deleted_interactions,
+                'pruned_rollups': pruned_rollups,
                 'cutoff_date': cutoff_date.isoformat()
             }
             
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk analytics rollup
+Window minute/hour/day harus menutup rentang tepat satu kali dan hasil summary
+harus sama dengan agregasi langsung atas row mentah
+"""
+
+import unittest
+import random
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.append('.')
+
+from core.analytics_rollup import (
+    QUERY_KEY_FIELDS, SIGNAL_KEY_FIELDS, RESOLUTION_DELTAS, floor_time, latency_bucket,
+    query_rollup_increments, signal_rollup_values, split_window, summarize_query_rollups,
+    summarize_signal_rollups
+)
+
+NOW = datetime(2026, 3, 14, 15, 9, 26)
+
+
+def as_rows(values, key_fields):
+    return [SimpleNamespace(**dict(zip(key_fields, key)), **fields) for key, fields in values.items()]
+
+
+def in_window(values, start, end):
+    """Rollup entries selected the way load_window selects them"""
+    selected = {}
+    for resolution, lo, hi in split_window(start, end):
+        selected.update({key: fields for key, fields in values.items()
+                         if key[0] == resolution and lo <= key[1] < hi})
+    return selected
+
+
+class TestSplitWindow(unittest.TestCase):
+
+    def test_covers_every_minute_once(self):
+        for span in (timedelta(minutes=5), timedelta(hours=3, minutes=7), timedelta(days=1),
+                     timedelta(days=1, hours=2), timedelta(days=7)):
+            start = NOW - span
+            covered = []
+            for resolution, lo, hi in split_window(start, NOW):
+                self.assertEqual(floor_time(lo, resolution), lo)
+                minute = lo
+                while minute < hi:
+                    covered.append(minute)
+                    minute += RESOLUTION_DELTAS['minute']
+            # Beyond minute retention the window starts on the hour
+            expected = []
+            minute = floor_time(start, 'minute' if span <= timedelta(days=2) else 'hour')
+            while minute <= NOW:
+                expected.append(minute)
+                minute += RESOLUTION_DELTAS['minute']
+            self.assertEqual(covered, expected, span)
+
+    def test_week_window_uses_few_buckets(self):
+        resolutions = [resolution for resolution, _, _ in split_window(NOW - timedelta(days=7), NOW)]
+        self.assertEqual(resolutions, ['hour', 'day', 'hour', 'minute'])
+        resolutions = [resolution for resolution, _, _ in split_window(NOW - timedelta(hours=30), NOW)]
+        self.assertEqual(resolutions, ['minute', 'hour', 'minute'])
+
+    def test_old_windows_start_on_coarse_boundaries(self):
+        self.assertEqual(split_window(NOW - timedelta(days=30), NOW)[0][0], 'hour')
+        self.assertEqual(split_window(NOW - timedelta(days=365), NOW)[0][0], 'day')
+
+
+class TestRollupSummaries(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        endpoints = ['/api/gpts/signal', '/api/gpts/chart', '/api/gpts/status']
+        self.queries = [{
+            'created_at': NOW - timedelta(seconds=rng.randint(0, 10 * 86400)),
+            'endpoint': rng.choice(endpoints),
+            'response_status': rng.choice([200, 200, 200, 500]),
+            'processing_time_ms': rng.choice([None, rng.randint(5, 20000)])
+        } for _ in range(2000)]
+        self.signals = [{
+            'created_at': NOW - timedelta(seconds=rng.randint(0, 40 * 86400)),
+            'symbol': rng.choice(['BTC-USDT', 'ETH-USDT']),
+            'timeframe': rng.choice(['1H', '4H']),
+            'confidence': rng.uniform(50, 95),
+            'is_executed': rng.random() < 0.4,
+            'outcome': rng.choice([None, 'HIT_TP', 'HIT_SL', 'WIN', 'LOSS', 'PENDING'])
+        } for _ in range(1500)]
+
+    def test_query_summary_matches_raw(self):
+        start = NOW - timedelta(days=7)
+        rows = as_rows(in_window(query_rollup_increments(self.queries), start, NOW), QUERY_KEY_FIELDS)
+        summary = summarize_query_rollups(rows, 7)
+
+        raw = [q for q in self.queries if q['created_at'] >= split_window(start, NOW)[0][1]]
+        timed = [q['processing_time_ms'] for q in raw if q['processing_time_ms'] is not None]
+        self.assertEqual(summary['total_queries'], len(raw))
+        self.assertEqual(summary['successful_queries'], sum(q['response_status'] < 400 for q in raw))
+        self.assertAlmostEqual(summary['avg_processing_time_ms'], round(sum(timed) / len(timed), 2))
+        self.assertEqual(sum(item['count'] for item in summary['latency_histogram']), len(timed))
+        self.assertEqual(sum(item['count'] for item in summary['daily_stats']), len(raw))
+        self.assertEqual(summary['top_endpoints'][0]['count'],
+                         max(sum(q['endpoint'] == e for q in raw) for e in {q['endpoint'] for q in raw}))
+
+    def test_signal_summary_matches_raw(self):
+        start = NOW - timedelta(days=30)
+        rows = as_rows(in_window(signal_rollup_values(self.signals, now=NOW), start, NOW), SIGNAL_KEY_FIELDS)
+        summary = summarize_signal_rollups(rows, 30)
+
+        raw = [s for s in self.signals if s['created_at'] >= split_window(start, NOW)[0][1]]
+        wins = sum(s['outcome'] in ('WIN', 'HIT_TP') for s in raw)
+        losses = sum(s['outcome'] in ('LOSS', 'HIT_SL') for s in raw)
+        self.assertEqual(summary['total_signals'], len(raw))
+        self.assertEqual(summary['executed_signals'], sum(s['is_executed'] for s in raw))
+        self.assertEqual((summary['winning_signals'], summary['closed_signals']), (wins, wins + losses))
+        self.assertEqual(sum(pair['signals'] for pair in summary['by_symbol_timeframe']), len(raw))
+        btc = [s['confidence'] for s in raw if s['symbol'] == 'BTC-USDT']
+        top = {item['symbol']: item for item in summary['top_symbols']}
+        self.assertAlmostEqual(top['BTC-USDT']['avg_confidence'], round(sum(btc) / len(btc), 2))
+
+    def test_expired_fine_buckets_are_not_built(self):
+        values = signal_rollup_values(self.signals, now=NOW)
+        minute_buckets = [key[1] for key in values if key[0] == 'minute']
+        self.assertTrue(minute_buckets)
+        self.assertGreaterEqual(min(minute_buckets), NOW - timedelta(days=2))
+
+    def test_latency_buckets(self):
+        self.assertEqual([latency_bucket(ms) for ms in (None, 0, 50, 51, 9999)], [-1, 50, 50, 100, 10000])
+        self.assertGreater(latency_bucket(60000), 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk BacktestOptimizer
+Sweep tidak dipotong, signal di-cache per subset parameter, dan hasil pool
+harus sama dengan run_backtest biasa
+"""
+
+import asyncio
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+from core.backtest_builder import BacktestBuilder, BacktestConfiguration
+from core.backtest_optimizer import (BacktestOptimizer, combination_at, expand_grid,
+                                     signal_key)
+from core.backtest_store import BacktestStore
+
+
+def make_config(**overrides):
+    config = dict(
+        symbol='BTC-USDT', timeframe='1H', start_date='2024-01-01T00:00:00',
+        end_date='2024-02-15T00:00:00', initial_capital=10000, position_size_percent=10,
+        confidence_threshold=60, max_concurrent_positions=3, commission_percent=0.1,
+        slippage_percent=0.05, model_type='mock', custom_parameters={}
+    )
+    config.update(overrides)
+    return BacktestConfiguration(**config)
+
+
+class CountingBuilder(BacktestBuilder):
+    """BacktestBuilder yang menghitung signal generation"""
+
+    def __init__(self):
+        super().__init__()
+        self.generations = 0
+
+    async def _generate_historical_signals(self, historical_data, config):
+        self.generations += 1
+        return await super()._generate_historical_signals(historical_data, config)
+
+
+class TestGridHelpers(unittest.TestCase):
+
+    def test_combination_at_matches_product_order(self):
+        ranges = {'a': [1, 2, 3], 'b': ['x', 'y'], 'c': [0.1, 0.2]}
+        grid = expand_grid(ranges)
+        self.assertEqual([combination_at(ranges, i) for i in range(len(grid))], grid)
+
+    def test_signal_key_ignores_execution_parameters(self):
+        self.assertEqual(signal_key({'position_size_percent': 5, 'lookback': 20}),
+                         signal_key({'slippage_percent': 0.1, 'lookback': 20}))
+        self.assertNotEqual(signal_key({'lookback': 20}), signal_key({'lookback': 30}))
+
+
+class TestBacktestOptimizer(unittest.TestCase):
+
+    ranges = {
+        'position_size_percent': [5, 10, 20, 30],
+        'confidence_threshold': [60, 70, 80],
+        'slippage_percent': [0.0, 0.05, 0.1],
+        'commission_percent': [0.05, 0.1],
+        'lookback': [10, 20],
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_full_grid_with_signal_cache(self):
+        builder = CountingBuilder()
+        optimizer = BacktestOptimizer(builder, max_workers=1)
+        result = asyncio.run(optimizer.optimize(make_config(), self.ranges))
+
+        self.assertEqual(result['total_strategies'], 144)
+        self.assertEqual(len(result['parameter_analysis']['position_size_percent']), 4)
+        self.assertEqual(builder.generations, 2)
+        self.assertEqual(result['signal_sets'], 2)
+        scores = [entry['score'] for entry in result['top_results']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_matches_run_backtest(self):
+        params = {'position_size_percent': 20, 'confidence_threshold': 75, 'slippage_percent': 0.1}
+        optimizer = BacktestOptimizer(max_workers=1)
+        result = asyncio.run(optimizer.optimize(make_config(), {name: [value] for name, value in params.items()}))
+        builder = BacktestBuilder(result_store=BacktestStore(base_dir=self.tmp_dir))
+        direct = asyncio.run(builder.run_backtest(make_config(**params, custom_parameters=params)))
+
+        metrics = result['best_strategy']['metrics']
+        self.assertEqual(metrics['total_signals'], direct.total_signals)
+        self.assertAlmostEqual(metrics['total_return'], direct.total_return)
+        self.assertAlmostEqual(metrics['sharpe_ratio'], direct.sharpe_ratio)
+
+    def test_pool_matches_in_process(self):
+        ranges = {'position_size_percent': [5, 10, 20], 'confidence_threshold': [60, 80],
+                  'slippage_percent': [0.0, 0.1]}
+        local = asyncio.run(BacktestOptimizer(max_workers=1).optimize(make_config(), ranges, top_k=12))
+        pooled_optimizer = BacktestOptimizer(max_workers=2, chunk_size=3, parallel_threshold=1)
+        try:
+            pooled = asyncio.run(pooled_optimizer.optimize(make_config(), ranges, top_k=12))
+        finally:
+            pooled_optimizer.close()
+        self.assertEqual(pooled['top_results'], local['top_results'])
+
+    def test_random_and_halving(self):
+        optimizer = BacktestOptimizer(max_workers=1)
+        sampled = asyncio.run(optimizer.optimize(make_config(), self.ranges, search='random', n_iter=20))
+        self.assertEqual(sampled['total_strategies'], 20)
+
+        halving = asyncio.run(optimizer.optimize(make_config(), self.ranges, search='halving', eta=3))
+        self.assertEqual(halving['rungs'][0]['candidates'], 144)
+        self.assertLess(halving['rungs'][-1]['candidates'], 144)
+        candles = [rung['candles'] for rung in halving['rungs']]
+        self.assertEqual(candles, sorted(candles))
+        self.assertEqual(optimizer.stats['signal_generations'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk PriceIndex exit simulation di BacktestBuilder
+First-hit TP/SL/time limit harus sama dengan scan dict per candle yang lama
+"""
+
+import asyncio
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.backtest_builder import BacktestBuilder, BacktestConfiguration, PriceIndex
+from core.backtest_store import BacktestStore
+
+
+def make_data(n=500, seed=8, freq='h'):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq=freq, tz='UTC'),
+        'open': close, 'high': close * (1 + rng.uniform(0, 0.01, n)),
+        'low': close * (1 - rng.uniform(0, 0.01, n)), 'close': close,
+        'volume': rng.uniform(1000, 5000, n)
+    })
+
+
+def legacy_exit(data, entry_time, action, take_profit, stop_loss):
+    """Loop lama atas price_lookup dict"""
+    lookup = {row['timestamp']: row for _, row in data.iterrows()}
+    entry_time = pd.to_datetime(entry_time)
+    for timestamp, prices in lookup.items():
+        if timestamp <= entry_time:
+            continue
+        if (timestamp - entry_time).total_seconds() / 3600 > 48:
+            return timestamp, prices['close'], 'TIME_LIMIT'
+        if action in ('BUY', 'LONG'):
+            if take_profit and prices['high'] >= take_profit:
+                return timestamp, take_profit, 'TAKE_PROFIT'
+            elif stop_loss and prices['low'] <= stop_loss:
+                return timestamp, stop_loss, 'STOP_LOSS'
+        else:
+            if take_profit and prices['low'] <= take_profit:
+                return timestamp, take_profit, 'TAKE_PROFIT'
+            elif stop_loss and prices['high'] >= stop_loss:
+                return timestamp, stop_loss, 'STOP_LOSS'
+    last = max(lookup.keys())
+    return last, lookup[last]['close'], 'END_OF_DATA'
+
+
+class TestPriceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_data()
+        self.index = PriceIndex(self.data)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_matches_legacy_scan(self):
+        rng = np.random.default_rng(1)
+        reasons = set()
+        for i in rng.integers(0, len(self.data), 150):
+            entry = self.data['timestamp'].iloc[i]
+            price = self.data['close'].iloc[i]
+            action = rng.choice(['BUY', 'SELL'])
+            tp_move, sl_move = rng.uniform(0.005, 0.08), rng.uniform(0.005, 0.08)
+            take_profit = price * (1 + tp_move) if action == 'BUY' else price * (1 - tp_move)
+            stop_loss = price * (1 - sl_move) if action == 'BUY' else price * (1 + sl_move)
+            if rng.random() < 0.1:
+                stop_loss = None
+
+            result = self.index.find_exit(entry, action, take_profit, stop_loss)
+            expected = legacy_exit(self.data, entry, action, take_profit, stop_loss)
+            self.assertEqual((result['exit_time'], result['exit_price'], result['exit_reason']), expected)
+            reasons.add(result['exit_reason'])
+        self.assertLessEqual({'TAKE_PROFIT', 'STOP_LOSS', 'TIME_LIMIT'}, reasons)
+
+    def test_entry_after_last_candle(self):
+        entry = self.data['timestamp'].iloc[-1] + pd.Timedelta(hours=1)
+        result = self.index.find_exit(entry, 'BUY', 1e9, 0.0)
+        self.assertEqual(result['exit_reason'], 'END_OF_DATA')
+        self.assertEqual(result['exit_time'], self.data['timestamp'].iloc[-1])
+
+    def test_run_backtest_on_mock_data(self):
+        builder = BacktestBuilder(result_store=BacktestStore(base_dir=self.tmp_dir))
+        config = BacktestConfiguration(
+            symbol='BTC-USDT', timeframe='1H', start_date='2024-01-01T00:00:00',
+            end_date='2024-03-01T00:00:00', initial_capital=10000, position_size_percent=10,
+            confidence_threshold=60, max_concurrent_positions=3, commission_percent=0.1,
+            slippage_percent=0.05, model_type='mock', custom_parameters={}
+        )
+        result = asyncio.run(builder.run_backtest(config))
+        self.assertGreater(result.total_signals, 0)
+        self.assertEqual(len(result.signal_details), result.total_signals)
+
+
+if __name__ == '__main__':
+    unittest.main()
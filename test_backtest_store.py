@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk BacktestStore
+Content-addressed cache, columnar blob round-trip dan history query
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.backtest_builder import BacktestBuilder, BacktestConfiguration
+from core.backtest_store import BacktestStore, decode_columns, encode_columns
+
+
+def make_config(**overrides):
+    values = dict(
+        symbol='BTC-USDT', timeframe='1H', start_date='2024-01-01T00:00:00',
+        end_date='2024-01-20T00:00:00', initial_capital=10000, position_size_percent=10,
+        confidence_threshold=60, max_concurrent_positions=3, commission_percent=0.1,
+        slippage_percent=0.05, model_type='mock', custom_parameters={}
+    )
+    values.update(overrides)
+    return BacktestConfiguration(**values)
+
+
+class TestColumnarEncoding(unittest.TestCase):
+
+    def test_round_trip_preserves_values_and_types(self):
+        start = pd.Timestamp('2024-01-01', tz='UTC')
+        rows = [
+            {'signal_id': 'S1', 'entry_time': start, 'entry_price': 100.5, 'quantity': 2,
+             'take_profit': None, 'success': True, 'extra': {'a': 1}},
+            {'signal_id': 'S2', 'entry_time': start + pd.Timedelta(hours=1), 'entry_price': np.float64(99.0),
+             'quantity': 3, 'take_profit': 110.0, 'success': False, 'extra': None},
+        ]
+        arrays, meta = encode_columns(rows)
+        self.assertEqual(meta['kinds']['entry_time'], 'datetime')
+        self.assertEqual(meta['kinds']['extra'], 'json')
+
+        decoded = decode_columns(arrays, meta)
+        self.assertEqual(decoded, rows)
+        self.assertIsInstance(decoded[0]['quantity'], int)
+        self.assertIsNone(decoded[0]['take_profit'])
+        self.assertEqual(str(decoded[1]['entry_time'].tz), 'UTC')
+
+
+class TestBacktestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = BacktestStore(base_dir=self.tmp_dir)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_history_reads_summaries_newest_first(self):
+        for index, symbol in enumerate(['BTC-USDT', 'ETH-USDT', 'BTC-USDT']):
+            self.store.save(f"key{index}", {'backtest_id': f"BT_{index}", 'symbol': symbol, 'timeframe': '1H',
+                                            'total_return': np.float64(index)},
+                            [{'pnl': 1.0, 'capital_after': 10001.0}], initial_capital=10000)
+
+        runs = self.store.list_runs(symbol='BTC-USDT')
+        self.assertEqual([run['backtest_id'] for run in runs], ['BT_2', 'BT_0'])
+        self.assertEqual(runs[0]['trade_count'], 1)
+        self.assertNotIn('signal_details', runs[0])
+        self.assertEqual(self.store.load('key1')['equity_curve'], [10000.0, 10001.0])
+        self.assertEqual(self.store.find_by_backtest_id('BT_1'), 'key1')
+
+    def test_builder_reuses_identical_runs(self):
+        builder = BacktestBuilder(result_store=self.store)
+        first = asyncio.run(builder.run_backtest(make_config()))
+        second = asyncio.run(builder.run_backtest(make_config()))
+
+        self.assertEqual(second.backtest_id, first.backtest_id)
+        self.assertEqual(second.signal_details, first.signal_details)
+        self.assertAlmostEqual(second.total_return, first.total_return)
+        self.assertEqual(self.store.list_runs()[0]['hit_count'], 1)
+
+        # Any config change is a different content address
+        other = asyncio.run(builder.run_backtest(make_config(position_size_percent=20)))
+        self.assertNotEqual(other.backtest_id, first.backtest_id)
+        self.assertEqual(len(builder.get_backtest_history(symbol='BTC-USDT')), 2)
+        self.assertEqual(builder.get_backtest_result(first.backtest_id).signal_details, first.signal_details)
+
+    def test_open_ended_range_is_not_cached(self):
+        builder = BacktestBuilder(result_store=self.store)
+        config = make_config(start_date='2024-01-01T00:00:00', end_date='2999-01-01T00:00:00')
+        self.assertIsNone(builder._backtest_cache_key(config))
+        self.assertIsNotNone(builder._backtest_cache_key(make_config()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk benchmark datasets & regression tracking
+Dataset synthetic/recorded harus deterministik dan candle-nya konsisten
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+import warnings
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from benchmark_backtests import FrameFetcher, compare_runs, find_baseline
+from core.benchmark_data import (
+    FIXTURE_DIR, SyntheticMarket, load_fixture, make_dataset, replay_ohlcv, save_fixture, synthetic_ohlcv
+)
+from core.candle_store import candles_to_records
+
+
+def assert_valid_candles(test, df, n):
+    test.assertEqual(len(df), n)
+    test.assertEqual(list(df.columns), ['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    test.assertTrue((df['high'] >= df[['open', 'close']].max(axis=1)).all())
+    test.assertTrue((df['low'] <= df[['open', 'close']].min(axis=1)).all())
+    test.assertTrue((df['low'] > 0).all() and (df['volume'] > 0).all())
+    test.assertTrue((df['timestamp'].diff().dropna() == pd.Timedelta(hours=1)).all())
+
+
+class TestSyntheticOHLCV(unittest.TestCase):
+
+    def test_deterministic_per_seed(self):
+        pd.testing.assert_frame_equal(synthetic_ohlcv(5000, seed=7), synthetic_ohlcv(5000, seed=7))
+        self.assertFalse(np.allclose(synthetic_ohlcv(5000, seed=7)['close'],
+                                     synthetic_ohlcv(5000, seed=8)['close']))
+        assert_valid_candles(self, synthetic_ohlcv(5000, seed=7), 5000)
+
+    def test_jumps_and_volume_regimes(self):
+        calm = synthetic_ohlcv(20000, market=SyntheticMarket(jump_rate=0.0))
+        jumpy = synthetic_ohlcv(20000, market=SyntheticMarket(jump_rate=0.02))
+        self.assertGreater(np.abs(np.diff(np.log(jumpy['close']))).max(),
+                           np.abs(np.diff(np.log(calm['close']))).max())
+
+        # Regimes persist, so rolling volume swings well beyond the per-bar noise
+        rolling_volume = calm['volume'].rolling(100).mean().dropna()
+        self.assertGreater(rolling_volume.max() / rolling_volume.min(), 2.0)
+
+
+class TestRecordedReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        source = synthetic_ohlcv(300, seed=3)
+        self.records = candles_to_records([
+            {'timestamp': int(row.timestamp.value // 10**6), 'open': row.open, 'high': row.high,
+             'low': row.low, 'close': row.close, 'volume': row.volume}
+            for row in source.itertuples()
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_fixture_round_trip(self):
+        save_fixture('BTC-USDT', '1H', self.records, self.tmp_dir)
+        np.testing.assert_array_equal(load_fixture('BTC-USDT', '1H', self.tmp_dir), self.records)
+        self.assertIsNone(load_fixture('ETH-USDT', '1H', self.tmp_dir))
+        self.assertIsNone(make_dataset('recorded', 100, fixture_dir=self.tmp_dir, symbol='ETH-USDT'))
+
+    def test_replay_extends_fixture(self):
+        replay = replay_ohlcv(self.records, 2000, seed=1)
+        assert_valid_candles(self, replay, 2000)
+        np.testing.assert_allclose(replay['close'][:300], self.records['close'])
+        pd.testing.assert_frame_equal(replay, replay_ohlcv(self.records, 2000, seed=1))
+
+        # Every replayed return comes from the recording
+        recorded = np.diff(np.log(self.records['close']))
+        replayed = np.diff(np.log(replay['close'].to_numpy()))
+        self.assertLess(np.abs(replayed[:, None] - recorded[None, :]).min(axis=1).max(), 1e-9)
+
+        short = replay_ohlcv(self.records, 50)
+        np.testing.assert_allclose(short['volume'], self.records['volume'][:50])
+
+    def test_committed_sample_fixture_replays(self):
+        fixture_dir = FIXTURE_DIR / 'sample'
+        records = load_fixture('SAMPLE-USDT', '1H', fixture_dir)
+        self.assertIsNotNone(records)
+        replay = make_dataset('recorded', 1000, symbol='SAMPLE-USDT', fixture_dir=fixture_dir)
+        assert_valid_candles(self, replay, 1000)
+        np.testing.assert_allclose(replay['close'][:len(records)], records['close'])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            fetcher = FrameFetcher(replay)
+        self.assertEqual(int(fetcher.records['timestamp'][0]), int(records['timestamp'][0]))
+        self.assertTrue((np.diff(fetcher.records['timestamp']) == 3600 * 1000).all())
+
+
+class TestRegressionTracking(unittest.TestCase):
+
+    def test_compare_and_baseline(self):
+        history = [
+            {'commit': 'aaa111', 'results': {'smc/synthetic/1000': 0.10, 'indicators/synthetic/1000': 0.50}},
+            {'commit': 'bbb222', 'results': {'smc/synthetic/1000': 0.11}},
+        ]
+        self.assertEqual(find_baseline(history, 'bbb222')['commit'], 'aaa111')
+        self.assertEqual(find_baseline(history, 'ccc333')['commit'], 'bbb222')
+        self.assertEqual(find_baseline(history, 'ccc333', baseline='aaa')['commit'], 'aaa111')
+        self.assertIsNone(find_baseline(history[:1], 'aaa111'))
+
+        rows = compare_runs({'smc/synthetic/1000': 0.14, 'indicators/synthetic/1000': 0.45,
+                             'smc/synthetic/10000': 1.0}, history[0]['results'], threshold=0.25)
+        self.assertEqual([row['key'] for row in rows], ['indicators/synthetic/1000', 'smc/synthetic/1000'])
+        self.assertEqual([row['regression'] for row in rows], [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
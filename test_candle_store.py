@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk CandleStore
+Memastikan append, overwrite live candle, backfill dan range read konsisten
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+
+from core.candle_store import CandleStore, candles_to_records
+import core.okx_fetcher as okx_fetcher
+from core.okx_fetcher import CandleFrameCache, OKXFetcher, records_to_frame
+
+HOUR_MS = 3600 * 1000
+
+
+def make_candles(start_index, count, price=100.0):
+    return [
+        {
+            'timestamp': (start_index + i) * HOUR_MS,
+            'open': price + i,
+            'high': price + i + 1,
+            'low': price + i - 1,
+            'close': price + i + 0.5,
+            'volume': 10.0 + i
+        }
+        for i in range(count)
+    ]
+
+
+class TestCandleStore(unittest.TestCase):
+    """Unit test untuk penyimpanan candle lokal"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CandleStore(base_dir=self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_records_sorted_and_deduplicated(self):
+        """OKX mengirim candle newest-first; store harus menyimpan oldest-first"""
+        candles = make_candles(0, 5)[::-1] + [make_candles(4, 1, price=200.0)[0]]
+        records = candles_to_records(candles)
+        self.assertEqual(len(records), 5)
+        self.assertTrue(np.all(np.diff(records['timestamp']) > 0))
+        # Duplicate timestamp keeps the latest occurrence
+        self.assertEqual(records['open'][-1], 200.0)
+
+    def test_append_and_tail(self):
+        """Candle baru di-append, tail mengembalikan slice terakhir"""
+        added = self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(0, 10)))
+        self.assertEqual(added, 10)
+        added = self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(10, 5)))
+        self.assertEqual(added, 5)
+
+        tail = self.store.tail('BTC-USDT', '1H', 3)
+        self.assertEqual(list(tail['timestamp']), [12 * HOUR_MS, 13 * HOUR_MS, 14 * HOUR_MS])
+        self.assertEqual(self.store.count('BTC-USDT', '1H'), 15)
+
+    def test_live_candle_overwritten_in_place(self):
+        """Candle terakhir dengan timestamp sama harus di-update, bukan diduplikasi"""
+        self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(0, 3)))
+        updated = make_candles(2, 2, price=500.0)
+        added = self.store.merge('BTC-USDT', '1H', candles_to_records(updated))
+
+        self.assertEqual(added, 1)
+        stored = self.store.load('BTC-USDT', '1H')
+        self.assertEqual(len(stored), 4)
+        self.assertEqual(stored['open'][2], 500.0)
+
+    def test_backfill_rewrites_in_order(self):
+        """Backfill data lama harus tetap menghasilkan urutan timestamp"""
+        self.store.merge('ETH-USDT', '4H', candles_to_records(make_candles(10, 5)))
+        added = self.store.merge('ETH-USDT', '4H', candles_to_records(make_candles(5, 7)))
+
+        self.assertEqual(added, 5)
+        stored = self.store.load('ETH-USDT', '4H')
+        self.assertEqual(len(stored), 10)
+        self.assertTrue(np.all(np.diff(stored['timestamp']) > 0))
+        self.assertEqual(self.store.first_timestamp('ETH-USDT', '4H'), 5 * HOUR_MS)
+
+    def test_read_range_inclusive(self):
+        """Range read menggunakan batas inklusif"""
+        self.store.merge('SOL-USDT', '1H', candles_to_records(make_candles(0, 20)))
+        window = self.store.read_range('SOL-USDT', '1H', 5 * HOUR_MS, 9 * HOUR_MS)
+        self.assertEqual(len(window), 5)
+        limited = self.store.read_range('SOL-USDT', '1H', 0, 9 * HOUR_MS, limit=3)
+        self.assertEqual(list(limited['timestamp']), [7 * HOUR_MS, 8 * HOUR_MS, 9 * HOUR_MS])
+
+    def test_torn_trailing_record_ignored(self):
+        """Record parsial akibat crash tidak boleh merusak pembacaan"""
+        self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(0, 4)))
+        with open(self.store._path('BTC-USDT', '1H'), 'ab') as f:
+            f.write(b'\x00' * 7)
+
+        self.assertEqual(self.store.count('BTC-USDT', '1H'), 4)
+        self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(4, 1)))
+        self.assertEqual(self.store.count('BTC-USDT', '1H'), 5)
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), 4 * HOUR_MS)
+
+
+class TestCandleFrameCache(unittest.TestCase):
+    """Unit test untuk shared DataFrame cache get_candles"""
+
+    def test_records_to_frame_types(self):
+        """Frame harus float64 dengan DatetimeIndex UTC"""
+        frame = records_to_frame(candles_to_records(make_candles(0, 5)))
+        self.assertEqual(list(frame.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertTrue(all(str(dtype) == 'float64' for dtype in frame.dtypes))
+        self.assertEqual(str(frame.index.tz), 'UTC')
+        self.assertTrue(frame.index.is_monotonic_increasing)
+
+    def test_lru_eviction(self):
+        """Entry paling lama dipakai harus dibuang saat melebihi maxsize"""
+        cache = CandleFrameCache(maxsize=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_ttl_expiry(self):
+        """Entry yang melewati TTL dianggap miss"""
+        cache = CandleFrameCache(maxsize=2, ttl=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+
+
+class HistoryFetcher(OKXFetcher):
+    """OKXFetcher dengan endpoint candles/history-candles palsu di atas history hourly"""
+
+    def __init__(self, candle_store, history):
+        self.candle_store = candle_store
+        self.history = sorted(history, key=lambda candle: -candle['timestamp'])
+
+    def _request_candles(self, endpoint, params):
+        # Recent endpoint only serves the latest 1440 bars, 300 per page
+        source = self.history[:1440] if endpoint.endswith('/candles') else self.history
+        page_limit = 300 if endpoint.endswith('/candles') else 100
+        if 'after' in params:
+            source = [candle for candle in source if candle['timestamp'] < params['after']]
+        return source[:min(params['limit'], page_limit)]
+
+
+class TestCandleSync(unittest.TestCase):
+    """Page cap pada sync/backfill tidak boleh meninggalkan lubang di store"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CandleStore(base_dir=self.tmp_dir)
+        self.now_index = int(time.time() * 1000) // HOUR_MS
+        self.fetcher = HistoryFetcher(self.store, make_candles(self.now_index - 5000, 5001))
+        self.max_pages = okx_fetcher.MAX_BACKFILL_PAGES
+        okx_fetcher.MAX_BACKFILL_PAGES = 5
+
+    def tearDown(self):
+        okx_fetcher.MAX_BACKFILL_PAGES = self.max_pages
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def assert_contiguous(self):
+        ts = self.store.load('BTC-USDT', '1H')['timestamp']
+        self.assertTrue((np.diff(ts) == HOUR_MS).all())
+
+    def test_sync_far_behind_catches_up_in_chunks(self):
+        self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(self.now_index - 3100, 100)))
+        self.fetcher._sync_candle_store('BTC-USDT', '1H', 100)
+        self.assert_contiguous()
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), (self.now_index - 3001 + 499) * HOUR_MS)
+
+        for _ in range(6):
+            self.fetcher._sync_candle_store('BTC-USDT', '1H', 100)
+        self.assert_contiguous()
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), self.now_index * HOUR_MS)
+
+    def test_backfill_cap_resumes_from_first_candle(self):
+        self.store.merge('BTC-USDT', '1H', candles_to_records(make_candles(self.now_index - 100, 101)))
+        start_ms = (self.now_index - 1500) * HOUR_MS
+        self.fetcher._backfill_candle_store('BTC-USDT', '1H', start_ms)
+        self.assert_contiguous()
+        self.assertEqual(self.store.first_timestamp('BTC-USDT', '1H'), (self.now_index - 600) * HOUR_MS)
+
+        self.fetcher._backfill_candle_store('BTC-USDT', '1H', start_ms)
+        self.fetcher._backfill_candle_store('BTC-USDT', '1H', start_ms)
+        self.assert_contiguous()
+        self.assertLessEqual(self.store.first_timestamp('BTC-USDT', '1H'), start_ms)
+
+
+if __name__ == '__main__':
+    unittest.main()
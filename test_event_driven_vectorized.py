@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk mode vectorized EventDrivenBacktester
+Equity curve, trade dan BacktestMetrics harus sama dengan event loop per bar
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.event_driven_backtester import EventDrivenBacktester, OrderSide
+
+
+def make_data(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'open': close, 'high': close * 1.002, 'low': close * 0.998, 'close': close,
+        'volume': rng.lognormal(3, 0.5, n)
+    })
+
+
+def crossover_signals(close):
+    fast = pd.Series(close).rolling(5).mean().to_numpy()
+    slow = pd.Series(close).rolling(20).mean().to_numpy()
+    with np.errstate(invalid='ignore'):
+        return fast > slow, fast < slow
+
+
+class TestVectorizedBacktest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_data()
+        self.entries, self.exits = crossover_signals(self.data['close'].to_numpy())
+
+    def run_event_loop(self, quantity):
+        entries, exits = self.entries, self.exits
+
+        def strategy(data, positions, capital):
+            i = len(data) - 1
+            if entries[i] and 'BTC-USDT' not in positions:
+                return {'action': 'BUY', 'quantity': quantity, 'symbol': 'BTC-USDT'}
+            if exits[i] and 'BTC-USDT' in positions:
+                return {'action': 'CLOSE', 'symbol': 'BTC-USDT'}
+            return None
+
+        backtester = EventDrivenBacktester(initial_capital=10000)
+        return backtester, backtester.run_backtest(self.data, strategy)
+
+    def test_matches_event_loop(self):
+        event_bt, event_metrics = self.run_event_loop(quantity=50)
+        vector_bt = EventDrivenBacktester(initial_capital=10000)
+        vector_metrics = vector_bt.run_vectorized_backtest(
+            self.data, self.entries, self.exits, size=50, size_type='quantity'
+        )
+
+        np.testing.assert_allclose(vector_bt.equity_curve, event_bt.equity_curve, rtol=1e-12)
+        self.assertEqual([(t.side, t.timestamp) for t in vector_bt.trades],
+                         [(t.side, t.timestamp) for t in event_bt.trades])
+        self.assertEqual(vector_metrics.total_trades, event_metrics.total_trades)
+        self.assertAlmostEqual(vector_metrics.total_return, event_metrics.total_return, places=10)
+        self.assertAlmostEqual(vector_metrics.sharpe_ratio, event_metrics.sharpe_ratio, places=8)
+        self.assertEqual(vector_metrics.max_drawdown_duration, event_metrics.max_drawdown_duration)
+        self.assertIn('BACKTEST REPORT', vector_bt.generate_report(vector_metrics).upper())
+
+    def test_fraction_sizing_and_unfunded_entries(self):
+        backtester = EventDrivenBacktester(initial_capital=10000)
+        metrics = backtester.run_vectorized_backtest(self.data, self.entries, self.exits, size=1.0)
+        buys = [t for t in backtester.trades if t.side == OrderSide.BUY]
+        first = buys[0]
+        self.assertAlmostEqual(first.quantity * first.price + first.commission, 10000)
+        self.assertGreater(metrics.total_trades, 0)
+
+        # Notional above available cash is never filled
+        backtester.run_vectorized_backtest(self.data, self.entries, self.exits, size=1e9, size_type='value')
+        self.assertEqual(backtester.trades, [])
+        self.assertEqual(backtester.equity_curve, [10000] * (len(self.data) + 1))
+
+    def test_conflicting_signals_ignored(self):
+        n = len(self.data)
+        entries = np.zeros(n, dtype=bool)
+        exits = np.zeros(n, dtype=bool)
+        entries[[10, 30]] = True
+        exits[[30, 50]] = True
+        backtester = EventDrivenBacktester(initial_capital=10000)
+        backtester.run_vectorized_backtest(self.data, entries, exits, size=0.5)
+        timestamps = self.data['timestamp']
+        self.assertEqual([(t.side, t.timestamp) for t in backtester.trades],
+                         [(OrderSide.BUY, timestamps[10]), (OrderSide.SELL, timestamps[50])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk shared FeatureFrame
+Memastikan memoization per (fingerprint, indikator, params) dan hasil identik dengan rumus lama
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.feature_frame import FeatureFrame, FeatureFrameCache, data_fingerprint
+
+
+def make_ohlcv(n=200, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    return pd.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 1, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+class TestFeatureFrame(unittest.TestCase):
+    """Unit test untuk memoization feature frame"""
+
+    def setUp(self):
+        self.df = make_ohlcv()
+
+    def test_default_params_share_entry(self):
+        frame = FeatureFrame(self.df)
+        first = frame.get('rsi')
+        second = frame.get('rsi', period=14, method='sma')
+        self.assertIs(first, second)
+        self.assertEqual(frame.stats, {'hits': 1, 'computed': 1})
+
+    def test_dependencies_are_reused(self):
+        """MACD mengambil EMA dari frame, jadi EMA tidak dihitung ulang"""
+        frame = FeatureFrame(self.df)
+        frame.get('macd')
+        computed = frame.stats['computed']
+        frame.get('ema', period=12)
+        frame.get('ema', period=26)
+        self.assertEqual(frame.stats['computed'], computed)
+
+    def test_matches_previous_inline_formulas(self):
+        frame = FeatureFrame(self.df)
+        delta = self.df['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        expected_rsi = 100 - (100 / (1 + gain / loss))
+        pd.testing.assert_series_equal(frame.get('rsi'), expected_rsi, check_names=False)
+
+        macd_line = self.df['close'].ewm(span=12).mean() - self.df['close'].ewm(span=26).mean()
+        macd = frame.get('macd')
+        pd.testing.assert_series_equal(macd['macd'], macd_line, check_names=False)
+        pd.testing.assert_series_equal(macd['signal'], macd_line.ewm(span=9).mean(), check_names=False)
+
+        high_low = self.df['high'] - self.df['low']
+        high_close = abs(self.df['high'] - self.df['close'].shift())
+        low_close = abs(self.df['low'] - self.df['close'].shift())
+        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+        pd.testing.assert_series_equal(frame.get('atr'), true_range.rolling(14).mean(), check_names=False)
+
+    def test_wilder_rsi(self):
+        frame = FeatureFrame(self.df)
+        delta = self.df['close'].diff()
+        up = delta.where(delta > 0, 0.0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+        down = (-delta.where(delta < 0, 0.0)).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+        expected = 100 - (100 / (1 + up / down))
+        np.testing.assert_allclose(frame.get('rsi', method='wilder').values, expected.values, equal_nan=True)
+
+    def test_series_input_is_close(self):
+        frame = FeatureFrame(self.df['close'])
+        self.assertEqual(len(frame.get('sma', period=5).dropna()), len(self.df) - 4)
+
+
+class TestFeatureFrameCache(unittest.TestCase):
+    """Unit test untuk cache lintas request"""
+
+    def test_same_candles_hit_cache(self):
+        cache = FeatureFrameCache(maxsize=4)
+        df = make_ohlcv()
+        frame = cache.get_frame(df)
+        self.assertIs(cache.get_frame(df.copy()), frame)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_new_candle_changes_fingerprint(self):
+        df = make_ohlcv()
+        updated = df.copy()
+        updated.iloc[-1, updated.columns.get_loc('close')] += 1
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(updated))
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(df.iloc[1:]))
+
+    def test_lru_bound(self):
+        cache = FeatureFrameCache(maxsize=2)
+        for seed in range(4):
+            cache.get_frame(make_ohlcv(50, seed=seed))
+        self.assertEqual(cache.stats()['size'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk vectorized indicator kernels
+Membandingkan hasil NumPy dengan implementasi loop lama (referensi) pada data random
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.indicator_calculator import (
+    AdvancedIndicatorCalculator, weighted_moving_average, hull_moving_average,
+    rolling_mean_abs_deviation, on_balance_volume, positive_volume_index,
+    volume_by_price_bins, volume_at_price_levels
+)
+
+
+def make_ohlcv(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[50:53] = close[49]  # flat closes exercise the "unchanged" branch
+    spread = np.abs(rng.normal(0, 0.5, n))
+    volume = rng.lognormal(3, 1, n)
+    volume[100:103] = volume[99]
+    return pd.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': volume,
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+# ===== Reference loop implementations (pre-vectorization behaviour) =====
+
+def reference_wma(series, period):
+    weights = np.arange(1, period + 1)
+    return series.rolling(window=period).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+
+
+def reference_mad(series, period):
+    return series.rolling(window=period).apply(lambda x: np.mean(np.abs(x - np.mean(x))), raw=True)
+
+
+def reference_obv(df):
+    obv = pd.Series(index=df.index, dtype=float)
+    obv.iloc[0] = df['volume'].iloc[0]
+    for i in range(1, len(df)):
+        if df['close'].iloc[i] > df['close'].iloc[i-1]:
+            obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
+        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
+            obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
+        else:
+            obv.iloc[i] = obv.iloc[i-1]
+    return obv
+
+
+def reference_pvi(df):
+    pvi = pd.Series(index=df.index, dtype=float)
+    pvi.iloc[0] = 1000
+    for i in range(1, len(df)):
+        if df['volume'].iloc[i] > df['volume'].iloc[i-1]:
+            pvi.iloc[i] = pvi.iloc[i-1] * (df['close'].iloc[i] / df['close'].iloc[i-1])
+        else:
+            pvi.iloc[i] = pvi.iloc[i-1]
+    return pvi
+
+
+def reference_volume_profile(df, price_levels, bins):
+    volume_profile = np.zeros(bins)
+    for i in range(len(df)):
+        high_bin = np.searchsorted(price_levels, df['high'].iloc[i]) - 1
+        low_bin = np.searchsorted(price_levels, df['low'].iloc[i]) - 1
+        volume = df['volume'].iloc[i]
+        if high_bin == low_bin:
+            if 0 <= high_bin < bins:
+                volume_profile[high_bin] += volume
+        else:
+            volume_per_bin = volume / (high_bin - low_bin + 1)
+            for bin_idx in range(low_bin, high_bin + 1):
+                if 0 <= bin_idx < bins:
+                    volume_profile[bin_idx] += volume_per_bin
+    return volume_profile
+
+
+def reference_liquidity(df, price_levels):
+    liquidity_map = np.zeros(len(price_levels))
+    for i in range(len(df)):
+        for j, level in enumerate(price_levels):
+            if df['low'].iloc[i] <= level <= df['high'].iloc[i]:
+                liquidity_map[j] += df['volume'].iloc[i]
+    return liquidity_map
+
+
+class TestVectorizedKernels(unittest.TestCase):
+    """Kernel NumPy harus identik (numerik) dengan versi loop"""
+
+    def setUp(self):
+        self.df = make_ohlcv()
+
+    def assertSeriesClose(self, actual, expected):
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                                   rtol=1e-10, atol=1e-10, equal_nan=True)
+
+    def test_wma(self):
+        for period in (1, 5, 20):
+            self.assertSeriesClose(weighted_moving_average(self.df['close'].values, period),
+                                   reference_wma(self.df['close'], period))
+
+    def test_wma_shorter_than_period(self):
+        self.assertTrue(np.isnan(weighted_moving_average(np.arange(3.0), 5)).all())
+
+    def test_hma(self):
+        close = self.df['close']
+        raw = 2 * reference_wma(close, 10) - reference_wma(close, 20)
+        self.assertSeriesClose(hull_moving_average(close.values, 20), reference_wma(raw, 4))
+
+    def test_mean_abs_deviation(self):
+        typical = (self.df['high'] + self.df['low'] + self.df['close']) / 3
+        self.assertSeriesClose(rolling_mean_abs_deviation(typical.values, 20), reference_mad(typical, 20))
+
+    def test_obv_exact(self):
+        obv = on_balance_volume(self.df['close'].values, self.df['volume'].values)
+        np.testing.assert_array_equal(obv, reference_obv(self.df).values)
+
+    def test_pvi_exact(self):
+        pvi = positive_volume_index(self.df['close'].values, self.df['volume'].values)
+        np.testing.assert_array_equal(pvi, reference_pvi(self.df).values)
+
+    def test_volume_profile_exact(self):
+        bins = 20
+        levels = np.linspace(self.df['low'].min(), self.df['high'].max(), bins + 1)
+        profile = volume_by_price_bins(self.df['low'].values, self.df['high'].values,
+                                       self.df['volume'].values, levels)
+        np.testing.assert_array_equal(profile, reference_volume_profile(self.df, levels, bins))
+
+    def test_liquidity_levels_exact(self):
+        levels = np.linspace(self.df['low'].min(), self.df['high'].max(), 50)
+        liquidity = volume_at_price_levels(self.df['low'].values, self.df['high'].values,
+                                           self.df['volume'].values, levels)
+        np.testing.assert_array_equal(liquidity, reference_liquidity(self.df, levels))
+
+
+class TestCalculatorOutputs(unittest.TestCase):
+    """IndicatorResult dari calculator tetap sama setelah vectorization"""
+
+    def setUp(self):
+        self.df = make_ohlcv(300, seed=11)
+        self.calculator = AdvancedIndicatorCalculator()
+
+    def test_series_indicators_keep_index_and_values(self):
+        result = self.calculator.calculate_indicator(self.df, 'obv')
+        self.assertTrue(result.values.index.equals(self.df.index))
+        np.testing.assert_array_equal(result.values.values, reference_obv(self.df).values)
+
+        result = self.calculator.calculate_indicator(self.df, 'wma')
+        np.testing.assert_allclose(result.values.values, reference_wma(self.df['close'], 20).values,
+                                   rtol=1e-10, equal_nan=True)
+
+    def test_volume_profile_result(self):
+        result = self.calculator.calculate_indicator(self.df, 'volume_profile')
+        self.assertNotEqual(result.signal, 'ERROR')
+
+
+if __name__ == '__main__':
+    unittest.main()
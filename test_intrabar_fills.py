@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk intrabar fill resolution
+Bar yang menyentuh TP dan SL sekaligus diselesaikan dengan candle 1m (lazy + memoized)
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.backtest_builder import PriceIndex
+from core.candle_store import CandleStore, candles_to_records
+from core.intrabar_fills import IntrabarResolver, store_loader
+from core.okx_fetcher import OKXFetcher
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+
+
+def make_bars():
+    # Bar 2 (02:00) spans 99..101: both TP=100.8 and SL=99.2 are inside it
+    close = np.array([100.0, 100.0, 100.0, 100.0])
+    high = np.array([100.1, 100.1, 101.0, 100.1])
+    low = np.array([99.9, 99.9, 99.0, 99.9])
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(4) * HOUR_MS, unit='ms', utc=True),
+        'open': close, 'high': high, 'low': low, 'close': close
+    })
+
+
+def minute_candles(bar_index, sl_first=True):
+    """60 one-minute candles inside hourly bar `bar_index`; the stop is hit at minute 10 or 40"""
+    candles = []
+    for minute in range(60):
+        low, high = 99.9, 100.1
+        if minute == (10 if sl_first else 40):
+            low = 99.0
+        if minute == (40 if sl_first else 10):
+            high = 101.0
+        candles.append({'timestamp': bar_index * HOUR_MS + minute * MINUTE_MS, 'open': 100.0,
+                        'high': high, 'low': low, 'close': 100.0, 'volume': 1.0})
+    return candles
+
+
+class CountingLoader:
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def __call__(self, start_ms, end_ms):
+        self.calls.append((start_ms, end_ms))
+        ts = self.records['timestamp']
+        return self.records[(ts >= start_ms) & (ts <= end_ms)]
+
+
+class TestIntrabarResolution(unittest.TestCase):
+
+    def setUp(self):
+        self.entry = pd.Timestamp(0, unit='ms', tz='UTC')
+
+    def test_bar_level_default_prefers_take_profit(self):
+        result = PriceIndex(make_bars()).find_exit(self.entry, 'BUY', 100.8, 99.2)
+        self.assertEqual(result['exit_reason'], 'TAKE_PROFIT')
+
+    def test_minute_candles_decide_first_touch(self):
+        for sl_first, reason in ((True, 'STOP_LOSS'), (False, 'TAKE_PROFIT')):
+            with self.subTest(sl_first=sl_first):
+                index = PriceIndex(make_bars())
+                index.intrabar = IntrabarResolver(CountingLoader(candles_to_records(minute_candles(2, sl_first))),
+                                                  HOUR_MS)
+                result = index.find_exit(self.entry, 'BUY', 100.8, 99.2)
+                self.assertEqual(result['exit_reason'], reason)
+                self.assertEqual(result['exit_time'], index.times[2])
+
+    def test_lazy_and_memoized(self):
+        loader = CountingLoader(candles_to_records(minute_candles(2)))
+        index = PriceIndex(make_bars())
+        index.intrabar = IntrabarResolver(loader, HOUR_MS)
+
+        for _ in range(3):
+            index.find_exit(self.entry, 'BUY', 100.8, 99.2)
+        index.find_exit(self.entry, 'BUY', 100.9, 99.1)
+        # Unambiguous exits never load minute data
+        index.find_exit(self.entry, 'BUY', 100.05, 90.0)
+
+        self.assertEqual(loader.calls, [(2 * HOUR_MS, 3 * HOUR_MS - 1)])
+        self.assertEqual(index.intrabar.stats['memo_hits'], 2)
+        self.assertEqual(index.intrabar.stats['lookups'], 4)
+
+    def test_missing_minute_data_keeps_bar_level_result(self):
+        index = PriceIndex(make_bars())
+        index.intrabar = IntrabarResolver(CountingLoader(candles_to_records([])), HOUR_MS)
+        self.assertEqual(index.find_exit(self.entry, 'BUY', 100.8, 99.2)['exit_reason'], 'TAKE_PROFIT')
+        self.assertEqual(index.intrabar.stats['unresolved'], 1)
+
+
+class WindowFetcher(OKXFetcher):
+    """OKXFetcher dengan history endpoint palsu"""
+
+    def __init__(self, candle_store, window_store, history):
+        self.candle_store = candle_store
+        self.window_store = window_store
+        self.history = sorted(history, key=lambda candle: -candle['timestamp'])
+        self.requests = []
+
+    def _request_candles(self, endpoint, params):
+        self.requests.append(params)
+        older = [candle for candle in self.history if candle['timestamp'] < params['after']]
+        return older[:params['limit']]
+
+
+class TestCandleWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CandleStore(base_dir=self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_store_loader_reads_local_minutes(self):
+        self.store.merge('BTC-USDT', '1m', candles_to_records(minute_candles(2)))
+        resolver = IntrabarResolver(store_loader(self.store, 'BTC-USDT'), HOUR_MS)
+        self.assertEqual(resolver.first_touch(2 * HOUR_MS * 1_000_000, 'BUY', 100.8, 99.2), 'STOP_LOSS')
+
+    def test_fetches_only_the_requested_window(self):
+        history = [candle for bar in range(4) for candle in minute_candles(bar)]
+        window_store = CandleStore(base_dir=f"{self.tmp_dir}/windows")
+        fetcher = WindowFetcher(self.store, window_store, history)
+
+        records = fetcher.get_candle_window('BTC-USDT', '1m', 2 * HOUR_MS, 3 * HOUR_MS - 1)
+        self.assertEqual(len(records), 60)
+        self.assertEqual(len(fetcher.requests), 1)
+        self.assertEqual(window_store.first_timestamp('BTC-USDT', '1m'), 2 * HOUR_MS - 40 * MINUTE_MS)
+
+        # Second call is served from the window store
+        fetcher.get_candle_window('BTC-USDT', '1m', 2 * HOUR_MS, 3 * HOUR_MS - 1)
+        self.assertEqual(len(fetcher.requests), 1)
+
+    def test_windows_do_not_leave_holes_in_the_main_store(self):
+        history = [candle for bar in range(6) for candle in minute_candles(bar)]
+        self.store.merge('BTC-USDT', '1m', candles_to_records(minute_candles(5)))
+        fetcher = WindowFetcher(self.store, CandleStore(base_dir=f"{self.tmp_dir}/windows"), history)
+
+        self.assertEqual(len(fetcher.get_candle_window('BTC-USDT', '1m', 1 * HOUR_MS, 2 * HOUR_MS - 1)), 60)
+        # The main series still starts at bar 5, so a later backfill fetches bars 1-4
+        self.assertEqual(self.store.first_timestamp('BTC-USDT', '1m'), 5 * HOUR_MS)
+        self.assertEqual(self.store.count('BTC-USDT', '1m'), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk MarketScanner
+Shared memory buffer, sharding dan hasil pool harus sama dengan scan in-process
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+from core.candle_store import CandleStore, candles_to_records
+from core.market_scanner import MarketScanner
+from core.shared_buffers import SharedCandleBuffer, attach_buffer, release_buffers
+
+HOUR_MS = 3600 * 1000
+
+
+def make_records(n=200, seed=0, drift=0.0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    return candles_to_records([
+        {'timestamp': (i + 1) * HOUR_MS, 'open': close[i - 1] if i else close[0],
+         'high': close[i] + spread[i], 'low': close[i] - spread[i], 'close': close[i],
+         'volume': rng.lognormal(3, 1)}
+        for i in range(n)
+    ])
+
+
+class StoreFetcher:
+    """Fetcher yang hanya membaca CandleStore lokal"""
+
+    def __init__(self, store):
+        self.candle_store = store
+
+    def _normalize_symbol(self, symbol):
+        return symbol
+
+    def get_candles(self, *args, **kwargs):
+        return None
+
+
+class TestSharedCandleBuffer(unittest.TestCase):
+
+    def test_roundtrip_through_shared_memory(self):
+        candles = {('BTC-USDT', '1H'): make_records(50, 1), ('ETH-USDT', '4H'): make_records(30, 2)}
+        with SharedCandleBuffer(candles) as buffer:
+            attached = attach_buffer(buffer.name, len(buffer))
+            for unit_id, symbol, timeframe, start, length in buffer.units:
+                np.testing.assert_array_equal(attached[start:start + length], candles[(symbol, timeframe)])
+            del attached
+            release_buffers()
+
+
+class TestMarketScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CandleStore(base_dir=self.tmp_dir)
+        self.symbols = [f"S{i}-USDT" for i in range(6)]
+        for i, symbol in enumerate(self.symbols):
+            for j, timeframe in enumerate(('1H', '4H')):
+                drift = 0.003 if i % 2 == 0 else -0.003
+                self.store.merge(symbol, timeframe, make_records(200, seed=10 * i + j, drift=drift))
+        self.store.merge('SHORT-USDT', '1H', make_records(20, seed=99))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_shards_cover_all_units(self):
+        scanner = MarketScanner(fetcher=StoreFetcher(self.store), max_workers=2)
+        units = [(i, 'S', '1H', 0, length) for i, length in enumerate([300, 50, 200, 10, 100])]
+        shards = scanner._shards(units)
+        self.assertEqual(sorted(unit for shard in shards for unit in shard), sorted(units))
+
+    def test_scan_ranks_and_skips_short_history(self):
+        scanner = MarketScanner(fetcher=StoreFetcher(self.store), max_workers=1)
+        result = scanner.scan(symbols=self.symbols + ['SHORT-USDT'], timeframes=['1H', '4H'], top_n=3)
+        self.assertEqual(result['scanned_symbols'], 6)
+        self.assertEqual(result['skipped_units'], 2)
+        self.assertEqual(len(result['signals']), 3)
+        convictions = [signal['conviction'] for signal in result['signals']]
+        self.assertEqual(convictions, sorted(convictions, reverse=True))
+        self.assertIn('smc', result['signals'][0]['timeframes']['1H'])
+
+    def test_pool_matches_in_process(self):
+        fetcher = StoreFetcher(self.store)
+        local = MarketScanner(fetcher=fetcher, max_workers=1)
+        pooled = MarketScanner(fetcher=fetcher, max_workers=2, parallel_threshold=1)
+        try:
+            candles = local.load_candles(self.symbols, ['1H', '4H'])
+            self.assertEqual(pooled.analyze_units(candles), local.analyze_units(candles))
+        finally:
+            pooled.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk MonteCarloEngine
+Statistik per path harus sama dengan perhitungan loop BacktestBuilder
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+from core.backtest_builder import BacktestBuilder
+from core.backtest_store import BacktestStore
+from core.monte_carlo_engine import MonteCarloEngine, bootstrap_indices, path_statistics
+
+
+class TestMonteCarloEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.returns = np.random.default_rng(5).normal(0.4, 3.0, 60)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_paths_match_loop_drawdown(self):
+        indices = bootstrap_indices(np.random.default_rng(1), len(self.returns), 50)
+        paths = self.returns[indices]
+        stats = path_statistics(paths, ruin_level=0.5)
+        builder = BacktestBuilder(result_store=BacktestStore(base_dir=self.tmp_dir))
+        for row, path in enumerate(paths):
+            self.assertAlmostEqual(stats['max_drawdown'][row],
+                                   builder._calculate_max_drawdown_from_returns(list(path)))
+            self.assertAlmostEqual(stats['total_return'][row], (np.prod(1 + path / 100) - 1) * 100)
+
+    def test_block_bootstrap_keeps_runs(self):
+        indices = bootstrap_indices(np.random.default_rng(2), 20, 100, block_size=5)
+        self.assertEqual(indices.shape, (100, 20))
+        steps = (np.diff(indices, axis=1) % 20)[:, :4]
+        self.assertTrue((steps == 1).all())
+
+    def test_chunking_does_not_change_results(self):
+        whole = MonteCarloEngine().simulate(self.returns, num_simulations=3000, seed=9, block_size=3)
+        chunked = MonteCarloEngine(chunk_elements=1000).simulate(self.returns, num_simulations=3000,
+                                                                 seed=9, block_size=3)
+        np.testing.assert_array_equal(whole.total_returns, chunked.total_returns)
+        np.testing.assert_array_equal(whole.max_drawdowns, chunked.max_drawdowns)
+
+    def test_risk_metrics(self):
+        result = MonteCarloEngine().simulate(self.returns, num_simulations=20000, seed=3)
+        risk = result.risk_metrics()
+        self.assertLessEqual(risk['cvar_95'], risk['var_95'])
+        self.assertTrue(0 <= risk['risk_of_ruin'] <= 100)
+        self.assertEqual(result.summary()['num_simulations'], 20000)
+
+        doomed = MonteCarloEngine().simulate([-30.0, -30.0], num_simulations=10, seed=0)
+        self.assertEqual(doomed.risk_of_ruin(), 100.0)
+
+    def test_rejects_zero_simulations(self):
+        with self.assertRaises(ValueError):
+            MonteCarloEngine().simulate(self.returns, num_simulations=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk shared OKX client rate limiting
+Memastikan token bucket per endpoint group mengikuti limit OKX
+"""
+
+import asyncio
+import unittest
+import sys
+sys.path.append('.')
+
+from core.okx_async_client import (
+    TokenBucket, OKXAsyncClient, OKXRateLimiter, OKX_RATE_LIMITS, DEFAULT_RATE_LIMIT
+)
+from core.enhanced_okx_fetcher import EnhancedOKXFetcher
+from core.okx_maximizer import OKXMaximizer
+
+
+class StubResponse:
+    """aiohttp response stand-in; holds the request open briefly to expose concurrency"""
+
+    def __init__(self, session, payload):
+        self.session = session
+        self.payload = payload
+
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.peak = max(self.session.peak, self.session.in_flight)
+        await asyncio.sleep(0.05)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.session.in_flight -= 1
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class StubSession:
+    """Session yang menjawab per endpoint path; endpoint tak dikenal -> OKX error"""
+
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    def get(self, url, params=None):
+        path = url.split('okx.com', 1)[-1]
+        self.calls.append((path, params))
+        if path in self.responses:
+            payload = {'code': '0', 'data': self.responses[path]}
+        else:
+            payload = {'code': '51001', 'msg': 'Instrument ID does not exist'}
+        return StubResponse(self, payload)
+
+    async def close(self):
+        pass
+
+
+class StubbedClient(OKXAsyncClient):
+
+    def __init__(self, responses):
+        super().__init__(limiter=OKXRateLimiter())
+        self.session = StubSession(responses)
+
+    async def _get_session(self):
+        return self.session
+
+
+SWAP = 'BTC-USDT-SWAP'
+RESPONSES = {
+    '/api/v5/market/ticker': [{'instId': SWAP, 'last': '50000', 'vol24h': '1200', 'chg24h': '1.5',
+                               'high24h': '51000', 'low24h': '49000'}],
+    '/api/v5/market/books': [{'bids': [['49990', '2', '0', '1']], 'asks': [['50010', '1', '0', '1']]}],
+    '/api/v5/public/funding-rate': [{'instId': SWAP, 'fundingRate': '0.0001', 'nextFundingTime': '0'}],
+    '/api/v5/public/open-interest': [{'instId': SWAP, 'oi': '1000', 'oiCcy': '10'}],
+    '/api/v5/public/price-limit': [{'instId': SWAP, 'buyLmt': '52000', 'sellLmt': '48000'}],
+    '/api/v5/public/liquidation-orders': [],
+    '/api/v5/public/position-tiers': [],
+    '/api/v5/public/funding-rate-history': [],
+    '/api/v5/public/opt-summary': [],
+}
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Unit test untuk token bucket"""
+
+    def test_burst_within_capacity_does_not_wait(self):
+        """Request sampai kapasitas bucket tidak perlu menunggu"""
+        bucket = TokenBucket(capacity=5, refill_per_second=2.5)
+        waits = [bucket.reserve() for _ in range(5)]
+        self.assertTrue(all(wait == 0.0 for wait in waits))
+
+    def test_over_capacity_waits_for_refill(self):
+        """Request melebihi kapasitas harus menunggu sesuai refill rate"""
+        bucket = TokenBucket(capacity=2, refill_per_second=10)
+        bucket.reserve()
+        bucket.reserve()
+        wait = bucket.reserve()
+        self.assertAlmostEqual(wait, 0.1, places=2)
+        # Reservasi berikutnya antri di belakang yang sebelumnya
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+
+class TestOKXRateLimiter(unittest.TestCase):
+    """Unit test untuk pemetaan endpoint group"""
+
+    def test_endpoint_groups_use_documented_limits(self):
+        limiter = OKXRateLimiter()
+        bucket = limiter.bucket_for('/api/v5/market/books?instId=BTC-USDT')
+        self.assertEqual(bucket.capacity, OKX_RATE_LIMITS['/api/v5/market/books'])
+        self.assertIs(bucket, limiter.bucket_for('/api/v5/market/books'))
+
+    def test_unknown_endpoint_uses_default(self):
+        limiter = OKXRateLimiter()
+        self.assertEqual(limiter.bucket_for('/api/v5/public/unknown').capacity, DEFAULT_RATE_LIMIT)
+
+
+
+class TestFetchMany(unittest.TestCase):
+    """fetch_many terhadap session stub: hasil per key, error -> None, paralel"""
+
+    def setUp(self):
+        self.client = StubbedClient(RESPONSES)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_batch_results_and_errors(self):
+        result = self.client.fetch_many({
+            'ticker': ('/api/v5/market/ticker', {'instId': SWAP}),
+            'books': ('/api/v5/market/books', {'instId': SWAP, 'sz': '20'}),
+            'missing': ('/api/v5/public/insurance-fund', {'instType': 'SWAP'}),
+        })
+        self.assertEqual(result['ticker'], RESPONSES['/api/v5/market/ticker'])
+        self.assertEqual(result['books'], RESPONSES['/api/v5/market/books'])
+        self.assertIsNone(result['missing'])
+        self.assertEqual(self.client.stats, {'requests': 3, 'errors': 1})
+        # Sub-requests overlap instead of running one after another
+        self.assertEqual(self.client.session.peak, 3)
+
+    def test_empty_batch_and_request_sync(self):
+        self.assertEqual(self.client.fetch_many({}), {})
+        self.assertEqual(self.client.request_sync('/api/v5/public/open-interest', {'instId': SWAP}),
+                         RESPONSES['/api/v5/public/open-interest'])
+
+
+class TestComprehensiveFetchers(unittest.TestCase):
+    """Comprehensive fetchers mengirim satu batch dan merakit hasilnya"""
+
+    def setUp(self):
+        self.client = StubbedClient(RESPONSES)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_enhanced_fetcher_market_data(self):
+        fetcher = EnhancedOKXFetcher()
+        fetcher.client = self.client
+        data = fetcher.get_comprehensive_market_data(SWAP)['data']
+
+        self.assertEqual(data['ticker'], RESPONSES['/api/v5/market/ticker'])
+        self.assertEqual(data['open_interest'], RESPONSES['/api/v5/public/open-interest'])
+        self.assertIn('option_summary', data)
+        self.assertEqual(len(self.client.session.calls), 10)
+        self.assertGreater(self.client.session.peak, 1)
+
+    def test_maximizer_analysis(self):
+        maximizer = OKXMaximizer.__new__(OKXMaximizer)
+        maximizer.client = self.client
+        components = maximizer.get_comprehensive_okx_analysis(SWAP)['components']
+
+        self.assertEqual(components['market_data']['price'], 50000.0)
+        self.assertEqual(components['open_interest']['open_interest'], 1000.0)
+        self.assertAlmostEqual(components['funding_analysis']['current_funding_rate'], 0.0001)
+        self.assertEqual(components['risk_analysis']['buy_limit'], 52000.0)
+        self.assertEqual(len(self.client.session.calls), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk OKX WebSocket ingestion
+Menggunakan stand-in WebSocket server lokal (aiohttp) sebagai pengganti OKX
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+from aiohttp import web
+
+from core.candle_store import CANDLE_DTYPE, CandleStore, candles_to_records
+from core.okx_ws_ingestor import OKXWebSocketIngestor, CandleRingBuffer
+
+HOUR_MS = 3600 * 1000
+
+
+def candle_msg(symbol, ts, close, confirm='0'):
+    return json.dumps({
+        'arg': {'channel': 'candle1H', 'instId': symbol},
+        'data': [[str(ts), str(close), str(close + 1), str(close - 1), str(close), '10', '0', '0', confirm]]
+    })
+
+
+def ticker_msg(symbol, last):
+    return json.dumps({
+        'arg': {'channel': 'tickers', 'instId': symbol},
+        'data': [{'instId': symbol, 'last': str(last), 'open24h': '100', 'high24h': '120',
+                  'low24h': '90', 'vol24h': '5', 'volCcy24h': '500', 'ts': '1700000000000'}]
+    })
+
+
+class StandInOKXServer:
+    """Local WS server: records subscribe args and replays canned frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.subscriptions = []
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.data == 'ping':
+                await ws.send_str('pong')
+                continue
+            payload = json.loads(msg.data)
+            if payload.get('op') == 'subscribe':
+                self.subscriptions.extend(payload['args'])
+                await ws.send_str(json.dumps({'event': 'subscribe', 'arg': payload['args'][0]}))
+                for frame in self.frames:
+                    await ws.send_str(frame)
+        return ws
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/ws', self._handler)
+        runner = web.AppRunner(app)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait(5)
+        return f"http://127.0.0.1:{self.port}/ws"
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class TestCandleRingBuffer(unittest.TestCase):
+    """Unit test untuk ring buffer candle"""
+
+    def _record(self, ts, close):
+        return np.array((ts, close, close, close, close, 1.0), dtype=CANDLE_DTYPE)
+
+    def test_live_update_and_wraparound(self):
+        buffer = CandleRingBuffer(capacity=3)
+        for i in range(5):
+            self.assertTrue(buffer.update(self._record(i * HOUR_MS, 100 + i)))
+        self.assertFalse(buffer.update(self._record(4 * HOUR_MS, 999)))
+
+        records = buffer.to_records()
+        self.assertEqual(list(records['timestamp']), [2 * HOUR_MS, 3 * HOUR_MS, 4 * HOUR_MS])
+        self.assertEqual(records['close'][-1], 999)
+        self.assertEqual(len(buffer.to_records(2)), 2)
+
+    def test_stale_candle_ignored(self):
+        buffer = CandleRingBuffer(capacity=3)
+        buffer.update(self._record(5 * HOUR_MS, 1))
+        self.assertFalse(buffer.update(self._record(4 * HOUR_MS, 1)))
+        self.assertEqual(len(buffer), 1)
+
+
+class TestMessageHandling(unittest.TestCase):
+    """Unit test parsing frame OKX tanpa koneksi"""
+
+    def setUp(self):
+        self.ingestor = OKXWebSocketIngestor(['BTC-USDT'], timeframes=['1H'], public_url='ws://unused')
+        self.closed = []
+        self.ingestor.on('candle_close', lambda symbol, payload: self.closed.append(int(payload['candle']['timestamp'])))
+
+    def test_confirmed_candle_closes_bar_once(self):
+        self.ingestor.handle_message(candle_msg('BTC-USDT', HOUR_MS, 100, confirm='1'))
+        self.ingestor.handle_message(candle_msg('BTC-USDT', HOUR_MS, 100, confirm='1'))
+        self.assertEqual(self.closed, [HOUR_MS])
+
+    def test_next_bar_implicitly_closes_previous(self):
+        self.ingestor.handle_message(candle_msg('BTC-USDT', HOUR_MS, 100))
+        self.ingestor.handle_message(candle_msg('BTC-USDT', 2 * HOUR_MS, 101))
+        self.assertEqual(self.closed, [HOUR_MS])
+        self.assertEqual(len(self.ingestor.get_candles('BTC-USDT', '1H')), 2)
+
+    def test_ticker_change_percent(self):
+        self.ingestor.handle_message(ticker_msg('BTC-USDT', 110))
+        ticker = self.ingestor.get_ticker('BTC-USDT')
+        self.assertAlmostEqual(ticker['change_24h'], 10.0)
+
+
+class TestClosedBarPersistence(unittest.TestCase):
+    """Closed bar hanya di-append bila menyambung series di candle store"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CandleStore(base_dir=self.tmp_dir)
+        self.store.merge('BTC-USDT', '1H', candles_to_records([
+            {'timestamp': ts * HOUR_MS, 'open': 100, 'high': 101, 'low': 99, 'close': 100, 'volume': 1}
+            for ts in (1, 2)
+        ]))
+        self.ingestor = OKXWebSocketIngestor(['BTC-USDT'], timeframes=['1H'], public_url='ws://unused',
+                                             candle_store=self.store)
+        self.closed = []
+        self.ingestor.on('candle_close', lambda symbol, payload: self.closed.append(int(payload['candle']['timestamp'])))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_contiguous_bar_is_stored(self):
+        self.ingestor.handle_message(candle_msg('BTC-USDT', 3 * HOUR_MS, 102, confirm='1'))
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), 3 * HOUR_MS)
+
+    def test_bar_after_gap_is_left_to_rest_sync(self):
+        self.ingestor.handle_message(candle_msg('BTC-USDT', 6 * HOUR_MS, 105, confirm='1'))
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), 2 * HOUR_MS)
+        # Listeners still see the close
+        self.assertEqual(self.closed, [6 * HOUR_MS])
+
+        # Once REST sync has filled the hole, the feed appends again
+        self.store.merge('BTC-USDT', '1H', candles_to_records([
+            {'timestamp': ts * HOUR_MS, 'open': 100, 'high': 101, 'low': 99, 'close': 100, 'volume': 1}
+            for ts in (3, 4, 5, 6)
+        ]))
+        self.ingestor.handle_message(candle_msg('BTC-USDT', 7 * HOUR_MS, 106, confirm='1'))
+        self.assertEqual(self.store.last_timestamp('BTC-USDT', '1H'), 7 * HOUR_MS)
+
+
+class TestStandInServer(unittest.TestCase):
+    """Integration test ingestor terhadap stand-in WS server lokal"""
+
+    def test_multiplexed_subscription_and_push(self):
+        server = StandInOKXServer([
+            ticker_msg('BTC-USDT', 105),
+            ticker_msg('ETH-USDT', 95),
+            candle_msg('BTC-USDT', HOUR_MS, 100, confirm='1'),
+        ])
+        url = server.start()
+        ingestor = OKXWebSocketIngestor(
+            ['BTC-USDT', 'ETH-USDT'], timeframes=['1H'],
+            channels=('tickers', 'candle'), public_url=url, business_url=url
+        )
+        closes = []
+        ingestor.on('candle_close', lambda symbol, payload: closes.append(symbol))
+
+        try:
+            ingestor.start()
+            deadline = time.time() + 5
+            while time.time() < deadline and not (closes and ingestor.get_ticker('ETH-USDT')):
+                time.sleep(0.05)
+
+            self.assertEqual(closes, ['BTC-USDT'])
+            self.assertEqual(ingestor.get_ticker('BTC-USDT')['last_price'], 105)
+            # All symbols and channels share one connection
+            self.assertEqual(len(server.subscriptions), 4)
+        finally:
+            ingestor.stop()
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk PaperTradingEngine
+Streaming strategy state harus sama dengan precomputed features; sesi persisten di SQLite
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.backtesting_engine import BacktestingEngine
+from core.okx_ws_ingestor import OKXWebSocketIngestor
+from core.paper_trading import PaperTradingEngine, StrategyStream
+from core.realtime_streamer import RealtimeDataStreamer
+from core.streaming_indicators import StreamingIndicatorManager
+from core.walk_forward import STEP_STRATEGIES, StrategyFeatures
+
+HOUR_MS = 3600 * 1000
+
+
+def make_candles(n=400, seed=23):
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.choice([-0.004, 0.004], n // 40 + 1), 40)[:n]
+    close = 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.003, 'low': close * 0.997, 'close': close,
+        'volume': rng.lognormal(3, 0.5, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h', tz='UTC'))
+
+
+def candle_at(df, i):
+    row = df.iloc[i]
+    return {'timestamp': int(df.index[i].value // 10**6), 'open': row['open'], 'high': row['high'],
+            'low': row['low'], 'close': row['close'], 'volume': row['volume']}
+
+
+class FrameFetcher:
+    """Fetcher yang mengembalikan prefix DataFrame yang bisa digeser"""
+
+    def __init__(self, df, end):
+        self.df = df
+        self.end = end
+
+    def get_candles(self, symbol, timeframe, limit=100):
+        return self.df.iloc[max(0, self.end - limit):self.end].copy()
+
+
+class TestStrategyStream(unittest.TestCase):
+
+    def test_signals_match_precomputed_features(self):
+        df = make_candles()
+        features = StrategyFeatures(df)
+        stream = StrategyStream()
+        matched = 0
+        for i in range(len(df)):
+            stream.update(tuple(candle_at(df, i).values()))
+            if i > 0:
+                self.assertAlmostEqual(stream.current['macd'], features.arrays['macd'][i], places=9)
+            for name, step in STEP_STRATEGIES.items():
+                expected = step(features.view(i))
+                self.assertEqual(step(stream.bar()), expected, f"{name} bar {i}")
+                matched += expected is not None
+        self.assertGreater(matched, 0)
+
+    def test_state_round_trip(self):
+        df = make_candles(120)
+        stream = StrategyStream()
+        for i in range(100):
+            stream.update(tuple(candle_at(df, i).values()))
+        restored = StrategyStream.from_state(stream.to_state())
+        for i in range(100, 120):
+            candle = tuple(candle_at(df, i).values())
+            stream.update(candle)
+            restored.update(candle)
+        self.assertEqual(restored.current, stream.current)
+
+
+class TestPaperTradingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'paper.db')
+        self.df = make_candles()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_sessions_survive_restart_and_candles_apply_once(self):
+        first = PaperTradingEngine(self.db_path)
+        sessions = [first.start_session('BTC-USDT', strategy)['session_id'] for strategy in STEP_STRATEGIES]
+        with self.assertRaises(ValueError):
+            first.start_session('BTC-USDT', 'ML_ENSEMBLE')
+
+        trades = []
+        for i in range(200):
+            trades += first.on_candle_close('BTC-USDT', '1H', candle_at(self.df, i))
+        first.close()
+
+        # A second worker (or a restarted one) continues from the persisted feed state
+        second = PaperTradingEngine(self.db_path)
+        self.assertEqual(second.on_candle_close('BTC-USDT', '1H', candle_at(self.df, 199)), [])
+        for i in range(200, len(self.df)):
+            trades += second.on_candle_close('BTC-USDT', '1H', candle_at(self.df, i))
+
+        self.assertGreater(len(trades), 0)
+        for session_id in sessions:
+            session = second.get_session(session_id)
+            history = second.get_trades(session_id)
+            self.assertEqual(session['trade_count'], len(history))
+            if history:
+                self.assertAlmostEqual(session['balance'], history[-1]['balance_after'])
+        self.assertEqual(second.feed_timestamp('BTC-USDT', '1H'), candle_at(self.df, len(self.df) - 1)['timestamp'])
+        second.close()
+
+    def test_backtesting_engine_paper_api(self):
+        fetcher = FrameFetcher(self.df, 150)
+        engine = BacktestingEngine(okx_fetcher=fetcher, paper_engine=PaperTradingEngine(self.db_path))
+        started = engine.start_paper_trading('BTC-USDT', 'BREAKOUT')
+        session_id = started['session_id']
+
+        for end in range(150, len(self.df)):
+            fetcher.end = end
+            result = engine.execute_paper_trade(session_id)
+            self.assertNotIn('error', result)
+
+        status = engine.get_paper_trading_status(session_id)
+        self.assertEqual(status['status'], 'ACTIVE')
+        self.assertGreater(status['total_trades'], 0)
+        self.assertLessEqual(len(status['recent_trades']), 5)
+        self.assertIn('error', engine.get_paper_trading_status('missing'))
+
+    def test_streamer_drives_sessions_on_bar_close(self):
+        engine = PaperTradingEngine(self.db_path)
+        ingestor = OKXWebSocketIngestor(['BTC-USDT'], timeframes=('1H',))
+        RealtimeDataStreamer(symbols=['BTC-USDT'], ingestor=ingestor, paper_engine=engine,
+                             indicators=StreamingIndicatorManager(checkpoint_dir=self.tmp_dir))
+        session_id = engine.start_session('BTC-USDT', 'BREAKOUT')['session_id']
+
+        for i in range(len(self.df)):
+            ingestor._emit('candle_close', 'BTC-USDT', {'timeframe': '1H', 'candle': candle_at(self.df, i)})
+
+        # No polling: the bar closes alone advanced the session
+        self.assertEqual(engine.feed_timestamp('BTC-USDT', '1H'), candle_at(self.df, len(self.df) - 1)['timestamp'])
+        self.assertGreater(engine.get_session(session_id)['trade_count'], 0)
+        engine.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk PortfolioBacktester
+Event clock, risk sizing, stop loss, circuit breaker dan equity portfolio
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.circuit_breaker import SimulatedCircuitBreaker
+from core.event_driven_backtester import EventDrivenBacktester, OrderSide
+from core.portfolio_backtester import PortfolioBacktester, merge_clock
+from core.risk_manager import RiskManager
+
+
+def make_frame(close, start='2024-01-01', freq='15min'):
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=len(close), freq=freq),
+        'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close
+    })
+
+
+def flags(n, bars):
+    mask = np.zeros(n, dtype=bool)
+    mask[list(bars)] = True
+    return mask
+
+
+class TestMergeClock(unittest.TestCase):
+
+    def test_heap_merge_aligns_rows(self):
+        a = np.array([0, 10, 20, 30], dtype=np.int64)
+        b = np.array([5, 10, 30], dtype=np.int64)
+        clock, rows = merge_clock([a, b])
+        self.assertEqual(clock.tolist(), [0, 5, 10, 20, 30])
+        self.assertEqual(rows[0].tolist(), [0, 2, 3, 4])
+        self.assertEqual(rows[1].tolist(), [1, 2, 4])
+
+
+class TestPortfolioBacktester(unittest.TestCase):
+
+    def test_risk_sizing_and_equity(self):
+        close = np.linspace(100, 110, 50)
+        data = {'BTC-USDT': make_frame(close), 'ETH-USDT': make_frame(close / 10, start='2024-01-01 00:05')}
+        signals = {
+            'BTC-USDT': {'entries': flags(50, [5]), 'exits': flags(50, [40])},
+            'ETH-USDT': {'entries': flags(50, [10]), 'exits': flags(50, [])},
+        }
+        backtester = PortfolioBacktester(initial_capital=100000, max_allocation_pct=100,
+                                         use_circuit_breaker=False)
+        metrics = backtester.run_backtest(data, signals)
+
+        first_buy = backtester.trades[0]
+        execution_price = close[5] * 1.0005
+        expected = RiskManager().calculate_position_size(execution_price, close[5] * 0.98,
+                                                         account_balance=100000, risk_percent=1.0)
+        self.assertAlmostEqual(first_buy.quantity, expected['position_size'])
+        self.assertEqual(len(backtester.clock), 100)
+        self.assertEqual(metrics.total_trades, 1)
+        self.assertIn('ETH-USDT', backtester.positions)
+
+        # Final equity = cash + open ETH position at its last close
+        cash = 100000
+        for trade in backtester.trades:
+            value = trade.quantity * trade.price
+            cash += -value - trade.commission if trade.side == OrderSide.BUY else value - trade.commission
+        eth = backtester.positions['ETH-USDT']['quantity'] * close[-1] / 10
+        self.assertAlmostEqual(backtester.equity_curve[-1], cash + eth, places=6)
+
+    def test_stop_loss_fires_before_exit_signal(self):
+        close = np.concatenate([np.full(10, 100.0), np.full(10, 95.0)])
+        data = {'SOL-USDT': make_frame(close)}
+        signals = {'SOL-USDT': {'entries': flags(20, [2]), 'exits': flags(20, [15])}}
+        backtester = PortfolioBacktester(use_circuit_breaker=False, stop_loss_pct=2.0)
+        backtester.run_backtest(data, signals)
+
+        sells = [trade for trade in backtester.trades if trade.side == OrderSide.SELL]
+        self.assertEqual(len(sells), 1)
+        self.assertEqual(sells[0].timestamp, data['SOL-USDT']['timestamp'][10])
+        self.assertEqual(backtester.symbol_stats['SOL-USDT']['stops'], 1)
+
+    def test_circuit_breaker_blocks_after_losses(self):
+        n = 200
+        close = 100 * np.exp(-0.001 * np.arange(n))
+        entries = flags(n, range(0, n - 2, 10))
+        exits = flags(n, range(5, n, 10))
+        backtester = PortfolioBacktester(breaker_thresholds={'max_consecutive_losses': 2})
+        backtester.run_backtest({'XRP-USDT': make_frame(close)}, {'XRP-USDT': {'entries': entries, 'exits': exits}})
+
+        self.assertGreater(backtester.stats['blocked_by_breaker'], 0)
+        self.assertGreater(backtester.stats['circuit_breaker']['triggers'], 0)
+
+    def test_event_driven_portfolio_mode(self):
+        close = np.linspace(100, 120, 60)
+        engine = EventDrivenBacktester(initial_capital=50000)
+        metrics = engine.run_portfolio_backtest(
+            {'BTC-USDT': make_frame(close)},
+            {'BTC-USDT': {'entries': flags(60, [3]), 'exits': flags(60, [50])}},
+            use_circuit_breaker=False
+        )
+        self.assertGreater(metrics.total_return, 0)
+        self.assertIn('BACKTEST REPORT', engine.generate_report(metrics))
+
+
+class TestSimulatedCircuitBreaker(unittest.TestCase):
+
+    def test_cooling_and_recovery(self):
+        breaker = SimulatedCircuitBreaker(10000, {'max_consecutive_losses': 1})
+        self.assertTrue(breaker.allow_entry(0))
+        breaker.record_outcome(60, -10, 9990)
+        self.assertFalse(breaker.allow_entry(120))
+        # After the cooling period the breaker is half-open and allows entries again
+        self.assertTrue(breaker.allow_entry(60 + 7200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk RedisManager bulk/versioned operations dan TTLCache fallback
+Dedup banyak signal harus satu round trip; invalidasi tanpa menghapus key
+"""
+
+import unittest
+import fnmatch
+import sys
+sys.path.append('.')
+
+from core.redis_manager import RedisManager, TTLCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Minimal in-process Redis: string keys, pipelines counted as one round trip"""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def _call(self, name, *args):
+        return getattr(self, f"_{name}")(*args)
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def _setex(self, key, seconds, value):
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        self.round_trips += 1
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def scan_iter(self, match, count):
+        self.round_trips += 1
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def unlink(self, *keys):
+        self.round_trips += 1
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        self.client.round_trips += 1
+        return [self.client._call(name, *args) for name, args in self.calls]
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_expiry_and_overwrite(self):
+        clock = FakeClock()
+        cache = TTLCache(clock=clock)
+        cache.set('a', 1, 10)
+        cache.set('b', 2, 30)
+        cache.set('a', 3, 60)
+
+        clock.now += 20
+        self.assertEqual(cache.purge_expired(), 0)
+        self.assertEqual(cache.get('a'), 3)
+        clock.now += 15
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual((len(cache), cache.get('a')), (1, 3))
+
+    def test_max_size_evicts_soonest_expiring(self):
+        cache = TTLCache(max_size=3, clock=FakeClock())
+        for i, ttl in enumerate([50, 10, 40, 30]):
+            cache.set(i, i, ttl)
+        self.assertEqual(sorted(key for key in range(4) if key in cache), [0, 2, 3])
+
+    def test_stale_heap_entries_are_compacted(self):
+        cache = TTLCache(clock=FakeClock())
+        for i in range(1000):
+            cache.set('same', i, 60)
+        self.assertLess(len(cache._heap), 100)
+
+
+class TestRedisManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = RedisManager()
+        self.client = FakeRedis()
+        self.manager.redis_client = self.manager.cache_client = self.client
+        self.manager.connected = True
+
+    def test_bulk_dedup_is_one_round_trip(self):
+        ids = [f"BTC-USDT:BUY:{i}" for i in range(100)]
+        self.manager.mark_signals_sent(ids[:40])
+        self.assertEqual(self.client.round_trips, 1)
+
+        sent = self.manager.are_signals_sent(ids)
+        self.assertEqual(self.client.round_trips, 2)
+        self.assertEqual(sum(sent.values()), 40)
+        self.assertTrue(sent[ids[0]] and not sent[ids[99]])
+        # Unversioned namespace keeps the old key layout
+        self.assertIn(f"signal:{ids[0]}", self.client.data)
+
+    def test_namespace_version_invalidates_without_deleting(self):
+        self.manager.mark_signal_sent('s1')
+        self.manager.set_cache_many({'a': {'x': 1}, 'b': [1, 2]})
+        self.assertEqual(self.manager.get_cache_many(['a', 'b', 'c']), {'a': {'x': 1}, 'b': [1, 2]})
+
+        keys_before = len(self.client.data)
+        self.manager.clear_signal_history()
+        self.manager.invalidate_cache()
+        self.assertFalse(self.manager.is_signal_sent('s1'))
+        self.assertIsNone(self.manager.get_cache('a'))
+        self.assertEqual(len(self.client.data), keys_before + 2)
+
+        self.manager.mark_signal_sent('s1')
+        self.assertIn('signal:v1:s1', self.client.data)
+
+    def test_other_process_bump_is_picked_up(self):
+        self.manager.mark_signal_sent('s1')
+        self.client.incr('signal:__version__')
+        self.assertFalse(self.manager.is_signal_sent('s1'))
+        self.manager.mark_signal_sent('s2')
+        self.assertTrue(self.manager.is_signal_sent('s2'))
+        self.assertEqual(self.manager._versions['signal'], 1)
+
+    def test_scan_purge_skips_version_keys(self):
+        self.manager.mark_signals_sent([f"s{i}" for i in range(1200)])
+        self.client.incr('signal:__version__')
+        self.assertEqual(self.manager.purge_keys('signal:*', batch_size=500), 1200)
+        self.assertEqual(list(self.client.data), ['signal:__version__'])
+
+
+if __name__ == '__main__':
+    unittest.main()
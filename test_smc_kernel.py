@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk SMC kernel
+Order block dan FVG harus identik dengan loop lama ProfessionalSMCAnalyzer,
+swing / BOS / CHoCH / equal levels dicek dengan data sederhana
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.professional_smc_analyzer import ProfessionalSMCAnalyzer
+from core.smc_kernel import (
+    BOS, CHOCH, BULLISH, BEARISH, SWING_DTYPE, detect_structure, find_fvgs, find_liquidity_pools,
+    find_order_blocks, find_swings
+)
+
+
+def make_candles(n=400, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.6, n))
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 0.8, n),
+    })
+
+
+def legacy_order_blocks(df):
+    blocks = []
+    for i in range(10, len(df) - 5):
+        candle = df.iloc[i]
+        avg_volume = df['volume'].rolling(20).mean().iloc[i]
+        if candle['volume'] > avg_volume * 1.5 and abs(candle['close'] - candle['open']) > 0:
+            blocks.append((i, 'bullish' if candle['close'] > candle['open'] else 'bearish',
+                           min(candle['volume'] / avg_volume, 3.0)))
+    return blocks
+
+
+def legacy_fvgs(df):
+    gaps = []
+    for i in range(2, len(df)):
+        candle1, candle3 = df.iloc[i - 2], df.iloc[i]
+        if candle1['high'] < candle3['low']:
+            gaps.append((i - 1, candle1['high'], candle3['low']))
+        elif candle1['low'] > candle3['high']:
+            gaps.append((i - 1, candle1['low'], candle3['high']))
+    return gaps
+
+
+class TestKernelMatchesLoops(unittest.TestCase):
+    """Kernel vs loop lama"""
+
+    def setUp(self):
+        self.df = make_candles()
+
+    def test_order_blocks(self):
+        df = self.df
+        blocks = find_order_blocks(df['open'].values, df['high'].values, df['low'].values,
+                                   df['close'].values, df['volume'].values)
+        expected = legacy_order_blocks(df)
+        self.assertEqual(blocks['index'].tolist(), [block[0] for block in expected])
+        self.assertEqual(['bullish' if d == BULLISH else 'bearish' for d in blocks['direction']],
+                         [block[1] for block in expected])
+        np.testing.assert_allclose(blocks['strength'], [block[2] for block in expected])
+
+    def test_fvgs(self):
+        gaps = find_fvgs(self.df['high'].values, self.df['low'].values)
+        expected = legacy_fvgs(self.df)
+        self.assertEqual(gaps['index'].tolist(), [gap[0] for gap in expected])
+        # Kernel reports the gap's upper/lower edge
+        self.assertEqual(gaps['top'].tolist(), [max(gap[1], gap[2]) for gap in expected])
+        self.assertEqual(gaps['bottom'].tolist(), [min(gap[1], gap[2]) for gap in expected])
+
+    def test_analyzer_output_shape(self):
+        candles = self.df.assign(timestamp=np.arange(len(self.df)) * 3600000).to_dict('records')
+        result = ProfessionalSMCAnalyzer().analyze_market_structure({'candles': candles})
+        self.assertLessEqual(len(result['order_blocks']), 5)
+        self.assertLessEqual(len(result['fair_value_gaps']), 3)
+        last_gap = legacy_fvgs(self.df)[-1]
+        self.assertEqual(result['fair_value_gaps'][-1]['timestamp'], last_gap[0] * 3600000)
+        # Analyzer keeps the legacy candle1 -> 'high', candle3 -> 'low' mapping
+        self.assertEqual([(gap['high'], gap['low']) for gap in result['fair_value_gaps']],
+                         [(gap[1], gap[2]) for gap in legacy_fvgs(self.df)[-3:]])
+        self.assertIn('choch_count', result['structure_analysis'])
+        self.assertIn('equal_highs', result['liquidity_analysis'])
+
+
+class TestStructure(unittest.TestCase):
+    """Swing, BOS/CHoCH dan equal levels"""
+
+    def test_swings(self):
+        high = np.array([1, 2, 5, 2, 1, 2, 3, 2, 1], dtype=float)
+        low = high - 0.5
+        swings = find_swings(high, low, length=2)
+        self.assertEqual(swings[swings['kind'] == 1]['index'].tolist(), [2, 6])
+        self.assertEqual(swings[swings['kind'] == -1]['index'].tolist(), [4])
+
+    def test_bos_then_choch(self):
+        # Rally to a high at bar 2, pullback low at bar 4, break up (BOS) then break down (CHoCH)
+        close = np.array([10, 11, 12, 11, 9, 10, 11, 13, 12, 10, 8, 7], dtype=float)
+        high = close + 0.2
+        low = close - 0.2
+        swings = find_swings(high, low, length=2)
+        events = detect_structure(high, low, close, swings, length=2)
+        self.assertEqual(events['direction'].tolist(), [BULLISH, BEARISH])
+        self.assertEqual(events['kind'].tolist(), [BOS, CHOCH])
+        self.assertEqual(events['index'].tolist(), [7, 10])
+        self.assertEqual(events['swing_index'].tolist(), [2, 4])
+
+    def test_equal_highs(self):
+        swings = np.zeros(3, dtype=SWING_DTYPE)
+        swings['index'] = [5, 20, 40]
+        swings['price'] = [100.0, 100.05, 103.0]
+        swings['kind'] = 1
+        pools = find_liquidity_pools(swings, tolerance=0.001)
+        self.assertEqual(len(pools), 1)
+        self.assertEqual(pools[0]['touches'], 2)
+        self.assertEqual((pools[0]['first_index'], pools[0]['last_index']), (5, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
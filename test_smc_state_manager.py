@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk SMCStateManager persistence
+State di-upsert per key ke SQLite dan harus utuh setelah restart
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import sqlite3
+import sys
+from pathlib import Path
+sys.path.append('.')
+
+from core.smc_state_manager import SMCState, SMCStateManager, SwingPoint, SwingType
+
+
+def make_state(symbol, timeframe):
+    return SMCState(
+        symbol=symbol, timeframe=timeframe, last_updated=1700000000.0, trend_direction='bullish',
+        last_structure_break={'type': 'BOS', 'price': 101.5},
+        swing_highs=[SwingPoint(1700000000.0, 101.5, SwingType.HH, True)],
+        swing_lows=[SwingPoint(1699990000.0, 98.0, SwingType.HL)],
+        fvg_zones=[{'high': 100.0, 'low': 99.5}]
+    )
+
+
+class TestSMCStatePersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_state_survives_restart(self):
+        manager = SMCStateManager(self.tmp_dir)
+        for symbol in ('BTC-USDT', 'ETH-USDT'):
+            for timeframe in ('1H', '4H'):
+                manager._save_state(f"{symbol}_{timeframe}", make_state(symbol, timeframe))
+        manager.close()
+
+        reloaded = SMCStateManager(self.tmp_dir)
+        self.assertEqual(len(reloaded.states), 4)
+        state = reloaded.get_smc_state('ETH-USDT', '4H')
+        self.assertEqual(state, make_state('ETH-USDT', '4H'))
+        self.assertIs(state.swing_highs[0].swing_type, SwingType.HH)
+        reloaded.close()
+
+    def test_update_writes_only_its_key(self):
+        manager = SMCStateManager(self.tmp_dir)
+        manager._save_state('BTC-USDT_1H', make_state('BTC-USDT', '1H'))
+        manager._save_state('ETH-USDT_1H', make_state('ETH-USDT', '1H'))
+
+        updated = make_state('BTC-USDT', '1H')
+        updated.trend_direction = 'bearish'
+        manager.states['ETH-USDT_1H'].trend_direction = 'unsaved'
+        manager._save_state('BTC-USDT_1H', updated)
+        manager.close()
+
+        db = sqlite3.connect(str(Path(self.tmp_dir) / 'smc_states.db'))
+        rows = dict(db.execute("SELECT state_key, state_json FROM smc_states").fetchall())
+        db.close()
+        self.assertEqual(json.loads(rows['BTC-USDT_1H'])['trend_direction'], 'bearish')
+        self.assertEqual(json.loads(rows['ETH-USDT_1H'])['trend_direction'], 'bullish')
+
+    def test_imports_legacy_json_once(self):
+        legacy = {'BTC-USDT_1H': json.loads(json.dumps(
+            make_state('BTC-USDT', '1H').__dict__, default=lambda o: o.__dict__ if isinstance(o, SwingPoint) else str(o)
+        ))}
+        self.assertEqual(legacy['BTC-USDT_1H']['swing_highs'][0]['swing_type'], 'SwingType.HH')
+        (Path(self.tmp_dir) / 'smc_states.json').write_text(json.dumps(legacy))
+
+        manager = SMCStateManager(self.tmp_dir)
+        self.assertEqual(manager.states['BTC-USDT_1H'], make_state('BTC-USDT', '1H'))
+        manager.close()
+
+        # Database now owns the state; later edits to the JSON file are ignored
+        (Path(self.tmp_dir) / 'smc_states.json').write_text(json.dumps({}))
+        reloaded = SMCStateManager(self.tmp_dir)
+        self.assertEqual(list(reloaded.states), ['BTC-USDT_1H'])
+        reloaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk streaming indicators
+Nilai incremental harus sama dengan perhitungan batch FeatureFrame, preview
+live candle tidak boleh mengubah state, dan checkpoint harus bisa dilanjutkan
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.candle_store import CandleStore, candles_to_records
+from core.feature_frame import FeatureFrame
+from core.indicator_calculator import on_balance_volume
+from core.streaming_indicators import (
+    StreamingIndicatorSet, StreamingIndicatorManager, StreamingVWAP, iter_candles
+)
+
+HOUR_MS = 3600 * 1000
+
+
+def make_candles(n=300, seed=5, start_price=60000.0):
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    spread = np.abs(rng.normal(0, start_price * 0.002, n))
+    return [
+        {
+            'timestamp': (i + 1) * HOUR_MS,
+            'open': float(close[i - 1] if i else close[0]),
+            'high': float(close[i] + spread[i]),
+            'low': float(close[i] - spread[i]),
+            'close': float(close[i]),
+            'volume': float(rng.lognormal(3, 1))
+        }
+        for i in range(n)
+    ]
+
+
+def to_frame(candles):
+    return pd.DataFrame(candles).set_index('timestamp')
+
+
+class TestStreamingMatchesBatch(unittest.TestCase):
+    """Nilai streaming = nilai batch pada bar terakhir"""
+
+    def setUp(self):
+        self.candles = make_candles()
+        self.features = FeatureFrame(to_frame(self.candles))
+        self.indicator_set = StreamingIndicatorSet('BTC-USDT', '1H')
+        for candle in self.candles:
+            self.indicator_set.update(candle)
+        self.values = self.indicator_set.snapshot()['values']
+
+    def test_ema_rsi_macd(self):
+        ema = self.features.get('ema', period=20, adjust=False).iloc[-1]
+        self.assertAlmostEqual(self.values['ema_20'], ema, places=6)
+
+        rsi = self.features.get('rsi', period=14, method='wilder').iloc[-1]
+        self.assertAlmostEqual(self.values['rsi'], rsi, places=8)
+
+        macd = self.features.get('macd', adjust=False)
+        self.assertAlmostEqual(self.values['macd']['macd'], macd['macd'].iloc[-1], places=6)
+        self.assertAlmostEqual(self.values['macd']['signal'], macd['signal'].iloc[-1], places=6)
+
+    def test_bollinger_and_atr_running_sums(self):
+        bands = self.features.get('bollinger', period=20, std_dev=2.0)
+        self.assertAlmostEqual(self.values['bollinger']['upper'], bands['upper'].iloc[-1], places=6)
+        self.assertAlmostEqual(self.values['bollinger']['lower'], bands['lower'].iloc[-1], places=6)
+        self.assertAlmostEqual(self.values['atr'], self.features.get('atr', period=14).iloc[-1], places=6)
+
+    def test_obv(self):
+        df = to_frame(self.candles)
+        expected = on_balance_volume(df['close'].values, df['volume'].values)[-1]
+        self.assertAlmostEqual(self.values['obv'], expected, places=6)
+
+    def test_vwap_session_reset(self):
+        vwap = StreamingVWAP(session_ms=2 * HOUR_MS)
+        vwap.update((0, 1, 10, 10, 10, 1))
+        vwap.update((HOUR_MS, 1, 20, 20, 20, 1))
+        self.assertAlmostEqual(vwap.value, 15.0)
+        vwap.update((2 * HOUR_MS, 1, 40, 40, 40, 1))
+        self.assertAlmostEqual(vwap.value, 40.0)
+
+
+class TestLiveCandles(unittest.TestCase):
+    """Live tick di-preview tanpa commit"""
+
+    def test_preview_does_not_commit(self):
+        candles = make_candles(60)
+        indicator_set = StreamingIndicatorSet('ETH-USDT', '1H')
+        for candle in candles[:-1]:
+            indicator_set.update(candle)
+        committed = indicator_set.snapshot()['values']
+
+        live = dict(candles[-1], close=candles[-1]['close'] * 1.01)
+        preview = indicator_set.update(live, closed=False)
+        self.assertTrue(preview['live'])
+        self.assertNotEqual(preview['values']['ema_20'], committed['ema_20'])
+
+        # Closing the bar with its final values equals a clean batch run
+        final = indicator_set.update(candles[-1], closed=True)
+        reference = StreamingIndicatorSet('ETH-USDT', '1H')
+        for candle in candles:
+            reference.update(candle)
+        self.assertFalse(final['live'])
+        self.assertEqual(final['values'], reference.snapshot()['values'])
+
+    def test_stale_candle_ignored(self):
+        candles = make_candles(30)
+        indicator_set = StreamingIndicatorSet('ETH-USDT', '1H')
+        for candle in candles:
+            indicator_set.update(candle)
+        indicator_set.update(candles[5])
+        self.assertEqual(indicator_set.closed_count, 30)
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Checkpoint ke disk dan catch-up dari CandleStore"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_restore_and_continue(self):
+        candles = make_candles(120)
+        manager = StreamingIndicatorManager(checkpoint_dir=self.tmp_dir, checkpoint_every=0)
+        manager.warm_up('BTC-USDT', '1H', candles[:100])
+        self.assertEqual(manager.checkpoint(), 1)
+
+        restored = StreamingIndicatorManager(checkpoint_dir=self.tmp_dir)
+        for candle in candles[100:]:
+            restored.update('BTC-USDT', '1H', candle)
+
+        reference = StreamingIndicatorSet('BTC-USDT', '1H')
+        for candle in candles:
+            reference.update(candle)
+        self.assertEqual(restored.snapshot('BTC-USDT', '1H')['values'], reference.snapshot()['values'])
+
+    def test_catch_up_from_candle_store(self):
+        candles = make_candles(50)
+        store = CandleStore(base_dir=f"{self.tmp_dir}/candles")
+        store.merge('SOL-USDT', '1H', candles_to_records(candles))
+
+        manager = StreamingIndicatorManager(checkpoint_dir=self.tmp_dir, candle_store=store)
+        snapshot = manager.snapshot('SOL-USDT', '1H')
+        # Newest stored candle is treated as still forming
+        self.assertEqual(snapshot['closed_bars'], 49)
+        self.assertTrue(snapshot['live'])
+
+    def test_iter_candles_from_dataframe(self):
+        df = pd.DataFrame(make_candles(5))
+        df.index = pd.to_datetime(df.pop('timestamp'), unit='ms', utc=True)
+        timestamps = [candle[0] for candle in iter_candles(df)]
+        self.assertEqual(timestamps, [(i + 1) * HOUR_MS for i in range(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
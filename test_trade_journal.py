@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk TradeJournal & TradeLogger persistence
+Query "sejak cutoff" hanya membaca segment/blok yang relevan dan hasilnya sama
+dengan scan penuh; active trades bertahan setelah restart
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import random
+import sys
+from pathlib import Path
+sys.path.append('.')
+
+import numpy as np
+
+from core.trade_journal import TradeJournal, segment_name
+from core.trade_logger import TradeLogger, TRAINING_FEATURES
+
+DAY = 86400
+NOW = 1773500000.0
+
+
+def make_records(count, seed=1):
+    rng = random.Random(seed)
+    return [{'trade_id': f"t{i}", 'timestamp': NOW - rng.uniform(0, 40 * DAY)} for i in range(count)]
+
+
+class TestTradeJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_read_since_matches_full_scan(self):
+        records = make_records(3000)
+        journal = TradeJournal(self.tmp_dir, block_size=16)
+        for start in range(0, len(records), 250):
+            journal.extend(records[start:start + 250])
+
+        for days in (0.5, 7, 30, 60):
+            cutoff = NOW - days * DAY
+            expected = sorted(r['trade_id'] for r in records if r['timestamp'] >= cutoff)
+            self.assertEqual(sorted(r['trade_id'] for r in journal.read_since(cutoff)), expected)
+            # Same answer after a restart (tail blocks rebuilt from index + scan)
+            reopened = TradeJournal(self.tmp_dir, block_size=16)
+            self.assertEqual(sorted(r['trade_id'] for r in reopened.read_since(cutoff)), expected)
+
+    def test_old_segments_are_not_opened(self):
+        journal = TradeJournal(self.tmp_dir)
+        journal.extend(make_records(500))
+        old = Path(self.tmp_dir) / f"{segment_name(NOW - 35 * DAY)}.jsonl"
+        self.assertTrue(old.exists())
+        old.write_text('not json at all\n')
+        self.assertTrue(list(journal.read_since(NOW - 7 * DAY)))
+
+        self.assertGreater(journal.prune_before(NOW - 30 * DAY), 0)
+        self.assertGreaterEqual(min(journal.segments()), segment_name(NOW - 30 * DAY))
+
+    def test_torn_tail_is_dropped_on_next_append(self):
+        journal = TradeJournal(self.tmp_dir, block_size=4)
+        journal.extend([{'trade_id': f"a{i}", 'timestamp': NOW} for i in range(6)])
+        segment = Path(self.tmp_dir) / f"{segment_name(NOW)}.jsonl"
+        with open(segment, 'a') as f:
+            f.write('{"trade_id": "torn", "timest')
+
+        reopened = TradeJournal(self.tmp_dir, block_size=4)
+        reopened.append({'trade_id': 'b', 'timestamp': NOW})
+        ids = [r['trade_id'] for r in reopened.read_since(NOW - DAY)]
+        self.assertEqual(ids, [f"a{i}" for i in range(6)] + ['b'])
+
+    def test_two_instances_share_a_directory(self):
+        first = TradeJournal(self.tmp_dir, block_size=3)
+        second = TradeJournal(self.tmp_dir, block_size=3)
+        first.append({'trade_id': 'a1', 'timestamp': NOW})
+        second.append({'trade_id': 'b1', 'timestamp': NOW})
+        first.append({'trade_id': 'a2', 'timestamp': NOW})
+        for i in range(5):
+            (first if i % 2 else second).append({'trade_id': f"c{i}", 'timestamp': NOW})
+
+        expected = ['a1', 'b1', 'a2'] + [f"c{i}" for i in range(5)]
+        for journal in (first, second, TradeJournal(self.tmp_dir, block_size=3)):
+            self.assertEqual([r['trade_id'] for r in journal.read_since(NOW - DAY)], expected)
+        index = Path(self.tmp_dir) / f"{segment_name(NOW)}.idx"
+        self.assertEqual([json.loads(line)['count'] for line in index.read_text().splitlines()], [3, 3])
+
+
+class TestTradeLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def open_trade(self, trade_logger, symbol='BTC-USDT'):
+        return trade_logger.log_signal_entry(
+            {'symbol': symbol, 'direction': 'BUY', 'entry_price': 100.0, 'timeframe': '1H'},
+            {'smc_score': 0.7, 'total_score': 0.8, 'confidence': 'HIGH'},
+            {'spread_bps': 2.0, 'approved': True},
+            {'structure_break': True, 'fvg_count': 2}
+        )
+
+    def test_burst_ids_are_unique(self):
+        trade_logger = TradeLogger(self.tmp_dir)
+        ids = {self.open_trade(trade_logger) for _ in range(200)}
+        self.assertEqual(len(ids), 200)
+
+    def test_active_trades_survive_restart_and_outcomes_reach_journal(self):
+        trade_logger = TradeLogger(self.tmp_dir)
+        ids = [self.open_trade(trade_logger) for _ in range(5)]
+        trade_logger.update_trade_outcome(ids[0], 'win', 110.0, 10.0, 30)
+        trade_logger.update_trade_outcome(ids[1], 'loss', 95.0, -5.0, 60)
+
+        reloaded = TradeLogger(self.tmp_dir)
+        self.assertEqual(sorted(reloaded.get_active_trades()), sorted(ids[2:]))
+        performance = reloaded.get_recent_performance(30)
+        self.assertEqual((performance['wins'], performance['losses'], performance['total_pnl']), (1, 1, 5.0))
+
+        columns = reloaded.get_training_columns(90)
+        self.assertEqual(set(TRAINING_FEATURES) - set(columns), set())
+        np.testing.assert_array_equal(columns['target_outcome'], [1.0, 0.0])
+        export_file = reloaded.export_training_data(90, format='npz')
+        with np.load(export_file) as data:
+            np.testing.assert_array_equal(data['target_pnl'], [10.0, -5.0])
+
+    def test_imports_legacy_files(self):
+        trade_logger = TradeLogger(self.tmp_dir)
+        trade_id = self.open_trade(trade_logger)
+        entry = trade_logger.active_trades[trade_id]
+        shutil.rmtree(self.tmp_dir)
+        Path(self.tmp_dir).mkdir()
+
+        finished = dict(entry.__dict__, trade_id='old', outcome='win', pnl=3.0, hold_time_minutes=5)
+        (Path(self.tmp_dir) / 'trade_log.jsonl').write_text(json.dumps(finished) + '\n')
+        (Path(self.tmp_dir) / 'active_trades.json').write_text(json.dumps({trade_id: entry.__dict__}))
+
+        reloaded = TradeLogger(self.tmp_dir)
+        self.assertEqual(list(reloaded.get_active_trades()), [trade_id])
+        self.assertEqual(reloaded.get_recent_performance(30)['wins'], 1)
+
+    def test_compaction_keeps_other_workers_trades(self):
+        first = TradeLogger(self.tmp_dir)
+        second = TradeLogger(self.tmp_dir)
+        first_ids = [self.open_trade(first) for _ in range(3)]
+        second_id = self.open_trade(second)
+        first.update_trade_outcome(first_ids[0], 'win', 110.0, 10.0, 30)
+
+        # Rebuilt from the shared log on disk, not from first's memory
+        first._save_active_trades()
+        self.assertEqual(sorted(first.get_active_trades()), sorted(first_ids[1:] + [second_id]))
+        self.assertEqual(sorted(TradeLogger(self.tmp_dir).get_active_trades()),
+                         sorted(first_ids[1:] + [second_id]))
+
+    def test_legacy_import_runs_once(self):
+        finished = {'trade_id': 'old', 'timestamp': NOW, 'symbol': 'BTC-USDT', 'signal_type': 'tajam'}
+        (Path(self.tmp_dir) / 'trade_log.jsonl').write_text(json.dumps(finished) + '\n')
+        first = TradeLogger(self.tmp_dir)
+        TradeLogger(self.tmp_dir)
+        self.assertEqual([r['trade_id'] for r in first.journal.read_since(0)], ['old'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk walk-forward runner
+Strategy dengan precomputed features harus sama dengan slice iloc[:i+1] yang lama
+"""
+
+import unittest
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from core.backtesting_engine import BacktestingEngine
+from core.walk_forward import (STEP_STRATEGIES, StrategyFeatures, WalkForwardRunner, new_backtest_state,
+                               walk_forward_splits)
+
+
+def make_candles(n=700, seed=17):
+    rng = np.random.default_rng(seed)
+    # Alternating regimes so every strategy trades
+    drift = np.repeat(rng.choice([-0.004, 0.004], n // 50 + 1), 50)[:n]
+    close = 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.003, 'low': close * 0.997, 'close': close,
+        'volume': rng.lognormal(3, 0.5, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+class FrameFetcher:
+    """Fetcher yang mengembalikan DataFrame tetap"""
+
+    def __init__(self, df):
+        self.df = df
+
+    def get_candles(self, symbol, timeframe, limit=100):
+        return self.df.copy()
+
+
+def legacy_backtest(engine, df, strategy):
+    state = new_backtest_state(10000)
+    for i in range(50, len(df)):
+        current = df.iloc[:i + 1]
+        signal = engine._get_strategy_signal(current, strategy)
+        if signal:
+            engine._execute_backtest_trade(state, signal, current.iloc[-1])
+    return state
+
+
+class TestPrecomputedStrategies(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_candles(300)
+        self.engine = BacktestingEngine(okx_fetcher=FrameFetcher(self.df))
+
+    def test_run_backtest_matches_growing_slices(self):
+        for strategy in STEP_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                result = self.engine.run_backtest('BTC-USDT', strategy, '2024-01-01', '2024-02-01')
+                data = self.df.copy()
+                data['timestamp'] = pd.to_datetime(data.index)
+                expected = legacy_backtest(self.engine, data, strategy)
+                self.assertEqual(result['performance']['final_balance'], round(expected['balance'], 2))
+                self.assertEqual(result['trade_details'], expected['trades'][-10:])
+                self.assertGreater(len(expected['trades']), 0)
+
+
+class TestWalkForward(unittest.TestCase):
+
+    def test_splits(self):
+        rolling = walk_forward_splits(400, 100, 50, mode='rolling')
+        self.assertEqual(rolling[:2], [(50, 150, 200), (100, 200, 250)])
+        self.assertEqual(rolling[-1][2], 400)
+        anchored = walk_forward_splits(400, 100, 50, mode='anchored')
+        self.assertTrue(all(train_start == 50 for train_start, _, _ in anchored))
+        with self.assertRaises(ValueError):
+            walk_forward_splits(400, 100, 50, mode='expanding')
+
+    def test_runner_emits_fold_metrics(self):
+        df = make_candles()
+        runner = WalkForwardRunner(BacktestingEngine())
+        result = runner.run(df, list(STEP_STRATEGIES), train_size=200, test_size=100)
+
+        self.assertEqual(result['summary']['total_folds'], 4)
+        fold = result['folds'][0]
+        self.assertEqual(fold['train']['start'], str(df.index[50]))
+        self.assertEqual(fold['test']['bars'], 100)
+        self.assertEqual(set(fold['in_sample']), set(STEP_STRATEGIES))
+        self.assertIn('sharpe_ratio', fold['out_of_sample'])
+        self.assertEqual(sum(result['summary']['selection_counts'].values()), 4)
+
+    def test_features_computed_once(self):
+        features = StrategyFeatures(make_candles(120))
+        bar = features.view(119)
+        self.assertEqual(len(bar), 120)
+        self.assertEqual(bar.prev('close', 119), features.arrays['close'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit Test untuk WriteBehindQueue
+Batch ditulis per ukuran/interval, urutan terjaga, antrian penuh memberi backpressure
+"""
+
+import unittest
+import threading
+import time
+import sys
+sys.path.append('.')
+
+from core.write_behind import WriteBehindQueue
+
+
+class RecordingSink:
+
+    def __init__(self, gate=None, fail_on=None):
+        self.batches = []
+        self.gate = gate
+        self.fail_on = fail_on
+
+    def __call__(self, batch):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail_on is not None and self.fail_on in batch:
+            raise RuntimeError('write failed')
+        self.batches.append(list(batch))
+
+    @property
+    def items(self):
+        return [item for batch in self.batches for item in batch]
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+
+    def test_flushes_full_batches_without_waiting_for_interval(self):
+        sink = RecordingSink()
+        queue = WriteBehindQueue(sink, batch_size=10, flush_interval_ms=60000)
+        for i in range(25):
+            self.assertTrue(queue.put(i))
+
+        self.assertTrue(wait_for(lambda: len(sink.items) == 20))
+        self.assertEqual([len(batch) for batch in sink.batches], [10, 10])
+        # The partial batch waits for the interval (or an explicit flush)
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(queue.flush(), 5)
+        self.assertEqual(sink.items, list(range(25)))
+        queue.close()
+
+    def test_interval_flushes_partial_batch(self):
+        sink = RecordingSink()
+        queue = WriteBehindQueue(sink, batch_size=100, flush_interval_ms=20)
+        for i in range(3):
+            queue.put(i)
+        self.assertTrue(wait_for(lambda: sink.items == [0, 1, 2]))
+        self.assertEqual(queue.stats()['batches'], 1)
+        queue.close()
+
+    def test_bounded_queue_drops_and_counts(self):
+        gate = threading.Event()
+        sink = RecordingSink(gate=gate)
+        queue = WriteBehindQueue(sink, batch_size=2, flush_interval_ms=1, max_queue_size=4)
+
+        queue.put('a')
+        queue.put('b')
+        # Flusher is now blocked inside the sink with ['a', 'b']
+        self.assertTrue(wait_for(lambda: len(queue) == 0))
+        accepted = [queue.put(i) for i in range(6)]
+        self.assertEqual(accepted, [True] * 4 + [False] * 2)
+
+        stats = queue.stats()
+        self.assertEqual((stats['dropped'], stats['blocked_puts'], stats['high_watermark']), (2, 2, 4))
+
+        gate.set()
+        queue.close()
+        self.assertEqual(sink.items, ['a', 'b', 0, 1, 2, 3])
+        self.assertEqual(queue.stats()['written'], 6)
+
+    def test_put_timeout_waits_for_space(self):
+        gate = threading.Event()
+        sink = RecordingSink(gate=gate)
+        queue = WriteBehindQueue(sink, batch_size=1, flush_interval_ms=1, max_queue_size=1, put_timeout=2.0)
+        queue.put(0)
+        self.assertTrue(wait_for(lambda: len(queue) == 0))
+        queue.put(1)
+
+        threading.Timer(0.05, gate.set).start()
+        self.assertTrue(queue.put(2))
+        queue.close()
+        self.assertEqual(sink.items, [0, 1, 2])
+        self.assertEqual(queue.stats()['dropped'], 0)
+
+    def test_failed_batch_is_counted_and_writer_continues(self):
+        sink = RecordingSink(fail_on='bad')
+        queue = WriteBehindQueue(sink, batch_size=2, flush_interval_ms=60000)
+        for item in ('ok', 'bad', 'x', 'y'):
+            queue.put(item)
+        queue.close()
+
+        stats = queue.stats()
+        self.assertEqual((stats['failed'], stats['written']), (2, 2))
+        self.assertEqual(sink.items, ['x', 'y'])
+        self.assertFalse(queue.put('late'))
+
+
+if __name__ == '__main__':
+    unittest.main()